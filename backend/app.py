@@ -1,42 +1,39 @@
 #!/usr/bin/env python3
 """
 时间管理系统 - 后端应用入口
+
+    python app.py                    # 开发服务器
+    python app.py --startup-profile  # 输出各子系统的冷启动耗时后退出
 """
 
-import os
+import argparse
 from dotenv import load_dotenv
-from app import create_app
 
 # 加载环境变量
 load_dotenv()
 
-# 创建应用实例
-app = create_app()
-
 
-@app.route('/')
-def index():
-    """根路由 - 健康检查"""
-    return {
-        'message': 'Time Management System API',
-        'version': '1.0.0',
-        'status': 'running'
-    }
+def main():
+    parser = argparse.ArgumentParser(description='时间管理系统后端（开发服务器）')
+    parser.add_argument('--startup-profile', action='store_true', help='输出各子系统的导入与初始化耗时后退出')
+    args = parser.parse_args()
 
+    if args.startup_profile:
+        # 必须在导入app包之前执行，否则各子系统已被导入
+        from utils.startup_profile import profile_startup
+        print(profile_startup().report())
+        return
 
-@app.route('/api/health')
-def health_check():
-    """健康检查端点"""
-    return {
-        'status': 'healthy',
-        'timestamp': '2025-01-01T00:00:00Z'
-    }
+    from app import create_app
+    app = create_app()
 
-
-if __name__ == '__main__':
     # 开发环境运行 - 强制启用DEBUG模式
     app.run(
         host='0.0.0.0',
         port=5000,
         debug=True
-    )
\ No newline at end of file
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 from flask import Flask
+from datetime import datetime
+from importlib import import_module
+import click
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 
@@ -8,9 +10,28 @@ from config import get_config
 
 # 初始化扩展
 db = SQLAlchemy()
-migrate = Migrate()
 jwt = JWTManager()
 
+# 蓝图注册表：(模块, 蓝图变量名, URL前缀)，前缀为None时使用蓝图自身的url_prefix
+BLUEPRINTS = (
+    ('routes.auth_routes', 'bp', '/api/auth'),
+    ('routes.user_routes', 'bp', '/api/users'),
+    ('routes.task_routes', 'bp', '/api/tasks'),
+    ('routes.task_category_routes', 'bp', '/api/task-categories'),
+    ('routes.matching_rule_routes', 'bp', '/api/matching-rules'),
+    ('routes.project_routes', 'bp', '/api/projects'),
+    ('routes.tag_routes', 'bp', '/api/tags'),
+    ('routes.time_block_routes', 'bp', '/api/time-blocks'),
+    ('routes.time_block_template_routes', 'bp', '/api/time-block-templates'),
+    ('routes.timeline_routes', 'bp', '/api/timeline'),
+    ('routes.search_routes', 'bp', '/api/search'),
+    ('routes.export_routes', 'bp', '/api/export'),
+    ('routes.import_routes', 'bp', '/api/import'),
+    ('routes.pomodoro_session_routes', 'pomodoro_session_bp', '/api/pomodoro-sessions'),
+    ('routes.recommendation_routes', 'bp', None),
+    ('routes.job_routes', 'bp', None),
+)
+
 
 def create_app(config_class=None):
     """应用工厂函数"""
@@ -23,7 +44,7 @@ def create_app(config_class=None):
 
     # 初始化扩展
     db.init_app(app)
-    migrate.init_app(app, db)
+    init_migrations(app)
     jwt.init_app(app)
 
     # 配置CORS - 开发环境允许所有来源
@@ -33,17 +54,31 @@ def create_app(config_class=None):
         CORS(app, origins=app.config['CORS_ORIGINS'])
 
     # 注册蓝图
-    from routes import auth_routes, user_routes, task_routes, task_category_routes, project_routes, tag_routes, time_block_routes, time_block_template_routes, pomodoro_session_routes, recommendation_routes
-    app.register_blueprint(auth_routes.bp, url_prefix='/api/auth')
-    app.register_blueprint(user_routes.bp, url_prefix='/api/users')
-    app.register_blueprint(task_routes.bp, url_prefix='/api/tasks')
-    app.register_blueprint(task_category_routes.bp, url_prefix='/api/task-categories')
-    app.register_blueprint(project_routes.bp, url_prefix='/api/projects')
-    app.register_blueprint(tag_routes.bp, url_prefix='/api/tags')
-    app.register_blueprint(time_block_routes.bp, url_prefix='/api/time-blocks')
-    app.register_blueprint(time_block_template_routes.bp, url_prefix='/api/time-block-templates')
-    app.register_blueprint(pomodoro_session_routes.pomodoro_session_bp, url_prefix='/api/pomodoro-sessions')
-    app.register_blueprint(recommendation_routes.bp)
+    register_blueprints(app)
+
+    # 初始化后台任务队列并注册任务处理函数
+    from services.job_queue import job_queue
+    import services.background_jobs  # noqa: F401
+    job_queue.init_app(app)
+
+    # 时间块容量索引，随任务排程与时间块修改自动维护
+    from services.capacity_index import capacity_index
+    capacity_index.init_app(app)
+
+    # 冲突增量复查快照
+    from services.incremental_conflicts import incremental_conflict_checker
+    incremental_conflict_checker.init_app(app)
+
+    # 全文搜索索引，随 db.create_all() 创建，由数据库触发器维护
+    from services.search_index import search_index
+    search_index.init_app(app)
+
+    # 注册命令行工具
+    from app.cli import register_commands
+    register_commands(app)
+
+    # 注册根路由与健康检查
+    register_core_routes(app)
 
     # 注册错误处理器
     register_error_handlers(app)
@@ -51,6 +86,47 @@ def create_app(config_class=None):
     return app
 
 
+def init_migrations(app):
+    """初始化数据库迁移
+
+    Flask-Migrate会导入整个alembic，只有 `flask db` 等命令行场景需要，
+    Web进程与测试默认跳过；设置 MIGRATIONS_ENABLED=True 可强制启用
+    """
+    if click.get_current_context(silent=True) is None and not app.config.get('MIGRATIONS_ENABLED', False):
+        return
+
+    from flask_migrate import Migrate
+    Migrate(app, db)
+
+
+def register_blueprints(app):
+    """按注册表导入并注册蓝图"""
+    for module_name, attribute, url_prefix in BLUEPRINTS:
+        blueprint = getattr(import_module(module_name), attribute)
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+
+
+def register_core_routes(app):
+    """注册根路由与健康检查"""
+
+    @app.route('/')
+    def index():
+        """根路由 - 健康检查"""
+        return {
+            'message': 'Time Management System API',
+            'version': '1.0.0',
+            'status': 'running'
+        }
+
+    @app.route('/api/health')
+    def health_check():
+        """健康检查端点"""
+        return {
+            'status': 'healthy',
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        }
+
+
 def register_error_handlers(app):
     """注册错误处理器"""
 
@@ -0,0 +1,209 @@
+"""
+ASGI适配
+高并发轮询端点（健康检查、当前推荐、活跃番茄钟）使用异步实现，
+其余请求通过WsgiToAsgi交给Flask应用，蓝图无需改动
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from flask_jwt_extended import decode_token
+from jwt import ExpiredSignatureError, InvalidTokenError
+from sqlalchemy import select
+
+from models.pomodoro_session import PomodoroSession, SessionStatus
+from models.task import Task, TaskStatus
+from services.async_db import create_async_engine_for_app, create_async_session_factory
+from services.recommendation_service import RecommendationService
+
+JSONResponse = Tuple[int, Dict[str, Any]]
+
+
+class AuthenticationError(Exception):
+    """认证失败，响应格式与Flask-JWT-Extended保持一致"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class AsyncRequest:
+    """异步端点使用的最小请求对象"""
+
+    def __init__(self, scope: Dict[str, Any]):
+        self.scope = scope
+        self.headers = {
+            name.decode('latin-1').lower(): value.decode('latin-1')
+            for name, value in scope.get('headers', [])
+        }
+        query = parse_qs(scope.get('query_string', b'').decode('utf-8'))
+        self.args = {key: values[-1] for key, values in query.items()}
+
+
+class AsyncAPIApplication:
+    """ASGI应用：异步轮询端点 + Flask回退"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi_app = WsgiToAsgi(flask_app)
+        self.engine = create_async_engine_for_app(flask_app)
+        self.session_factory = create_async_session_factory(self.engine)
+        self.routes = {
+            '/api/health': self.health_check,
+            '/api/recommendations/current': self.get_current_recommendation,
+            '/api/pomodoro-sessions/active': self.get_active_pomodoro_session
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._handle_lifespan(receive, send)
+            return
+
+        handler = None
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            handler = self.routes.get(scope['path'])
+
+        if handler is None:
+            await self.wsgi_app(scope, receive, send)
+            return
+
+        request = AsyncRequest(scope)
+        status_code, body = await handler(request)
+        await self._send_json(request, send, status_code, body)
+
+    async def _handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _send_json(self, request: AsyncRequest, send, status_code: int, body: Dict[str, Any]):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode('latin-1'))
+        ]
+        headers.extend(self._cors_headers(request))
+
+        await send({'type': 'http.response.start', 'status': status_code, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    def _cors_headers(self, request: AsyncRequest) -> List[Tuple[bytes, bytes]]:
+        """与create_app中的CORS配置保持一致（预检请求仍由Flask-CORS处理）"""
+        origin = request.headers.get('origin')
+        if not origin:
+            return []
+
+        if self.flask_app.config.get('DEBUG', False):
+            return [
+                (b'access-control-allow-origin', origin.encode('latin-1')),
+                (b'access-control-allow-credentials', b'true'),
+                (b'vary', b'Origin')
+            ]
+        if origin in self.flask_app.config.get('CORS_ORIGINS', []):
+            return [
+                (b'access-control-allow-origin', origin.encode('latin-1')),
+                (b'vary', b'Origin')
+            ]
+        return []
+
+    def _get_identity(self, request: AsyncRequest) -> str:
+        """校验Bearer令牌并返回用户ID"""
+        auth_header = request.headers.get('authorization')
+        if not auth_header:
+            raise AuthenticationError(401, 'Missing Authorization Header')
+
+        parts = auth_header.split()
+        if len(parts) != 2 or parts[0] != 'Bearer':
+            raise AuthenticationError(422, "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'")
+
+        try:
+            with self.flask_app.app_context():
+                decoded = decode_token(parts[1])
+        except ExpiredSignatureError:
+            raise AuthenticationError(401, 'Token has expired')
+        except InvalidTokenError as e:
+            raise AuthenticationError(422, str(e))
+
+        if decoded.get('type') != 'access':
+            raise AuthenticationError(422, 'Only non-refresh tokens are allowed')
+
+        return decoded[self.flask_app.config.get('JWT_IDENTITY_CLAIM', 'sub')]
+
+    async def health_check(self, request: AsyncRequest) -> JSONResponse:
+        """健康检查端点"""
+        return 200, {
+            'status': 'healthy',
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        }
+
+    async def get_current_recommendation(self, request: AsyncRequest) -> JSONResponse:
+        """获取当前最应该执行的任务推荐"""
+        try:
+            current_user_id = self._get_identity(request)
+        except AuthenticationError as e:
+            return e.status_code, {'msg': e.message}
+
+        current_time = datetime.utcnow()
+        current_time_str = request.args.get('current_time')
+        if current_time_str:
+            try:
+                current_time = datetime.fromisoformat(current_time_str)
+            except ValueError:
+                return 400, {'error': 'Invalid time format'}
+
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(Task).where(
+                        Task.user_id == current_user_id,
+                        Task.status == TaskStatus.PENDING
+                    )
+                )
+                pending_tasks = result.scalars().all()
+
+            recommendations = RecommendationService(None).rank_tasks(pending_tasks, current_time, limit=1)
+        except Exception as e:
+            return 500, {'error': f'获取推荐失败: {str(e)}'}
+
+        if recommendations:
+            return 200, {
+                'recommendation': recommendations[0],
+                'timestamp': datetime.utcnow().isoformat()
+            }
+        return 200, {
+            'message': '暂无待处理任务',
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+    async def get_active_pomodoro_session(self, request: AsyncRequest) -> JSONResponse:
+        """获取当前活跃的番茄钟会话"""
+        try:
+            user_id = self._get_identity(request)
+        except AuthenticationError as e:
+            return e.status_code, {'msg': e.message}
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(PomodoroSession).where(
+                    PomodoroSession.user_id == user_id,
+                    PomodoroSession.status == SessionStatus.IN_PROGRESS
+                ).limit(1)
+            )
+            active_session = result.scalars().first()
+
+        if active_session:
+            return 200, {'active_session': active_session.to_dict()}
+        return 200, {'message': '没有活跃的番茄钟会话'}
+
+
+def create_asgi_app(flask_app) -> AsyncAPIApplication:
+    """创建ASGI应用"""
+    return AsyncAPIApplication(flask_app)
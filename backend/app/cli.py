@@ -0,0 +1,107 @@
+"""
+命令行工具
+"""
+import click
+from flask.cli import AppGroup
+
+jobs_cli = AppGroup('jobs', help='后台任务管理')
+search_cli = AppGroup('search', help='全文搜索索引管理')
+time_blocks_cli = AppGroup('time-blocks', help='时间块数据维护')
+analytics_cli = AppGroup('analytics', help='分析数据导出')
+time_logs_cli = AppGroup('time-logs', help='时间账本维护')
+counters_cli = AppGroup('counters', help='任务、项目与分类计数维护')
+
+
+@jobs_cli.command('worker')
+@click.option('--poll-interval', default=1.0, show_default=True, help='无任务时的轮询间隔（秒）')
+@click.option('--once', is_flag=True, help='执行一轮到期任务后退出')
+def run_job_worker(poll_interval: float, once: bool):
+    """运行后台任务worker，执行jobs表中到期的待处理任务"""
+    from services.job_queue import job_queue
+
+    click.echo(f'Job worker started (poll interval {poll_interval}s)')
+    job_queue.work(poll_interval=poll_interval, once=once)
+
+
+@search_cli.command('rebuild')
+def rebuild_search_index():
+    """按源表重建全文搜索索引，已有数据库首次启用搜索或绕过触发器修改数据后使用"""
+    from services.search_index import search_index
+
+    if search_index.rebuild():
+        click.echo('Search index rebuilt')
+    else:
+        click.echo('Full-text search is not supported by this database, search falls back to LIKE')
+
+
+@time_blocks_cli.command('sync-durations')
+def sync_time_block_durations():
+    """补齐duration_minutes列并按开始、结束时间修正存储的时长（绕过ORM修改时间后使用）"""
+    from app import db
+    from models.time_block import sync_durations
+
+    with db.engine.begin() as connection:
+        changed = sync_durations(connection)
+    click.echo(f'Updated duration of {changed} time blocks')
+
+
+@time_logs_cli.command('backfill')
+def backfill_time_log_ledger():
+    """为尚无时间日志的已结束专注会话补生成日志，启用时间账本前的历史数据或批量导入的会话使用"""
+    from models.time_log import backfill_time_logs
+
+    click.echo(f'Created {backfill_time_logs()} time logs')
+
+
+@counters_cli.command('reconcile')
+@click.option('--user', 'user_id', help='只检查指定用户ID（默认全部）')
+@click.option('--dry-run', is_flag=True, help='只报告偏差，不修正')
+def reconcile_counters(user_id: str, dry_run: bool):
+    """按任务与时间日志检查冗余计数，修正偏差（绕过ORM修改数据后使用）"""
+    from app import db
+    from models.counters import reconcile_counters as reconcile
+
+    with db.engine.begin() as connection:
+        drift = reconcile(connection, user_id, repair=not dry_run)
+    action = 'Found' if dry_run else 'Repaired'
+    for table, rows in drift.items():
+        click.echo(f'{action} counter drift in {rows} {table}')
+
+
+@analytics_cli.command('export')
+@click.argument('user')
+@click.argument('output_dir', type=click.Path(file_okay=False))
+@click.option('--format', 'export_format', type=click.Choice(['parquet', 'arrow']), default='parquet',
+              show_default=True)
+@click.option('--entity', 'entities', multiple=True, help='只导出指定实体，可重复（默认全部）')
+def export_analytics(user: str, output_dir: str, export_format: str, entities):
+    """将USER（ID、用户名或邮箱）的番茄钟会话、任务与时间块写成列式文件到OUTPUT_DIR"""
+    import os
+    from app import db
+    from models.user import User
+    from services import analytics_export
+
+    if not analytics_export.is_available():
+        raise click.ClickException('Analytics export requires pyarrow (pip install .[analytics])')
+    account = User.query.filter(db.or_(User.id == user, User.username == user, User.email == user)).first()
+    if account is None:
+        raise click.ClickException(f'User not found: {user}')
+
+    os.makedirs(output_dir, exist_ok=True)
+    _, extension = analytics_export.ANALYTICS_FORMATS[export_format]
+    for entity in entities or analytics_export.ANALYTICS_ENTITIES:
+        if entity not in analytics_export.ANALYTICS_ENTITIES:
+            raise click.ClickException(f'Unknown entity: {entity}')
+        path = os.path.join(output_dir, f'{entity}.{extension}')
+        rows = analytics_export.AnalyticsExport(account.id, entity).write_to(path, export_format)
+        click.echo(f'Wrote {rows} rows to {path}')
+
+
+def register_commands(app):
+    """注册命令行工具"""
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(time_blocks_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(time_logs_cli)
+    app.cli.add_command(counters_cli)
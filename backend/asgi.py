@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+时间管理系统 - ASGI入口
+轮询端点异步处理，其余请求交给Flask应用
+uvicorn asgi:application
+gunicorn -k uvicorn.workers.UvicornWorker asgi:application
+"""
+
+from dotenv import load_dotenv
+from app import create_app
+from app.asgi import create_asgi_app
+
+# 加载环境变量
+load_dotenv()
+
+# 创建应用实例
+application = create_asgi_app(create_app())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+自动排程压测：1000个任务 × 200个时间块（每天8个2小时时间块，共25天）
+
+分别测量纯排程算法（数据已加载）与包含数据库读取的完整排程（dry_run，不写入）。
+
+用法（在backend目录下）：
+    python benchmarks/bench_auto_schedule.py
+    python benchmarks/bench_auto_schedule.py --tasks 5000 --blocks 500 --repeat 3
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CATEGORY_NAMES = ['科研', '学习', '工作', '阅读', '运动', '娱乐', '休息', '总结', '规划', '其他']
+
+
+def _seed(user_id, start_date, task_count, block_count, blocks_per_day, rng):
+    from app import db
+    from models.task import Task, TaskType, TaskStatus, PriorityLevel
+    from models.task_category import TaskCategory
+    from models.time_block import TimeBlock, BlockType
+
+    categories = [TaskCategory(name=name, color='#888888', user_id=user_id) for name in CATEGORY_NAMES]
+    db.session.add_all(categories)
+    db.session.flush()
+
+    days = -(-block_count // blocks_per_day)
+    block_minutes = (16 * 60) // blocks_per_day
+    blocks = []
+    for index in range(block_count):
+        day, slot = divmod(index, blocks_per_day)
+        date = start_date + timedelta(days=day)
+        start_time = date + timedelta(hours=7, minutes=slot * block_minutes)
+        blocks.append(TimeBlock(
+            user_id=user_id,
+            date=date,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=block_minutes),
+            block_type=rng.choice(list(BlockType)),
+            color='#888888'
+        ))
+    db.session.add_all(blocks)
+
+    tasks = [
+        Task(
+            title=f'任务 {i}',
+            user_id=user_id,
+            planned_start_time=start_date + timedelta(minutes=rng.randrange(days * 24 * 60)),
+            estimated_pomodoros=rng.randint(1, 3),
+            task_type=TaskType.RIGID if rng.random() < 0.1 else TaskType.FLEXIBLE,
+            category_id=rng.choice(categories).id,
+            status=TaskStatus.PENDING,
+            priority=rng.choice(list(PriorityLevel))
+        )
+        for i in range(task_count)
+    ]
+    db.session.add_all(tasks)
+    db.session.commit()
+    return days
+
+
+def _time(func, repeat):
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='自动排程压测')
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--blocks', type=int, default=200)
+    parser.add_argument('--blocks-per-day', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+        from app import create_app, db
+        from models.task import Task
+        from models.time_block import TimeBlock
+        from services.auto_scheduler import auto_scheduler
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            user_id = 'benchmark-user'
+            start_date = datetime(2025, 1, 6)
+            days = _seed(user_id, start_date, args.tasks, args.blocks, args.blocks_per_day, random.Random(args.seed))
+            end_date = start_date + timedelta(days=days - 1)
+
+            tasks = Task.query.filter_by(user_id=user_id).all()
+            blocks = TimeBlock.query.filter_by(user_id=user_id).order_by(TimeBlock.start_time).all()
+            category_names = auto_scheduler._load_category_names(tasks)
+
+            algorithm_time, result = _time(
+                lambda: auto_scheduler.build_schedule(user_id, tasks, blocks, {}, category_names),
+                args.repeat
+            )
+            end_to_end_time, _ = _time(
+                lambda: auto_scheduler.schedule(user_id, start_date, end_date, dry_run=True),
+                args.repeat
+            )
+
+        summary = result['summary']
+        print(f'tasks={args.tasks} blocks={args.blocks} days={days} repeat={args.repeat}')
+        print(f"scheduled={summary['scheduled']} unscheduled={summary['unscheduled']} "
+              f"minutes={summary['scheduled_minutes']}")
+        print(f'algorithm only: {algorithm_time * 1000:.1f} ms')
+        print(f'with queries  : {end_to_end_time * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+批量时间块建议压测：N个任务 × 一天内M个时间块
+
+对比逐任务调用find_best_time_blocks与一次性计算分数矩阵（数据已加载），
+并测量包含数据库读取的批量建议（suggest_time_blocks_for_tasks）。
+
+用法（在backend目录下）：
+    python benchmarks/bench_batch_suggest.py
+    python benchmarks/bench_batch_suggest.py --tasks 500 --blocks 48 --repeat 3
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CATEGORY_NAMES = ['科研', '学习', '工作', '阅读', '运动', '娱乐', '休息', '总结', '规划', '其他']
+
+
+def _seed(user_id, day, task_count, block_count, rng):
+    from app import db
+    from models.task import Task, TaskType, TaskStatus
+    from models.task_category import TaskCategory
+    from models.time_block import TimeBlock, BlockType
+
+    categories = [TaskCategory(name=name, color='#888888', user_id=user_id) for name in CATEGORY_NAMES]
+    db.session.add_all(categories)
+    db.session.flush()
+
+    block_minutes = (16 * 60) // block_count
+    blocks = []
+    for slot in range(block_count):
+        start_time = day + timedelta(hours=7, minutes=slot * block_minutes)
+        blocks.append(TimeBlock(
+            user_id=user_id,
+            date=day,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=block_minutes),
+            block_type=rng.choice(list(BlockType)),
+            color='#888888'
+        ))
+    db.session.add_all(blocks)
+
+    db.session.add_all([
+        Task(
+            title=f'任务 {i}',
+            user_id=user_id,
+            planned_start_time=day + timedelta(minutes=rng.randrange(24 * 60)),
+            estimated_pomodoros=rng.randint(1, 3),
+            task_type=TaskType.FLEXIBLE,
+            category_id=rng.choice(categories).id,
+            status=TaskStatus.PENDING
+        )
+        for i in range(task_count)
+    ])
+    db.session.commit()
+
+
+def _time(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量时间块建议压测')
+    parser.add_argument('--tasks', type=int, default=300)
+    parser.add_argument('--blocks', type=int, default=32)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+        from app import create_app, db
+        from models.task import Task
+        from models.time_block import TimeBlock
+        from services.category_timeblock_matching import category_timeblock_matcher
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            user_id = 'benchmark-user'
+            day = datetime(2025, 1, 6)
+            _seed(user_id, day, args.tasks, args.blocks, random.Random(args.seed))
+
+            tasks = Task.query.filter_by(user_id=user_id).all()
+            blocks = TimeBlock.query.filter_by(user_id=user_id).order_by(TimeBlock.start_time).all()
+
+            per_task_time = _time(
+                lambda: [category_timeblock_matcher.find_best_time_blocks(task, blocks, args.top_k) for task in tasks],
+                args.repeat
+            )
+            matrix_time = _time(
+                lambda: category_timeblock_matcher.score_matrix(user_id, tasks, blocks),
+                args.repeat
+            )
+            batch_time = _time(
+                lambda: category_timeblock_matcher.suggest_time_blocks_for_tasks(
+                    user_id, Task.query.filter_by(user_id=user_id).all(), day.date(), args.top_k
+                ),
+                args.repeat
+            )
+
+        print(f'tasks={args.tasks} blocks={args.blocks} top_k={args.top_k} repeat={args.repeat}')
+        print(f'per-task scoring : {per_task_time * 1000:.1f} ms')
+        print(f'score matrix     : {matrix_time * 1000:.1f} ms')
+        print(f'batch with query : {batch_time * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
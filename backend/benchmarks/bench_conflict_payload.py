@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+冲突响应体积压测：密集的一天（时间块大量互相重叠、排有任务）下，
+对比默认结构与compact规范化结构的JSON字节数、gzip后字节数与序列化耗时
+
+用法（在backend目录下）：
+    python benchmarks/bench_conflict_payload.py
+    python benchmarks/bench_conflict_payload.py --blocks 20 60 120 --tasks-per-block 2
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _seed(user_id, day, block_count, tasks_per_block, rng):
+    from app import db
+    from models.task import Task, TaskType
+    from models.time_block import TimeBlock, BlockType
+
+    # 集中在8点到20点之间，时间块之间普遍重叠
+    blocks = []
+    for _ in range(block_count):
+        start_time = day + timedelta(hours=8, minutes=rng.randrange(0, 12 * 60, 5))
+        blocks.append(TimeBlock(
+            user_id=user_id,
+            date=day,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=rng.choice((30, 60, 90, 120))),
+            block_type=rng.choice(list(BlockType)),
+            color='#888888'
+        ))
+    db.session.add_all(blocks)
+    db.session.flush()
+
+    db.session.add_all([
+        Task(
+            title=f'任务 {index}-{offset}',
+            description='压测用任务描述' * 4,
+            user_id=user_id,
+            category_id='benchmark-category',
+            planned_start_time=block.start_time,
+            estimated_pomodoros=rng.randint(1, 6),
+            task_type=TaskType.FLEXIBLE,
+            scheduled_time_block_id=block.id
+        )
+        for index, block in enumerate(blocks)
+        for offset in range(tasks_per_block)
+    ])
+    db.session.commit()
+
+
+def _measure(conflicts, compact, repeat):
+    from services.conflict_resolution import serialize_conflicts
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = json.dumps(serialize_conflicts(conflicts, compact), ensure_ascii=False).encode()
+        durations.append(time.perf_counter() - start)
+    return len(body), len(gzip.compress(body)), statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冲突响应体积压测')
+    parser.add_argument('--blocks', type=int, nargs='+', default=[20, 60, 120])
+    parser.add_argument('--tasks-per-block', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+        from app import create_app, db
+        from services.conflict_resolution import conflict_resolution_service
+
+        app = create_app()
+        print(f'tasks_per_block={args.tasks_per_block} repeat={args.repeat}')
+        print(f"{'blocks':>6} {'conflicts':>9} {'shape':>8} {'bytes':>10} {'gzip':>9} {'serialize':>10}")
+        for offset, block_count in enumerate(args.blocks):
+            with app.app_context():
+                db.create_all()
+                user_id = f'benchmark-user-{block_count}'
+                day = datetime(2025, 1, 6) + timedelta(days=offset)
+                _seed(user_id, day, block_count, args.tasks_per_block, random.Random(args.seed))
+
+                conflicts = conflict_resolution_service.detect_conflicts(user_id, day)
+                for compact in (False, True):
+                    size, gzip_size, milliseconds = _measure(conflicts, compact, args.repeat)
+                    print(f"{block_count:>6} {len(conflicts):>9} {'compact' if compact else 'full':>8} "
+                          f"{size:>10,} {gzip_size:>9,} {milliseconds:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
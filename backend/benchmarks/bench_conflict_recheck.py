@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+冲突增量复查压测：一天内N个时间块，拖动其中一个后整天检测与增量复查的耗时对比
+
+用法（在backend目录下）：
+    python benchmarks/bench_conflict_recheck.py
+    python benchmarks/bench_conflict_recheck.py --blocks 50 200 800 --repeat 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _seed(user_id, day, block_count, rng):
+    from app import db
+    from models.time_block import TimeBlock, BlockType
+
+    blocks = []
+    for _ in range(block_count):
+        start_time = day + timedelta(minutes=rng.randrange(24 * 60 - 90))
+        blocks.append(TimeBlock(
+            user_id=user_id,
+            date=day,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=rng.choice((15, 30, 45, 60))),
+            block_type=rng.choice(list(BlockType)),
+            color='#888888'
+        ))
+    db.session.add_all(blocks)
+    db.session.commit()
+    return blocks
+
+
+def _median_ms(durations):
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冲突增量复查压测')
+    parser.add_argument('--blocks', type=int, nargs='+', default=[50, 200, 800])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+        from app import create_app, db
+        from services.incremental_conflicts import incremental_conflict_checker
+
+        app = create_app()
+        print(f'repeat={args.repeat}')
+        for offset, block_count in enumerate(args.blocks):
+            with app.test_request_context():
+                db.create_all()
+                user_id = f'benchmark-user-{block_count}'
+                day = datetime(2025, 1, 6) + timedelta(days=offset)
+                rng = random.Random(args.seed)
+                blocks = _seed(user_id, day, block_count, rng)
+
+                full_times, recheck_times = [], []
+                _, version = incremental_conflict_checker.full_check(user_id, day.date())
+                for _ in range(args.repeat):
+                    block = rng.choice(blocks)
+                    duration = block.end_time - block.start_time
+                    block.start_time = day + timedelta(minutes=rng.randrange(24 * 60 - 90))
+                    block.end_time = block.start_time + duration
+                    db.session.commit()
+
+                    start = time.perf_counter()
+                    incremental_conflict_checker.recheck(user_id, day.date(), version, [block.id])
+                    recheck_times.append(time.perf_counter() - start)
+
+                    # 整天检测会重建快照，之后沿用新版本号
+                    start = time.perf_counter()
+                    _, version = incremental_conflict_checker.full_check(user_id, day.date())
+                    full_times.append(time.perf_counter() - start)
+                    db.session.expire_all()
+
+            print(f'blocks={block_count:<5} full check: {_median_ms(full_times):7.1f} ms   '
+                  f'recheck: {_median_ms(recheck_times):6.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+数据导出压测：不同历史数据量下流式导出的耗时与内存峰值，
+内存峰值应只与批大小有关，不随行数增长。安装了pyarrow时同时测量列式导出（含Arrow内存池的峰值）
+
+用法（在backend目录下）：
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --rows 10000 50000 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _seed(user_id, task_count):
+    from app import db
+    from models.task import Task, TaskType
+
+    day = datetime(2025, 1, 6)
+    for offset in range(0, task_count, 10000):
+        db.session.execute(Task.__table__.insert(), [
+            {
+                'id': str(uuid.uuid4()),
+                'title': f'任务{index}',
+                'description': '整理实验记录并撰写周报' * 3,
+                'user_id': user_id,
+                'category_id': 'benchmark-category',
+                'planned_start_time': day + timedelta(minutes=index),
+                'task_type': TaskType.FLEXIBLE,
+            }
+            for index in range(offset, min(offset + 10000, task_count))
+        ])
+    db.session.commit()
+
+
+def _export(user_id, export_format, compress):
+    from services.analytics_export import ANALYTICS_FORMATS, AnalyticsExport
+    from services.data_export import UserDataExport, gzip_stream, parse_entities
+
+    if export_format in ANALYTICS_FORMATS:
+        return sum(len(chunk) for chunk in AnalyticsExport(user_id, 'tasks').stream(export_format))
+    export = UserDataExport(user_id, parse_entities('tasks'))
+    chunks = export.csv() if export_format == 'csv' else export.ndjson()
+    if compress:
+        chunks = gzip_stream(chunks)
+    return sum(len(chunk) for chunk in chunks)
+
+
+# 各次测量的Arrow内存池代理，都包装最初的默认池；代理需一直保留，被释放后仍由它分配的缓冲区会悬空
+_ARROW_POOLS = []
+
+
+def _arrow_pool():
+    """为一次测量换上新的Arrow内存池代理，单独统计峰值"""
+    from services.analytics_export import is_available
+
+    if not is_available():
+        return None
+    import pyarrow as pa
+
+    base = _ARROW_POOLS[0] if _ARROW_POOLS else pa.default_memory_pool()
+    if not _ARROW_POOLS:
+        _ARROW_POOLS.append(base)
+    pool = pa.proxy_memory_pool(base)
+    _ARROW_POOLS.append(pool)
+    pa.set_memory_pool(pool)
+    return pool
+
+
+def _measure(user_id, export_format, compress):
+    """耗时与内存峰值分两次测量，tracemalloc会显著拖慢执行"""
+    start = time.perf_counter()
+    size = _export(user_id, export_format, compress)
+    elapsed = time.perf_counter() - start
+
+    pool = _arrow_pool()
+    tracemalloc.start()
+    _export(user_id, export_format, compress)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if pool is not None:
+        peak += pool.max_memory()
+    return size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据导出压测')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 200000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+        from app import create_app, db
+        from services.analytics_export import is_available
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            print(f"{'rows':>8} {'format':<12} {'output':>10} {'time':>8} {'peak memory':>12}")
+            for rows in args.rows:
+                user_id = str(uuid.uuid4())
+                _seed(user_id, rows)
+                formats = [('ndjson', False), ('ndjson', True), ('csv', False)]
+                if is_available():
+                    formats += [('arrow', False), ('parquet', False)]
+                for export_format, compress in formats:
+                    size, elapsed, peak = _measure(user_id, export_format, compress)
+                    label = export_format + (' gzip' if compress else '')
+                    print(f'{rows:>8,} {label:<12} {size / 1e6:>8.1f}MB {elapsed:>7.2f}s {peak / 1e6:>10.2f}MB')
+                db.session.expunge_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+批量导入压测：生成NDJSON/CSV导入文件，测量各类数据的导入吞吐量（行/秒）
+
+用法（在backend目录下）：
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --rows 200000 --chunk-size 5000
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CATEGORIES = ['科研', '学习', '运动', '生活', '工作']
+PROJECTS = [f'项目{index}' for index in range(20)]
+TAGS = [f'标签{index}' for index in range(50)]
+BLOCK_TYPES = ['RESEARCH', 'GROWTH', 'REST', 'ENTERTAINMENT', 'REVIEW']
+
+
+def _tasks(rng, count):
+    day = datetime(2024, 1, 1)
+    for index in range(count):
+        yield {
+            'entity': 'tasks',
+            'ref': f'task-{index}',
+            'title': f'任务{index} 整理实验记录',
+            'description': '从其他工具导入的历史任务',
+            'planned_start_time': (day + timedelta(minutes=index * 7)).isoformat(),
+            'category': rng.choice(CATEGORIES),
+            'project': rng.choice(PROJECTS),
+            'tags': rng.sample(TAGS, 2),
+            'status': 'COMPLETED'
+        }
+
+
+def _sessions(rng, count, task_count):
+    day = datetime(2024, 1, 1)
+    for index in range(count):
+        start_time = day + timedelta(minutes=index * 30)
+        yield {
+            'entity': 'pomodoro_sessions',
+            'task_ref': f'task-{rng.randrange(task_count)}',
+            'start_time': start_time.isoformat(),
+            'end_time': (start_time + timedelta(minutes=25)).isoformat(),
+            'status': 'COMPLETED'
+        }
+
+
+def _time_blocks(count):
+    day = datetime(2024, 1, 1)
+    for index in range(count):
+        # 每天8个一小时的时间块
+        start_time = day + timedelta(days=index // 8, hours=8 + index % 8)
+        yield {
+            'start_time': start_time.isoformat(),
+            'end_time': (start_time + timedelta(hours=1)).isoformat(),
+            'block_type': BLOCK_TYPES[index % len(BLOCK_TYPES)]
+        }
+
+
+def _ndjson(records):
+    return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode('utf-8')
+
+
+def _csv(records):
+    records = list(records)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(records[0]))
+    writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue().encode('utf-8')
+
+
+def _run(user_id, data, import_format, entity, chunk_size):
+    from services.data_import import BulkImporter, read_records
+
+    importer = BulkImporter(user_id, entity, chunk_size)
+    start = time.perf_counter()
+    summary = list(importer.run(read_records(io.BytesIO(data), import_format)))[-1]
+    return summary, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量导入压测')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+        from app import create_app, db
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            rng = random.Random(args.seed)
+            user_id = str(uuid.uuid4())
+            cases = [
+                ('tasks ndjson', _ndjson(_tasks(rng, args.rows)), 'ndjson', None),
+                ('sessions ndjson', _ndjson(list(_tasks(rng, 1000)) + list(_sessions(rng, args.rows, 1000))),
+                 'ndjson', None),
+                ('time_blocks csv', _csv(_time_blocks(args.rows)), 'csv', 'time_blocks'),
+            ]
+            print(f"{'case':<18} {'rows':>8} {'errors':>7} {'time':>8} {'rows/s':>9}")
+            for index, (label, data, import_format, entity) in enumerate(cases):
+                # 每种数据用单独的用户，ref互不干扰
+                summary, elapsed = _run(f'{user_id}-{index}', data, import_format, entity, args.chunk_size)
+                print(f"{label:<18} {summary['rows']:>8,} {summary['errors']:>7} {elapsed:>7.2f}s "
+                      f"{summary['rows'] / elapsed:>9,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+轮询端点压测：开发服务器 / 同步gunicorn / serve.py / ASGI异步模式
+
+在临时SQLite数据库上启动服务器，用N个保持连接的并发客户端持续请求轮询端点，
+统计每秒请求数、错误数与服务器进程树的峰值内存。
+
+用法（在backend目录下）：
+    python benchmarks/bench_polling.py --connections 1000 --duration 15
+    python benchmarks/bench_polling.py --endpoint /api/pomodoro-sessions/active --modes asgi
+    python benchmarks/bench_polling.py --endpoint /api/health --modes dev serve
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+JWT_SECRET = 'benchmark-jwt-secret-key-at-least-32-bytes'
+
+
+def _gunicorn_command(*worker_args):
+    def build(host, port, workers):
+        return ['gunicorn', *worker_args, '-w', str(workers), '-b', f'{host}:{port}',
+                '--backlog', '4096', '--log-level', 'warning']
+    return build
+
+
+def _dev_server_command(host, port, workers):
+    """werkzeug开发服务器（多线程、单进程，与 python app.py 相同）"""
+    return [sys.executable, '-c',
+            f"from wsgi import app; app.run(host='{host}', port={port}, threaded=True)"]
+
+
+def _serve_command(host, port, workers):
+    return [sys.executable, 'serve.py', '--workers', str(workers), '--bind', f'{host}:{port}',
+            '--log-level', 'warning']
+
+
+SERVER_COMMANDS = {
+    'dev': _dev_server_command,
+    'sync': _gunicorn_command('-k', 'sync', 'wsgi:app'),
+    'gthread': _gunicorn_command('-k', 'gthread', '--threads', '8', 'wsgi:app'),
+    'serve': _serve_command,
+    'asgi': _gunicorn_command('-k', 'uvicorn.workers.UvicornWorker', 'asgi:application')
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _prepare_database(database_url: str) -> str:
+    """建表并写入测试数据，返回访问令牌"""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['JWT_SECRET_KEY'] = JWT_SECRET
+
+    from app import create_app, db
+    from flask_jwt_extended import create_access_token
+    from models.task import Task, TaskType, TaskStatus, PriorityLevel
+    from models.pomodoro_session import PomodoroSession
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user_id = 'benchmark-user'
+        tasks = [
+            Task(
+                title=f'任务 {i}',
+                user_id=user_id,
+                planned_start_time=datetime.utcnow() + timedelta(minutes=15 * i),
+                task_type=TaskType.FLEXIBLE if i % 3 else TaskType.RIGID,
+                category_id='benchmark-category',
+                status=TaskStatus.PENDING,
+                priority=list(PriorityLevel)[i % 3]
+            )
+            for i in range(50)
+        ]
+        db.session.add_all(tasks)
+        db.session.flush()
+
+        session = PomodoroSession(task_id=tasks[0].id, user_id=user_id)
+        session.start()
+        db.session.add(session)
+        db.session.commit()
+
+        return create_access_token(identity=user_id, expires_delta=timedelta(hours=1))
+
+
+def _process_tree_rss_kb(root_pid: int) -> int:
+    """统计进程树的RSS（KB），仅支持Linux /proc"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                parent_pid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent_pid, []).append(int(entry))
+
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total
+
+
+async def _client_loop(host, port, request_bytes, deadline, stats):
+    """单个保持连接的客户端，循环发送请求直到截止时间"""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats['errors'] += 1
+        return
+
+    try:
+        while time.monotonic() < deadline:
+            writer.write(request_bytes)
+            await writer.drain()
+
+            headers = await reader.readuntil(b'\r\n\r\n')
+            status_line, _, header_block = headers.partition(b'\r\n')
+            content_length = 0
+            for line in header_block.split(b'\r\n'):
+                name, _, value = line.partition(b':')
+                if name.strip().lower() == b'content-length':
+                    content_length = int(value.strip())
+            await reader.readexactly(content_length)
+
+            if b' 200 ' in status_line:
+                stats['ok'] += 1
+            else:
+                stats['errors'] += 1
+
+            # 同步worker会在响应后关闭连接，需要重连
+            if b'connection: close' in header_block.lower():
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        stats['errors'] += 1
+    finally:
+        writer.close()
+
+
+def _run_client_process(host, port, path, token, connections, duration, result_queue):
+    request_bytes = (
+        f'GET {path} HTTP/1.1\r\n'
+        f'Host: {host}:{port}\r\n'
+        f'Authorization: Bearer {token}\r\n'
+        f'Connection: keep-alive\r\n\r\n'
+    ).encode('latin-1')
+    stats = {'ok': 0, 'errors': 0}
+
+    async def main():
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*[
+            _client_loop(host, port, request_bytes, deadline, stats)
+            for _ in range(connections)
+        ])
+
+    asyncio.run(main())
+    result_queue.put(stats)
+
+
+def _wait_for_server(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('服务器启动超时')
+
+
+def run_benchmark(mode, args, database_url, token):
+    host, port = '127.0.0.1', _free_port()
+    command = SERVER_COMMANDS[mode](host, port, args.workers)
+    env = dict(os.environ, DATABASE_URL=database_url, JWT_SECRET_KEY=JWT_SECRET, FLASK_ENV='production')
+    # 开发服务器逐条输出访问日志，压测时丢弃
+    server_output = subprocess.DEVNULL if mode == 'dev' else None
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stderr=server_output)
+
+    try:
+        _wait_for_server(host, port)
+        baseline_rss = _process_tree_rss_kb(server.pid)
+
+        peak_rss = [baseline_rss]
+        stop_sampling = threading.Event()
+
+        def sample_memory():
+            while not stop_sampling.wait(0.5):
+                peak_rss[0] = max(peak_rss[0], _process_tree_rss_kb(server.pid))
+
+        sampler = threading.Thread(target=sample_memory, daemon=True)
+        sampler.start()
+
+        result_queue = multiprocessing.Queue()
+        per_process = max(1, args.connections // args.client_processes)
+        clients = [
+            multiprocessing.Process(
+                target=_run_client_process,
+                args=(host, port, args.endpoint, token, per_process, args.duration, result_queue)
+            )
+            for _ in range(args.client_processes)
+        ]
+        for client in clients:
+            client.start()
+        results = [result_queue.get() for _ in clients]
+        for client in clients:
+            client.join()
+
+        stop_sampling.set()
+        sampler.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    ok = sum(r['ok'] for r in results)
+    errors = sum(r['errors'] for r in results)
+    return {
+        'mode': mode,
+        'requests_per_second': ok / args.duration,
+        'errors': errors,
+        'baseline_rss_mb': baseline_rss / 1024,
+        'peak_rss_mb': peak_rss[0] / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='轮询端点压测：开发服务器 / gunicorn / ASGI')
+    parser.add_argument('--endpoint', default='/api/recommendations/current')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--duration', type=int, default=15, help='每种模式的压测时长（秒）')
+    parser.add_argument('--workers', type=int, default=2, help='服务器worker进程数')
+    parser.add_argument('--client-processes', type=int, default=2)
+    parser.add_argument('--modes', nargs='+', default=['sync', 'asgi'], choices=sorted(SERVER_COMMANDS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+        token = _prepare_database(database_url)
+
+        print(f'endpoint={args.endpoint} connections={args.connections} '
+              f'duration={args.duration}s workers={args.workers}')
+        print(f"{'mode':<10}{'req/s':>12}{'errors':>10}{'idle MB':>10}{'peak MB':>10}")
+        for mode in args.modes:
+            result = run_benchmark(mode, args, database_url, token)
+            print(f"{result['mode']:<10}{result['requests_per_second']:>12.1f}{result['errors']:>10}"
+                  f"{result['baseline_rss_mb']:>10.1f}{result['peak_rss_mb']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+全文搜索压测：单个用户大量任务（另有其他用户的数据）下，
+对比FTS5索引与LIKE退化实现的搜索耗时
+
+用法（在backend目录下）：
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --tasks 100000 --repeat 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# 常用汉字区间内随机取字组词
+CHARACTERS = [chr(0x4E00 + offset) for offset in range(3000)]
+# 词频按Zipf分布：少数词很常见，多数词很少见
+VOCABULARY_SIZE = 5000
+QUERY_RANKS = (0, 3, 50, 500, 3000)
+
+
+def _vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choice(CHARACTERS) for _ in range(rng.choice((2, 2, 3, 4)))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def _text(rng, words, weights, count):
+    return ''.join(rng.choices(words, weights, k=count))
+
+
+def _seed(user_ids, task_count, rng, words, weights):
+    """各用户的任务交错写入，与实际使用中多个用户同时写入的顺序一致"""
+    from app import db
+    from models.task import Task, TaskType
+
+    day = datetime(2025, 1, 6)
+    rows = [
+        {
+            'id': str(uuid.uuid4()),
+            'title': _text(rng, words, weights, 3),
+            'description': _text(rng, words, weights, 12),
+            'user_id': user_id,
+            'category_id': 'benchmark-category',
+            'planned_start_time': day + timedelta(minutes=index),
+            'task_type': TaskType.FLEXIBLE,
+        }
+        for index in range(task_count)
+        for user_id in user_ids
+    ]
+    db.session.execute(Task.__table__.insert(), rows)
+    db.session.commit()
+
+
+def _measure(user_id, query, repeat, fallback):
+    from services.search_index import search_index
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if fallback:
+            result = search_index._search_like(user_id, query.split(), ['task'], 21, 0)
+        else:
+            result = search_index.search(user_id, query, ['task'])['results']
+        durations.append(time.perf_counter() - start)
+    return len(result), statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全文搜索压测')
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--other-users', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+        from app import create_app, db
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            rng = random.Random(args.seed)
+            words = _vocabulary(rng)
+            weights = [1 / rank for rank in range(1, len(words) + 1)]
+            user_ids = [str(uuid.uuid4()) for _ in range(args.other_users + 1)]
+            start = time.perf_counter()
+            _seed(user_ids, args.tasks, rng, words, weights)
+            print(f'seeded {args.tasks:,} tasks x {len(user_ids)} users in {time.perf_counter() - start:.1f}s')
+
+            user_id = user_ids[0]
+            queries = [words[rank] for rank in QUERY_RANKS] + [f'{words[1]} {words[40]}', '不存在的关键词']
+            print(f"{'query':<16} {'hits':>5} {'fts5':>9} {'like':>9}")
+            for query in queries:
+                hits, fts_ms = _measure(user_id, query, args.repeat, fallback=False)
+                _, like_ms = _measure(user_id, query, args.repeat, fallback=True)
+                print(f'{query:<16} {hits:>5} {fts_ms:>7.1f}ms {like_ms:>7.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
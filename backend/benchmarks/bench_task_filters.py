@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+任务过滤压测：单个用户10万任务、50个标签（另有其他用户的数据）下，
+按标签（any / all）、项目、优先级与计划时间范围过滤 GET /api/tasks 的耗时，
+并对比删除 task_tags 的 (tag_id, task_id) 索引后的标签过滤耗时
+
+用法（在backend目录下）：
+    python benchmarks/bench_task_filters.py
+    python benchmarks/bench_task_filters.py --tasks 100000 --tags 50 --repeat 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DAY = datetime(2025, 1, 6)
+
+
+def _seed(user_ids, task_count, tag_count, rng):
+    """每个用户task_count个任务、tag_count个标签、5个项目；每个任务0~4个标签，标签使用频率按Zipf分布"""
+    from app import db
+    from models.task import Task, TaskType, TaskStatus, PriorityLevel
+    from models.tag import Tag
+    from models.project import Project
+    from models.task_tags import task_tags
+
+    seeded = {}
+    weights = [1 / rank for rank in range(1, tag_count + 1)]
+    for user_id in user_ids:
+        tag_ids = [str(uuid.uuid4()) for _ in range(tag_count)]
+        project_ids = [str(uuid.uuid4()) for _ in range(5)]
+        db.session.execute(Tag.__table__.insert(), [
+            {'id': tag_id, 'name': f'tag{index}', 'user_id': user_id} for index, tag_id in enumerate(tag_ids)
+        ])
+        db.session.execute(Project.__table__.insert(), [
+            {'id': project_id, 'name': f'project{index}', 'user_id': user_id, 'color': '#000000'}
+            for index, project_id in enumerate(project_ids)
+        ])
+        tasks, links = [], []
+        for index in range(task_count):
+            task_id = str(uuid.uuid4())
+            tasks.append({
+                'id': task_id,
+                'title': f'task {index}',
+                'user_id': user_id,
+                'category_id': 'benchmark-category',
+                'project_id': rng.choice(project_ids),
+                'planned_start_time': DAY + timedelta(minutes=index * 5),
+                'task_type': TaskType.FLEXIBLE,
+                'status': rng.choice(list(TaskStatus)),
+                'priority': rng.choice(list(PriorityLevel)),
+            })
+            for tag_id in set(rng.choices(tag_ids, weights, k=rng.randint(0, 4))):
+                links.append({'task_id': task_id, 'tag_id': tag_id})
+        db.session.execute(Task.__table__.insert(), tasks)
+        db.session.execute(task_tags.insert(), links)
+        seeded[user_id] = (tag_ids, project_ids)
+    db.session.commit()
+    return seeded
+
+
+def _measure(client, headers, query, repeat):
+    """接口耗时（含序列化）"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(f'/api/tasks/?{query}', headers=headers)
+        durations.append(time.perf_counter() - start)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()['count'], statistics.median(durations) * 1000
+
+
+def _measure_ids(user_id, tag_ids, match_all, repeat):
+    """只执行标签过滤的半连接查询（取任务ID）的耗时"""
+    from app import db
+    from models.task import Task
+
+    statement = select(Task.id).where(Task.user_id == user_id, Task.tagged_with(tag_ids, match_all))
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.session.scalars(statement).all()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='任务过滤压测')
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--tags', type=int, default=50)
+    parser.add_argument('--other-users', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+        from app import create_app, db
+        from flask_jwt_extended import create_access_token
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            rng = random.Random(args.seed)
+            user_ids = [str(uuid.uuid4()) for _ in range(args.other_users + 1)]
+            start = time.perf_counter()
+            seeded = _seed(user_ids, args.tasks, args.tags, rng)
+            db.session.execute(db.text('ANALYZE'))
+            print(f'seeded {args.tasks:,} tasks x {len(user_ids)} users, {args.tags} tags '
+                  f'in {time.perf_counter() - start:.1f}s')
+
+            user_id = user_ids[0]
+            tag_ids, project_ids = seeded[user_id]
+            headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+            week = f'planned_start_from={DAY + timedelta(days=30):%Y-%m-%dT%H:%M}' \
+                   f'&planned_start_to={DAY + timedelta(days=37):%Y-%m-%dT%H:%M}'
+            tag_cases = [
+                ('common tag', tag_ids[:1], False, ''),
+                ('rare tag', tag_ids[-1:], False, ''),
+                ('3 tags any', tag_ids[10:13], False, ''),
+                ('2 tags all', tag_ids[:2], True, ''),
+                ('tag+project', tag_ids[5:6], False, f'&project_id={project_ids[0]}&priority=HIGH'),
+                ('tag+week', tag_ids[:1], False, f'&{week}'),
+            ]
+
+            def run(label):
+                print(f"{label:<14} {'hits':>6} {'endpoint':>10} {'ids only':>9}")
+                for name, ids, match_all, extra in tag_cases:
+                    query = f'tag_ids={",".join(ids)}&tag_match={"all" if match_all else "any"}{extra}'
+                    hits, endpoint_ms = _measure(client, headers, query, args.repeat)
+                    # 带其他过滤条件时只看接口耗时
+                    ids = '-' if extra else f'{_measure_ids(user_id, ids, match_all, args.repeat):.1f}ms'
+                    print(f'{name:<14} {hits:>6} {endpoint_ms:>8.1f}ms {ids:>9}')
+
+            with app.test_client() as client:
+                hits, week_ms = _measure(client, headers, week, args.repeat)
+                print(f'planned-time range only: {hits} hits, {week_ms:.1f}ms')
+                run('indexed')
+                db.session.execute(db.text('DROP INDEX ix_task_tags_tag_id_task_id'))
+                db.session.commit()
+                run('no index')
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,27 @@ class Config:
     # CORS配置
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5173').split(',')
 
+    # 番茄钟SSE推送心跳间隔（秒）
+    POMODORO_STREAM_HEARTBEAT = int(os.getenv('POMODORO_STREAM_HEARTBEAT', 15))
+
+    # 后台任务配置：thread 在Web进程线程池执行，external 交给 `flask jobs worker`
+    JOB_QUEUE_MODE = os.getenv('JOB_QUEUE_MODE', 'thread')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_RETRY_DELAY = float(os.getenv('JOB_RETRY_DELAY', 2))
+    JOB_STREAM_POLL_INTERVAL = float(os.getenv('JOB_STREAM_POLL_INTERVAL', 1))
+    # 执行中的任务超过该秒数未结束视为执行进程已退出，重新排队（次数用尽时标记失败）
+    JOB_RUNNING_TIMEOUT = float(os.getenv('JOB_RUNNING_TIMEOUT', 600))
+
+    # 时间块容量索引的缓存秒数（多进程部署时感知其他进程修改的最长延迟）
+    CAPACITY_INDEX_TTL = float(os.getenv('CAPACITY_INDEX_TTL', 60))
+
+    # 冲突增量复查快照的缓存秒数（过期后复查退回整天检测）
+    CONFLICT_STATE_TTL = float(os.getenv('CONFLICT_STATE_TTL', 300))
+
+    # 每个进程缓存的已编译匹配规则（按用户）上限
+    MATCHING_RULES_CACHE_SIZE = int(os.getenv('MATCHING_RULES_CACHE_SIZE', 1024))
+
 
 class DevelopmentConfig(Config):
     """开发环境配置"""
@@ -33,6 +54,7 @@ class TestingConfig(Config):
     """测试环境配置"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    JOB_QUEUE_MODE = 'eager'
 
 
 def get_config() -> Config:
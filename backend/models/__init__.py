@@ -29,7 +29,7 @@ from .time_block import TimeBlock
 from .time_block_template_config import TimeBlockTemplateConfig  # 必须在TimeBlockTemplate之前导入
 from .time_block_template import TimeBlockTemplate
 from .pomodoro_session import PomodoroSession
-# from .time_log import TimeLog
+from .time_log import TimeLog
 # from .recommendation import Recommendation
 # from .daily_stats import DailyStats
 # from .daily_review import DailyReview
@@ -37,4 +37,7 @@ from .pomodoro_session import PomodoroSession
 # from .review_section import ReviewSection
 from .project import Project
 from .tag import Tag
-from .task_tags import task_tags
\ No newline at end of file
+from .task_tags import task_tags
+from .job import Job
+from .matching_rule import MatchingRuleSet, MatchingRule
+from . import counters  # 计数列维护，需在相关模型之后导入
@@ -0,0 +1,241 @@
+"""
+任务、项目与分类上的冗余计数
+
+- tasks: actual_minutes、completed_pomodoros
+- projects: task_count、completed_count、estimated_pomodoros、actual_minutes、completed_pomodoros
+- task_categories: task_count、completed_count、actual_minutes、completed_pomodoros
+
+时间类计数按时间日志累计（项目、分类按日志记录的归属），任务数按任务当前的项目、分类与状态。
+ORM保存任务或时间日志时，在同一事务中以 x = x + 增量 的UPDATE维护；
+绕过ORM的修改（批量导入、Core语句）由调用方自行维护，或通过 reconcile_counters 检测并修正偏差。
+"""
+
+from collections import defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import Boolean, and_, event, func, inspect, or_, select, update
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from . import db
+from .project import Project
+from .task import Task, TaskStatus
+from .task_category import TaskCategory
+from .time_log import TimeLog
+
+# 表 -> 计数列；旧数据库缺列时补上并回填
+COUNTER_COLUMNS = {
+    Task: ('actual_minutes', 'completed_pomodoros'),
+    Project: ('task_count', 'completed_count', 'estimated_pomodoros', 'actual_minutes', 'completed_pomodoros'),
+    TaskCategory: ('task_count', 'completed_count', 'actual_minutes', 'completed_pomodoros'),
+}
+
+
+def _is_completed(status) -> bool:
+    return status in (TaskStatus.COMPLETED, TaskStatus.COMPLETED.value)
+
+
+def _task_effects(values: Dict) -> list:
+    """一个任务对项目、分类计数的贡献"""
+    completed = 1 if _is_completed(values['status']) else 0
+    return [
+        (Project, values['project_id'], {'task_count': 1, 'completed_count': completed,
+                                         'estimated_pomodoros': values['estimated_pomodoros'] or 0}),
+        (TaskCategory, values['category_id'], {'task_count': 1, 'completed_count': completed}),
+    ]
+
+
+def _time_log_effects(values: Dict) -> list:
+    """一条时间日志对任务、项目、分类计数的贡献"""
+    deltas = {'actual_minutes': values['duration'] or 0,
+              'completed_pomodoros': 1 if values['is_completed'] else 0}
+    return [(Task, values['task_id'], deltas), (Project, values['project_id'], deltas),
+            (TaskCategory, values['category_id'], deltas)]
+
+
+_EFFECTS = {
+    Task: (('project_id', 'category_id', 'status', 'estimated_pomodoros'), _task_effects),
+    TimeLog: (('task_id', 'project_id', 'category_id', 'duration', 'is_completed'), _time_log_effects),
+}
+
+
+def _values(target, names, committed: bool) -> Dict:
+    """属性的当前值，或本次flush之前的值"""
+    state = inspect(target)
+    values = {}
+    for name in names:
+        value = getattr(target, name)
+        if committed:
+            history = state.attrs[name].history
+            if history.deleted:
+                value = history.deleted[0]
+            elif history.added:
+                value = None
+        values[name] = value
+    return values
+
+
+def _collect(totals, effects, sign: int):
+    for model, item_id, deltas in effects:
+        if item_id is None:
+            continue
+        for name, delta in deltas.items():
+            totals[(model, item_id)][name] += sign * delta
+
+
+def apply_deltas(connection, totals, session=None):
+    """执行 {(模型, ID): {列: 增量}}，同时修正会话中已加载对象的对应属性"""
+    for (model, item_id), deltas in totals.items():
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            continue
+        table = model.__table__
+        values = {name: table.c[name] + delta for name, delta in deltas.items()}
+        # 计数变化不算对象本身的修改
+        values['updated_at'] = table.c.updated_at
+        connection.execute(update(table).where(table.c.id == item_id).values(values))
+
+        instance = session.identity_map.get(identity_key(model, item_id)) if session is not None else None
+        if instance is not None:
+            for name, delta in deltas.items():
+                if name in instance.__dict__:
+                    set_committed_value(instance, name, (instance.__dict__[name] or 0) + delta)
+
+
+def add_rows(connection, model, rows, sign: int = 1):
+    """以Core语句批量插入（sign=-1时为删除）任务或时间日志行后，维护相关计数"""
+    names, effects = _EFFECTS[model]
+    totals = defaultdict(lambda: defaultdict(int))
+    for row in rows:
+        _collect(totals, effects({name: row.get(name) for name in names}), sign)
+    apply_deltas(connection, totals)
+
+
+def add_task_rows(connection, rows, sign: int = 1):
+    """以Core语句批量插入（sign=-1时为删除）任务行后，维护项目与分类的任务数"""
+    add_rows(connection, Task, rows, sign)
+
+
+def _after_insert(mapper, connection, target):
+    names, effects = _EFFECTS[mapper.class_]
+    totals = defaultdict(lambda: defaultdict(int))
+    _collect(totals, effects(_values(target, names, committed=False)), 1)
+    apply_deltas(connection, totals, object_session(target))
+
+
+def _after_update(mapper, connection, target):
+    names, effects = _EFFECTS[mapper.class_]
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in names):
+        return
+    totals = defaultdict(lambda: defaultdict(int))
+    _collect(totals, effects(_values(target, names, committed=True)), -1)
+    _collect(totals, effects(_values(target, names, committed=False)), 1)
+    apply_deltas(connection, totals, object_session(target))
+
+
+def _after_delete(mapper, connection, target):
+    names, effects = _EFFECTS[mapper.class_]
+    totals = defaultdict(lambda: defaultdict(int))
+    _collect(totals, effects(_values(target, names, committed=True)), -1)
+    apply_deltas(connection, totals, object_session(target))
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+for _model, (_names, _) in _EFFECTS.items():
+    event.listen(_model, 'after_insert', _after_insert)
+    event.listen(_model, 'after_update', _after_update)
+    event.listen(_model, 'after_delete', _after_delete)
+    # 修改前加载旧值，过期的对象被修改后也能按旧的归属扣减
+    for _name in _names:
+        event.listen(getattr(_model, _name), 'set', _load_old_value, active_history=True)
+
+
+def _expected_counts() -> Dict:
+    """各计数列按源数据计算的值（关联子查询）"""
+    tasks, projects, categories = Task.__table__, Project.__table__, TaskCategory.__table__
+    logs = TimeLog.__table__
+
+    def minutes(column):
+        return select(func.coalesce(func.sum(logs.c.duration), 0)).where(column).scalar_subquery()
+
+    def pomodoros(column):
+        return select(func.count()).where(column, logs.c.is_completed.is_(True)).scalar_subquery()
+
+    def task_counts(column, estimated=False):
+        counts = {
+            'task_count': select(func.count()).where(column).scalar_subquery(),
+            'completed_count': select(func.count()).where(column, tasks.c.status == TaskStatus.COMPLETED)
+            .scalar_subquery(),
+        }
+        if estimated:
+            counts['estimated_pomodoros'] = select(func.coalesce(func.sum(tasks.c.estimated_pomodoros), 0)) \
+                .where(column).scalar_subquery()
+        return counts
+
+    return {
+        Task: {
+            'actual_minutes': minutes(logs.c.task_id == tasks.c.id),
+            'completed_pomodoros': pomodoros(logs.c.task_id == tasks.c.id),
+        },
+        Project: {
+            **task_counts(tasks.c.project_id == projects.c.id, estimated=True),
+            'actual_minutes': minutes(logs.c.project_id == projects.c.id),
+            'completed_pomodoros': pomodoros(logs.c.project_id == projects.c.id),
+        },
+        TaskCategory: {
+            **task_counts(tasks.c.category_id == categories.c.id),
+            'actual_minutes': minutes(logs.c.category_id == categories.c.id),
+            'completed_pomodoros': pomodoros(logs.c.category_id == categories.c.id),
+        },
+    }
+
+
+def reconcile_counters(connection, user_id: Optional[str] = None, repair: bool = True) -> Dict[str, int]:
+    """
+    按源数据检查计数列，返回各表计数有偏差的行数；repair为True时在同一语句中修正
+
+    每张表一条带关联子查询的语句，user_id为空时检查全部用户
+    """
+    drift = {}
+    for model, expected in _expected_counts().items():
+        table = model.__table__
+        condition = or_(*(table.c[name] != value for name, value in expected.items()))
+        if user_id is not None:
+            condition = and_(table.c.user_id == user_id, condition)
+        if repair:
+            result = connection.execute(
+                update(table).where(condition).values({**expected, 'updated_at': table.c.updated_at})
+            )
+            drift[table.name] = result.rowcount
+        else:
+            drift[table.name] = connection.scalar(select(func.count()).select_from(table).where(condition))
+    return drift
+
+
+def ensure_counter_columns(connection) -> bool:
+    """旧数据库补上计数列（及时间日志的is_completed列），返回是否补了列"""
+    added = False
+    for model, names in {**COUNTER_COLUMNS, TimeLog: ('is_completed',)}.items():
+        table = model.__table__
+        existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+        for name in names:
+            if name in existing:
+                continue
+            column_type = 'BOOLEAN' if isinstance(table.c[name].type, Boolean) else 'INTEGER'
+            connection.exec_driver_sql(
+                f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type} NOT NULL DEFAULT 0'
+            )
+            added = True
+    return added
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _upgrade_counter_columns(target, connection, **kwargs):
+    """db.create_all() 时为旧数据库补上计数列并按源数据回填"""
+    if ensure_counter_columns(connection):
+        reconcile_counters(connection)
@@ -0,0 +1,83 @@
+from . import BaseModel, db
+from sqlalchemy import String, Text, Integer, DateTime, Enum
+from typing import Dict, Any
+import enum
+import json
+
+
+class JobStatus(enum.Enum):
+    """后台任务状态枚举"""
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    SUCCEEDED = 'SUCCEEDED'
+    FAILED = 'FAILED'
+
+
+class Job(BaseModel):
+    """后台任务模型"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    # 不设外键：账户删除任务完成后仍需保留任务记录供查询
+    user_id = db.Column(String(36), nullable=False, index=True)
+    job_type = db.Column(String(50), nullable=False)
+    status = db.Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+
+    # 任务参数与结果（JSON格式存储）
+    payload = db.Column(Text, default='{}')
+    result = db.Column(Text)
+    error = db.Column(Text)
+
+    # 重试控制
+    attempts = db.Column(Integer, nullable=False, default=0)
+    max_attempts = db.Column(Integer, nullable=False, default=3)
+    run_after = db.Column(DateTime)
+
+    started_at = db.Column(DateTime)
+    finished_at = db.Column(DateTime)
+
+    def get_payload(self) -> Dict[str, Any]:
+        """获取任务参数"""
+        try:
+            return json.loads(self.payload or '{}')
+        except json.JSONDecodeError:
+            return {}
+
+    def set_payload(self, payload: Dict[str, Any]):
+        """设置任务参数"""
+        self.payload = json.dumps(payload, ensure_ascii=False)
+
+    def get_result(self):
+        """获取任务结果"""
+        if self.result is None:
+            return None
+        try:
+            return json.loads(self.result)
+        except json.JSONDecodeError:
+            return None
+
+    def set_result(self, result):
+        """设置任务结果"""
+        self.result = json.dumps(result, ensure_ascii=False)
+
+    def is_finished(self) -> bool:
+        """检查任务是否已结束"""
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        base_dict = super().to_dict()
+        base_dict.update({
+            'user_id': self.user_id,
+            'job_type': self.job_type,
+            'status': self.status.value,
+            'result': self.get_result(),
+            'error': self.error,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        })
+        return base_dict
@@ -0,0 +1,54 @@
+from . import BaseModel, db
+from sqlalchemy import String, Integer, Float, ForeignKey, Enum
+from sqlalchemy.orm import relationship
+from typing import Dict, Any
+from .time_block import BlockType
+
+
+class MatchingRuleSet(BaseModel):
+    """用户自定义匹配规则集（每个用户一条，版本号用于各进程缓存失效）"""
+    __tablename__ = 'matching_rule_sets'
+
+    user_id = db.Column(String(36), ForeignKey('users.id'), unique=True, nullable=False)
+    version = db.Column(Integer, nullable=False, default=1)
+
+    # 关联关系
+    user = relationship('User', back_populates='matching_rule_set')
+    rules = relationship('MatchingRule', back_populates='rule_set', cascade='all, delete-orphan')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，规则按类别分组"""
+        grouped = {}
+        for rule in sorted(self.rules, key=lambda r: (r.category_name, -r.score)):
+            grouped.setdefault(rule.category_name, []).append(rule.to_dict())
+
+        base_dict = super().to_dict()
+        base_dict.update({
+            'user_id': self.user_id,
+            'version': self.version,
+            'rules': grouped
+        })
+        return base_dict
+
+
+class MatchingRule(BaseModel):
+    """任务类别 -> 时间块类型 的匹配分数"""
+    __tablename__ = 'matching_rules'
+    __table_args__ = (
+        db.UniqueConstraint('rule_set_id', 'category_name', 'block_type', name='uq_matching_rules_category_type'),
+    )
+
+    rule_set_id = db.Column(String(36), ForeignKey('matching_rule_sets.id'), nullable=False, index=True)
+    category_name = db.Column(String(50), nullable=False)
+    block_type = db.Column(Enum(BlockType), nullable=False)
+    score = db.Column(Float, nullable=False)
+
+    # 关联关系
+    rule_set = relationship('MatchingRuleSet', back_populates='rules')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            'block_type': self.block_type.value,
+            'score': self.score
+        }
@@ -1,4 +1,5 @@
 from . import BaseModel, db
+from .time_log import TimeLog
 from datetime import datetime
 from sqlalchemy import Enum as SQLAlchemyEnum
 import enum
@@ -36,6 +37,7 @@ class PomodoroSession(BaseModel):
     # 关联
     task = db.relationship('Task', back_populates='pomodoro_sessions')
     user = db.relationship('User', back_populates='pomodoro_sessions')
+    time_log = db.relationship('TimeLog', back_populates='pomodoro_session', uselist=False)
 
     def __init__(self, task_id, user_id, planned_duration=25, session_type=SessionType.FOCUS):
         self.task_id = task_id
@@ -68,6 +70,8 @@ class PomodoroSession(BaseModel):
             duration_seconds = (self.end_time - self.start_time).total_seconds()
             self.actual_duration = int(duration_seconds / 60)  # 转换为分钟
 
+        # 记入时间账本
+        TimeLog.from_session(self)
         self.updated_at = datetime.utcnow()
 
     def interrupt(self, reason=None):
@@ -84,6 +88,8 @@ class PomodoroSession(BaseModel):
             duration_seconds = (self.end_time - self.start_time).total_seconds()
             self.actual_duration = int(duration_seconds / 60)  # 转换为分钟
 
+        # 记入时间账本
+        TimeLog.from_session(self)
         self.updated_at = datetime.utcnow()
 
     def get_remaining_time(self):
@@ -122,5 +128,18 @@ class PomodoroSession(BaseModel):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    def to_state_dict(self):
+        """转换为状态字典（供事件推送，客户端据此本地倒计时）"""
+        return {
+            'id': self.id,
+            'task_id': self.task_id,
+            'status': self.status.value,
+            'session_type': self.session_type.value,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'planned_duration': self.planned_duration,
+            'actual_duration': self.actual_duration
+        }
+
     def __repr__(self):
         return f'<PomodoroSession {self.id} - {self.status.value} - {self.session_type.value}>'
\ No newline at end of file
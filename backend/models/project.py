@@ -1,5 +1,5 @@
 from . import BaseModel, db
-from sqlalchemy import String, Text, ForeignKey
+from sqlalchemy import String, Text, Integer, ForeignKey
 from sqlalchemy.orm import relationship
 from typing import Dict, Any
 
@@ -13,6 +13,13 @@ class Project(BaseModel):
     user_id = db.Column(String(36), ForeignKey('users.id'), nullable=False)
     color = db.Column(String(7), nullable=False)  # 项目颜色标识
 
+    # 冗余计数（见 models/counters.py）
+    task_count = db.Column(Integer, nullable=False, default=0)
+    completed_count = db.Column(Integer, nullable=False, default=0)
+    estimated_pomodoros = db.Column(Integer, nullable=False, default=0)
+    actual_minutes = db.Column(Integer, nullable=False, default=0)  # 按时间日志的归属累计
+    completed_pomodoros = db.Column(Integer, nullable=False, default=0)
+
     # 关联关系
     user = relationship('User', back_populates='projects')
     tasks = relationship('Task', back_populates='project', cascade='all, delete-orphan')
@@ -26,6 +33,8 @@ class Project(BaseModel):
             'user_id': self.user_id,
             'color': self.color,
             'task_count': self.get_task_count(),
+            'completed_count': self.completed_count or 0,
+            'completed_pomodoros': self.completed_pomodoros or 0,
             'total_estimated_time': self.get_total_estimated_time(),
             'total_actual_time': self.get_total_actual_time(),
             'completion_progress': self.get_completion_progress()
@@ -34,35 +43,18 @@ class Project(BaseModel):
 
     def get_task_count(self) -> int:
         """获取项目中的任务数量"""
-        return len(self.tasks) if self.tasks else 0
+        return self.task_count or 0
 
     def get_total_estimated_time(self) -> int:
-        """获取项目总预估时间（分钟）"""
-        if not self.tasks:
-            return 0
-
-        total_time = 0
-        for task in self.tasks:
-            # 假设每个番茄钟25分钟
-            total_time += task.estimated_pomodoros * 25 if task.estimated_pomodoros else 0
-        return total_time
+        """获取项目总预估时间（分钟），每个番茄钟按25分钟计"""
+        return (self.estimated_pomodoros or 0) * 25
 
     def get_total_actual_time(self) -> int:
         """获取项目总实际花费时间（分钟）"""
-        if not self.tasks:
-            return 0
-
-        total_time = 0
-        for task in self.tasks:
-            # 这里需要实现获取任务实际时间的方法
-            # 暂时返回0，后续可以集成TimeLog数据
-            total_time += 0
-        return total_time
+        return self.actual_minutes or 0
 
     def get_completion_progress(self) -> float:
         """获取项目完成进度（0-1）"""
-        if not self.tasks:
+        if not self.task_count:
             return 0.0
-
-        completed_tasks = [task for task in self.tasks if task.status == 'COMPLETED']
-        return len(completed_tasks) / len(self.tasks)
\ No newline at end of file
+        return (self.completed_count or 0) / self.task_count
@@ -1,7 +1,8 @@
 from . import BaseModel, db
-from sqlalchemy import String, ForeignKey
+from .task_tags import task_tags
+from sqlalchemy import String, ForeignKey, func, select
 from sqlalchemy.orm import relationship
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 
 class Tag(BaseModel):
@@ -15,17 +16,27 @@ class Tag(BaseModel):
     # 多对多关联
     tasks = relationship('Task', secondary='task_tags', back_populates='tags')
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
+    @classmethod
+    def list_with_usage_counts(cls, user_id: str) -> List[Tuple['Tag', int]]:
+        """用户的全部标签及各自的使用次数，一条按标签分组的COUNT查询"""
+        return db.session.execute(
+            select(cls, func.count(task_tags.c.task_id))
+            .outerjoin(task_tags, task_tags.c.tag_id == cls.id)
+            .where(cls.user_id == user_id)
+            .group_by(cls.id)
+        ).all()
+
+    def to_dict(self, usage_count: Optional[int] = None) -> Dict[str, Any]:
+        """转换为字典，批量转换时传入已统计的使用次数"""
         base_dict = super().to_dict()
         base_dict.update({
             'name': self.name,
             'user_id': self.user_id,
             'color': self.color,
-            'usage_count': self.get_usage_count()
+            'usage_count': self.get_usage_count() if usage_count is None else usage_count
         })
         return base_dict
 
     def get_usage_count(self) -> int:
-        """获取标签使用次数"""
-        return len(self.tasks) if self.tasks else 0
\ No newline at end of file
+        """获取标签使用次数（COUNT查询，不加载任务）"""
+        return db.session.scalar(select(func.count()).select_from(task_tags).where(task_tags.c.tag_id == self.id))
@@ -1,5 +1,6 @@
 from . import BaseModel, db
-from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, Enum
+from .task_tags import task_tags
+from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, Enum, event, func, select
 from sqlalchemy.orm import relationship
 from typing import Dict, Any, Optional
 import enum
@@ -29,6 +30,9 @@ class PriorityLevel(enum.Enum):
 class Task(BaseModel):
     """任务模型"""
     __tablename__ = 'tasks'
+    __table_args__ = (
+        db.Index('ix_tasks_user_id_planned_start_time', 'user_id', 'planned_start_time'),
+    )
 
     title = db.Column(String(200), nullable=False)
     description = db.Column(Text)
@@ -50,6 +54,10 @@ class Task(BaseModel):
     # 项目关联
     project_id = db.Column(String(36), ForeignKey('projects.id'))
 
+    # 冗余计数（见 models/counters.py）
+    actual_minutes = db.Column(Integer, nullable=False, default=0)
+    completed_pomodoros = db.Column(Integer, nullable=False, default=0)
+
     # 关联关系
     user = relationship('User', back_populates='tasks')
     category = relationship('TaskCategory', back_populates='tasks')
@@ -57,7 +65,19 @@ class Task(BaseModel):
     project = relationship('Project', back_populates='tasks')
     tags = relationship('Tag', secondary='task_tags', back_populates='tasks')
     pomodoro_sessions = relationship('PomodoroSession', back_populates='task', cascade='all, delete-orphan')
-    # time_logs = relationship('TimeLog', back_populates='task', cascade='all, delete-orphan')
+    time_logs = relationship('TimeLog', back_populates='task', cascade='all, delete-orphan')
+
+    @classmethod
+    def tagged_with(cls, tag_ids, match_all: bool = False):
+        """
+        带有任一（match_all为True时为全部）指定标签的过滤条件
+
+        task_tags上的半连接子查询，由 (tag_id, task_id) 索引覆盖；tag_ids需已去重
+        """
+        tagged = select(task_tags.c.task_id).where(task_tags.c.tag_id.in_(tag_ids))
+        if match_all and len(tag_ids) > 1:
+            tagged = tagged.group_by(task_tags.c.task_id).having(func.count() == len(tag_ids))
+        return cls.id.in_(tagged)
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -73,6 +93,15 @@ class Task(BaseModel):
             'scheduled_time_block_id': self.scheduled_time_block_id,
             'status': self.status.value,
             'priority': self.priority.value,
-            'project_id': self.project_id
+            'project_id': self.project_id,
+            'actual_minutes': self.actual_minutes or 0,
+            'completed_pomodoros': self.completed_pomodoros or 0
         })
-        return base_dict
\ No newline at end of file
+        return base_dict
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_missing_indexes(target, connection, **kwargs):
+    """db.create_all() 不会为已存在的表建索引，旧数据库在这里补上任务过滤用的索引"""
+    for index in (*Task.__table__.indexes, *task_tags.indexes):
+        index.create(connection, checkfirst=True)
@@ -1,5 +1,5 @@
 from . import BaseModel, db
-from sqlalchemy import String, Text, ForeignKey
+from sqlalchemy import String, Text, Integer, ForeignKey
 from sqlalchemy.orm import relationship
 from typing import Dict, Any
 
@@ -14,6 +14,12 @@ class TaskCategory(BaseModel):
     icon = db.Column(String(50))
     description = db.Column(Text)
 
+    # 冗余计数（见 models/counters.py）
+    task_count = db.Column(Integer, nullable=False, default=0)
+    completed_count = db.Column(Integer, nullable=False, default=0)
+    actual_minutes = db.Column(Integer, nullable=False, default=0)  # 按时间日志的归属累计
+    completed_pomodoros = db.Column(Integer, nullable=False, default=0)
+
     # 关联关系
     user = relationship('User', back_populates='task_categories')
     tasks = relationship('Task', back_populates='category', cascade='all, delete-orphan')
@@ -28,22 +34,16 @@ class TaskCategory(BaseModel):
             'icon': self.icon,
             'description': self.description,
             'task_count': self.get_task_count(),
+            'completed_count': self.completed_count or 0,
+            'completed_pomodoros': self.completed_pomodoros or 0,
             'total_time_spent': self.get_total_time_spent()
         })
         return base_dict
 
     def get_task_count(self) -> int:
         """获取任务数量"""
-        return len(self.tasks) if self.tasks else 0
+        return self.task_count or 0
 
     def get_total_time_spent(self) -> int:
         """获取总时间花费（分钟）"""
-        if not self.tasks:
-            return 0
-
-        total_time = 0
-        for task in self.tasks:
-            # 这里需要实现获取任务实际时间的方法
-            # 暂时返回0，后续可以集成TimeLog数据
-            total_time += 0
-        return total_time
\ No newline at end of file
+        return self.actual_minutes or 0
@@ -1,10 +1,12 @@
 from app import db
-from sqlalchemy import Table, Column, String, ForeignKey
+from sqlalchemy import Table, Column, String, ForeignKey, Index
 
-# 任务标签关联表
+# 任务标签关联表；主键 (task_id, tag_id) 用于查任务的标签，(tag_id, task_id) 索引用于按标签查任务
 task_tags = Table(
     'task_tags',
     db.metadata,
     Column('task_id', String(36), ForeignKey('tasks.id'), primary_key=True),
-    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True)
-)
\ No newline at end of file
+    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True),
+    Index('ix_task_tags_tag_id_task_id', 'tag_id', 'task_id')
+)
+
@@ -1,7 +1,7 @@
 from . import BaseModel, db
-from sqlalchemy import String, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import String, DateTime, ForeignKey, Enum, Boolean, Integer, bindparam, event, inspect, select, update
 from sqlalchemy.orm import relationship
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import enum
 from datetime import datetime
 
@@ -15,9 +15,25 @@ class BlockType(enum.Enum):
     REVIEW = 'REVIEW'           # 复盘
 
 
+def duration_between(start_time: Optional[datetime], end_time: Optional[datetime]) -> int:
+    """两个时间之间的分钟数（不足一分钟的部分舍去），任一为空时为0"""
+    if start_time and end_time:
+        return int((end_time - start_time).total_seconds() / 60)
+    return 0
+
+
+def _default_duration(context) -> int:
+    """插入时按开始、结束时间计算时长，批量Core插入同样生效"""
+    parameters = context.get_current_parameters()
+    return duration_between(parameters.get('start_time'), parameters.get('end_time'))
+
+
 class TimeBlock(BaseModel):
     """时间块模型"""
     __tablename__ = 'time_blocks'
+    __table_args__ = (
+        db.Index('ix_time_blocks_user_id_duration_minutes', 'user_id', 'duration_minutes'),
+    )
 
     user_id = db.Column(String(36), ForeignKey('users.id'), nullable=False)
     date = db.Column(DateTime, nullable=False)  # 所属日期
@@ -28,6 +44,9 @@ class TimeBlock(BaseModel):
     is_recurring = db.Column(Boolean, default=False)
     recurrence_pattern = db.Column(String(100))
 
+    # 持续时间（分钟），随开始、结束时间保存，供SQL按时长过滤、排序与汇总
+    duration_minutes = db.Column(Integer, nullable=False, default=_default_duration)
+
     # 模板关联
     template_id = db.Column(String(36), ForeignKey('time_block_templates.id'))
 
@@ -55,11 +74,8 @@ class TimeBlock(BaseModel):
         return base_dict
 
     def get_duration(self) -> int:
-        """获取时间块持续时间（分钟）"""
-        if self.start_time and self.end_time:
-            duration = (self.end_time - self.start_time).total_seconds() / 60
-            return int(duration)
-        return 0
+        """获取时间块持续时间（分钟），按当前的开始、结束时间计算，未保存的修改也会反映"""
+        return duration_between(self.start_time, self.end_time)
 
     def is_active(self) -> bool:
         """检查时间块是否处于活跃状态"""
@@ -75,4 +91,51 @@ class TimeBlock(BaseModel):
     def can_accommodate_task(self, task_duration: int) -> bool:
         """检查时间块是否能容纳指定时长的任务"""
         block_duration = self.get_duration()
-        return block_duration >= task_duration
\ No newline at end of file
+        return block_duration >= task_duration
+
+
+@event.listens_for(TimeBlock, 'before_insert')
+@event.listens_for(TimeBlock, 'before_update')
+def _sync_duration(mapper, connection, target):
+    """ORM保存时按开始、结束时间刷新存储的时长"""
+    duration = target.get_duration()
+    if target.duration_minutes != duration:
+        target.duration_minutes = duration
+
+
+def sync_durations(connection, only_missing_column: bool = False) -> int:
+    """
+    确保time_blocks表有duration_minutes列及索引，并按开始、结束时间修正存储的时长，返回修正的行数
+
+    旧数据库缺少该列时先补列；only_missing_column为True时，只在补列后回填
+    """
+    table = TimeBlock.__table__
+    columns = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    added = 'duration_minutes' not in columns
+    if added:
+        connection.exec_driver_sql(
+            f'ALTER TABLE {table.name} ADD COLUMN duration_minutes INTEGER NOT NULL DEFAULT 0'
+        )
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+    if only_missing_column and not added:
+        return 0
+
+    rows = connection.execute(select(table.c.id, table.c.start_time, table.c.end_time, table.c.duration_minutes))
+    changes = [
+        {'block_id': block_id, 'duration': duration_between(start_time, end_time)}
+        for block_id, start_time, end_time, duration in rows
+        if duration != duration_between(start_time, end_time)
+    ]
+    if changes:
+        connection.execute(
+            update(table).where(table.c.id == bindparam('block_id')).values(duration_minutes=bindparam('duration')),
+            changes
+        )
+    return len(changes)
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _upgrade_duration_column(target, connection, **kwargs):
+    """db.create_all() 时为旧数据库补上duration_minutes列并回填"""
+    sync_durations(connection, only_missing_column=True)
@@ -0,0 +1,171 @@
+from . import BaseModel, db
+from sqlalchemy import String, Text, Integer, Boolean, DateTime, ForeignKey, select
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+import json
+
+
+def backfill_time_logs() -> int:
+    """按开始时间为尚无日志的已结束专注会话生成时间日志，返回生成数量"""
+    from .pomodoro_session import PomodoroSession, SessionStatus, SessionType
+
+    sessions = (
+        PomodoroSession.query
+        .filter(PomodoroSession.status.in_([SessionStatus.COMPLETED, SessionStatus.INTERRUPTED]),
+                PomodoroSession.session_type == SessionType.FOCUS,
+                ~PomodoroSession.time_log.has())
+        .order_by(PomodoroSession.user_id, PomodoroSession.start_time)
+        .all()
+    )
+    created = sum(1 for session in sessions if TimeLog.from_session(session) is not None)
+    db.session.commit()
+    return created
+
+
+class TimeLog(BaseModel):
+    """时间日志模型
+
+    番茄钟会话完成或中断时自动生成，同一用户的日志时间互不重叠，构成时间账本。
+    category_id、project_id 与 task_snapshot 记录产生日志时任务的状态，之后任务修改不影响已有日志。
+    """
+    __tablename__ = 'time_logs'
+    __table_args__ = (
+        db.Index('ix_time_logs_user_id_start_time', 'user_id', 'start_time'),
+        db.Index('ix_time_logs_task_id_duration', 'task_id', 'duration'),
+        db.Index('ix_time_logs_project_id_duration', 'project_id', 'duration'),
+        db.Index('ix_time_logs_category_id_duration', 'category_id', 'duration'),
+    )
+
+    user_id = db.Column(String(36), ForeignKey('users.id'), nullable=False)
+    task_id = db.Column(String(36), ForeignKey('tasks.id'), nullable=False)
+    pomodoro_session_id = db.Column(String(36), ForeignKey('pomodoro_sessions.id'), unique=True)
+
+    # 时间记录
+    start_time = db.Column(DateTime, nullable=False)
+    end_time = db.Column(DateTime, nullable=False)
+    duration = db.Column(Integer, nullable=False)  # 分钟
+    is_completed = db.Column(Boolean, nullable=False, default=False)  # 番茄钟是否完成（否则为中断）
+
+    # 关联数据
+    completion_summary = db.Column(Text)
+    category_id = db.Column(String(36))
+    project_id = db.Column(String(36))
+    task_snapshot = db.Column(Text, default='{}')  # 任务快照（JSON格式存储）
+
+    # 关联关系
+    user = relationship('User', back_populates='time_logs')
+    task = relationship('Task', back_populates='time_logs')
+    pomodoro_session = relationship('PomodoroSession', back_populates='time_log')
+
+    @classmethod
+    def from_session(cls, session) -> Optional['TimeLog']:
+        """为结束的专注会话生成时间日志并加入数据库会话
+
+        与已有日志重叠的部分不计入：从会话时间中扣除重叠日志占用的区间，
+        每个会话只对应一条日志，剩余多段空闲时间时取最长的一段（相同时取最早的），
+        完全被覆盖时不生成日志。休息会话不计入账本。
+        """
+        from .pomodoro_session import SessionStatus, SessionType
+
+        if session.session_type != SessionType.FOCUS or not session.start_time or not session.end_time:
+            return None
+
+        segment = cls._longest_free_segment(session.user_id, session.start_time, session.end_time)
+        if segment is None:
+            return None
+        start_time, end_time = segment
+
+        task = session.task
+        time_log = cls(
+            user_id=session.user_id,
+            task_id=session.task_id,
+            pomodoro_session=session,
+            start_time=start_time,
+            end_time=end_time,
+            duration=int((end_time - start_time).total_seconds() / 60),
+            is_completed=session.status == SessionStatus.COMPLETED,
+            completion_summary=session.completion_summary,
+            category_id=task.category_id if task else None,
+            project_id=task.project_id if task else None,
+            task_snapshot=json.dumps(cls.snapshot_of(task), ensure_ascii=False)
+        )
+        db.session.add(time_log)
+        return time_log
+
+    @classmethod
+    def _longest_free_segment(cls, user_id: str, start_time: datetime,
+                              end_time: datetime) -> Optional[Tuple[datetime, datetime]]:
+        """[start_time, end_time] 扣除该用户已有日志后最长的空闲区间，没有时返回None"""
+        occupied = db.session.execute(
+            select(cls.start_time, cls.end_time).where(
+                cls.user_id == user_id,
+                cls.start_time < end_time,
+                cls.end_time > start_time
+            ).order_by(cls.start_time)
+        ).all()
+
+        longest = None
+        cursor = start_time
+        for busy_start, busy_end in [*occupied, (end_time, end_time)]:
+            if busy_start > cursor and (longest is None or busy_start - cursor > longest[1] - longest[0]):
+                longest = (cursor, min(busy_start, end_time))
+            cursor = max(cursor, busy_end)
+            if cursor >= end_time:
+                break
+        return longest
+
+    @staticmethod
+    def snapshot_of(task) -> Dict[str, Any]:
+        """任务快照"""
+        if task is None:
+            return {}
+        return {
+            'title': task.title,
+            'task_type': task.task_type.value if task.task_type else None,
+            'status': task.status.value if task.status else None,
+            'priority': task.priority.value if task.priority else None,
+            'estimated_pomodoros': task.estimated_pomodoros,
+            'category_id': task.category_id,
+            'project_id': task.project_id,
+            'planned_start_time': task.planned_start_time.isoformat() if task.planned_start_time else None
+        }
+
+    def get_task_snapshot(self) -> Dict[str, Any]:
+        """获取任务快照"""
+        try:
+            return json.loads(self.task_snapshot or '{}')
+        except json.JSONDecodeError:
+            return {}
+
+    def is_valid(self) -> bool:
+        """检查时间是否有效：结束晚于开始，且不与同一用户的其他日志重叠"""
+        if not self.start_time or not self.end_time or self.end_time <= self.start_time:
+            return False
+        overlap = db.session.scalar(
+            select(TimeLog.id).where(
+                TimeLog.user_id == self.user_id,
+                TimeLog.id != self.id,
+                TimeLog.start_time < self.end_time,
+                TimeLog.end_time > self.start_time
+            ).limit(1)
+        )
+        return overlap is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        base_dict = super().to_dict()
+        base_dict.update({
+            'user_id': self.user_id,
+            'task_id': self.task_id,
+            'pomodoro_session_id': self.pomodoro_session_id,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'duration': self.duration,
+            'is_completed': self.is_completed,
+            'completion_summary': self.completion_summary,
+            'category_id': self.category_id,
+            'project_id': self.project_id,
+            'task_snapshot': self.get_task_snapshot()
+        })
+        return base_dict
@@ -24,7 +24,8 @@ class User(BaseModel):
     time_blocks = relationship('TimeBlock', back_populates='user', cascade='all, delete-orphan')
     time_block_templates = relationship('TimeBlockTemplate', back_populates='user', cascade='all, delete-orphan')
     pomodoro_sessions = relationship('PomodoroSession', back_populates='user', cascade='all, delete-orphan')
-    # time_logs = relationship('TimeLog', back_populates='user', cascade='all, delete-orphan')
+    matching_rule_set = relationship('MatchingRuleSet', back_populates='user', uselist=False, cascade='all, delete-orphan')
+    time_logs = relationship('TimeLog', back_populates='user', cascade='all, delete-orphan')
     # recommendations = relationship('Recommendation', back_populates='user', cascade='all, delete-orphan')
     # daily_stats = relationship('DailyStats', back_populates='user', cascade='all, delete-orphan')
     # daily_reviews = relationship('DailyReview', back_populates='user', cascade='all, delete-orphan')
@@ -0,0 +1,94 @@
+"""
+数据导出API路由
+以NDJSON或CSV流式导出当前用户的全部历史数据，支持gzip与断点续传；
+分析用的列式导出（Arrow IPC / Parquet）见 /api/export/analytics
+"""
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from services import analytics_export
+from services.data_export import (
+    UserDataExport, ExportError, EXPORT_FORMATS, gzip_stream, parse_entities
+)
+from utils.response_utils import NDJSON_MIMETYPE
+
+bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+
+@bp.route('', methods=['GET'])
+@bp.route('/', methods=['GET'])
+@jwt_required()
+def export_data():
+    """
+    流式导出：?format=ndjson|csv&entities=tasks,time_blocks,...&cursor=实体:主键
+
+    NDJSON可包含多个实体，每批之后输出checkpoint行；CSV只能导出一个实体。
+    中断后以最后收到的游标作为cursor参数重新请求即可续传。
+    请求头 Accept-Encoding 包含gzip时边生成边压缩。
+    """
+    current_user_id = get_jwt_identity()
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    try:
+        entities = parse_entities(request.args.get('entities'))
+        if export_format == 'csv' and len(entities) != 1:
+            raise ExportError('csv export requires exactly one entity')
+        export = UserDataExport(current_user_id, entities, request.args.get('cursor'))
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if export_format == 'csv':
+        chunks, mimetype = export.csv(), 'text/csv'
+        filename = f'{entities[0].name}-{datetime.utcnow():%Y%m%d}.csv'
+    else:
+        chunks, mimetype = export.ndjson(), NDJSON_MIMETYPE
+        filename = f'export-{datetime.utcnow():%Y%m%d}.ndjson'
+
+    headers = {
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Vary': 'Accept-Encoding'
+    }
+    if 'gzip' in request.accept_encodings:
+        chunks = gzip_stream(chunks)
+        headers['Content-Encoding'] = 'gzip'
+
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+@bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def export_analytics():
+    """
+    列式导出：?entity=pomodoro_sessions|tasks|time_blocks&format=arrow|parquet
+
+    枚举为dictionary列、时间为timestamp列，按时间排序；从服务端游标逐批写出（每批一个RecordBatch / row group）
+    """
+    current_user_id = get_jwt_identity()
+
+    entity = request.args.get('entity')
+    if entity not in analytics_export.ANALYTICS_ENTITIES:
+        return jsonify({'error': f"entity must be one of: {', '.join(analytics_export.ANALYTICS_ENTITIES)}"}), 400
+    export_format = request.args.get('format', 'parquet')
+    if export_format not in analytics_export.ANALYTICS_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(analytics_export.ANALYTICS_FORMATS)}"}), 400
+    if not analytics_export.is_available():
+        return jsonify({'error': 'Analytics export requires pyarrow (pip install .[analytics])'}), 501
+
+    mimetype, extension = analytics_export.ANALYTICS_FORMATS[export_format]
+    export = analytics_export.AnalyticsExport(current_user_id, entity)
+    return Response(
+        stream_with_context(export.stream(export_format)),
+        mimetype=mimetype,
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+            'Content-Disposition': f'attachment; filename="{entity}-{datetime.utcnow():%Y%m%d}.{extension}"'
+        }
+    )
@@ -0,0 +1,75 @@
+"""
+数据导入API路由
+批量导入任务、时间块与番茄钟会话，以NDJSON流式返回进度与逐行错误
+"""
+import gzip
+import shutil
+import tempfile
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from services.data_import import (
+    BulkImporter, DataImportError, IMPORT_FORMATS, read_records
+)
+from utils.response_utils import NDJSON_MIMETYPE, format_ndjson_line
+
+bp = Blueprint('import', __name__, url_prefix='/api/import')
+
+# 上传内容超过该大小时缓存到临时文件
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+@bp.route('', methods=['POST'])
+@bp.route('/', methods=['POST'])
+@jwt_required()
+def import_data():
+    """
+    批量导入：请求体为NDJSON或CSV，?format=ndjson|csv&entity=tasks|time_blocks|pomodoro_sessions
+
+    NDJSON每行一个对象，可用entity字段指定类型（缺省取entity参数）；CSV整个文件为entity参数指定的类型。
+    请求体可用 Content-Encoding: gzip 压缩。
+    返回NDJSON：出错的行为 {"type": "error"}，每块之后一行 {"type": "progress"}，最后一行为 {"type": "summary"}
+    """
+    current_user_id = get_jwt_identity()
+
+    import_format = request.args.get('format', 'ndjson')
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(IMPORT_FORMATS)}"}), 400
+    entity = request.args.get('entity')
+    if import_format == 'csv' and not entity:
+        return jsonify({'error': 'entity is required for csv import'}), 400
+
+    try:
+        importer = BulkImporter(current_user_id, entity)
+    except DataImportError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # 先把请求体读完再开始写响应，不依赖服务器与客户端同时收发
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    shutil.copyfileobj(request.stream, upload)
+    if not upload.tell():
+        upload.close()
+        return jsonify({'error': 'No data provided'}), 400
+    upload.seek(0)
+
+    stream = upload
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        stream = gzip.GzipFile(fileobj=upload, mode='rb')
+
+    def generate():
+        try:
+            for event in importer.run(read_records(stream, import_format)):
+                yield format_ndjson_line(event)
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            # 压缩数据损坏或编码错误时无法继续读取，已写入的块保持不变
+            yield format_ndjson_line({'type': 'failed', 'error': f'Unreadable upload: {e}',
+                                      'rows': importer.rows, 'imported': importer.imported})
+        finally:
+            upload.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
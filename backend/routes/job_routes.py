@@ -0,0 +1,87 @@
+"""
+后台任务API路由
+提供任务状态轮询与SSE结果推送
+"""
+from flask import Blueprint, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db
+from models.job import Job
+from services.job_queue import job_queue
+from utils.response_utils import format_sse_event
+import time
+
+bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+
+@bp.route('/', methods=['GET'])
+@jwt_required()
+def get_jobs():
+    """获取用户最近的后台任务"""
+    current_user_id = get_jwt_identity()
+
+    jobs = Job.query.filter_by(user_id=current_user_id).order_by(Job.created_at.desc()).limit(50).all()
+    return jsonify({
+        'jobs': [job.to_dict() for job in jobs],
+        'count': len(jobs)
+    })
+
+
+@bp.route('/<string:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """获取后台任务状态与结果"""
+    current_user_id = get_jwt_identity()
+
+    job = Job.query.filter_by(id=job_id, user_id=current_user_id).first()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    # 执行进程已退出或调度丢失的任务重新排队或标记失败，避免客户端无限等待
+    if job_queue.needs_recovery(job):
+        job_queue.recover_stale()
+        job = db.session.get(Job, job_id, populate_existing=True)
+
+    return jsonify({'job': job.to_dict()})
+
+
+@bp.route('/<string:job_id>/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_job(job_id):
+    """以SSE推送后台任务状态，任务结束后关闭连接"""
+    current_user_id = get_jwt_identity()
+
+    job = Job.query.filter_by(id=job_id, user_id=current_user_id).first()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    poll_interval = current_app.config.get('JOB_STREAM_POLL_INTERVAL', 1.0)
+
+    def generate():
+        last_state = None
+        while True:
+            current_job = db.session.get(Job, job_id, populate_existing=True)
+            if job_queue.needs_recovery(current_job):
+                job_queue.recover_stale()
+                current_job = db.session.get(Job, job_id, populate_existing=True)
+            state = (current_job.status, current_job.attempts)
+            job_dict = current_job.to_dict()
+            is_finished = current_job.is_finished()
+            # 结束读事务，下次轮询才能看到worker提交的新状态
+            db.session.rollback()
+
+            if state != last_state:
+                last_state = state
+                yield format_sse_event('status', job_dict)
+
+            if is_finished:
+                return
+            time.sleep(poll_interval)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
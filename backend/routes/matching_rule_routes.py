@@ -0,0 +1,109 @@
+"""
+匹配规则API路由
+管理用户自定义的 任务类别 -> 时间块类型 匹配分数
+"""
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.time_block import BlockType
+from services.matching_rules import matching_rule_service, DEFAULT_MATCHING_RULES
+
+bp = Blueprint('matching_rules', __name__, url_prefix='/api/matching-rules')
+
+
+def _serialize_rules(rules):
+    return {
+        category_name: [{'block_type': block_type.value, 'score': score} for block_type, score in category_rules]
+        for category_name, category_rules in rules.items()
+    }
+
+
+def _parse_rules(data):
+    """解析 {'rules': [{'block_type': ..., 'score': ...}]}，返回(规则列表, 错误信息)"""
+    items = (data or {}).get('rules')
+    if not isinstance(items, list) or not items:
+        return None, 'rules must be a non-empty list'
+
+    rules = []
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict):
+            return None, 'Each rule must be an object with block_type and score'
+        try:
+            block_type = BlockType(item.get('block_type'))
+        except ValueError:
+            return None, f"Invalid block_type: {item.get('block_type')}"
+        if block_type in seen:
+            return None, f'Duplicate block_type: {block_type.value}'
+
+        score = item.get('score')
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 1:
+            return None, 'score must be a number between 0 and 1'
+
+        seen.add(block_type)
+        rules.append((block_type, float(score)))
+
+    return rules, None
+
+
+@bp.route('/', methods=['GET'])
+@jwt_required()
+def get_matching_rules():
+    """获取用户自定义规则与默认规则"""
+    current_user_id = get_jwt_identity()
+
+    compiled = matching_rule_service.get_compiled(current_user_id)
+    return jsonify({
+        'rules': _serialize_rules(matching_rule_service.get_custom_rules(current_user_id)),
+        'defaults': _serialize_rules(DEFAULT_MATCHING_RULES),
+        'version': compiled.version
+    })
+
+
+@bp.route('/matrix', methods=['GET'])
+@jwt_required()
+def get_matching_matrix():
+    """获取合并后的 类别 × 时间块类型 分数矩阵"""
+    current_user_id = get_jwt_identity()
+
+    return jsonify(matching_rule_service.get_compiled(current_user_id).to_dict())
+
+
+@bp.route('/<string:category_name>', methods=['PUT'])
+@jwt_required()
+def set_category_rules(category_name):
+    """替换某个类别的自定义规则"""
+    current_user_id = get_jwt_identity()
+
+    rules, error = _parse_rules(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+
+    rule_set = matching_rule_service.set_category_rules(current_user_id, category_name, rules)
+    return jsonify({
+        'message': 'Matching rules updated successfully',
+        'category_name': category_name,
+        'rules': [{'block_type': block_type.value, 'score': score} for block_type, score in rules],
+        'version': rule_set.version
+    })
+
+
+@bp.route('/<string:category_name>', methods=['DELETE'])
+@jwt_required()
+def delete_category_rules(category_name):
+    """删除某个类别的自定义规则，恢复默认规则"""
+    current_user_id = get_jwt_identity()
+
+    if not matching_rule_service.delete_category_rules(current_user_id, category_name):
+        return jsonify({'error': 'Matching rules not found'}), 404
+
+    return jsonify({'message': 'Matching rules deleted successfully'})
+
+
+@bp.route('/', methods=['DELETE'])
+@jwt_required()
+def reset_matching_rules():
+    """删除全部自定义规则"""
+    current_user_id = get_jwt_identity()
+
+    matching_rule_service.delete_category_rules(current_user_id)
+    return jsonify({'message': 'Matching rules reset successfully'})
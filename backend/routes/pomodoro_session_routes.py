@@ -1,9 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from models.pomodoro_session import PomodoroSession, SessionStatus, SessionType
 from models.task import Task
+from services.pomodoro_events import pomodoro_event_broker, PomodoroEventType
+from utils.response_utils import format_sse_event
 from datetime import datetime
+import queue
 
 pomodoro_session_bp = Blueprint('pomodoro_sessions', __name__)
 
@@ -123,6 +126,7 @@ def start_pomodoro_session(session_id):
     try:
         pomodoro_session.start()
         db.session.commit()
+        pomodoro_event_broker.publish(user_id, PomodoroEventType.STARTED, pomodoro_session.to_state_dict())
 
         return jsonify({
             'message': '番茄钟会话已开始',
@@ -150,6 +154,7 @@ def complete_pomodoro_session(session_id):
         summary = data.get('completion_summary')
         pomodoro_session.complete(summary)
         db.session.commit()
+        pomodoro_event_broker.publish(user_id, PomodoroEventType.COMPLETED, pomodoro_session.to_state_dict())
 
         return jsonify({
             'message': '番茄钟会话已完成',
@@ -177,6 +182,7 @@ def interrupt_pomodoro_session(session_id):
         reason = data.get('interruption_reason')
         pomodoro_session.interrupt(reason)
         db.session.commit()
+        pomodoro_event_broker.publish(user_id, PomodoroEventType.INTERRUPTED, pomodoro_session.to_state_dict())
 
         return jsonify({
             'message': '番茄钟会话已中断',
@@ -203,6 +209,58 @@ def get_active_pomodoro_session():
     else:
         return jsonify({'message': '没有活跃的番茄钟会话'})
 
+@pomodoro_session_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_pomodoro_session_events():
+    """以SSE推送番茄钟会话状态变化
+
+    连接建立时先发送一次sync事件（服务器时间与当前活跃会话），
+    之后仅在会话开始、完成、中断时推送，客户端据此本地倒计时。
+    EventSource无法设置请求头，因此同时接受查询参数中的令牌。
+    """
+    user_id = get_jwt_identity()
+
+    active_session = PomodoroSession.query.filter_by(
+        user_id=user_id,
+        status=SessionStatus.IN_PROGRESS
+    ).first()
+
+    sync_payload = {
+        'server_time': datetime.utcnow().isoformat(),
+        'active_session': active_session.to_state_dict() if active_session else None
+    }
+
+    # 生成器在请求上下文结束后才迭代，这里先释放数据库连接
+    db.session.remove()
+
+    heartbeat_interval = current_app.config.get('POMODORO_STREAM_HEARTBEAT', 15)
+
+    def generate():
+        # 在生成器内订阅：客户端在开始迭代前断开时不会留下订阅队列
+        subscriber = pomodoro_event_broker.subscribe(user_id)
+        try:
+            yield format_sse_event(PomodoroEventType.SYNC, sync_payload)
+            while True:
+                try:
+                    event_type, payload = subscriber.get(timeout=heartbeat_interval)
+                except queue.Empty:
+                    # 心跳注释行，防止代理关闭空闲连接
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_sse_event(event_type, payload)
+        finally:
+            pomodoro_event_broker.unsubscribe(user_id, subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @pomodoro_session_bp.route('/<int:session_id>', methods=['GET'])
 @jwt_required()
 def get_pomodoro_session(session_id):
@@ -0,0 +1,44 @@
+"""
+全文搜索API路由
+在任务、项目、标签与番茄钟完成总结中统一搜索
+"""
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from services.search_index import search_index, DOC_TYPES, DEFAULT_LIMIT, MAX_LIMIT
+
+bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+
+@bp.route('', methods=['GET'])
+@bp.route('/', methods=['GET'])
+@jwt_required()
+def search():
+    """
+    全文搜索：?q=关键词（空格分隔，需全部命中）&types=task,project,tag,session&limit=&offset=
+
+    结果按相关度排序，每条包含type、id、score与item（完整对象）
+    """
+    current_user_id = get_jwt_identity()
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+
+    doc_types = None
+    if request.args.get('types'):
+        doc_types = [doc_type.strip() for doc_type in request.args['types'].split(',') if doc_type.strip()]
+        invalid = [doc_type for doc_type in doc_types if doc_type not in DOC_TYPES]
+        if invalid:
+            return jsonify({'error': f"Invalid types: {', '.join(invalid)}"}), 400
+
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    if limit < 1 or limit > MAX_LIMIT:
+        return jsonify({'error': f'limit must be between 1 and {MAX_LIMIT}'}), 400
+    if offset < 0:
+        return jsonify({'error': 'offset must not be negative'}), 400
+
+    result = search_index.search(current_user_id, query, doc_types, limit, offset)
+    result.update({'query': query, 'limit': limit, 'offset': offset})
+    return jsonify(result)
@@ -12,8 +12,8 @@ def get_tags():
     """获取用户的所有标签"""
     current_user_id = get_jwt_identity()
 
-    tags = Tag.query.filter_by(user_id=current_user_id).all()
-    return jsonify([tag.to_dict() for tag in tags])
+    tags = Tag.list_with_usage_counts(current_user_id)
+    return jsonify([tag.to_dict(usage_count) for tag, usage_count in tags])
 
 
 @bp.route('/', methods=['POST'])
@@ -123,7 +123,7 @@ def delete_tag(tag_id):
         return jsonify({'error': 'Tag not found'}), 404
 
     # 检查是否有任务使用此标签
-    if tag.tasks:
+    if tag.get_usage_count():
         return jsonify({
             'error': 'Cannot delete tag with associated tasks. Please remove the tag from tasks first.'
         }), 400
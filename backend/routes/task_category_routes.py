@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db
+from models.task import Task
 from models.task_category import TaskCategory
+from services.matching_rules import matching_rule_service
 
 bp = Blueprint('task_category', __name__, url_prefix='/api/task-categories')
 
@@ -98,8 +100,10 @@ def update_task_category(category_id):
         if existing_category:
             return jsonify({'error': 'Task category with this name already exists'}), 400
 
-    # 更新字段
+    # 更新字段（改名时自定义匹配规则随之改名）
     if 'name' in data:
+        if data['name'] != category.name:
+            matching_rule_service.rename_category(current_user_id, category.name, data['name'])
         category.name = data['name']
     if 'color' in data:
         category.color = data['color']
@@ -131,7 +135,7 @@ def delete_task_category(category_id):
         return jsonify({'error': 'Task category not found'}), 404
 
     # 检查是否有任务使用此类别
-    if category.tasks:
+    if db.session.query(Task.query.filter_by(category_id=category.id).exists()).scalar():
         return jsonify({
             'error': 'Cannot delete category with associated tasks. Please reassign or delete the tasks first.'
         }), 400
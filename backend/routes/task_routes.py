@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
 from app import db
-from models.task import Task, TaskStatus
+from models.task import Task, TaskStatus, PriorityLevel
 
 bp = Blueprint('tasks', __name__)
 
@@ -9,20 +11,62 @@ bp = Blueprint('tasks', __name__)
 @bp.route('/', methods=['GET'])
 @jwt_required()
 def get_tasks():
-    """获取用户任务列表"""
+    """
+    获取用户任务列表
+
+    过滤参数：status、category_id、project_id、priority、
+    planned_start_from / planned_start_to（ISO时间，闭区间）、
+    tag_ids（逗号分隔，也可重复传入）与 tag_match=any|all（默认any：带任一标签；all：带全部标签）
+    """
     current_user_id = get_jwt_identity()
 
     # 获取查询参数
     status = request.args.get('status')
     category_id = request.args.get('category_id')
+    project_id = request.args.get('project_id')
+    priority = request.args.get('priority')
+    planned_start_from = request.args.get('planned_start_from')
+    planned_start_to = request.args.get('planned_start_to')
+    tag_ids = list(dict.fromkeys(
+        tag_id.strip() for value in request.args.getlist('tag_ids') for tag_id in value.split(',') if tag_id.strip()
+    ))
+    tag_match = request.args.get('tag_match', 'any')
 
     # 构建查询
     query = Task.query.filter_by(user_id=current_user_id)
 
     if status:
-        query = query.filter_by(status=TaskStatus(status))
+        try:
+            query = query.filter_by(status=TaskStatus(status))
+        except ValueError:
+            return jsonify({'error': 'Invalid status'}), 400
     if category_id:
         query = query.filter_by(category_id=category_id)
+    if project_id:
+        query = query.filter_by(project_id=project_id)
+    if priority:
+        try:
+            query = query.filter_by(priority=PriorityLevel(priority))
+        except ValueError:
+            return jsonify({'error': 'Invalid priority'}), 400
+
+    # 按计划开始时间范围过滤
+    if planned_start_from:
+        try:
+            query = query.filter(Task.planned_start_time >= datetime.fromisoformat(planned_start_from))
+        except ValueError:
+            return jsonify({'error': 'Invalid planned_start_from format'}), 400
+    if planned_start_to:
+        try:
+            query = query.filter(Task.planned_start_time <= datetime.fromisoformat(planned_start_to))
+        except ValueError:
+            return jsonify({'error': 'Invalid planned_start_to format'}), 400
+
+    # 按标签过滤
+    if tag_match not in ('any', 'all'):
+        return jsonify({'error': 'tag_match must be one of: any, all'}), 400
+    if tag_ids:
+        query = query.filter(Task.tagged_with(tag_ids, match_all=tag_match == 'all'))
 
     tasks = query.all()
 
@@ -71,6 +115,41 @@ def create_task():
     }), 201
 
 
+@bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_update_tasks():
+    """
+    批量操作任务，所有操作在一个事务中依次执行
+
+    请求体：{"operations": [{"op": ..., "task_ids": [...], ...}]}，op为：
+    - update：修改 fields 中的字段（status、priority、task_type、planned_start_time、
+      estimated_pomodoros、category_id、project_id）
+    - reschedule：计划开始时间顺延 shift_minutes 分钟（可为负）
+    - move：移入 time_block_id 指定的时间块（null为移出）
+    - add_tags / remove_tags：添加、移除 tag_ids 中的标签
+    - delete：删除任务及其番茄钟会话与时间日志
+
+    返回与操作一一对应的 results（succeeded为成功的任务ID，failed为 {task_id, error}）
+    """
+    from services.bulk_task_operations import bulk_task_operations
+
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    try:
+        result = bulk_task_operations.execute(current_user_id, data.get('operations'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except SQLAlchemyError as e:
+        return jsonify({'error': f'Failed to apply operations: {e.__class__.__name__}'}), 500
+
+    result['message'] = 'Bulk operations applied successfully'
+    return jsonify(result), 200
+
+
 @bp.route('/<task_id>', methods=['GET'])
 @jwt_required()
 def get_task(task_id):
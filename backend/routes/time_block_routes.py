@@ -1,12 +1,26 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db
 from models.time_block import TimeBlock, BlockType
 from datetime import datetime, timedelta
 from typing import List, Dict
+from services.time_block_statistics import build_time_block_statistics
+from services.job_queue import job_queue
+from services.search_index import search_index
+from utils.response_utils import job_accepted_response, format_ndjson_line, NDJSON_MIMETYPE
 
 bp = Blueprint('time_block', __name__, url_prefix='/api/time-blocks')
 
+# 自动排程单次最多覆盖的天数
+MAX_AUTO_SCHEDULE_DAYS = 7
+# 冲突范围扫描单次最多覆盖的天数
+MAX_CONFLICT_SCAN_DAYS = 31
+# 冲突增量复查单次最多涉及的时间块与任务数，超过时应重新整天检测
+MAX_RECHECK_IDS = 50
+# 批量时间块建议单次最多处理的任务数与每个任务返回的建议数
+MAX_BATCH_SUGGEST_TASKS = 500
+MAX_SUGGESTIONS_PER_TASK = 10
+
 
 @bp.route('/', methods=['GET'])
 @jwt_required()
@@ -324,21 +338,21 @@ def check_time_block_conflicts():
     except ValueError:
         return jsonify({'error': 'Invalid date format'}), 400
 
-    # 使用增强的冲突检测服务
-    from services.conflict_resolution import conflict_resolution_service
+    # 使用增强的冲突检测服务（只读，自动修复见 POST /conflicts/auto-fix）；
+    # 同时保存当天快照，返回的version用于之后的增量复查 POST /conflicts/recheck
+    from services.incremental_conflicts import incremental_conflict_checker
 
-    try:
-        conflicts = conflict_resolution_service.detect_conflicts(current_user_id, target_date)
-        conflict_dicts = [conflict.to_dict() for conflict in conflicts]
+    from services.conflict_resolution import serialize_conflicts
 
-        # 尝试自动修复可修复的冲突
-        auto_fixes = conflict_resolution_service.auto_fix_conflicts(conflicts)
+    try:
+        conflicts, version = incremental_conflict_checker.full_check(current_user_id, target_date.date())
 
         return jsonify({
-            'conflicts': conflict_dicts,
+            **serialize_conflicts(conflicts, _wants_compact()),
             'conflict_count': len(conflicts),
-            'auto_fixes': auto_fixes,
+            'auto_fixable_count': sum(1 for conflict in conflicts if conflict.auto_fixable),
             'date': date_str,
+            'version': version,
             'severity_summary': _get_severity_summary(conflicts)
         })
 
@@ -347,6 +361,167 @@ def check_time_block_conflicts():
         return _fallback_conflict_detection(current_user_id, target_date, date_str)
 
 
+@bp.route('/conflicts/recheck', methods=['POST'])
+@jwt_required()
+def recheck_time_block_conflicts():
+    """
+    时间块或任务修改后增量复查当天冲突
+
+    只重新检测被修改的时间块（block_ids）/任务（task_ids）影响到的冲突，
+    返回自since版本以来新增的冲突（added）与移除的冲突键（removed），客户端先移除再添加；
+    since缺失或已失效时返回full=true及完整冲突列表（conflicts）
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    date_str = data.get('date')
+    if not date_str:
+        return jsonify({'error': 'Date is required'}), 400
+
+    try:
+        target_date = datetime.fromisoformat(date_str)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+
+    block_ids = data.get('block_ids') or []
+    task_ids = data.get('task_ids') or []
+    for ids in (block_ids, task_ids):
+        if not isinstance(ids, list) or not all(isinstance(item, str) for item in ids):
+            return jsonify({'error': 'block_ids and task_ids must be lists of ids'}), 400
+    if not block_ids and not task_ids:
+        return jsonify({'error': 'block_ids or task_ids is required'}), 400
+    if len(block_ids) + len(task_ids) > MAX_RECHECK_IDS:
+        return jsonify({'error': f'Cannot recheck more than {MAX_RECHECK_IDS} ids at once'}), 400
+
+    from services.incremental_conflicts import incremental_conflict_checker
+
+    delta = incremental_conflict_checker.recheck(
+        current_user_id, target_date.date(), data.get('since'), block_ids, task_ids
+    )
+    return jsonify(delta.to_dict(compact=_wants_compact()))
+
+
+@bp.route('/conflicts', methods=['GET'])
+@jwt_required()
+def scan_time_block_conflicts():
+    """
+    扫描日期范围（最多31天）内的冲突，以NDJSON流式返回
+
+    每个有冲突的日期一行 {"type": "day", ...}，按日期顺序输出，日历可逐天渲染；
+    最后一行为 {"type": "summary", ...}
+    """
+    current_user_id = get_jwt_identity()
+
+    start_date_str = request.args.get('start_date')
+    if not start_date_str:
+        return jsonify({'error': 'Start date is required'}), 400
+
+    try:
+        start_date = datetime.fromisoformat(start_date_str).date()
+        end_date_str = request.args.get('end_date')
+        end_date = datetime.fromisoformat(end_date_str).date() if end_date_str else start_date
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+
+    if end_date < start_date:
+        return jsonify({'error': 'End date must not be before start date'}), 400
+    if (end_date - start_date).days >= MAX_CONFLICT_SCAN_DAYS:
+        return jsonify({'error': f'Date range cannot exceed {MAX_CONFLICT_SCAN_DAYS} days'}), 400
+
+    from services.conflict_resolution import conflict_resolution_service, serialize_conflicts
+
+    compact = _wants_compact()
+
+    def generate():
+        days_with_conflicts = 0
+        conflict_count = 0
+        total_summary = _get_severity_summary([])
+        for day, conflicts in conflict_resolution_service.scan_conflicts(current_user_id, start_date, end_date):
+            severity_summary = _get_severity_summary(conflicts)
+            days_with_conflicts += 1
+            conflict_count += len(conflicts)
+            for severity, count in severity_summary.items():
+                total_summary[severity] += count
+
+            yield format_ndjson_line({
+                'type': 'day',
+                'date': day.isoformat(),
+                **serialize_conflicts(conflicts, compact),
+                'conflict_count': len(conflicts),
+                'severity_summary': severity_summary
+            })
+
+        yield format_ndjson_line({
+            'type': 'summary',
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'days_with_conflicts': days_with_conflicts,
+            'conflict_count': conflict_count,
+            'severity_summary': total_summary
+        })
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/conflicts/auto-fix', methods=['POST'])
+@jwt_required()
+def auto_fix_time_block_conflicts():
+    """
+    自动修复指定日期的时间重叠
+
+    dry_run为true时只返回修改方案；否则在一个事务中应用全部修改。
+    传入预览返回的fingerprint时，若预览后时间块已被修改则返回409，避免应用过期的方案
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    date_str = data.get('date')
+    if not date_str:
+        return jsonify({'error': 'Date is required'}), 400
+
+    try:
+        target_date = datetime.fromisoformat(date_str)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+
+    dry_run = data.get('dry_run', False)
+    if not isinstance(dry_run, bool):
+        return jsonify({'error': 'dry_run must be a boolean'}), 400
+
+    from services.conflict_resolution import conflict_resolution_service
+
+    plan = conflict_resolution_service.plan_auto_fix(current_user_id, target_date.date())
+
+    if not dry_run:
+        expected_fingerprint = data.get('fingerprint')
+        if expected_fingerprint and expected_fingerprint != plan.fingerprint:
+            return jsonify({
+                'error': 'Time blocks changed since the plan was previewed',
+                'plan': plan.to_dict()
+            }), 409
+
+        try:
+            conflict_resolution_service.apply_auto_fix_plan(plan)
+        except Exception as e:
+            return jsonify({'error': f'Failed to apply auto-fix plan: {str(e)}'}), 500
+
+    result = plan.to_dict()
+    result.update({
+        'dry_run': dry_run,
+        'applied': not dry_run and bool(plan.shifts)
+    })
+    return jsonify(result)
+
+
+def _wants_compact() -> bool:
+    """?compact=1 时冲突只引用时间块与任务ID，时间块与任务放入blocks / tasks各序列化一次"""
+    return request.args.get('compact', '').lower() in ('1', 'true')
+
+
 def _get_severity_summary(conflicts: List) -> Dict:
     """获取严重程度统计"""
     summary = {
@@ -459,6 +634,127 @@ def suggest_time_slots():
         return _fallback_time_slot_suggestions(task, target_date, current_user_id)
 
 
+@bp.route('/suggest-time-slots/batch', methods=['POST'])
+@jwt_required()
+def suggest_time_slots_batch():
+    """为多个任务批量建议时间块，未指定task_ids时为所有未排程的待处理任务建议"""
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    date_str = data.get('date')
+    if not date_str:
+        return jsonify({'error': 'Date is required'}), 400
+
+    try:
+        target_date = datetime.fromisoformat(date_str)
+        top_k = int(data.get('top_k', 3))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid date or top_k'}), 400
+
+    if not 1 <= top_k <= MAX_SUGGESTIONS_PER_TASK:
+        return jsonify({'error': f'top_k must be between 1 and {MAX_SUGGESTIONS_PER_TASK}'}), 400
+
+    from models.task import Task, TaskStatus
+    query = Task.query.filter_by(user_id=current_user_id)
+    task_ids = data.get('task_ids')
+    if task_ids is not None:
+        if not isinstance(task_ids, list):
+            return jsonify({'error': 'task_ids must be a list'}), 400
+        query = query.filter(Task.id.in_(task_ids))
+    else:
+        query = query.filter(
+            Task.status == TaskStatus.PENDING,
+            Task.scheduled_time_block_id.is_(None)
+        )
+
+    tasks = query.order_by(Task.created_at).limit(MAX_BATCH_SUGGEST_TASKS + 1).all()
+    if len(tasks) > MAX_BATCH_SUGGEST_TASKS:
+        return jsonify({'error': f'Cannot suggest for more than {MAX_BATCH_SUGGEST_TASKS} tasks at once'}), 400
+
+    from services.category_timeblock_matching import category_timeblock_matcher
+    result = category_timeblock_matcher.suggest_time_blocks_for_tasks(
+        current_user_id, tasks, target_date.date(), top_k
+    )
+    result.update({
+        'date': target_date.date().isoformat(),
+        'task_count': len(tasks)
+    })
+    return jsonify(result)
+
+
+@bp.route('/auto-schedule', methods=['POST'])
+@jwt_required()
+def auto_schedule_tasks():
+    """将日期范围内未排程的待处理任务批量分配到时间块"""
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    start_date_str = data.get('start_date') or data.get('date')
+    if not start_date_str:
+        return jsonify({'error': 'Date is required'}), 400
+
+    try:
+        start_date = datetime.fromisoformat(start_date_str)
+        end_date = datetime.fromisoformat(data['end_date']) if data.get('end_date') else start_date
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+
+    if end_date < start_date:
+        return jsonify({'error': 'End date must not be before start date'}), 400
+    if (end_date.date() - start_date.date()).days >= MAX_AUTO_SCHEDULE_DAYS:
+        return jsonify({'error': f'Date range cannot exceed {MAX_AUTO_SCHEDULE_DAYS} days'}), 400
+
+    dry_run = data.get('dry_run', False)
+    if not isinstance(dry_run, bool):
+        return jsonify({'error': 'dry_run must be a boolean'}), 400
+
+    if request.args.get('async', 'false').lower() == 'true':
+        job = job_queue.enqueue('time_blocks.auto_schedule', current_user_id, {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'dry_run': dry_run
+        })
+        return job_accepted_response(job, 'Auto-schedule job scheduled')
+
+    from services.auto_scheduler import auto_scheduler
+    result = auto_scheduler.schedule(current_user_id, start_date, end_date, dry_run=dry_run)
+
+    result['message'] = (
+        f"Scheduled {result['summary']['scheduled']} of {result['summary']['total_tasks']} tasks"
+    )
+    return jsonify(result)
+
+
+@bp.route('/free-slots', methods=['GET'])
+@jwt_required()
+def get_free_slots():
+    """查询某天能容纳指定时长任务的时间块与时间块之间的空闲间隙"""
+    current_user_id = get_jwt_identity()
+
+    date_str = request.args.get('date')
+    if not date_str:
+        return jsonify({'error': 'Date is required'}), 400
+
+    try:
+        target_date = datetime.fromisoformat(date_str)
+        minutes = int(request.args.get('minutes', 25))
+    except ValueError:
+        return jsonify({'error': 'Invalid date or minutes'}), 400
+
+    if minutes <= 0:
+        return jsonify({'error': 'Minutes must be positive'}), 400
+
+    from services.capacity_index import capacity_index
+    capacity = capacity_index.get_day(current_user_id, target_date)
+
+    return jsonify({
+        'date': target_date.date().isoformat(),
+        'minutes': minutes,
+        'time_blocks': [block.to_dict() for block in capacity.blocks_that_fit(minutes)],
+        'gaps': capacity.gaps_that_fit(minutes)
+    })
+
+
 def _fallback_time_slot_suggestions(task, target_date, user_id):
     """降级时间槽建议逻辑"""
     task_duration = (task.estimated_pomodoros or 1) * 25
@@ -527,148 +823,15 @@ def get_time_block_statistics():
     except ValueError:
         return jsonify({'error': 'Invalid date format'}), 400
 
-    # 获取指定时间范围内的时间块
-    time_blocks = TimeBlock.query.filter(
-        TimeBlock.user_id == current_user_id,
-        TimeBlock.date >= start_date,
-        TimeBlock.date <= end_date
-    ).all()
-
-    if not time_blocks:
-        return jsonify({
-            'period': {
-                'start_date': start_date.isoformat(),
-                'end_date': end_date.isoformat(),
-                'days': (end_date - start_date).days
-            },
-            'total_blocks': 0,
-            'total_minutes': 0,
-            'statistics': {}
+    # 大范围统计可转为后台任务，立即返回任务ID
+    if request.args.get('async', 'false').lower() == 'true':
+        job = job_queue.enqueue('time_blocks.statistics', current_user_id, {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat()
         })
+        return job_accepted_response(job, 'Statistics job scheduled')
 
-    # 基础统计
-    total_blocks = len(time_blocks)
-    total_minutes = sum(block.get_duration() for block in time_blocks)
-    total_hours = total_minutes / 60
-
-    # 按类型统计
-    type_stats = {}
-    for block_type in BlockType:
-        blocks_of_type = [block for block in time_blocks if block.block_type == block_type]
-        type_minutes = sum(block.get_duration() for block in blocks_of_type)
-        type_stats[block_type.value] = {
-            'count': len(blocks_of_type),
-            'minutes': type_minutes,
-            'hours': round(type_minutes / 60, 2),
-            'percentage': round((type_minutes / total_minutes) * 100, 2) if total_minutes > 0 else 0
-        }
-
-    # 按日期统计
-    daily_stats = {}
-    for block in time_blocks:
-        date_key = block.date.date().isoformat()
-        if date_key not in daily_stats:
-            daily_stats[date_key] = {
-                'count': 0,
-                'minutes': 0,
-                'types': {}
-            }
-
-        daily_stats[date_key]['count'] += 1
-        daily_stats[date_key]['minutes'] += block.get_duration()
-
-        block_type = block.block_type.value
-        if block_type not in daily_stats[date_key]['types']:
-            daily_stats[date_key]['types'][block_type] = 0
-        daily_stats[date_key]['types'][block_type] += block.get_duration()
-
-    # 转换分钟为小时
-    for date_data in daily_stats.values():
-        date_data['hours'] = round(date_data['minutes'] / 60, 2)
-
-    # 按星期统计
-    weekday_stats = {}
-    weekday_names = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
-
-    for block in time_blocks:
-        weekday = block.date.weekday()  # 0=Monday, 6=Sunday
-        weekday_name = weekday_names[weekday]
-
-        if weekday_name not in weekday_stats:
-            weekday_stats[weekday_name] = {
-                'count': 0,
-                'minutes': 0,
-                'hours': 0
-            }
-
-        weekday_stats[weekday_name]['count'] += 1
-        weekday_stats[weekday_name]['minutes'] += block.get_duration()
-
-    for weekday_data in weekday_stats.values():
-        weekday_data['hours'] = round(weekday_data['minutes'] / 60, 2)
-
-    # 按时间段统计（小时）
-    hourly_stats = {}
-    for i in range(24):
-        hourly_stats[f"{i:02d}:00"] = {
-            'count': 0,
-            'minutes': 0
-        }
-
-    for block in time_blocks:
-        start_hour = block.start_time.hour
-        end_hour = block.end_time.hour
-
-        # 计算每个小时的时间块时长
-        current_hour = start_hour
-        current_time = block.start_time
-
-        while current_time < block.end_time and current_hour < 24:
-            hour_end = current_time.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-            hour_end = min(hour_end, block.end_time)
-
-            hour_minutes = (hour_end - current_time).total_seconds() / 60
-            hourly_stats[f"{current_hour:02d}:00"]['count'] += 1
-            hourly_stats[f"{current_hour:02d}:00"]['minutes'] += hour_minutes
-
-            current_time = hour_end
-            current_hour = current_time.hour
-
-    # 计算平均值
-    days_in_period = max(1, (end_date - start_date).days)
-    avg_blocks_per_day = round(total_blocks / days_in_period, 2)
-    avg_hours_per_day = round(total_hours / days_in_period, 2)
-
-    # 找出最常用的时间块类型
-    most_used_type = max(type_stats.items(), key=lambda x: x[1]['count'])[0] if type_stats else None
-
-    # 找出最忙碌的一天
-    busiest_day = max(daily_stats.items(), key=lambda x: x[1]['minutes'])[0] if daily_stats else None
-
-    # 找出最常用的时间段
-    most_active_hour = max(hourly_stats.items(), key=lambda x: x[1]['minutes'])[0] if hourly_stats else None
-
-    return jsonify({
-        'period': {
-            'start_date': start_date.isoformat(),
-            'end_date': end_date.isoformat(),
-            'days': days_in_period
-        },
-        'summary': {
-            'total_blocks': total_blocks,
-            'total_minutes': total_minutes,
-            'total_hours': round(total_hours, 2),
-            'avg_blocks_per_day': avg_blocks_per_day,
-            'avg_hours_per_day': avg_hours_per_day,
-            'most_used_type': most_used_type,
-            'busiest_day': busiest_day,
-            'most_active_hour': most_active_hour
-        },
-        'by_type': type_stats,
-        'by_date': daily_stats,
-        'by_weekday': weekday_stats,
-        'by_hour': hourly_stats
-    })
+    return jsonify(build_time_block_statistics(current_user_id, start_date, end_date))
 
 
 @bp.route('/search', methods=['GET'])
@@ -689,13 +852,13 @@ def search_time_blocks():
     # 构建查询
     query = TimeBlock.query.filter_by(user_id=current_user_id)
 
-    # 关键词搜索（搜索描述和关联的任务）
+    # 关键词搜索：匹配时间块类型，或排入该时间块的任务标题与描述（走全文索引）
     if keyword:
-        # 这里可以扩展搜索逻辑，目前搜索时间块类型
+        matched_types = [item for item in BlockType if keyword.upper() in item.value]
         query = query.filter(
             db.or_(
-                TimeBlock.block_type.like(f"%{keyword}%"),
-                # 如果有描述字段，也可以搜索描述
+                TimeBlock.block_type.in_(matched_types),
+                TimeBlock.id.in_(search_index.matching_time_block_ids(current_user_id, keyword))
             )
         )
 
@@ -730,14 +893,12 @@ def search_time_blocks():
         else:
             query = query.filter(~TimeBlock.scheduled_tasks.any())
 
-    # 按时长过滤
+    # 按时长过滤（分钟）
     if min_duration is not None:
-        # 这里需要使用计算字段，暂时跳过实现
-        pass
+        query = query.filter(TimeBlock.duration_minutes >= min_duration)
 
     if max_duration is not None:
-        # 这里需要使用计算字段，暂时跳过实现
-        pass
+        query = query.filter(TimeBlock.duration_minutes <= max_duration)
 
     # 排序
     sort_by = request.args.get('sort_by', 'date')
@@ -749,8 +910,10 @@ def search_time_blocks():
         else:
             query = query.order_by(TimeBlock.date.asc(), TimeBlock.start_time.asc())
     elif sort_by == 'duration':
-        # 需要计算时长，这里简化处理
-        query = query.order_by(TimeBlock.start_time.desc())
+        if sort_order == 'desc':
+            query = query.order_by(TimeBlock.duration_minutes.desc(), TimeBlock.start_time.desc())
+        else:
+            query = query.order_by(TimeBlock.duration_minutes.asc(), TimeBlock.start_time.asc())
 
     # 限制结果数量
     limit = request.args.get('limit', type=int)
@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db
 from models.time_block_template import TimeBlockTemplate
+from services.job_queue import job_queue
+from utils.response_utils import job_accepted_response
 from datetime import datetime
 
 bp = Blueprint('time_block_template', __name__, url_prefix='/api/time-block-templates')
@@ -183,6 +185,14 @@ def apply_time_block_template(template_id):
     except ValueError:
         return jsonify({'error': 'Invalid date format'}), 400
 
+    # 配置较多的模板可转为后台任务应用，立即返回任务ID
+    if request.args.get('async', 'false').lower() == 'true':
+        job = job_queue.enqueue('time_block_templates.apply', current_user_id, {
+            'template_id': template_id,
+            'date': target_date.isoformat()
+        })
+        return job_accepted_response(job, 'Template application scheduled')
+
     # 应用模板生成时间块
     try:
         generated_time_blocks = template.apply_to_date(target_date)
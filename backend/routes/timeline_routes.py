@@ -0,0 +1,46 @@
+"""
+时间轴API路由
+日历视图的一次性数据：时间块、已排程任务与番茄钟会话
+"""
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from services.timeline import build_timeline
+
+bp = Blueprint('timeline', __name__, url_prefix='/api/timeline')
+
+# 时间轴单次最多覆盖的天数
+MAX_TIMELINE_DAYS = 31
+
+
+@bp.route('', methods=['GET'])
+@bp.route('/', methods=['GET'])
+@jwt_required()
+def get_timeline():
+    """
+    获取时间轴：?date= 查询单日，?start=&end= 查询日期范围（含首尾，最多31天）
+
+    时间块按开始时间排序，每个时间块嵌套scheduled_tasks；pomodoro_sessions为范围内开始的番茄钟会话
+    """
+    current_user_id = get_jwt_identity()
+
+    date_str = request.args.get('date')
+    start_str = request.args.get('start') or date_str
+    if not start_str:
+        return jsonify({'error': 'date or start is required'}), 400
+    end_str = request.args.get('end') or start_str
+
+    try:
+        start_date = datetime.fromisoformat(start_str).date()
+        end_date = datetime.fromisoformat(end_str).date()
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+
+    if end_date < start_date:
+        return jsonify({'error': 'End date must not be before start date'}), 400
+    if (end_date - start_date).days >= MAX_TIMELINE_DAYS:
+        return jsonify({'error': f'Date range cannot exceed {MAX_TIMELINE_DAYS} days'}), 400
+
+    return jsonify(build_timeline(current_user_id, start_date, end_date))
@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
 from app import db
+from services.job_queue import job_queue
+from utils.response_utils import job_accepted_response
 
 bp = Blueprint('users', __name__)
 
@@ -95,8 +97,16 @@ def update_user_preferences():
     if not data or 'preferences' not in data:
         return jsonify({'error': 'Preferences data is required'}), 400
 
+    # 连续工作阈值用于冲突检测，必须是不超过一天的正分钟数
+    from services.conflict_resolution import WorkStreakPolicy
+    preferences = data['preferences']
+    if isinstance(preferences, dict):
+        for name in WorkStreakPolicy.PREFERENCE_KEYS:
+            if name in preferences and not WorkStreakPolicy.is_valid_threshold(preferences[name]):
+                return jsonify({'error': f'{name} must be a positive number of minutes (at most 1440)'}), 400
+
     try:
-        user.set_preferences(data['preferences'])
+        user.set_preferences(preferences)
         db.session.commit()
 
         return jsonify({
@@ -218,6 +228,11 @@ def delete_account():
     if not user.check_password(data['password']):
         return jsonify({'error': 'Password is incorrect'}), 400
 
+    # 数据量大的账户可转为后台任务删除，立即返回任务ID
+    if request.args.get('async', 'false').lower() == 'true':
+        job = job_queue.enqueue('account.delete', current_user_id)
+        return job_accepted_response(job, 'Account deletion scheduled')
+
     try:
         # 删除用户（会级联删除所有相关数据）
         db.session.delete(user)
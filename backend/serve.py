@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+时间管理系统 - 生产环境启动入口
+
+基于gunicorn运行，主进程预加载应用（模型导入与蓝图注册只执行一次），
+fork后各worker重建数据库连接池。
+
+    python serve.py                                   # 默认 gthread worker
+    python serve.py --workers 4 --threads 8 --keepalive 5
+    python serve.py --worker-class gevent             # 番茄钟SSE长连接
+    python serve.py --asgi                            # 异步轮询端点（见asgi.py）
+
+平滑重载：kill -HUP $(cat <pidfile>)  按新配置重启全部worker，进行中的请求会处理完毕；
+预加载模式下代码更新需要 kill -USR2 启动新主进程，再对旧主进程发送 WINCH/QUIT。
+"""
+
+import argparse
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def build_options(args: argparse.Namespace) -> dict:
+    """将命令行参数转换为gunicorn配置"""
+    worker_class = 'uvicorn.workers.UvicornWorker' if args.asgi else args.worker_class
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': worker_class,
+        'threads': args.threads,
+        'worker_connections': args.worker_connections,
+        'keepalive': args.keepalive,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10 if args.max_requests else 0,
+        'preload_app': not args.no_preload,
+        'pidfile': args.pidfile,
+        'accesslog': args.access_log,
+        'loglevel': args.log_level,
+        'post_fork': _post_fork
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def _post_fork(server, worker):
+    """fork后丢弃从主进程继承的数据库连接，各worker使用独立连接池"""
+    from app import db
+
+    application = worker.app.wsgi()
+    flask_app = getattr(application, 'flask_app', application)
+    with flask_app.app_context():
+        db.engine.dispose(close=False)
+
+    # ASGI模式下的异步引擎同样不能跨进程共享连接
+    async_engine = getattr(application, 'engine', None)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+def load_application(is_asgi: bool):
+    """创建WSGI或ASGI应用"""
+    from app import create_app
+
+    flask_app = create_app()
+    if not is_asgi:
+        return flask_app
+
+    from app.asgi import create_asgi_app
+    return create_asgi_app(flask_app)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    default_workers = _env_int('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+
+    parser = argparse.ArgumentParser(description='以gunicorn运行时间管理系统后端')
+    parser.add_argument('--bind', default=os.getenv('WEB_BIND', '0.0.0.0:5000'))
+    parser.add_argument('--workers', type=int, default=default_workers, help='worker进程数')
+    parser.add_argument('--worker-class', default=os.getenv('WEB_WORKER_CLASS', 'gthread'),
+                        help='sync / gthread / gevent')
+    parser.add_argument('--threads', type=int, default=_env_int('WEB_THREADS', 4),
+                        help='gthread worker的线程数')
+    parser.add_argument('--worker-connections', type=int, default=_env_int('WEB_WORKER_CONNECTIONS', 1000),
+                        help='gevent worker的最大并发连接数')
+    parser.add_argument('--keepalive', type=int, default=_env_int('WEB_KEEPALIVE', 5),
+                        help='keep-alive连接等待下一个请求的秒数')
+    parser.add_argument('--timeout', type=int, default=_env_int('WEB_TIMEOUT', 30))
+    parser.add_argument('--graceful-timeout', type=int, default=_env_int('WEB_GRACEFUL_TIMEOUT', 30),
+                        help='重载/停止时等待进行中请求的秒数')
+    parser.add_argument('--max-requests', type=int, default=_env_int('WEB_MAX_REQUESTS', 0),
+                        help='worker处理多少请求后自动回收，0表示不回收')
+    parser.add_argument('--no-preload', action='store_true', help='不在主进程预加载应用')
+    parser.add_argument('--asgi', action='store_true', help='使用uvicorn worker运行asgi应用')
+    parser.add_argument('--pidfile', default=os.getenv('WEB_PIDFILE'))
+    parser.add_argument('--access-log', default=os.getenv('WEB_ACCESS_LOG'), help='访问日志路径，- 表示标准输出')
+    parser.add_argument('--log-level', default=os.getenv('WEB_LOG_LEVEL', 'info'))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    load_dotenv()
+    args = parse_args(argv)
+
+    from gunicorn.app.base import BaseApplication
+
+    class StandaloneApplication(BaseApplication):
+        """以代码方式配置的gunicorn应用"""
+
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if key in self.cfg.settings:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            return load_application(args.asgi)
+
+    StandaloneApplication(build_options(args)).run()
+
+
+if __name__ == '__main__':
+    main()
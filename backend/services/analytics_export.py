@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+分析用列式导出
+将番茄钟会话、任务与时间块按列类型写成Arrow IPC流或Parquet文件，供notebook离线分析。
+
+- 列类型取自模型定义：枚举为固定字典的dictionary列，时间为原生timestamp列，整数与布尔保持原类型
+- 枚举字典包含全部取值且顺序固定，各批次与各次导出的编码一致
+- 按时间列排序从服务端游标逐批读取，每批转成一个RecordBatch写出后即丢弃，内存只与批大小有关
+- pyarrow为可选依赖（pip install .[analytics]），未安装时 is_available() 为False
+"""
+
+import io
+from importlib.util import find_spec
+from typing import Dict, Iterator, List
+
+from sqlalchemy import Boolean, DateTime, Enum, Integer, select
+
+from app import db
+from models.pomodoro_session import PomodoroSession
+from models.task import Task
+from models.time_block import TimeBlock
+
+ANALYTICS_FORMATS = {
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+# 每批行数，Parquet中即每个row group的行数
+ANALYTICS_BATCH_SIZE = 16384
+
+# 实体 -> (模型, 排序的时间列)
+ANALYTICS_ENTITIES = {
+    'pomodoro_sessions': (PomodoroSession, 'start_time'),
+    'tasks': (Task, 'planned_start_time'),
+    'time_blocks': (TimeBlock, 'start_time'),
+}
+
+
+def is_available() -> bool:
+    return find_spec('pyarrow') is not None
+
+
+def _field(pa, column):
+    """模型列 -> Arrow字段（Enum是String的子类，需先判断）"""
+    column_type = column.type
+    if isinstance(column_type, Enum):
+        arrow_type = pa.dictionary(pa.int8(), pa.string())
+    elif isinstance(column_type, DateTime):
+        arrow_type = pa.timestamp('us')
+    elif isinstance(column_type, Boolean):
+        arrow_type = pa.bool_()
+    elif isinstance(column_type, Integer):
+        arrow_type = pa.int32()
+    else:
+        arrow_type = pa.string()
+    return pa.field(column.name, arrow_type, nullable=bool(column.nullable) and not column.primary_key)
+
+
+def schema_for(entity: str):
+    """实体的Arrow schema，列顺序与表定义一致"""
+    import pyarrow as pa
+
+    model, _ = ANALYTICS_ENTITIES[entity]
+    return pa.schema([_field(pa, column) for column in model.__table__.columns])
+
+
+class _ChunkSink(io.RawIOBase):
+    """只追加的输出：写入的数据暂存到被取走为止，tell() 返回累计位置（Parquet页脚记录的偏移依赖它）"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class AnalyticsExport:
+    """一个用户一类实体的列式导出"""
+
+    def __init__(self, user_id: str, entity: str, batch_size: int = None):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.user_id = user_id
+        self.entity = entity
+        self.model, self.order_column = ANALYTICS_ENTITIES[entity]
+        self.columns = list(self.model.__table__.columns)
+        self.schema = schema_for(entity)
+        self.batch_size = batch_size or ANALYTICS_BATCH_SIZE
+        # 枚举列的固定字典与取值 -> 下标
+        self.dictionaries: Dict[str, tuple] = {
+            column.name: (
+                pa.array([member.value for member in column.type.enum_class], pa.string()),
+                {member: index for index, member in enumerate(column.type.enum_class)}
+            )
+            for column in self.columns if isinstance(column.type, Enum)
+        }
+
+    def record_batches(self) -> Iterator:
+        """按时间列排序，从服务端游标逐批产出RecordBatch"""
+        table = self.model.__table__
+        statement = (
+            select(*self.columns)
+            .where(table.c.user_id == self.user_id)
+            .order_by(table.c[self.order_column], table.c.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        for rows in db.session.execute(statement).partitions():
+            batch = self._record_batch(rows)
+            # 取下一批之前释放本批的行，否则循环变量会让两批同时驻留
+            del rows
+            yield batch
+
+    def _record_batch(self, rows):
+        pa = self.pa
+        arrays = []
+        for column, field, values in zip(self.columns, self.schema, zip(*rows)):
+            if column.name in self.dictionaries:
+                dictionary, indices = self.dictionaries[column.name]
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array([None if value is None else indices[value] for value in values], pa.int8()),
+                    dictionary
+                ))
+            else:
+                arrays.append(pa.array(values, field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def stream(self, export_format: str) -> Iterator[bytes]:
+        """逐批写出并产出已生成的字节；没有数据时也输出带schema的空文件"""
+        sink = _ChunkSink()
+        if export_format == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(sink, self.schema)
+        else:
+            writer = self.pa.ipc.new_stream(sink, self.schema)
+
+        with writer:
+            for batch in self.record_batches():
+                writer.write_batch(batch)
+                del batch
+                yield sink.drain()
+        yield sink.drain()
+
+    def write_to(self, path: str, export_format: str) -> int:
+        """写入本地文件，返回行数"""
+        rows = 0
+        if export_format == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(path, self.schema)
+        else:
+            writer = self.pa.ipc.new_stream(path, self.schema)
+
+        with writer:
+            for batch in self.record_batches():
+                writer.write_batch(batch)
+                rows += batch.num_rows
+                del batch
+        return rows
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+异步数据库会话服务
+供ASGI模式下的高并发只读端点使用，与Flask-SQLAlchemy共用模型和同一个数据库
+"""
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+# 同步驱动 -> 异步驱动
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql'
+}
+
+
+def to_async_url(url: URL) -> URL:
+    """将同步数据库URL转换为对应的异步驱动URL"""
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if not driver:
+        raise ValueError(f"不支持异步访问的数据库: {backend}")
+    return url.set(drivername=driver)
+
+
+def create_async_engine_for_app(app) -> AsyncEngine:
+    """根据Flask应用的数据库配置创建异步引擎"""
+    from app import db
+
+    configured_uri = app.config.get('ASYNC_SQLALCHEMY_DATABASE_URI')
+    if configured_uri:
+        async_url = make_url(configured_uri)
+    else:
+        # 使用Flask-SQLAlchemy解析后的URL，保证相对SQLite路径指向同一个文件
+        with app.app_context():
+            async_url = to_async_url(db.engine.url)
+
+    return create_async_engine(async_url, pool_pre_ping=True)
+
+
+def create_async_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    """创建异步会话工厂（提交后不过期，便于会话关闭后序列化）"""
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+任务自动排程服务
+一次性将用户在指定日期范围内未排程的待处理任务分配到时间块：
+刚性任务固定到覆盖其计划开始时间的时间块，柔性任务按优先级贪心选择匹配度最高的时间块，
+同时遵守时间块容量（预估番茄钟数 × 25分钟）与任务数上限
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import db
+from models.task import Task, TaskStatus, TaskType, PriorityLevel
+from models.task_category import TaskCategory
+from models.time_block import TimeBlock, BlockType
+from services.capacity_index import capacity_index, POMODORO_MINUTES
+
+# 与冲突检测保持一致：匹配分数低于0.5视为类型不匹配，超过3个任务视为过载
+DEFAULT_MIN_MATCH_SCORE = 0.5
+DEFAULT_MAX_TASKS_PER_BLOCK = 3
+
+# 没有类别的任务按中等匹配处理（与CategoryTimeBlockMatcher一致）
+UNCATEGORIZED_MATCH_SCORE = 0.5
+
+PRIORITY_RANK = {
+    PriorityLevel.HIGH: 0,
+    PriorityLevel.MEDIUM: 1,
+    PriorityLevel.LOW: 2
+}
+
+
+def task_duration_minutes(task: Task) -> int:
+    """任务预估时长（分钟）"""
+    return (task.estimated_pomodoros or 1) * POMODORO_MINUTES
+
+
+class AutoScheduler:
+    """批量任务排程器"""
+
+    def __init__(self, min_match_score: float = DEFAULT_MIN_MATCH_SCORE,
+                 max_tasks_per_block: int = DEFAULT_MAX_TASKS_PER_BLOCK):
+        self.min_match_score = min_match_score
+        self.max_tasks_per_block = max_tasks_per_block
+
+    def schedule(self, user_id: str, start_date: datetime, end_date: datetime,
+                 dry_run: bool = False) -> Dict[str, Any]:
+        """
+        为用户排程日期范围内（含首尾两天）未排程的待处理任务
+
+        Args:
+            user_id: 用户ID
+            start_date: 开始日期
+            end_date: 结束日期
+            dry_run: 为True时只返回排程方案，不写入数据库
+
+        Returns:
+            排程结果：assignments、unscheduled与summary
+        """
+        range_start = datetime.combine(start_date.date(), datetime.min.time())
+        range_end = datetime.combine(end_date.date(), datetime.min.time()) + timedelta(days=1)
+
+        time_blocks = TimeBlock.query.filter(
+            TimeBlock.user_id == user_id,
+            TimeBlock.date >= range_start,
+            TimeBlock.date < range_end
+        ).order_by(TimeBlock.start_time).all()
+
+        tasks = Task.query.filter(
+            Task.user_id == user_id,
+            Task.status == TaskStatus.PENDING,
+            Task.scheduled_time_block_id.is_(None),
+            Task.planned_start_time >= range_start,
+            Task.planned_start_time < range_end
+        ).all()
+
+        usage = self._load_block_usage(user_id, range_start, range_end)
+        category_names = self._load_category_names(tasks)
+
+        result = self.build_schedule(user_id, tasks, time_blocks, usage, category_names)
+
+        if not dry_run and result['assignments']:
+            tasks_by_id = {task.id: task for task in tasks}
+            for assignment in result['assignments']:
+                tasks_by_id[assignment['task_id']].scheduled_time_block_id = assignment['time_block_id']
+            db.session.commit()
+
+        result['dry_run'] = dry_run
+        result['period'] = {
+            'start_date': range_start.date().isoformat(),
+            'end_date': (range_end - timedelta(days=1)).date().isoformat()
+        }
+        return result
+
+    def build_schedule(self, user_id: str, tasks: List[Task], time_blocks: List[TimeBlock],
+                       usage: Dict[str, Tuple[int, int]],
+                       category_names: Dict[str, str]) -> Dict[str, Any]:
+        """
+        在已加载的数据上计算排程方案（不访问数据库）
+
+        Args:
+            user_id: 用户ID（用于读取用户自定义匹配规则）
+            tasks: 待排程任务
+            time_blocks: 候选时间块，按开始时间排序
+            usage: 时间块已占用情况 {time_block_id: (已占用分钟数, 已排程任务数)}
+            category_names: 任务类别名称 {category_id: name}
+        """
+        remaining_minutes = []
+        remaining_slots = []
+        for block in time_blocks:
+            used_minutes, used_count = usage.get(block.id, (0, 0))
+            remaining_minutes.append(block.get_duration() - used_minutes)
+            remaining_slots.append(self.max_tasks_per_block - used_count)
+
+        score_tables = self._build_score_tables(user_id, tasks, category_names)
+        assignments = []
+        unscheduled = []
+
+        def assign(task, block_index, score):
+            remaining_minutes[block_index] -= task_duration_minutes(task)
+            remaining_slots[block_index] -= 1
+            block = time_blocks[block_index]
+            assignments.append({
+                'task_id': task.id,
+                'task_title': task.title,
+                'task_type': task.task_type.value,
+                'time_block_id': block.id,
+                'time_block_start': block.start_time.isoformat(),
+                'block_type': block.block_type.value,
+                'duration_minutes': task_duration_minutes(task),
+                'match_score': score
+            })
+
+        def fits(task, block_index):
+            return (remaining_slots[block_index] > 0 and
+                    remaining_minutes[block_index] >= task_duration_minutes(task))
+
+        rigid_tasks = [task for task in tasks if task.task_type == TaskType.RIGID]
+        flexible_tasks = [task for task in tasks if task.task_type != TaskType.RIGID]
+
+        # 1. 刚性任务时间固定，只能放入覆盖其计划开始时间的时间块，优先占用容量
+        for task in sorted(rigid_tasks, key=self._task_order_key):
+            block_index = self._find_covering_block(task, time_blocks)
+            if block_index is None:
+                unscheduled.append(self._unscheduled(task, '没有覆盖计划开始时间的时间块'))
+            elif not fits(task, block_index):
+                unscheduled.append(self._unscheduled(task, '覆盖计划开始时间的时间块容量不足'))
+            else:
+                scores = score_tables[task.category_id]
+                assign(task, block_index, scores.get(time_blocks[block_index].block_type, 0.0))
+
+        # 2. 柔性任务：每个任务的候选时间块按(匹配分数降序, 与计划时间的距离升序)排列，
+        #    优先队列每次取出优先级最高的任务的当前最佳候选；候选容量不足时顺延到下一个候选
+        # 按类型分组并预先取出时间块属性，每个任务只遍历匹配分数达标的类型，
+        # 也避免在 任务数 × 时间块数 的循环中反复访问ORM属性
+        blocks_by_type = {}
+        for block_index, block in enumerate(time_blocks):
+            blocks_by_type.setdefault(block.block_type, []).append(
+                (block_index, block.get_duration(), block.start_time)
+            )
+
+        candidates = {}
+        heap = []
+        for index, task in enumerate(flexible_tasks):
+            duration = task_duration_minutes(task)
+            planned_start_time = task.planned_start_time
+            task_candidates = []
+            for block_type, score in score_tables[task.category_id].items():
+                if score < self.min_match_score:
+                    continue
+                for block_index, block_duration, block_start_time in blocks_by_type.get(block_type, ()):
+                    if block_duration >= duration:
+                        distance = abs((block_start_time - planned_start_time).total_seconds())
+                        task_candidates.append((-score, distance, block_index))
+
+            if not task_candidates:
+                unscheduled.append(self._unscheduled(task, '没有类型匹配且时长足够的时间块'))
+                continue
+
+            task_candidates.sort()
+            candidates[index] = task_candidates
+            heapq.heappush(heap, self._heap_entry(task, index, task_candidates[0], 0))
+
+        while heap:
+            _, _, _, _, index, position = heapq.heappop(heap)
+            task = flexible_tasks[index]
+            task_candidates = candidates[index]
+            _, _, block_index = task_candidates[position]
+
+            if fits(task, block_index):
+                assign(task, block_index, -task_candidates[position][0])
+                continue
+
+            # 容量只减不增，已放不下的候选之后也放不下，直接跳过
+            position += 1
+            while position < len(task_candidates) and not fits(task, task_candidates[position][2]):
+                position += 1
+
+            if position < len(task_candidates):
+                heapq.heappush(heap, self._heap_entry(task, index, task_candidates[position], position))
+            else:
+                unscheduled.append(self._unscheduled(task, '匹配的时间块容量已满'))
+
+        return {
+            'assignments': assignments,
+            'unscheduled': unscheduled,
+            'summary': {
+                'total_tasks': len(tasks),
+                'scheduled': len(assignments),
+                'unscheduled': len(unscheduled),
+                'total_time_blocks': len(time_blocks),
+                'scheduled_minutes': sum(a['duration_minutes'] for a in assignments)
+            }
+        }
+
+    def _heap_entry(self, task: Task, index: int, candidate: Tuple[float, float, int], position: int):
+        """优先队列条目：(优先级, 负匹配分数, 时间距离, 计划开始时间, 任务序号, 候选位置)"""
+        negative_score, distance, _ = candidate
+        return (
+            PRIORITY_RANK.get(task.priority, PRIORITY_RANK[PriorityLevel.MEDIUM]),
+            negative_score,
+            distance,
+            task.planned_start_time,
+            index,
+            position
+        )
+
+    def _task_order_key(self, task: Task):
+        return (PRIORITY_RANK.get(task.priority, PRIORITY_RANK[PriorityLevel.MEDIUM]), task.planned_start_time)
+
+    def _find_covering_block(self, task: Task, time_blocks: List[TimeBlock]) -> Optional[int]:
+        """查找覆盖任务计划开始时间的时间块"""
+        for block_index, block in enumerate(time_blocks):
+            if block.start_time > task.planned_start_time:
+                break
+            if block.start_time <= task.planned_start_time < block.end_time:
+                return block_index
+        return None
+
+    def _build_score_tables(self, user_id: str, tasks: List[Task],
+                            category_names: Dict[str, str]) -> Dict[Optional[str], Dict[BlockType, float]]:
+        """为每个类别预先计算 时间块类型 -> 匹配分数，避免逐对查询类别"""
+        from services.matching_rules import matching_rule_service
+
+        compiled = matching_rule_service.get_compiled(user_id)
+        score_tables = {}
+        for task in tasks:
+            if task.category_id in score_tables:
+                continue
+
+            category_name = category_names.get(task.category_id)
+            if category_name is None:
+                score_tables[task.category_id] = {
+                    block_type: UNCATEGORIZED_MATCH_SCORE for block_type in BlockType
+                }
+            else:
+                score_tables[task.category_id] = compiled.row_scores(category_name)
+
+        return score_tables
+
+    def _load_block_usage(self, user_id: str, range_start: datetime,
+                          range_end: datetime) -> Dict[str, Tuple[int, int]]:
+        """从容量索引读取时间块已占用的分钟数与任务数"""
+        days = capacity_index.get_range(user_id, range_start, range_end - timedelta(days=1))
+        return {
+            block.block_id: (block.used_minutes, block.task_count)
+            for capacity in days.values()
+            for block in capacity.blocks.values()
+        }
+
+    def _load_category_names(self, tasks: List[Task]) -> Dict[str, str]:
+        category_ids = {task.category_id for task in tasks if task.category_id}
+        if not category_ids:
+            return {}
+
+        rows = db.session.query(TaskCategory.id, TaskCategory.name).filter(
+            TaskCategory.id.in_(category_ids)
+        ).all()
+        return dict(rows)
+
+    def _unscheduled(self, task: Task, reason: str) -> Dict[str, Any]:
+        return {
+            'task_id': task.id,
+            'task_title': task.title,
+            'task_type': task.task_type.value,
+            'reason': reason
+        }
+
+
+# 全局排程器实例
+auto_scheduler = AutoScheduler()
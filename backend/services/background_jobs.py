@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+后台任务处理函数
+每个处理函数签名为 handler(user_id, payload) -> 可JSON序列化的结果
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from app import db
+from services.job_queue import job_queue
+
+
+@job_queue.register('account.delete')
+def delete_account_job(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """删除用户账户及其级联数据"""
+    from models.user import User
+
+    user = db.session.get(User, user_id)
+    if not user:
+        return {'deleted': False, 'reason': 'User not found'}
+
+    db.session.delete(user)
+    db.session.commit()
+    return {'deleted': True}
+
+
+@job_queue.register('time_block_templates.apply')
+def apply_time_block_template_job(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """将模板应用到指定日期"""
+    from models.time_block_template import TimeBlockTemplate
+
+    template = TimeBlockTemplate.query.filter_by(
+        id=payload['template_id'],
+        user_id=user_id
+    ).first()
+    if not template:
+        raise ValueError('Time block template not found')
+
+    generated_time_blocks = template.apply_to_date(datetime.fromisoformat(payload['date']))
+    db.session.add_all(generated_time_blocks)
+    db.session.commit()
+
+    return {'generated_time_blocks': [block.to_dict() for block in generated_time_blocks]}
+
+
+@job_queue.register('time_blocks.statistics')
+def time_block_statistics_job(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """统计时间块分布"""
+    from services.time_block_statistics import build_time_block_statistics
+
+    return build_time_block_statistics(
+        user_id,
+        datetime.fromisoformat(payload['start_date']),
+        datetime.fromisoformat(payload['end_date'])
+    )
+
+
+@job_queue.register('time_blocks.auto_schedule')
+def auto_schedule_job(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """批量排程日期范围内未排程的任务"""
+    from services.auto_scheduler import auto_scheduler
+
+    return auto_scheduler.schedule(
+        user_id,
+        datetime.fromisoformat(payload['start_date']),
+        datetime.fromisoformat(payload['end_date']),
+        dry_run=payload.get('dry_run', False)
+    )
+
+
+@job_queue.register('counters.reconcile')
+def reconcile_counters_job(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """检查并修正用户的任务、项目与分类计数，repair为False时只检查"""
+    from models.counters import reconcile_counters
+
+    repair = payload.get('repair', True)
+    drift = reconcile_counters(db.session.connection(), user_id, repair=repair)
+    db.session.commit()
+    return {'drift': drift, 'repaired': repair}
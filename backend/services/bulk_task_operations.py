@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+任务批量操作
+一个请求中的多个操作（修改字段、顺延计划时间、移入/移出时间块、增删标签、删除）在同一事务中依次执行：
+每个操作先用一条查询取出涉及的任务（校验归属并记下修改前的值），再用集合式的UPDATE/DELETE写入。
+
+- 请求整体先校验（操作类型、字段值、引用的分类/项目/时间块/标签是否属于用户），有误时不执行任何操作
+- 单个任务的问题（不存在、已被前面的操作删除、时长超过时间块）只记在该操作的 failed 中，其余任务照常执行
+- 集合语句绕过ORM事件，冗余计数（models/counters.py）在这里按修改前后的行维护；
+  容量索引与冲突快照在提交后按用户失效一次
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from models import counters
+from models.pomodoro_session import PomodoroSession
+from models.project import Project
+from models.tag import Tag
+from models.task import Task, TaskStatus, TaskType, PriorityLevel
+from models.task_category import TaskCategory
+from models.task_tags import task_tags
+from models.time_block import TimeBlock, duration_between
+from models.time_log import TimeLog
+from services.capacity_index import capacity_index, POMODORO_MINUTES
+from services.incremental_conflicts import incremental_conflict_checker
+
+MAX_OPERATIONS = 100
+MAX_TASKS_PER_OPERATION = 1000
+
+OPERATIONS = ('update', 'reschedule', 'move', 'add_tags', 'remove_tags', 'delete')
+
+# 可批量修改的字段（标题、描述逐个修改）
+UPDATABLE_FIELDS = ('status', 'priority', 'task_type', 'planned_start_time', 'estimated_pomodoros',
+                    'category_id', 'project_id')
+
+# 影响项目、分类计数的字段
+COUNTED_FIELDS = ('status', 'estimated_pomodoros', 'category_id', 'project_id')
+
+ENUM_FIELDS = {'status': TaskStatus, 'priority': PriorityLevel, 'task_type': TaskType}
+
+tasks = Task.__table__
+
+
+class BulkTaskOperations:
+    """任务批量操作执行器"""
+
+    def execute(self, user_id: str, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        校验并在一个事务中依次执行操作
+
+        Args:
+            user_id: 用户ID
+            operations: 操作列表，每项包含 op 与 task_ids 及该操作的参数
+
+        Returns:
+            results（与操作一一对应的 succeeded / failed）与 summary
+
+        Raises:
+            ValueError: 请求不合法，未执行任何操作
+            SQLAlchemyError: 写入失败，事务已回滚
+        """
+        if not isinstance(operations, list) or not operations:
+            raise ValueError('operations must be a non-empty list')
+        if len(operations) > MAX_OPERATIONS:
+            raise ValueError(f'At most {MAX_OPERATIONS} operations per request')
+
+        parsed = [self._parse(user_id, index, operation) for index, operation in enumerate(operations)]
+
+        results = []
+        # 本次请求中已被删除的任务，之后的操作引用时单独报告
+        deleted_ids = set()
+        try:
+            connection = db.session.connection()
+            for index, (op, task_ids, params) in enumerate(parsed):
+                rows = self._load(connection, user_id, task_ids)
+                failed = [
+                    {'task_id': task_id,
+                     'error': 'Task deleted by an earlier operation' if task_id in deleted_ids else 'Task not found'}
+                    for task_id in task_ids if task_id not in rows
+                ]
+                if rows:
+                    failed.extend(self._HANDLERS[op](self, connection, rows, params))
+                failed_ids = {item['task_id'] for item in failed}
+                if op == 'delete':
+                    deleted_ids.update(task_id for task_id in rows if task_id not in failed_ids)
+                results.append({
+                    'index': index,
+                    'op': op,
+                    'succeeded': [task_id for task_id in task_ids if task_id not in failed_ids],
+                    'failed': failed
+                })
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            raise
+
+        # 集合语句不经过会话事件，相关缓存整体失效一次
+        capacity_index.invalidate_user(user_id)
+        incremental_conflict_checker.invalidate_user(user_id)
+
+        return {
+            'results': results,
+            'summary': {
+                'operations': len(results),
+                'succeeded': sum(len(result['succeeded']) for result in results),
+                'failed': sum(len(result['failed']) for result in results)
+            }
+        }
+
+    # 校验
+
+    def _parse(self, user_id: str, index: int, operation) -> Tuple[str, List[str], Dict[str, Any]]:
+        """校验一个操作，返回 (操作类型, 去重后的任务ID, 参数)"""
+        def error(message: str) -> ValueError:
+            return ValueError(f'operations[{index}]: {message}')
+
+        if not isinstance(operation, dict):
+            raise error('operation must be an object')
+        op = operation.get('op')
+        if op not in OPERATIONS:
+            raise error(f"op must be one of: {', '.join(OPERATIONS)}")
+
+        task_ids = operation.get('task_ids')
+        if not isinstance(task_ids, list) or not task_ids or not all(isinstance(item, str) for item in task_ids):
+            raise error('task_ids must be a non-empty list of task IDs')
+        task_ids = list(dict.fromkeys(task_ids))
+        if len(task_ids) > MAX_TASKS_PER_OPERATION:
+            raise error(f'At most {MAX_TASKS_PER_OPERATION} tasks per operation')
+
+        try:
+            params = self._PARSERS[op](self, user_id, operation)
+        except ValueError as e:
+            raise error(str(e))
+        return op, task_ids, params
+
+    def _parse_update(self, user_id: str, operation) -> Dict[str, Any]:
+        fields = operation.get('fields')
+        if not isinstance(fields, dict) or not fields:
+            raise ValueError('fields must be a non-empty object')
+        unknown = sorted(set(fields) - set(UPDATABLE_FIELDS))
+        if unknown:
+            raise ValueError(f"Fields cannot be bulk updated: {', '.join(unknown)}")
+
+        values = {}
+        for name, value in fields.items():
+            if name in ENUM_FIELDS:
+                try:
+                    values[name] = ENUM_FIELDS[name](value)
+                except ValueError:
+                    raise ValueError(f'Invalid {name}')
+            elif name == 'planned_start_time':
+                try:
+                    values[name] = datetime.fromisoformat(value)
+                except (TypeError, ValueError):
+                    raise ValueError('Invalid planned_start_time format')
+            elif name == 'estimated_pomodoros':
+                if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                    raise ValueError('estimated_pomodoros must be a positive integer')
+                values[name] = value
+            elif name == 'category_id':
+                if not self._owned(TaskCategory, user_id, [value]):
+                    raise ValueError('Task category not found')
+                values[name] = value
+            elif name == 'project_id':
+                if value is not None and not self._owned(Project, user_id, [value]):
+                    raise ValueError('Project not found')
+                values[name] = value
+        return {'values': values}
+
+    def _parse_reschedule(self, user_id: str, operation) -> Dict[str, Any]:
+        shift_minutes = operation.get('shift_minutes')
+        if not isinstance(shift_minutes, int) or isinstance(shift_minutes, bool):
+            raise ValueError('shift_minutes must be an integer')
+        return {'shift': timedelta(minutes=shift_minutes)}
+
+    def _parse_move(self, user_id: str, operation) -> Dict[str, Any]:
+        if 'time_block_id' not in operation:
+            raise ValueError('time_block_id is required (null to unschedule)')
+        time_block_id = operation['time_block_id']
+        if time_block_id is None:
+            return {'time_block_id': None, 'duration': None}
+
+        block = db.session.query(TimeBlock.start_time, TimeBlock.end_time).filter(
+            TimeBlock.id == time_block_id,
+            TimeBlock.user_id == user_id
+        ).first()
+        if block is None:
+            raise ValueError('Time block not found')
+        return {'time_block_id': time_block_id, 'duration': duration_between(block.start_time, block.end_time)}
+
+    def _parse_tags(self, user_id: str, operation) -> Dict[str, Any]:
+        tag_ids = operation.get('tag_ids')
+        if not isinstance(tag_ids, list) or not tag_ids or not all(isinstance(item, str) for item in tag_ids):
+            raise ValueError('tag_ids must be a non-empty list of tag IDs')
+        tag_ids = list(dict.fromkeys(tag_ids))
+        if not self._owned(Tag, user_id, tag_ids):
+            raise ValueError('Tag not found')
+        return {'tag_ids': tag_ids}
+
+    def _parse_delete(self, user_id: str, operation) -> Dict[str, Any]:
+        return {}
+
+    @staticmethod
+    def _owned(model, user_id: str, ids: List[str]) -> bool:
+        """ids是否都是用户的记录"""
+        if not all(isinstance(item, str) for item in ids):
+            return False
+        count = db.session.query(model.id).filter(model.id.in_(ids), model.user_id == user_id).count()
+        return count == len(ids)
+
+    # 执行：每个处理函数接收已确认归属的任务行，返回失败项
+
+    @staticmethod
+    def _load(connection, user_id: str, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """一条查询取出任务修改前的值"""
+        rows = connection.execute(
+            select(tasks.c.id, tasks.c.status, tasks.c.estimated_pomodoros, tasks.c.category_id,
+                   tasks.c.project_id, tasks.c.planned_start_time)
+            .where(tasks.c.user_id == user_id, tasks.c.id.in_(task_ids))
+        ).mappings()
+        return {row['id']: dict(row) for row in rows}
+
+    def _update(self, connection, rows: Dict[str, Dict], params: Dict) -> List[Dict]:
+        values = params['values']
+        connection.execute(update(tasks).where(tasks.c.id.in_(list(rows))).values(values))
+        if any(name in values for name in COUNTED_FIELDS):
+            counters.add_task_rows(connection, rows.values(), -1)
+            counters.add_task_rows(connection, [{**row, **values} for row in rows.values()])
+        return []
+
+    def _reschedule(self, connection, rows: Dict[str, Dict], params: Dict) -> List[Dict]:
+        # 各任务的新时间不同，同一条UPDATE按任务执行多组参数
+        connection.execute(
+            update(tasks).where(tasks.c.id == bindparam('task_id'))
+            .values(planned_start_time=bindparam('new_start_time')),
+            [{'task_id': task_id, 'new_start_time': row['planned_start_time'] + params['shift']}
+             for task_id, row in rows.items()]
+        )
+        return []
+
+    def _move(self, connection, rows: Dict[str, Dict], params: Dict) -> List[Dict]:
+        failed = []
+        duration = params['duration']
+        movable = list(rows)
+        if duration is not None:
+            movable = []
+            for task_id, row in rows.items():
+                task_duration = (row['estimated_pomodoros'] or 1) * POMODORO_MINUTES
+                if task_duration > duration:
+                    failed.append({
+                        'task_id': task_id,
+                        'error': f'Task duration ({task_duration} minutes) exceeds '
+                                 f'time block duration ({duration} minutes)'
+                    })
+                else:
+                    movable.append(task_id)
+        if movable:
+            connection.execute(
+                update(tasks).where(tasks.c.id.in_(movable)).values(scheduled_time_block_id=params['time_block_id'])
+            )
+        return failed
+
+    def _add_tags(self, connection, rows: Dict[str, Dict], params: Dict) -> List[Dict]:
+        tags = Tag.__table__
+        already_tagged = select(task_tags.c.task_id).where(
+            task_tags.c.task_id == tasks.c.id,
+            task_tags.c.tag_id == tags.c.id
+        ).exists()
+        connection.execute(task_tags.insert().from_select(
+            ['task_id', 'tag_id'],
+            select(tasks.c.id, tags.c.id).where(
+                tasks.c.id.in_(list(rows)),
+                tags.c.id.in_(params['tag_ids']),
+                ~already_tagged
+            )
+        ))
+        return []
+
+    def _remove_tags(self, connection, rows: Dict[str, Dict], params: Dict) -> List[Dict]:
+        connection.execute(delete(task_tags).where(
+            task_tags.c.task_id.in_(list(rows)),
+            task_tags.c.tag_id.in_(params['tag_ids'])
+        ))
+        return []
+
+    def _delete(self, connection, rows: Dict[str, Dict], params: Dict) -> List[Dict]:
+        task_ids = list(rows)
+        logs = TimeLog.__table__
+        # 时间日志计入的项目、分类时间随之扣减（任务本身一并删除，不再维护任务上的计数）
+        log_rows = connection.execute(
+            select(logs.c.project_id, logs.c.category_id, logs.c.duration, logs.c.is_completed)
+            .where(logs.c.task_id.in_(task_ids))
+        ).mappings().all()
+        counters.add_rows(connection, TimeLog, log_rows, -1)
+        counters.add_task_rows(connection, rows.values(), -1)
+
+        # 与ORM的级联删除一致：时间日志、番茄钟会话、标签关联，最后是任务
+        connection.execute(delete(logs).where(logs.c.task_id.in_(task_ids)))
+        sessions = PomodoroSession.__table__
+        connection.execute(delete(sessions).where(sessions.c.task_id.in_(task_ids)))
+        connection.execute(delete(task_tags).where(task_tags.c.task_id.in_(task_ids)))
+        connection.execute(delete(tasks).where(tasks.c.id.in_(task_ids)))
+        return []
+
+    _PARSERS: Dict[str, Callable] = {
+        'update': _parse_update,
+        'reschedule': _parse_reschedule,
+        'move': _parse_move,
+        'add_tags': _parse_tags,
+        'remove_tags': _parse_tags,
+        'delete': _parse_delete
+    }
+
+    _HANDLERS: Dict[str, Callable] = {
+        'update': _update,
+        'reschedule': _reschedule,
+        'move': _move,
+        'add_tags': _add_tags,
+        'remove_tags': _remove_tags,
+        'delete': _delete
+    }
+
+
+# 全局批量操作实例
+bulk_task_operations = BulkTaskOperations()
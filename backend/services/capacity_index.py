@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+时间块剩余容量索引
+按 (用户, 日期) 缓存每个时间块的剩余分钟数和时间块之间的空闲间隙，
+两者均按分钟数有序存放，"75分钟的任务放得下哪里"只需一次二分查找。
+
+索引通过会话事件维护：提交后按任务的排程变化增量调整剩余容量，
+时间块增删改则使当天索引失效、下次访问时重建。其他进程的修改通过TTL过期感知。
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date as date_type, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app import db
+from models.task import Task, TaskStatus
+from models.time_block import TimeBlock, BlockType
+
+POMODORO_MINUTES = 25
+DEFAULT_TTL = 60
+
+# 会话中待提交的容量变化
+PENDING_CHANGES_KEY = 'capacity_index_pending'
+
+DayKey = Tuple[str, date_type]
+
+
+class BlockCapacity:
+    """单个时间块的容量"""
+
+    __slots__ = ('block_id', 'start_time', 'end_time', 'block_type', 'duration', 'used_minutes', 'task_count')
+
+    def __init__(self, block_id: str, start_time: datetime, end_time: datetime, block_type: BlockType,
+                 used_minutes: int = 0, task_count: int = 0):
+        self.block_id = block_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.block_type = block_type
+        self.duration = int((end_time - start_time).total_seconds() / 60)
+        self.used_minutes = used_minutes
+        self.task_count = task_count
+
+    @property
+    def remaining_minutes(self) -> int:
+        return self.duration - self.used_minutes
+
+    def to_dict(self) -> Dict:
+        return {
+            'time_block_id': self.block_id,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat(),
+            'block_type': self.block_type.value,
+            'duration': self.duration,
+            'remaining_minutes': self.remaining_minutes,
+            'task_count': self.task_count
+        }
+
+
+class DayCapacity:
+    """一个用户一天的容量索引"""
+
+    def __init__(self, blocks: Iterable[BlockCapacity]):
+        self.built_at = time.monotonic()
+        self.blocks: Dict[str, BlockCapacity] = {}
+        # (剩余分钟数, 开始时间, 时间块ID)，按剩余分钟数升序
+        self._by_remaining: List[Tuple[int, datetime, str]] = []
+        # (间隙分钟数, 开始时间, 结束时间)，按间隙分钟数升序
+        self._gaps: List[Tuple[int, datetime, datetime]] = []
+
+        ordered = sorted(blocks, key=lambda block: block.start_time)
+        latest_end = None
+        for block in ordered:
+            self.blocks[block.block_id] = block
+            self._by_remaining.append(self._entry(block))
+            if latest_end is not None and block.start_time > latest_end:
+                gap_minutes = int((block.start_time - latest_end).total_seconds() / 60)
+                self._gaps.append((gap_minutes, latest_end, block.start_time))
+            latest_end = block.end_time if latest_end is None else max(latest_end, block.end_time)
+
+        self._by_remaining.sort()
+        self._gaps.sort()
+
+    def _entry(self, block: BlockCapacity) -> Tuple[int, datetime, str]:
+        return (block.remaining_minutes, block.start_time, block.block_id)
+
+    def blocks_that_fit(self, minutes: int) -> List[BlockCapacity]:
+        """剩余容量不少于指定分钟数的时间块，按剩余容量升序（最佳适配在前）"""
+        index = bisect_left(self._by_remaining, (minutes,))
+        return [self.blocks[block_id] for _, _, block_id in self._by_remaining[index:]]
+
+    def gaps_that_fit(self, minutes: int) -> List[Dict]:
+        """时长不少于指定分钟数的空闲间隙，按时长升序"""
+        index = bisect_left(self._gaps, (minutes,))
+        return [
+            {'start_time': start.isoformat(), 'end_time': end.isoformat(), 'minutes': gap_minutes}
+            for gap_minutes, start, end in self._gaps[index:]
+        ]
+
+    def remaining_minutes(self, block_id: str, default: Optional[int] = None) -> Optional[int]:
+        block = self.blocks.get(block_id)
+        return block.remaining_minutes if block else default
+
+    def task_count(self, block_id: str, default: int = 0) -> int:
+        block = self.blocks.get(block_id)
+        return block.task_count if block else default
+
+    def adjust(self, block_id: str, minutes: int, count: int):
+        """调整时间块已占用的分钟数与任务数"""
+        block = self.blocks.get(block_id)
+        if block is None:
+            return
+
+        index = bisect_left(self._by_remaining, self._entry(block))
+        del self._by_remaining[index]
+        block.used_minutes += minutes
+        block.task_count += count
+        insort(self._by_remaining, self._entry(block))
+
+
+class CapacityIndex:
+    """按 (用户, 日期) 缓存的容量索引"""
+
+    def __init__(self):
+        self._days: Dict[DayKey, DayCapacity] = {}
+        self._block_days: Dict[str, DayKey] = {}
+        self._lock = threading.RLock()
+        self._listening = False
+
+    def init_app(self, app):
+        """绑定Flask应用并注册会话事件（每个应用可能使用不同的数据库，清空已有索引）"""
+        app.extensions['capacity_index'] = self
+        self.clear()
+
+        if not self._listening:
+            event.listen(Session, 'before_flush', _record_pending_changes)
+            event.listen(Session, 'after_commit', _apply_pending_changes)
+            event.listen(Session, 'after_rollback', _discard_pending_changes)
+            self._listening = True
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+            self._block_days.clear()
+
+    def invalidate_user(self, user_id: str):
+        """使用户已缓存的所有日期失效（绕过会话事件的批量修改之后调用）"""
+        with self._lock:
+            for key in [key for key in self._days if key[0] == user_id]:
+                self._drop(key)
+
+    def get_day(self, user_id: str, day) -> DayCapacity:
+        """获取一天的容量索引，缺失或过期时从数据库构建"""
+        day = _as_date(day)
+        return self.get_range(user_id, day, day)[day]
+
+    def get_range(self, user_id: str, start_day, end_day) -> Dict[date_type, DayCapacity]:
+        """获取日期范围（含首尾）内每天的容量索引，缺失的天数用一次查询批量构建"""
+        start_day, end_day = _as_date(start_day), _as_date(end_day)
+        days = [start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1)]
+        ttl = current_app.config.get('CAPACITY_INDEX_TTL', DEFAULT_TTL)
+        now = time.monotonic()
+
+        with self._lock:
+            result = {}
+            for day in days:
+                capacity = self._days.get((user_id, day))
+                if capacity is not None and now - capacity.built_at < ttl:
+                    result[day] = capacity
+        missing = [day for day in days if day not in result]
+        if not missing:
+            return result
+
+        built = _load_days(user_id, min(missing), max(missing))
+        # 会话中有已刷新未提交的改动时，读到的数据提交后还会再被增量调整一次，不能缓存
+        cacheable = not db.session.info.get(PENDING_CHANGES_KEY)
+
+        with self._lock:
+            for day in missing:
+                capacity = built.get(day) or DayCapacity([])
+                result[day] = capacity
+                if cacheable:
+                    self._store((user_id, day), capacity)
+        return result
+
+    def _store(self, key: DayKey, capacity: DayCapacity):
+        self._drop(key)
+        self._days[key] = capacity
+        for block_id in capacity.blocks:
+            self._block_days[block_id] = key
+
+    def _drop(self, key: DayKey):
+        capacity = self._days.pop(key, None)
+        if capacity:
+            for block_id in capacity.blocks:
+                self._block_days.pop(block_id, None)
+
+    def apply(self, pending: 'PendingChanges'):
+        """应用一次提交中的容量变化"""
+        with self._lock:
+            for block_id, minutes, count in pending.deltas:
+                key = self._block_days.get(block_id)
+                if key is not None:
+                    self._days[key].adjust(block_id, minutes, count)
+
+            for key in pending.invalidated_days:
+                self._drop(key)
+            for block_id in pending.invalidated_blocks:
+                key = self._block_days.get(block_id)
+                if key is not None:
+                    self._drop(key)
+
+
+class PendingChanges:
+    """一个事务内尚未提交的容量变化"""
+
+    def __init__(self):
+        self.deltas: List[Tuple[str, int, int]] = []
+        self.invalidated_days: set = set()
+        self.invalidated_blocks: set = set()
+
+    def __bool__(self):
+        return bool(self.deltas or self.invalidated_days or self.invalidated_blocks)
+
+
+def _as_date(value) -> date_type:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _load_days(user_id: str, start_day: date_type, end_day: date_type) -> Dict[date_type, DayCapacity]:
+    """查询日期范围内的时间块及其已占用容量（已取消的任务不占用容量）"""
+    range_start = datetime.combine(start_day, datetime.min.time())
+    range_end = datetime.combine(end_day, datetime.min.time()) + timedelta(days=1)
+    date_filter = (
+        TimeBlock.user_id == user_id,
+        TimeBlock.date >= range_start,
+        TimeBlock.date < range_end
+    )
+
+    blocks = db.session.query(
+        TimeBlock.id, TimeBlock.date, TimeBlock.start_time, TimeBlock.end_time, TimeBlock.block_type
+    ).filter(*date_filter).all()
+
+    usage_rows = db.session.query(
+        Task.scheduled_time_block_id,
+        func.sum(func.coalesce(Task.estimated_pomodoros, 1)),
+        func.count(Task.id)
+    ).join(TimeBlock, Task.scheduled_time_block_id == TimeBlock.id).filter(
+        *date_filter,
+        Task.status != TaskStatus.CANCELLED
+    ).group_by(Task.scheduled_time_block_id).all()
+    usage = {block_id: (int(pomodoros) * POMODORO_MINUTES, count) for block_id, pomodoros, count in usage_rows}
+
+    blocks_by_day: Dict[date_type, List[BlockCapacity]] = {}
+    for block_id, block_date, start_time, end_time, block_type in blocks:
+        used_minutes, task_count = usage.get(block_id, (0, 0))
+        blocks_by_day.setdefault(block_date.date(), []).append(
+            BlockCapacity(block_id, start_time, end_time, block_type, used_minutes, task_count)
+        )
+
+    return {day: DayCapacity(day_blocks) for day, day_blocks in blocks_by_day.items()}
+
+
+def _previous_value(obj, key: str):
+    """返回 (是否已知, 修改前的值)"""
+    history = get_history(obj, key)
+    if history.deleted:
+        return True, history.deleted[0]
+    if history.unchanged:
+        return True, history.unchanged[0]
+    if not history.added:
+        return True, None
+    # 属性过期后直接赋值，旧值未加载
+    return False, None
+
+
+def _contribution(block_id, pomodoros, status) -> Optional[Tuple[str, int]]:
+    """任务对时间块的容量占用 (时间块ID, 分钟数)"""
+    if not block_id or status == TaskStatus.CANCELLED:
+        return None
+    return block_id, (pomodoros or 1) * POMODORO_MINUTES
+
+
+def _record_pending_changes(session, flush_context, instances):
+    """刷新前记录任务排程与时间块的变化"""
+    pending = session.info.get(PENDING_CHANGES_KEY)
+    if pending is None:
+        pending = session.info[PENDING_CHANGES_KEY] = PendingChanges()
+
+    for obj in session.new:
+        if isinstance(obj, Task):
+            new = _contribution(obj.scheduled_time_block_id, obj.estimated_pomodoros, obj.status)
+            if new:
+                pending.deltas.append((new[0], new[1], 1))
+        elif isinstance(obj, TimeBlock) and obj.date:
+            pending.invalidated_days.add((obj.user_id, _as_date(obj.date)))
+
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            old = _contribution(obj.scheduled_time_block_id, obj.estimated_pomodoros, obj.status)
+            if old:
+                pending.deltas.append((old[0], -old[1], -1))
+        elif isinstance(obj, TimeBlock):
+            pending.invalidated_blocks.add(obj.id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Task):
+            _record_task_change(pending, obj)
+        elif isinstance(obj, TimeBlock) and session.is_modified(obj):
+            pending.invalidated_blocks.add(obj.id)
+            for value in get_history(obj, 'date').sum():
+                if value:
+                    pending.invalidated_days.add((obj.user_id, _as_date(value)))
+
+
+def _record_task_change(pending: PendingChanges, task: Task):
+    keys = ('scheduled_time_block_id', 'estimated_pomodoros', 'status')
+    if not any(get_history(task, key).has_changes() for key in keys):
+        return
+
+    previous = [_previous_value(task, key) for key in keys]
+    new = _contribution(task.scheduled_time_block_id, task.estimated_pomodoros, task.status)
+
+    if not all(known for known, _ in previous):
+        # 旧值未知，无法增量调整，让涉及的时间块所在日期失效
+        known_block, old_block_id = previous[0]
+        if known_block and old_block_id:
+            pending.invalidated_blocks.add(old_block_id)
+        elif not known_block:
+            pending.invalidated_days.update(_cached_user_days(task.user_id))
+        if new:
+            pending.invalidated_blocks.add(new[0])
+        return
+
+    old = _contribution(*(value for _, value in previous))
+    if old:
+        pending.deltas.append((old[0], -old[1], -1))
+    if new:
+        pending.deltas.append((new[0], new[1], 1))
+
+
+def _cached_user_days(user_id: str) -> List[DayKey]:
+    """旧时间块未知时使该用户已缓存的所有日期失效"""
+    with capacity_index._lock:
+        return [key for key in capacity_index._days if key[0] == user_id]
+
+
+def _apply_pending_changes(session):
+    pending = session.info.pop(PENDING_CHANGES_KEY, None)
+    if pending:
+        capacity_index.apply(pending)
+
+
+def _discard_pending_changes(session):
+    session.info.pop(PENDING_CHANGES_KEY, None)
+
+
+# 全局容量索引实例
+capacity_index = CapacityIndex()
@@ -3,89 +3,93 @@
 任务类别与时间块类型匹配服务
 """
 
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from models import db
 from models.task_category import TaskCategory
 from models.time_block import TimeBlock, BlockType
 from models.task import Task
+from services.matching_rules import matching_rule_service, DEFAULT_MATCHING_RULES, BLOCK_TYPE_INDEX
+
+# numpy只在批量打分时导入，避免拖慢应用启动
+if TYPE_CHECKING:
+    import numpy as np
+
+# 没有类别的任务的匹配分数
+UNCATEGORIZED_MATCH_SCORE = 0.5
+# 剩余容量不足时的分数系数
+INSUFFICIENT_CAPACITY_FACTOR = 0.1
+# 计划时间与时间块开始时间相差该秒数及以上时，时间匹配度为0
+TIME_PROXIMITY_SECONDS = 4 * 3600
+# 时间块内每个已调度任务扣减的分数比例
+TASK_LOAD_PENALTY = 0.2
+
+EPOCH = datetime(1970, 1, 1)
 
 
 class CategoryTimeBlockMatcher:
     """任务类别与时间块类型匹配器"""
 
-    # 预定义的匹配规则
-    DEFAULT_MATCHING_RULES = {
-        # 任务类别 -> [时间块类型, 优先级]
-        '科研': [(BlockType.RESEARCH, 1.0), (BlockType.GROWTH, 0.8), (BlockType.REVIEW, 0.6)],
-        '学习': [(BlockType.GROWTH, 1.0), (BlockType.RESEARCH, 0.8), (BlockType.REVIEW, 0.6)],
-        '工作': [(BlockType.RESEARCH, 1.0), (BlockType.GROWTH, 0.8)],
-        '阅读': [(BlockType.GROWTH, 1.0), (BlockType.REST, 0.7)],
-        '运动': [(BlockType.REST, 1.0), (BlockType.ENTERTAINMENT, 0.8)],
-        '娱乐': [(BlockType.ENTERTAINMENT, 1.0), (BlockType.REST, 0.8)],
-        '休息': [(BlockType.REST, 1.0)],
-        '总结': [(BlockType.REVIEW, 1.0), (BlockType.GROWTH, 0.8)],
-        '规划': [(BlockType.REVIEW, 1.0), (BlockType.RESEARCH, 0.8)],
-        '其他': [(BlockType.GROWTH, 0.8), (BlockType.RESEARCH, 0.7), (BlockType.REST, 0.6)]
-    }
-
-    def __init__(self):
-        self.matching_rules = self.DEFAULT_MATCHING_RULES.copy()
-        self.user_custom_rules = {}  # 用户自定义规则 {user_id: {category_name: [(block_type, score), ...]}}
+    # 预定义的匹配规则：任务类别 -> [(时间块类型, 匹配分数)]
+    DEFAULT_MATCHING_RULES = DEFAULT_MATCHING_RULES
 
     def set_user_custom_rules(self, user_id: str, rules: Dict[str, List[Tuple[BlockType, float]]]):
-        """设置用户自定义匹配规则"""
-        self.user_custom_rules[user_id] = rules
+        """设置用户自定义匹配规则（持久化，替换该用户原有的全部自定义规则）"""
+        matching_rule_service.replace_rules(user_id, rules)
 
     def get_matching_rules(self, user_id: str, category_name: str) -> List[Tuple[BlockType, float]]:
         """获取匹配规则，优先使用用户自定义规则"""
-        user_rules = self.user_custom_rules.get(user_id, {})
-        if category_name in user_rules:
-            return user_rules[category_name]
-        return self.matching_rules.get(category_name, self.matching_rules['其他'])
+        return matching_rule_service.get_compiled(user_id).rules_for(category_name)
 
     def calculate_match_score(self, task: Task, time_block: TimeBlock) -> float:
         """计算任务与时间块的匹配分数"""
         if not task.category_id:
             # 没有类别，返回中等匹配分数
-            return 0.5
+            return UNCATEGORIZED_MATCH_SCORE
 
-        # 获取任务类别
-        category = TaskCategory.query.get(task.category_id)
+        # 获取任务类别（会话中已加载的类别不再查询）
+        category = db.session.get(TaskCategory, task.category_id)
         if not category:
-            return 0.5
+            return UNCATEGORIZED_MATCH_SCORE
 
-        # 获取匹配规则
-        matching_rules = self.get_matching_rules(task.user_id, category.name)
-
-        # 查找匹配的时间块类型
-        for block_type, score in matching_rules:
-            if time_block.block_type == block_type:
-                return score
-
-        return 0.0
+        # 在编译好的 类别 × 时间块类型 分数矩阵中直接取值
+        return matching_rule_service.get_compiled(task.user_id).score(category.name, time_block.block_type)
 
     def find_best_time_blocks(self, task: Task, available_time_blocks: List[TimeBlock],
                             top_k: int = 5) -> List[Tuple[TimeBlock, float]]:
         """为任务找到最佳时间块"""
+        from services.capacity_index import capacity_index
+
         scored_blocks = []
+        task_duration = (task.estimated_pomodoros or 1) * 25
+        day_capacities = {}
 
         for time_block in available_time_blocks:
             # 计算基础匹配分数
             match_score = self.calculate_match_score(task, time_block)
 
-            # 检查时间容量
-            if not time_block.can_accommodate_task(task.estimated_pomodoros * 25):
-                match_score *= 0.1  # 大幅降低分数，但仍保留
+            # 从容量索引读取剩余容量与已排程任务数（未入库的时间块按空时间块处理）
+            day = time_block.date.date()
+            if day not in day_capacities:
+                day_capacities[day] = capacity_index.get_day(time_block.user_id, day)
+            capacity = day_capacities[day]
+            remaining_minutes = capacity.remaining_minutes(time_block.id, default=time_block.get_duration())
+
+            # 检查剩余容量
+            if remaining_minutes < task_duration:
+                match_score *= INSUFFICIENT_CAPACITY_FACTOR  # 大幅降低分数，但仍保留
 
             # 考虑时间匹配度（任务计划时间与时间块开始时间的接近程度）
             if task.planned_start_time:
                 time_diff = abs((time_block.start_time - task.planned_start_time).total_seconds())
                 # 时间差越小，分数越高
-                time_score = max(0, 1 - time_diff / (4 * 3600))  # 4小时内为满分
+                time_score = max(0, 1 - time_diff / TIME_PROXIMITY_SECONDS)
                 match_score *= time_score
 
             # 考虑当前时间块已有任务数量
-            existing_tasks = len(time_block.scheduled_tasks or [])
-            task_penalty = max(0, 1 - existing_tasks * 0.2)  # 每个已调度任务减少20%分数
+            existing_tasks = capacity.task_count(time_block.id)
+            task_penalty = max(0, 1 - existing_tasks * TASK_LOAD_PENALTY)  # 每个已调度任务减少20%分数
             match_score *= task_penalty
 
             scored_blocks.append((time_block, match_score))
@@ -121,6 +125,102 @@ class CategoryTimeBlockMatcher:
 
         return suggestions
 
+    def score_matrix(self, user_id: str, tasks: List[Task], time_blocks: List[TimeBlock]) -> 'np.ndarray':
+        """
+        计算 任务 × 时间块 的匹配分数矩阵，与逐个调用find_best_time_blocks的打分一致
+
+        类别分数、容量不足惩罚、时间接近度与已有任务数惩罚都按向量计算，
+        类别名称与时间块容量各只读取一次
+        """
+        import numpy as np
+        from services.capacity_index import capacity_index
+
+        if not tasks or not time_blocks:
+            return np.zeros((len(tasks), len(time_blocks)))
+
+        compiled = matching_rule_service.get_compiled(user_id)
+
+        # 类别分数表：编译好的规则矩阵 + 一行无类别任务的固定分数
+        category_scores = np.vstack([
+            np.asarray(compiled.scores, dtype=float).reshape(-1, compiled.width),
+            np.full(compiled.width, UNCATEGORIZED_MATCH_SCORE)
+        ])
+        uncategorized_row = len(category_scores) - 1
+
+        category_ids = {task.category_id for task in tasks if task.category_id}
+        category_names = dict(
+            db.session.query(TaskCategory.id, TaskCategory.name).filter(TaskCategory.id.in_(category_ids)).all()
+        ) if category_ids else {}
+
+        task_rows = np.array([
+            compiled.row_for(category_names[task.category_id])
+            if task.category_id in category_names else uncategorized_row
+            for task in tasks
+        ])
+        task_minutes = np.array([(task.estimated_pomodoros or 1) * 25 for task in tasks], dtype=float)
+        # 没有计划时间的任务不参与时间接近度打分（NaN在下方视为满分）
+        task_starts = np.array([
+            (task.planned_start_time - EPOCH).total_seconds() if task.planned_start_time else np.nan
+            for task in tasks
+        ])
+
+        day_capacities = {}
+        remaining = np.empty(len(time_blocks))
+        task_counts = np.empty(len(time_blocks))
+        for column, time_block in enumerate(time_blocks):
+            day = time_block.date.date()
+            if day not in day_capacities:
+                day_capacities[day] = capacity_index.get_day(user_id, day)
+            capacity = day_capacities[day]
+            remaining[column] = capacity.remaining_minutes(time_block.id, default=time_block.get_duration())
+            task_counts[column] = capacity.task_count(time_block.id)
+
+        block_columns = np.array([BLOCK_TYPE_INDEX[time_block.block_type] for time_block in time_blocks])
+        block_starts = np.array([(time_block.start_time - EPOCH).total_seconds() for time_block in time_blocks])
+
+        scores = category_scores[np.ix_(task_rows, block_columns)]
+        scores = scores * np.where(remaining[None, :] < task_minutes[:, None], INSUFFICIENT_CAPACITY_FACTOR, 1.0)
+
+        time_scores = np.maximum(0, 1 - np.abs(block_starts[None, :] - task_starts[:, None]) / TIME_PROXIMITY_SECONDS)
+        scores = scores * np.where(np.isnan(time_scores), 1.0, time_scores)
+
+        return scores * np.maximum(0, 1 - task_counts * TASK_LOAD_PENALTY)[None, :]
+
+    def suggest_time_blocks_for_tasks(self, user_id: str, tasks: List[Task], date,
+                                      top_k: int = 3) -> Dict:
+        """为多个任务批量建议指定日期的时间块"""
+        import numpy as np
+
+        target_date = datetime.combine(date, datetime.min.time())
+        time_blocks = TimeBlock.query.filter_by(
+            user_id=user_id,
+            date=target_date
+        ).order_by(TimeBlock.start_time).all()
+
+        scores = self.score_matrix(user_id, tasks, time_blocks)
+
+        suggestions = {}
+        if time_blocks:
+            # 稳定排序：同分时保持时间块原有顺序，与单任务建议一致
+            best_columns = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+            for row, task in enumerate(tasks):
+                suggestions[task.id] = [
+                    {
+                        'time_block_id': time_blocks[column].id,
+                        'match_score': score,
+                        'match_reason': self._get_match_reason(task, time_blocks[column], score),
+                        'suitability': self._get_suitability_level(score)
+                    }
+                    for column, score in zip(best_columns[row].tolist(), scores[row, best_columns[row]].tolist())
+                ]
+        else:
+            suggestions = {task.id: [] for task in tasks}
+
+        return {
+            'time_blocks': [time_block.to_dict() for time_block in time_blocks],
+            'suggestions': suggestions
+        }
+
     def _get_match_reason(self, task: Task, time_block: TimeBlock, score: float) -> str:
         """获取匹配原因"""
         if score >= 0.9:
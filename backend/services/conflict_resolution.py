@@ -3,11 +3,15 @@
 时间块冲突检测和解决建议服务
 """
 
-from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime, timedelta, time
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from datetime import date as date_type, datetime, timedelta, time
+from sqlalchemy.orm import selectinload
+from models import db
 from models.time_block import TimeBlock, BlockType
 from models.task import Task
 from models.task_category import TaskCategory
+from models.user import User
 from services.category_timeblock_matching import category_timeblock_matcher
 
 
@@ -20,6 +24,95 @@ class ConflictType:
     SCHEDULE_VIOLATION = "schedule_violation"
 
 
+# 连续工作检查涉及的时间块类型
+WORK_BLOCK_TYPES = (BlockType.RESEARCH, BlockType.GROWTH)
+
+# 连续工作默认阈值，用户偏好 min_rest_minutes / max_continuous_work_minutes 可覆盖
+DEFAULT_MIN_REST_MINUTES = 15
+DEFAULT_MAX_CONTINUOUS_WORK_MINUTES = 180
+
+# 自动修复：顺延后与前一时间块的间隔；原本重叠达到该分钟数的需要手动处理
+AUTO_FIX_GAP = timedelta(minutes=5)
+AUTO_FIX_MAX_OVERLAP_MINUTES = 30
+
+
+def conflict_key(conflict_type: str, block_ids: Iterable[str], task_ids: Iterable[str] = ()) -> str:
+    """冲突的稳定标识：类型 + 涉及的时间块与任务，增量复查按它比较前后结果"""
+    return f"{conflict_type}:{','.join(block_ids)}:{','.join(task_ids)}"
+
+
+class WorkStreakPolicy:
+    """连续工作阈值：间隔少于min_rest的工作时间块算作连续，连续超过max_work需要休息"""
+
+    def __init__(self, min_rest_minutes: float = DEFAULT_MIN_REST_MINUTES,
+                 max_work_minutes: float = DEFAULT_MAX_CONTINUOUS_WORK_MINUTES):
+        self.min_rest = timedelta(minutes=min_rest_minutes)
+        self.max_work = timedelta(minutes=max_work_minutes)
+
+    # 用户偏好中的阈值键（分钟）
+    PREFERENCE_KEYS = ('min_rest_minutes', 'max_continuous_work_minutes')
+
+    @staticmethod
+    def is_valid_threshold(value: Any) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and 0 < value <= 24 * 60
+
+    @classmethod
+    def from_preferences(cls, preferences: Dict[str, Any]) -> 'WorkStreakPolicy':
+        """从用户偏好读取阈值，缺失或不合法时使用默认值"""
+        defaults = (DEFAULT_MIN_REST_MINUTES, DEFAULT_MAX_CONTINUOUS_WORK_MINUTES)
+        values = [preferences.get(name) for name in cls.PREFERENCE_KEYS]
+        return cls(*(value if cls.is_valid_threshold(value) else default
+                     for value, default in zip(values, defaults)))
+
+
+class WorkStreak:
+    """一段连续工作"""
+
+    __slots__ = ('start_time', 'end_time', 'items')
+
+    def __init__(self, start_time: datetime, end_time: datetime, items: List[Any]):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.items = items
+
+    @property
+    def minutes(self) -> int:
+        return int((self.end_time - self.start_time).total_seconds() / 60)
+
+
+class WorkStreakTracker:
+    """
+    按开始时间依次加入工作时间块，单次遍历合并出最长的连续工作段
+
+    与当前段（到目前为止最晚的结束时间）间隔少于最短休息的时间块并入当前段，重叠的自然也并入；
+    连续工作按自然日计算，跨日期的时间块开始新的一段。每段结束时只检查一次是否超长，整体O(n)
+    """
+
+    def __init__(self, policy: WorkStreakPolicy):
+        self.policy = policy
+        self._streak: Optional[WorkStreak] = None
+
+    def push(self, start_time: datetime, end_time: datetime, item: Any) -> Optional[WorkStreak]:
+        """加入一个工作时间块，返回因此结束的超长连续段（没有则为None）"""
+        streak = self._streak
+        if streak and start_time.date() == streak.start_time.date() and \
+                start_time - streak.end_time < self.policy.min_rest:
+            streak.end_time = max(streak.end_time, end_time)
+            streak.items.append(item)
+            return None
+
+        closed = self.close()
+        self._streak = WorkStreak(start_time, end_time, [item])
+        return closed
+
+    def close(self) -> Optional[WorkStreak]:
+        """结束当前连续段，至少两个时间块且超过最长连续工作时返回该段"""
+        streak, self._streak = self._streak, None
+        if streak and len(streak.items) >= 2 and streak.end_time - streak.start_time > self.policy.max_work:
+            return streak
+        return None
+
+
 class ConflictSeverity:
     """冲突严重程度"""
     LOW = "low"
@@ -42,9 +135,15 @@ class TimeBlockConflict:
         self.auto_fixable = auto_fixable
         self.created_at = datetime.utcnow()
 
+    @property
+    def key(self) -> str:
+        return conflict_key(self.conflict_type, (block.id for block in self.affected_blocks),
+                            (task.id for task in self.affected_tasks))
+
     def to_dict(self) -> Dict:
         """转换为字典"""
         return {
+            'key': self.key,
             'conflict_type': self.conflict_type,
             'severity': self.severity,
             'message': self.message,
@@ -55,48 +154,155 @@ class TimeBlockConflict:
             'created_at': self.created_at.isoformat()
         }
 
-
-class ConflictResolutionService:
-    """冲突检测和解决服务"""
-
-    def __init__(self):
-        self.conflict_resolvers = {
-            ConflictType.TIME_OVERLAP: self._resolve_time_overlap,
-            ConflictType.TASK_DURATION: self._resolve_task_duration,
-            ConflictType.TASK_TYPE_MISMATCH: self._resolve_task_type_mismatch,
-            ConflictType.RESOURCE_OVERLOAD: self._resolve_resource_overload,
-            ConflictType.SCHEDULE_VIOLATION: self._resolve_schedule_violation
+    def to_compact_dict(self) -> Dict:
+        """转换为只引用时间块与任务ID的字典，时间块与任务由serialize_conflicts统一序列化"""
+        return {
+            'key': self.key,
+            'conflict_type': self.conflict_type,
+            'severity': self.severity,
+            'message': self.message,
+            'block_ids': [block.id for block in self.affected_blocks],
+            'task_ids': [task.id for task in self.affected_tasks],
+            'suggestions': self.suggestions,
+            'auto_fixable': self.auto_fixable,
+            'created_at': self.created_at.isoformat()
         }
 
-    def detect_conflicts(self, user_id: str, date: datetime) -> List[TimeBlockConflict]:
-        """检测指定日期的所有冲突"""
-        conflicts = []
-
-        # 获取当天所有时间块
-        time_blocks = TimeBlock.query.filter_by(
-            user_id=user_id,
-            date=date
-        ).all()
-
-        # 1. 检测时间重叠冲突
-        conflicts.extend(self._detect_time_overlaps(time_blocks))
 
-        # 2. 检测任务时长冲突
-        conflicts.extend(self._detect_task_duration_conflicts(time_blocks))
+def serialize_conflicts(conflicts: Iterable[TimeBlockConflict], compact: bool = False) -> Dict:
+    """
+    序列化冲突列表，返回 {'conflicts': [...]}
+
+    compact时改为规范化结构：时间块和任务各序列化一次，放入以ID为键的blocks / tasks，
+    冲突通过block_ids / task_ids引用，同一时间块涉及多个冲突时不再重复
+    """
+    if not compact:
+        return {'conflicts': [conflict.to_dict() for conflict in conflicts]}
+
+    blocks, tasks, items = {}, {}, []
+    for conflict in conflicts:
+        items.append(conflict.to_compact_dict())
+        for block in conflict.affected_blocks:
+            if block.id not in blocks:
+                blocks[block.id] = block.to_dict()
+        for task in conflict.affected_tasks:
+            if task.id not in tasks:
+                tasks[task.id] = task.to_dict()
+    return {'conflicts': items, 'blocks': blocks, 'tasks': tasks}
+
+
+def normalize_conflict_dicts(conflict_dicts: Iterable[Dict]) -> Dict:
+    """把已序列化的完整冲突字典转换为serialize_conflicts(compact=True)的结构"""
+    blocks, tasks, items = {}, {}, []
+    for conflict in conflict_dicts:
+        item = {}
+        for name, value in conflict.items():
+            if name == 'affected_blocks':
+                item['block_ids'] = [block['id'] for block in value]
+                blocks.update((block['id'], block) for block in value)
+            elif name == 'affected_tasks':
+                item['task_ids'] = [task['id'] for task in value]
+                tasks.update((task['id'], task) for task in value)
+            else:
+                item[name] = value
+        items.append(item)
+    return {'conflicts': items, 'blocks': blocks, 'tasks': tasks}
 
-        # 3. 检测任务类型不匹配
-        conflicts.extend(self._detect_task_type_mismatches(time_blocks))
 
-        # 4. 检测资源过载
-        conflicts.extend(self._detect_resource_overloads(time_blocks))
+class ConflictResolutionService:
+    """冲突检测和解决服务"""
 
-        # 5. 检测日程违规
-        conflicts.extend(self._detect_schedule_violations(time_blocks))
+    def detect_conflicts(self, user_id: str, date: datetime) -> List[TimeBlockConflict]:
+        """检测指定日期的所有冲突（包括与前一天跨午夜时间块的重叠）"""
+        for _, conflicts in self.scan_conflicts(user_id, date.date(), date.date()):
+            return conflicts
+        return []
+
+    def scan_conflicts(self, user_id: str, start_date: date_type,
+                       end_date: date_type) -> Iterator[Tuple[date_type, List[TimeBlockConflict]]]:
+        """
+        扫描日期范围内的冲突，按日期顺序逐天产出 (日期, 冲突列表)，没有冲突的日期不产出
+
+        一次按开始时间排序查询窗口内的时间块（含前一天跨午夜延伸进窗口的时间块），
+        单次遍历完成全部五类检测：重叠用仍未结束的时间块集合扫描，连续工作用WorkStreakTracker合并；
+        冲突归属于重叠开始 / 时间块开始所在的日期，某天的时间块遍历完即可产出该天结果
+        """
+        window_start = datetime.combine(start_date, time.min)
+        window_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+        time_blocks = TimeBlock.query.options(
+            selectinload(TimeBlock.scheduled_tasks)
+        ).filter(
+            TimeBlock.user_id == user_id,
+            TimeBlock.start_time < window_end,
+            TimeBlock.end_time > window_start
+        ).order_by(TimeBlock.start_time, TimeBlock.end_time, TimeBlock.id).all()
+
+        # 预先加载任务类别，类型匹配检测直接命中会话缓存（局部变量保持引用直到扫描结束）
+        categories = self._load_categories(time_blocks)
+        policy = self.get_work_streak_policy(user_id)
+
+        current_day = None
+        day_conflicts: List[TimeBlockConflict] = []
+        active_blocks: List[TimeBlock] = []
+        work_streaks = WorkStreakTracker(policy)
 
-        # 按严重程度排序
-        conflicts.sort(key=lambda x: self._get_severity_priority(x.severity), reverse=True)
+        for block in time_blocks:
+            block_day = block.start_time.date()
+            if block_day != current_day:
+                # 连续工作按自然日计算，换日前结束当天的连续段
+                self._append_work_streak(day_conflicts, work_streaks.close(), policy, window_start)
+                if day_conflicts:
+                    yield current_day, self._sort_by_severity(day_conflicts)
+                current_day, day_conflicts = block_day, []
+
+            in_window = block.start_time >= window_start
+
+            # 1. 时间重叠：与仍未结束的时间块比较
+            active_blocks = [other for other in active_blocks if other.end_time > block.start_time]
+            if in_window:
+                for other in active_blocks:
+                    day_conflicts.append(self._build_overlap_conflict(other, block))
+            active_blocks.append(block)
+
+            # 5. 日程违规：间隔不足最短休息的工作时间块合并为连续段，超长的连续段各报告一次
+            if block.block_type in WORK_BLOCK_TYPES:
+                streak = work_streaks.push(block.start_time, block.end_time, block)
+                self._append_work_streak(day_conflicts, streak, policy, window_start)
+
+            if not in_window:
+                continue
 
-        return conflicts
+            # 2~4. 任务时长、任务类型、资源过载只涉及单个时间块
+            day_conflicts.extend(self._detect_task_duration_conflicts([block]))
+            day_conflicts.extend(self._detect_task_type_mismatches([block]))
+            day_conflicts.extend(self._detect_resource_overloads([block]))
+
+        self._append_work_streak(day_conflicts, work_streaks.close(), policy, window_start)
+        if day_conflicts:
+            yield current_day, self._sort_by_severity(day_conflicts)
+
+    def get_work_streak_policy(self, user_id: str) -> WorkStreakPolicy:
+        """用户的连续工作阈值"""
+        user = db.session.get(User, user_id)
+        return WorkStreakPolicy.from_preferences(user.get_preferences() if user else {})
+
+    def _append_work_streak(self, conflicts: List[TimeBlockConflict], streak: Optional[WorkStreak],
+                            policy: WorkStreakPolicy, window_start: datetime):
+        # 前一天跨午夜延伸进窗口的时间块组成的连续段属于前一天
+        if streak and streak.start_time >= window_start:
+            conflicts.append(self._build_work_streak_conflict(streak, policy))
+
+    def _load_categories(self, time_blocks: List[TimeBlock]) -> List[TaskCategory]:
+        category_ids = {task.category_id for block in time_blocks for task in block.scheduled_tasks
+                        if task.category_id}
+        if not category_ids:
+            return []
+        return TaskCategory.query.filter(TaskCategory.id.in_(category_ids)).all()
+
+    def _sort_by_severity(self, conflicts: List[TimeBlockConflict]) -> List[TimeBlockConflict]:
+        """按严重程度排序"""
+        return sorted(conflicts, key=lambda x: self._get_severity_priority(x.severity), reverse=True)
 
     def _detect_time_overlaps(self, time_blocks: List[TimeBlock]) -> List[TimeBlockConflict]:
         """检测时间重叠冲突"""
@@ -108,32 +314,35 @@ class ConflictResolutionService:
                 block2 = time_blocks[j]
 
                 if block1.overlaps_with(block2):
-                    # 计算重叠时间
-                    overlap_start = max(block1.start_time, block2.start_time)
-                    overlap_end = min(block1.end_time, block2.end_time)
-                    overlap_duration = (overlap_end - overlap_start).total_seconds() / 60
-
-                    severity = self._calculate_overlap_severity(overlap_duration)
-
-                    suggestions = [
-                        f"调整 {block1.block_type.value} 时间块到 {block2.start_time.strftime('%H:%m')} 之前",
-                        f"调整 {block2.block_type.value} 时间块到 {block1.end_time.strftime('%H:%m')} 之后",
-                        f"合并两个时间块为一个更大的时间块",
-                        f"删除优先级较低的时间块"
-                    ]
-
-                    conflict = TimeBlockConflict(
-                        conflict_type=ConflictType.TIME_OVERLAP,
-                        severity=severity,
-                        message=f"{block1.block_type.value} 时间块与 {block2.block_type.value} 时间块重叠 {int(overlap_duration)} 分钟",
-                        affected_blocks=[block1, block2],
-                        suggestions=suggestions,
-                        auto_fixable=overlap_duration < 30  # 小于30分钟可以自动修复
-                    )
-                    conflicts.append(conflict)
+                    conflicts.append(self._build_overlap_conflict(block1, block2))
 
         return conflicts
 
+    def _build_overlap_conflict(self, block1: TimeBlock, block2: TimeBlock) -> TimeBlockConflict:
+        """构建两个重叠时间块的冲突"""
+        # 计算重叠时间
+        overlap_start = max(block1.start_time, block2.start_time)
+        overlap_end = min(block1.end_time, block2.end_time)
+        overlap_duration = (overlap_end - overlap_start).total_seconds() / 60
+
+        severity = self._calculate_overlap_severity(overlap_duration)
+
+        suggestions = [
+            f"调整 {block1.block_type.value} 时间块到 {block2.start_time.strftime('%H:%m')} 之前",
+            f"调整 {block2.block_type.value} 时间块到 {block1.end_time.strftime('%H:%m')} 之后",
+            f"合并两个时间块为一个更大的时间块",
+            f"删除优先级较低的时间块"
+        ]
+
+        return TimeBlockConflict(
+            conflict_type=ConflictType.TIME_OVERLAP,
+            severity=severity,
+            message=f"{block1.block_type.value} 时间块与 {block2.block_type.value} 时间块重叠 {int(overlap_duration)} 分钟",
+            affected_blocks=[block1, block2],
+            suggestions=suggestions,
+            auto_fixable=overlap_duration < AUTO_FIX_MAX_OVERLAP_MINUTES  # 由自动修复方案顺延时间块解决
+        )
+
     def _detect_task_duration_conflicts(self, time_blocks: List[TimeBlock]) -> List[TimeBlockConflict]:
         """检测任务时长冲突"""
         conflicts = []
@@ -164,7 +373,7 @@ class ConflictResolutionService:
                         affected_blocks=[block],
                         affected_tasks=[task],
                         suggestions=suggestions,
-                        auto_fixable=overflow < 45
+                        auto_fixable=False  # 自动修复只处理时间重叠
                     )
                     conflicts.append(conflict)
 
@@ -184,7 +393,7 @@ class ConflictResolutionService:
                 if match_score < 0.5:  # 匹配分数低于0.5认为是严重不匹配
                     severity = ConflictSeverity.MEDIUM if match_score >= 0.3 else ConflictSeverity.HIGH
 
-                    category = TaskCategory.query.get(task.category_id) if task.category_id else None
+                    category = db.session.get(TaskCategory, task.category_id) if task.category_id else None
                     category_name = category.name if category else "未分类"
 
                     suggestions = [
@@ -237,49 +446,46 @@ class ConflictResolutionService:
                     affected_blocks=[block],
                     affected_tasks=block.scheduled_tasks,
                     suggestions=suggestions,
-                    auto_fixable=task_count <= 4
+                    auto_fixable=False
                 )
                 conflicts.append(conflict)
 
         return conflicts
 
-    def _detect_schedule_violations(self, time_blocks: List[TimeBlock]) -> List[TimeBlockConflict]:
-        """检测日程违规"""
-        conflicts = []
-
-        # 检查是否有连续工作时间过长
-        work_blocks = [block for block in time_blocks
-                      if block.block_type in [BlockType.RESEARCH, BlockType.GROWTH]]
-
-        if len(work_blocks) >= 3:
-            work_blocks.sort(key=lambda x: x.start_time)
-
-            for i in range(len(work_blocks) - 2):
-                # 检查连续3个工作时间块
-                block1, block2, block3 = work_blocks[i:i+3]
-
-                # 检查是否有足够休息
-                if (block2.start_time - block1.end_time).total_seconds() < 15 * 60:  # 少于15分钟休息
-                    total_work_time = (block3.end_time - block1.start_time).total_seconds() / 60
-
-                    if total_work_time > 180:  # 超过3小时连续工作
-                        suggestions = [
-                            f"在 {block1.end_time.strftime('%H:%m')} 后添加休息时间",
-                            f"将 {block2.block_type.value} 时间块推迟到 {block1.end_time + timedelta(minutes=15)}",
-                            f"拆分长时间工作块，添加休息间隙"
-                        ]
-
-                        conflict = TimeBlockConflict(
-                            conflict_type=ConflictType.SCHEDULE_VIOLATION,
-                            severity=ConflictSeverity.MEDIUM,
-                            message=f"连续工作 {int(total_work_time)} 分钟，缺少休息时间",
-                            affected_blocks=[block1, block2, block3],
-                            suggestions=suggestions,
-                            auto_fixable=True
-                        )
-                        conflicts.append(conflict)
-
-        return conflicts
+    def _detect_schedule_violations(self, time_blocks: List[TimeBlock],
+                                    policy: Optional[WorkStreakPolicy] = None) -> List[TimeBlockConflict]:
+        """检测日程违规：排序后单次遍历，每段超长的连续工作报告一次"""
+        policy = policy or WorkStreakPolicy()
+        work_blocks = sorted((block for block in time_blocks if block.block_type in WORK_BLOCK_TYPES),
+                             key=lambda block: (block.start_time, block.end_time, block.id))
+
+        work_streaks = WorkStreakTracker(policy)
+        streaks = [work_streaks.push(block.start_time, block.end_time, block) for block in work_blocks]
+        streaks.append(work_streaks.close())
+        return [self._build_work_streak_conflict(streak, policy) for streak in streaks if streak]
+
+    def _build_work_streak_conflict(self, streak: WorkStreak, policy: WorkStreakPolicy) -> TimeBlockConflict:
+        """构建一段超长连续工作的冲突，affected_blocks为该段全部时间块"""
+        blocks = streak.items
+        rest_minutes = int(policy.min_rest.total_seconds() / 60)
+        # 在最接近连续段中点的时间块结束后休息，两边的连续工作时间最均衡
+        middle = streak.start_time + (streak.end_time - streak.start_time) / 2
+        split_block = min(blocks[:-1], key=lambda block: abs(block.end_time - middle))
+
+        suggestions = [
+            f"在 {split_block.end_time.strftime('%H:%M')} 后添加至少 {rest_minutes} 分钟休息时间",
+            f"将 {split_block.end_time.strftime('%H:%M')} 之后的工作时间块推迟 {rest_minutes} 分钟",
+            f"拆分长时间工作块，添加休息间隙"
+        ]
+
+        return TimeBlockConflict(
+            conflict_type=ConflictType.SCHEDULE_VIOLATION,
+            severity=ConflictSeverity.MEDIUM,
+            message=f"连续工作 {streak.minutes} 分钟（{len(blocks)} 个时间块），缺少休息时间",
+            affected_blocks=blocks,
+            suggestions=suggestions,
+            auto_fixable=False
+        )
 
     def _calculate_overlap_severity(self, overlap_duration: float) -> str:
         """计算重叠严重程度"""
@@ -302,75 +508,168 @@ class ConflictResolutionService:
         }
         return priority_map.get(severity, 0)
 
-    def auto_fix_conflicts(self, conflicts: List[TimeBlockConflict]) -> List[Dict]:
-        """自动修复可修复的冲突"""
-        fixed_conflicts = []
-
-        for conflict in conflicts:
-            if conflict.auto_fixable and conflict.conflict_type in self.conflict_resolvers:
-                try:
-                    fix_result = self.conflict_resolvers[conflict.conflict_type](conflict)
-                    if fix_result.get('success'):
-                        fixed_conflicts.append({
-                            'conflict': conflict.to_dict(),
-                            'fix_result': fix_result,
-                            'message': f"自动修复成功: {conflict.message}"
-                        })
-                except Exception as e:
-                    fixed_conflicts.append({
-                        'conflict': conflict.to_dict(),
-                        'fix_result': {'success': False, 'error': str(e)},
-                        'message': f"自动修复失败: {conflict.message}"
-                    })
-
-        return fixed_conflicts
-
-    def _resolve_time_overlap(self, conflict: TimeBlockConflict) -> Dict:
-        """解决时间重叠冲突"""
-        if len(conflict.affected_blocks) != 2:
-            return {'success': False, 'error': '需要恰好2个时间块'}
-
-        block1, block2 = conflict.affected_blocks
-
-        # 简单策略：将较晚开始的时间块向后移动
-        if block1.start_time < block2.start_time:
-            earlier, later = block1, block2
-        else:
-            earlier, later = block2, block1
-
-        # 移动较晚的时间块
-        gap = later.start_time - earlier.end_time
-        if gap.total_seconds() < 0:  # 有重叠
-            later.start_time = earlier.end_time + timedelta(minutes=5)
-            later.end_time = later.start_time + timedelta(minutes=later.get_duration())
-
-            return {
-                'success': True,
-                'action': '调整时间块时间',
-                'details': f"将 {later.block_type.value} 时间块移动到 {later.start_time.strftime('%H:%m')}"
-            }
-
-        return {'success': False, 'error': '无重叠或已解决'}
-
-    def _resolve_task_duration(self, conflict: TimeBlockConflict) -> Dict:
-        """解决任务时长冲突"""
-        # 这里可以实现自动延长时间块或减少任务预估时间的逻辑
-        return {'success': False, 'error': '需要手动处理任务时长冲突'}
-
-    def _resolve_task_type_mismatch(self, conflict: TimeBlockConflict) -> Dict:
-        """解决任务类型不匹配"""
-        # 类型不匹配通常需要用户决定，不建议自动修复
-        return {'success': False, 'error': '任务类型不匹配需要用户确认'}
-
-    def _resolve_resource_overload(self, conflict: TimeBlockConflict) -> Dict:
-        """解决资源过载"""
-        # 可以实现自动移动部分任务到其他时间块
-        return {'success': False, 'error': '资源过载需要手动处理'}
-
-    def _resolve_schedule_violation(self, conflict: TimeBlockConflict) -> Dict:
-        """解决日程违规"""
-        # 可以自动添加休息时间块
-        return {'success': False, 'error': '日程违规需要手动处理'}
+    def plan_auto_fix(self, user_id: str, day: date_type) -> 'AutoFixPlan':
+        """为指定日期生成时间重叠的自动修复方案（只读，不修改任何时间块）"""
+        window_start = datetime.combine(day, time.min)
+        window_end = window_start + timedelta(days=1)
+
+        time_blocks = TimeBlock.query.filter(
+            TimeBlock.user_id == user_id,
+            TimeBlock.start_time < window_end,
+            TimeBlock.end_time > window_start
+        ).order_by(TimeBlock.start_time, TimeBlock.end_time, TimeBlock.id).all()
+
+        return self.build_auto_fix_plan(day, time_blocks)
+
+    def build_auto_fix_plan(self, day: date_type, time_blocks: List[TimeBlock]) -> 'AutoFixPlan':
+        """
+        计算整天的级联移动方案
+
+        按开始时间遍历，与已安排时间块重叠的时间块顺延到其中最晚结束时间之后（间隔5分钟），
+        被顺延的时间块若又与后面的时间块重叠，后面的时间块继续顺延。
+        以下时间块保持不动：前一天跨午夜延伸过来的、原本重叠不少于30分钟（需手动处理）的、
+        顺延后会越过午夜的；若顺延后与保持不动的时间块产生新的或更长的重叠，
+        就把该时间块也固定下来重新计算，直到方案不会让任何一对时间块的重叠变多
+        """
+        day_start = datetime.combine(day, time.min)
+        day_end = day_start + timedelta(days=1)
+        time_blocks = sorted(time_blocks, key=lambda block: (block.start_time, block.end_time, block.id))
+
+        original_starts = {block.id: block.start_time for block in time_blocks}
+        original_overlaps = self._overlap_minutes(time_blocks, original_starts)
+
+        pinned = {block.id for block in time_blocks if block.start_time < day_start}
+        for pair, minutes in original_overlaps.items():
+            if minutes >= AUTO_FIX_MAX_OVERLAP_MINUTES:
+                pinned.update(pair)
+
+        while True:
+            planned_starts = {}
+            latest_end = None
+            for block in time_blocks:
+                start_time = block.start_time
+                duration = block.end_time - block.start_time
+                if latest_end and start_time < latest_end and block.id not in pinned:
+                    shifted_start = latest_end + AUTO_FIX_GAP
+                    if shifted_start + duration <= day_end:
+                        start_time = shifted_start
+                planned_starts[block.id] = start_time
+                end_time = start_time + duration
+                latest_end = end_time if latest_end is None else max(latest_end, end_time)
+
+            planned_overlaps = self._overlap_minutes(time_blocks, planned_starts)
+            worse_pairs = [pair for pair, minutes in planned_overlaps.items()
+                           if minutes > original_overlaps.get(pair, 0)]
+            if not worse_pairs:
+                break
+
+            # 回退造成新重叠的移动，固定后重新计算
+            pinned.update(block_id for pair in worse_pairs for block_id in pair
+                          if planned_starts[block_id] != original_starts[block_id])
+
+        overlapped_ids = {pair[1] for pair in original_overlaps}
+        shifts = [
+            BlockShift(block, planned_starts[block.id],
+                       '消除时间重叠' if block.id in overlapped_ids else '顺延以避免产生新的重叠')
+            for block in time_blocks
+            if planned_starts[block.id] != block.start_time
+        ]
+
+        return AutoFixPlan(
+            day=day,
+            shifts=shifts,
+            unresolved=planned_overlaps,
+            resolved_count=sum(1 for pair in original_overlaps if pair not in planned_overlaps),
+            fingerprint=self._fingerprint(time_blocks)
+        )
+
+    def apply_auto_fix_plan(self, plan: 'AutoFixPlan'):
+        """在一个事务中应用修复方案，失败时整体回滚"""
+        try:
+            for shift in plan.shifts:
+                shift.block.start_time = shift.new_start_time
+                shift.block.end_time = shift.new_end_time
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _overlap_minutes(self, time_blocks: List[TimeBlock],
+                         starts: Dict[str, datetime]) -> Dict[Tuple[str, str], float]:
+        """给定开始时间下每对重叠时间块的重叠分钟数，键为(较早开始的时间块ID, 较晚开始的时间块ID)"""
+        placed = sorted(
+            ((starts[block.id], starts[block.id] + (block.end_time - block.start_time), block.id)
+             for block in time_blocks),
+        )
+        overlaps = {}
+        active = []
+        for start_time, end_time, block_id in placed:
+            active = [item for item in active if item[1] > start_time]
+            for _, other_end, other_id in active:
+                overlaps[(other_id, block_id)] = (min(end_time, other_end) - start_time).total_seconds() / 60
+            active.append((start_time, end_time, block_id))
+        return overlaps
+
+    def _fingerprint(self, time_blocks: List[TimeBlock]) -> str:
+        """时间块当前时间安排的指纹，应用方案前用于确认预览之后没有被修改"""
+        digest = hashlib.sha1()
+        for block in sorted(time_blocks, key=lambda b: b.id):
+            digest.update(f'{block.id}|{block.start_time.isoformat()}|{block.end_time.isoformat()};'.encode())
+        return digest.hexdigest()
+
+
+class BlockShift:
+    """修复方案中的一次时间块移动"""
+
+    def __init__(self, block: TimeBlock, new_start_time: datetime, reason: str):
+        self.block = block
+        # 记录原时间，应用后仍能返回修改前后的对比
+        self.old_start_time = block.start_time
+        self.old_end_time = block.end_time
+        self.new_start_time = new_start_time
+        self.new_end_time = new_start_time + (block.end_time - block.start_time)
+        self.reason = reason
+
+    def to_dict(self) -> Dict:
+        shift_minutes = int((self.new_start_time - self.old_start_time).total_seconds() / 60)
+        block_type = self.block.block_type.value
+        return {
+            'time_block_id': self.block.id,
+            'block_type': block_type,
+            'old_start_time': self.old_start_time.isoformat(),
+            'old_end_time': self.old_end_time.isoformat(),
+            'new_start_time': self.new_start_time.isoformat(),
+            'new_end_time': self.new_end_time.isoformat(),
+            'shift_minutes': shift_minutes,
+            'reason': self.reason,
+            'message': (f"将 {block_type} 时间块从 {self.old_start_time.strftime('%H:%M')} "
+                        f"顺延 {shift_minutes} 分钟到 {self.new_start_time.strftime('%H:%M')}")
+        }
+
+
+class AutoFixPlan:
+    """整天的时间重叠修复方案"""
+
+    def __init__(self, day: date_type, shifts: List[BlockShift], unresolved: Dict[Tuple[str, str], float],
+                 resolved_count: int, fingerprint: str):
+        self.day = day
+        self.shifts = shifts
+        self.unresolved = unresolved
+        self.resolved_count = resolved_count
+        self.fingerprint = fingerprint
+
+    def to_dict(self) -> Dict:
+        return {
+            'date': self.day.isoformat(),
+            'fingerprint': self.fingerprint,
+            'changes': [shift.to_dict() for shift in self.shifts],
+            'change_count': len(self.shifts),
+            'resolved_overlap_count': self.resolved_count,
+            'unresolved_overlaps': [
+                {'time_block_ids': list(pair), 'overlap_minutes': int(minutes)}
+                for pair, minutes in self.unresolved.items()
+            ]
+        }
 
 
 # 全局冲突解决服务实例
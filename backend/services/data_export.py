@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+用户数据导出
+按实体逐批从服务端游标（yield_per）读取行并序列化为NDJSON或CSV，由生成器流式输出，
+内存占用只与批大小有关，与历史数据量无关。
+
+每个实体按主键排序，断点续传使用 "实体:主键" 形式的游标（复合主键用逗号连接）：
+从游标实体中主键更大的行继续，之前的实体跳过。NDJSON每批输出后写一行checkpoint携带当前游标；
+CSV的主键列排在最前面，客户端用最后一行的主键拼出游标。
+"""
+
+import csv
+import io
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, tuple_
+
+from app import db
+from models.pomodoro_session import PomodoroSession
+from models.project import Project
+from models.tag import Tag
+from models.task import Task
+from models.task_category import TaskCategory
+from models.task_tags import task_tags
+from models.time_block import TimeBlock
+from models.time_block_template import TimeBlockTemplate
+from models.time_block_template_config import TimeBlockTemplateConfig
+from utils.response_utils import format_ndjson_line
+
+EXPORT_FORMAT_VERSION = 1
+EXPORT_FORMATS = ('ndjson', 'csv')
+# 每批从游标读取的行数，也是NDJSON写checkpoint的间隔
+EXPORT_BATCH_SIZE = 500
+
+
+class ExportError(ValueError):
+    """导出参数错误"""
+
+
+class ExportEntity:
+    """一类可导出的数据：表、主键列与限定到当前用户的查询条件"""
+
+    def __init__(self, name: str, table, key_columns: Sequence[str],
+                 owner: Callable[[str], Tuple[Optional[object], object]]):
+        self.name = name
+        self.table = table
+        self.key_columns = [table.c[column] for column in key_columns]
+        # 返回 (需要连接的父表或None, 过滤条件)
+        self.owner = owner
+
+    @property
+    def columns(self) -> List:
+        """主键列在前，其余列按表定义顺序"""
+        return self.key_columns + [column for column in self.table.columns if column not in self.key_columns]
+
+    def query(self, user_id: str, after: Optional[Sequence[str]] = None):
+        join_table, condition = self.owner(user_id)
+        statement = select(*self.columns)
+        if join_table is not None:
+            statement = statement.select_from(self.table.join(join_table))
+        statement = statement.where(condition)
+        if after is not None:
+            if len(self.key_columns) == 1:
+                statement = statement.where(self.key_columns[0] > after[0])
+            else:
+                statement = statement.where(tuple_(*self.key_columns) > tuple_(*after))
+        return statement.order_by(*self.key_columns)
+
+    def cursor(self, row) -> str:
+        return f'{self.name}:' + ','.join(str(row[index]) for index in range(len(self.key_columns)))
+
+
+def _owned_by(model) -> Callable[[str], Tuple[None, object]]:
+    return lambda user_id: (None, model.__table__.c.user_id == user_id)
+
+
+# 按依赖顺序排列，导入时可按同样的顺序写回
+ENTITIES: Tuple[ExportEntity, ...] = (
+    ExportEntity('projects', Project.__table__, ['id'], _owned_by(Project)),
+    ExportEntity('task_categories', TaskCategory.__table__, ['id'], _owned_by(TaskCategory)),
+    ExportEntity('tags', Tag.__table__, ['id'], _owned_by(Tag)),
+    ExportEntity('time_block_templates', TimeBlockTemplate.__table__, ['id'], _owned_by(TimeBlockTemplate)),
+    ExportEntity('time_block_template_configs', TimeBlockTemplateConfig.__table__, ['id'],
+                 lambda user_id: (TimeBlockTemplate.__table__, TimeBlockTemplate.__table__.c.user_id == user_id)),
+    ExportEntity('time_blocks', TimeBlock.__table__, ['id'], _owned_by(TimeBlock)),
+    ExportEntity('tasks', Task.__table__, ['id'], _owned_by(Task)),
+    ExportEntity('task_tags', task_tags, ['task_id', 'tag_id'],
+                 lambda user_id: (Task.__table__, Task.__table__.c.user_id == user_id)),
+    ExportEntity('pomodoro_sessions', PomodoroSession.__table__, ['id'], _owned_by(PomodoroSession)),
+)
+
+ENTITIES_BY_NAME = {entity.name: entity for entity in ENTITIES}
+ENTITY_NAMES = tuple(ENTITIES_BY_NAME)
+
+
+def _export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def parse_entities(value: Optional[str]) -> List[ExportEntity]:
+    """解析逗号分隔的实体列表，按导出顺序返回；为空时导出全部实体"""
+    if not value:
+        return list(ENTITIES)
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    invalid = sorted(names - set(ENTITY_NAMES))
+    if invalid:
+        raise ExportError(f"Invalid entities: {', '.join(invalid)}")
+    return [entity for entity in ENTITIES if entity.name in names]
+
+
+def parse_cursor(value: Optional[str], entities: List[ExportEntity]) -> Optional[Tuple[ExportEntity, List[str]]]:
+    """解析 "实体:主键" 游标"""
+    if not value:
+        return None
+    name, separator, key = value.partition(':')
+    entity = ENTITIES_BY_NAME.get(name)
+    if not separator or entity not in entities:
+        raise ExportError('Invalid cursor')
+    parts = key.split(',')
+    if len(parts) != len(entity.key_columns) or not all(parts):
+        raise ExportError('Invalid cursor')
+    return entity, parts
+
+
+class UserDataExport:
+    """一次导出：当前用户、实体列表与可选的续传游标"""
+
+    def __init__(self, user_id: str, entities: List[ExportEntity], cursor: Optional[str] = None,
+                 batch_size: Optional[int] = None):
+        self.user_id = user_id
+        self.entities = entities
+        self.resume = parse_cursor(cursor, entities)
+        self.cursor = cursor
+        self.batch_size = batch_size or EXPORT_BATCH_SIZE
+        self.counts: Dict[str, int] = {}
+
+    def batches(self) -> Iterator[Tuple[ExportEntity, List]]:
+        """按实体顺序逐批产出 (实体, 行列表)，行来自服务端游标"""
+        pending = list(self.entities)
+        after = None
+        if self.resume:
+            resume_entity, after = self.resume
+            pending = pending[pending.index(resume_entity):]
+
+        for entity in pending:
+            self.counts[entity.name] = 0
+            result = db.session.execute(
+                entity.query(self.user_id, after).execution_options(yield_per=self.batch_size)
+            )
+            after = None
+            for partition in result.partitions():
+                self.counts[entity.name] += len(partition)
+                yield entity, partition
+
+    def ndjson(self) -> Iterator[str]:
+        """NDJSON：header行，record行与每批之后的checkpoint行，最后是summary行"""
+        yield format_ndjson_line({
+            'type': 'header',
+            'format_version': EXPORT_FORMAT_VERSION,
+            'user_id': self.user_id,
+            'entities': [entity.name for entity in self.entities],
+            'resumed_from': self.cursor,
+            'exported_at': datetime.utcnow().isoformat()
+        })
+        for entity, rows in self.batches():
+            names = [column.name for column in entity.columns]
+            lines = [
+                format_ndjson_line({
+                    'type': 'record',
+                    'entity': entity.name,
+                    'data': {name: _export_value(value) for name, value in zip(names, row)}
+                })
+                for row in rows
+            ]
+            self.cursor = entity.cursor(rows[-1])
+            lines.append(format_ndjson_line({'type': 'checkpoint', 'cursor': self.cursor}))
+            yield ''.join(lines)
+        yield format_ndjson_line({'type': 'summary', 'counts': self.counts, 'complete': True})
+
+    def csv(self) -> Iterator[str]:
+        """CSV：单个实体，首行为列名（主键列在前）"""
+        entity = self.entities[0]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column.name for column in entity.columns])
+        for _, rows in self.batches():
+            writer.writerows([
+                ['' if value is None else _export_value(value) for value in row]
+                for row in rows
+            ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # 没有数据时也要输出列名
+        if buffer.tell():
+            yield buffer.getvalue()
+
+
+def gzip_stream(chunks: Iterable[str]) -> Iterator[bytes]:
+    """边生成边gzip压缩，每个块SYNC_FLUSH一次，客户端可以及时解压已收到的部分"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
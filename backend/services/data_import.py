@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+批量导入
+从NDJSON或CSV逐行读取任务、时间块与番茄钟会话，按块校验后用Core批量插入，每块一个事务。
+
+- 分类、项目与标签按名称解析为ID，映射在导入开始时各查询一次并保存在内存中，未知名称随所在块一起创建
+- 任务可带 ref（原系统中的ID），番茄钟会话用 task_ref 引用本次导入中此前出现的任务，或用 task_id 引用已有任务
+- 时间块与已有时间块及本次导入的时间块不能重叠，与单个创建接口一致
+- 每块处理完产出一个progress事件，出错的行产出error事件（超过上限后只计数）
+"""
+
+import csv
+import io
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from models import counters
+from models.pomodoro_session import SessionStatus, SessionType
+from models.project import Project
+from models.tag import Tag
+from models.task import Task, TaskType, TaskStatus, PriorityLevel
+from models.task_category import TaskCategory
+from models.task_tags import task_tags
+from models.time_block import TimeBlock, BlockType, duration_between
+from services.capacity_index import capacity_index
+from services.incremental_conflicts import incremental_conflict_checker
+from services.search_index import search_index
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+IMPORT_ENTITIES = ('tasks', 'time_blocks', 'pomodoro_sessions')
+# 每块的行数，也是一个事务写入的行数
+IMPORT_CHUNK_SIZE = 5000
+# 最多逐行报告的错误数，超过后只计数
+MAX_REPORTED_ERRORS = 1000
+# 按名称自动创建的分类与项目使用的颜色
+DEFAULT_COLOR = '#808080'
+
+
+class DataImportError(ValueError):
+    """导入参数错误"""
+
+
+class RowError(ValueError):
+    """单行数据错误"""
+
+
+def read_records(stream, import_format: str) -> Iterator[Tuple[int, Any]]:
+    """逐行读取二进制流，产出 (行号, 记录)：NDJSON为原始行，CSV为去掉空值的字典"""
+    if import_format == 'csv':
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, '')}
+        return
+
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8-sig'), 1):
+        if line.strip():
+            yield line_number, line
+
+
+def _text(record: Dict[str, Any], field: str, max_length: int = None, required: bool = False) -> Optional[str]:
+    value = record.get(field)
+    if value is None or value == '':
+        if required:
+            raise RowError(f'Missing required field: {field}')
+        return None
+    value = str(value)
+    if max_length and len(value) > max_length:
+        raise RowError(f'{field} must be at most {max_length} characters')
+    return value
+
+
+def _datetime(record: Dict[str, Any], field: str, required: bool = False) -> Optional[datetime]:
+    value = record.get(field)
+    if value is None or value == '':
+        if required:
+            raise RowError(f'Missing required field: {field}')
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise RowError(f'Invalid date/time format: {field}')
+    # 数据库中保存不带时区的UTC时间
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _enum(enum_class, record: Dict[str, Any], field: str, default: Enum = None) -> Enum:
+    value = record.get(field)
+    if value is None or value == '':
+        if default is None:
+            raise RowError(f'Missing required field: {field}')
+        return default
+    try:
+        return enum_class(str(value).upper())
+    except ValueError:
+        raise RowError(f'Invalid {field}: {value}')
+
+
+def _integer(record: Dict[str, Any], field: str, default: Optional[int], minimum: int = 0) -> Optional[int]:
+    value = record.get(field)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RowError(f'Invalid {field}: {value}')
+    if value < minimum:
+        raise RowError(f'{field} must be at least {minimum}')
+    return value
+
+
+def _boolean(record: Dict[str, Any], field: str) -> bool:
+    value = record.get(field)
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def _names(value) -> List[str]:
+    """标签列表：NDJSON中为数组，CSV中为逗号分隔的字符串"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise RowError('tags must be a list or a comma separated string')
+    return list(dict.fromkeys(str(name).strip() for name in value if str(name).strip()))
+
+
+class _NameMap:
+    """用户的分类、项目或标签：名称到ID的内存映射，未知名称登记后随当前块一起插入"""
+
+    def __init__(self, label: str, model, max_length: int, defaults: Dict[str, Any]):
+        self.label = label
+        self.table = model.__table__
+        self.max_length = max_length
+        self.defaults = defaults
+        self.ids_by_name: Optional[Dict[str, str]] = None
+        self.ids = set()
+        self.pending: List[Dict[str, Any]] = []
+        self.created = 0
+
+    def load(self, user_id: str):
+        if self.ids_by_name is not None:
+            return
+        self.ids_by_name = {}
+        rows = db.session.execute(
+            select(self.table.c.id, self.table.c.name)
+            .where(self.table.c.user_id == user_id)
+            .order_by(self.table.c.created_at)
+        )
+        for item_id, name in rows:
+            self.ids_by_name.setdefault(name, item_id)
+            self.ids.add(item_id)
+
+    def check_id(self, item_id: str) -> str:
+        if item_id not in self.ids:
+            raise RowError(f'{self.label} not found: {item_id}')
+        return item_id
+
+    def check_name(self, name: str) -> str:
+        name = name.strip()
+        if len(name) > self.max_length:
+            raise RowError(f'{self.label} name must be at most {self.max_length} characters')
+        return name
+
+    def get_or_create(self, user_id: str, name: str, now: datetime) -> str:
+        """调用前需已通过check_name"""
+        item_id = self.ids_by_name.get(name)
+        if item_id is None:
+            item_id = str(uuid.uuid4())
+            self.ids_by_name[name] = item_id
+            self.ids.add(item_id)
+            self.pending.append({'id': item_id, 'name': name, 'user_id': user_id,
+                                 'created_at': now, 'updated_at': now, **self.defaults})
+        return item_id
+
+    def flush(self):
+        if self.pending:
+            db.session.execute(self.table.insert(), self.pending)
+            self.created += len(self.pending)
+            self.pending = []
+
+    def reset(self):
+        """块写入失败时丢弃映射，下一块重新从数据库加载"""
+        self.ids_by_name = None
+        self.ids = set()
+        self.pending = []
+
+
+class _Chunk:
+    """一个块中校验通过、待插入的行"""
+
+    def __init__(self):
+        self.tasks: List[Dict[str, Any]] = []
+        self.task_tags: List[Dict[str, Any]] = []
+        self.time_blocks: List[Tuple[int, Dict[str, Any]]] = []
+        # (行号, 行, 是否通过task_ref引用本次导入的任务)
+        self.pomodoro_sessions: List[Tuple[int, Dict[str, Any], bool]] = []
+        self.refs: List[str] = []
+        self.errors: List[Tuple[int, str]] = []
+
+
+class BulkImporter:
+    """一次导入：逐块校验、解析名称并批量插入，产出进度事件"""
+
+    def __init__(self, user_id: str, default_entity: Optional[str] = None, chunk_size: Optional[int] = None):
+        if default_entity is not None and default_entity not in IMPORT_ENTITIES:
+            raise DataImportError(f"entity must be one of: {', '.join(IMPORT_ENTITIES)}")
+        self.user_id = user_id
+        self.default_entity = default_entity
+        self.chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+        self.categories = _NameMap('Category', TaskCategory, 50, {'color': DEFAULT_COLOR, 'icon': None,
+                                                                   'description': None})
+        self.projects = _NameMap('Project', Project, 100, {'color': DEFAULT_COLOR, 'description': None})
+        self.tags = _NameMap('Tag', Tag, 50, {'color': None})
+        self.task_refs: Dict[str, str] = {}
+        self.rows = 0
+        self.imported = {entity: 0 for entity in IMPORT_ENTITIES}
+        self.error_count = 0
+        self.reported_errors = 0
+
+    def run(self, records: Iterable[Tuple[int, Any]]) -> Iterator[Dict[str, Any]]:
+        """逐块导入，产出 error、progress 与最后的 summary 事件"""
+        started = time.perf_counter()
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                break
+            errors = self._import_chunk(chunk)
+            self.rows += len(chunk)
+            self.error_count += len(errors)
+            for line, message in errors:
+                if self.reported_errors >= MAX_REPORTED_ERRORS:
+                    break
+                self.reported_errors += 1
+                yield {'type': 'error', 'line': line, 'error': message}
+            yield {
+                'type': 'progress',
+                'rows': self.rows,
+                'imported': dict(self.imported),
+                'errors': self.error_count,
+                'elapsed_seconds': round(time.perf_counter() - started, 3)
+            }
+
+        elapsed = time.perf_counter() - started
+        yield {
+            'type': 'summary',
+            'rows': self.rows,
+            'imported': dict(self.imported),
+            'created': {'task_categories': self.categories.created, 'projects': self.projects.created,
+                        'tags': self.tags.created},
+            'errors': self.error_count,
+            'errors_reported': self.reported_errors,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': int(self.rows / elapsed) if elapsed > 0 else None,
+            'complete': True
+        }
+
+    def _import_chunk(self, records: List[Tuple[int, Any]]) -> List[Tuple[int, str]]:
+        """校验并写入一个块，返回按行号排序的错误"""
+        for names in (self.categories, self.projects, self.tags):
+            names.load(self.user_id)
+
+        chunk = _Chunk()
+        now = datetime.utcnow()
+        builders = {
+            'tasks': self._add_task,
+            'time_blocks': self._add_time_block,
+            'pomodoro_sessions': self._add_session
+        }
+        for line, record in records:
+            try:
+                entity, record = self._parse(record)
+                builders[entity](chunk, line, record, now)
+            except RowError as e:
+                chunk.errors.append((line, str(e)))
+
+        time_blocks = self._without_overlaps(chunk)
+        sessions = self._with_known_tasks(chunk)
+
+        try:
+            for names in (self.categories, self.projects, self.tags):
+                names.flush()
+            connection = db.session.connection()
+            if time_blocks:
+                connection.execute(TimeBlock.__table__.insert(), time_blocks)
+            search_index.bulk_insert(connection, 'task', chunk.tasks)
+            counters.add_task_rows(connection, chunk.tasks)
+            if chunk.task_tags:
+                connection.execute(task_tags.insert(), chunk.task_tags)
+            search_index.bulk_insert(connection, 'session', sessions)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            for names in (self.categories, self.projects, self.tags):
+                names.reset()
+            for ref in chunk.refs:
+                self.task_refs.pop(ref, None)
+            message = f'Failed to save chunk: {e.__class__.__name__}'
+            failed = {line for line, _ in chunk.errors}
+            return sorted(chunk.errors + [(line, message) for line, _ in records if line not in failed])
+
+        # 集合插入不经过会话事件，每块提交后相关缓存整体失效一次
+        capacity_index.invalidate_user(self.user_id)
+        incremental_conflict_checker.invalidate_user(self.user_id)
+        self.imported['tasks'] += len(chunk.tasks)
+        self.imported['time_blocks'] += len(time_blocks)
+        self.imported['pomodoro_sessions'] += len(sessions)
+        return sorted(chunk.errors)
+
+    def _parse(self, record) -> Tuple[str, Dict[str, Any]]:
+        if isinstance(record, str):
+            try:
+                record = json.loads(record)
+            except ValueError:
+                raise RowError('Invalid JSON')
+            if not isinstance(record, dict):
+                raise RowError('Each line must be a JSON object')
+        entity = record.get('entity') or self.default_entity
+        if entity is None:
+            raise RowError('Missing required field: entity')
+        if entity not in IMPORT_ENTITIES:
+            raise RowError(f'Invalid entity: {entity}')
+        return entity, record
+
+    def _add_task(self, chunk: _Chunk, line: int, record: Dict[str, Any], now: datetime):
+        title = _text(record, 'title', 200, required=True)
+        planned_start_time = _datetime(record, 'planned_start_time', required=True)
+        estimated_pomodoros = _integer(record, 'estimated_pomodoros', 1, minimum=1)
+        task_type = _enum(TaskType, record, 'task_type', TaskType.FLEXIBLE)
+        status = _enum(TaskStatus, record, 'status', TaskStatus.PENDING)
+        priority = _enum(PriorityLevel, record, 'priority', PriorityLevel.MEDIUM)
+        created_at = _datetime(record, 'created_at') or now
+
+        ref = _text(record, 'ref')
+        if ref is not None and ref in self.task_refs:
+            raise RowError(f'Duplicate ref: {ref}')
+
+        # 先完成所有校验，再登记需要新建的分类、项目与标签
+        category_id = _text(record, 'category_id')
+        category = None
+        if category_id:
+            self.categories.check_id(category_id)
+        else:
+            category = self.categories.check_name(_text(record, 'category', required=True))
+        project_id = _text(record, 'project_id')
+        project = _text(record, 'project')
+        if project_id:
+            self.projects.check_id(project_id)
+            project = None
+        elif project is not None:
+            project = self.projects.check_name(project)
+        tags = [self.tags.check_name(name) for name in _names(record.get('tags'))]
+
+        if category is not None:
+            category_id = self.categories.get_or_create(self.user_id, category, now)
+        if project is not None:
+            project_id = self.projects.get_or_create(self.user_id, project, now)
+
+        task_id = str(uuid.uuid4())
+        chunk.tasks.append({
+            'id': task_id,
+            'title': title,
+            'description': _text(record, 'description'),
+            'user_id': self.user_id,
+            'planned_start_time': planned_start_time,
+            'estimated_pomodoros': estimated_pomodoros,
+            'task_type': task_type,
+            'category_id': category_id,
+            'scheduled_time_block_id': None,
+            'status': status,
+            'priority': priority,
+            'project_id': project_id,
+            'created_at': created_at,
+            'updated_at': created_at
+        })
+        chunk.task_tags.extend(
+            {'task_id': task_id, 'tag_id': self.tags.get_or_create(self.user_id, name, now)} for name in tags
+        )
+        if ref is not None:
+            self.task_refs[ref] = task_id
+            chunk.refs.append(ref)
+
+    def _add_time_block(self, chunk: _Chunk, line: int, record: Dict[str, Any], now: datetime):
+        start_time = _datetime(record, 'start_time', required=True)
+        end_time = _datetime(record, 'end_time', required=True)
+        if start_time >= end_time:
+            raise RowError('Start time must be before end time')
+        date = _datetime(record, 'date') or start_time
+        created_at = _datetime(record, 'created_at') or now
+
+        chunk.time_blocks.append((line, {
+            'id': str(uuid.uuid4()),
+            'user_id': self.user_id,
+            'date': date.replace(hour=0, minute=0, second=0, microsecond=0),
+            'start_time': start_time,
+            'end_time': end_time,
+            'block_type': _enum(BlockType, record, 'block_type'),
+            'color': _text(record, 'color', 7) or DEFAULT_COLOR,
+            'is_recurring': _boolean(record, 'is_recurring'),
+            'recurrence_pattern': _text(record, 'recurrence_pattern', 100),
+            'duration_minutes': duration_between(start_time, end_time),
+            'template_id': None,
+            'created_at': created_at,
+            'updated_at': created_at
+        }))
+
+    def _add_session(self, chunk: _Chunk, line: int, record: Dict[str, Any], now: datetime):
+        task_ref = _text(record, 'task_ref')
+        if task_ref is not None:
+            task_id = self.task_refs.get(task_ref)
+            if task_id is None:
+                raise RowError(f'Unknown task_ref: {task_ref}')
+        else:
+            task_id = _text(record, 'task_id', required=True)
+
+        start_time = _datetime(record, 'start_time', required=True)
+        end_time = _datetime(record, 'end_time')
+        if end_time is not None and end_time < start_time:
+            raise RowError('End time must not be before start time')
+        actual_duration = _integer(record, 'actual_duration', None)
+        if actual_duration is None and end_time is not None:
+            actual_duration = duration_between(start_time, end_time)
+        created_at = _datetime(record, 'created_at') or now
+
+        chunk.pomodoro_sessions.append((line, {
+            'id': str(uuid.uuid4()),
+            'task_id': task_id,
+            'user_id': self.user_id,
+            'start_time': start_time,
+            'end_time': end_time,
+            'planned_duration': _integer(record, 'planned_duration', 25, minimum=1),
+            'actual_duration': actual_duration,
+            'status': _enum(SessionStatus, record, 'status', SessionStatus.PLANNED),
+            'session_type': _enum(SessionType, record, 'session_type', SessionType.FOCUS),
+            'completion_summary': _text(record, 'completion_summary'),
+            'interruption_reason': _text(record, 'interruption_reason'),
+            'created_at': created_at,
+            'updated_at': created_at
+        }, task_ref is not None))
+
+    def _without_overlaps(self, chunk: _Chunk) -> List[Dict[str, Any]]:
+        """一次查询取出块中涉及日期的已有时间块，在内存中检查重叠"""
+        if not chunk.time_blocks:
+            return []
+        table = TimeBlock.__table__
+        dates = {row['date'] for _, row in chunk.time_blocks}
+        intervals: Dict[datetime, List[Tuple[datetime, datetime]]] = {date: [] for date in dates}
+        for date, start_time, end_time in db.session.execute(
+            select(table.c.date, table.c.start_time, table.c.end_time)
+            .where(table.c.user_id == self.user_id, table.c.date.in_(dates))
+        ):
+            intervals[date].append((start_time, end_time))
+
+        accepted = []
+        for line, row in chunk.time_blocks:
+            day = intervals[row['date']]
+            if any(start_time < row['end_time'] and end_time > row['start_time'] for start_time, end_time in day):
+                chunk.errors.append((line, 'Time block overlaps with existing blocks'))
+                continue
+            day.append((row['start_time'], row['end_time']))
+            accepted.append(row)
+        return accepted
+
+    def _with_known_tasks(self, chunk: _Chunk) -> List[Dict[str, Any]]:
+        """一次查询确认会话引用的已有任务属于当前用户"""
+        if not chunk.pomodoro_sessions:
+            return []
+        referenced = {row['task_id'] for _, row, by_ref in chunk.pomodoro_sessions if not by_ref}
+        known = set()
+        if referenced:
+            known = set(db.session.scalars(
+                select(Task.id).where(Task.user_id == self.user_id, Task.id.in_(referenced))
+            ))
+
+        accepted = []
+        for line, row, by_ref in chunk.pomodoro_sessions:
+            if not by_ref and row['task_id'] not in known:
+                chunk.errors.append((line, f"Task not found: {row['task_id']}"))
+                continue
+            accepted.append(row)
+        return accepted
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+时间块冲突增量复查
+按 (用户, 日期) 缓存当天的冲突快照（冲突键 -> 冲突）及工作时间块的开始时间顺序，
+拖拽修改一个时间块或任务后只重新检测受影响的部分：
+该时间块与其重叠的相邻时间块、它自身排程的任务、以及成员有变化的连续工作段
+（连续段在内存中的工作时间块序列上重新合并，不访问数据库）。
+
+快照带版本号，复查结果只返回自客户端持有的版本以来新增和移除的冲突。
+版本号来自其他进程、快照已过期或历史已被淘汰时退回整天检测并返回完整冲突列表。
+其他进程或未报告的修改通过TTL过期感知。
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import date as date_type, datetime, time as time_of_day, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import current_app
+from sqlalchemy.orm import selectinload
+
+from models import db
+from models.task import Task
+from models.time_block import TimeBlock
+
+# 冲突检测服务依赖numpy，只在首次检测时导入，避免拖慢应用启动
+if TYPE_CHECKING:
+    from services.conflict_resolution import TimeBlockConflict, WorkStreakPolicy
+
+DEFAULT_TTL = 300
+# 每个进程最多缓存的 (用户, 日期) 快照数
+MAX_CACHED_DAYS = 2048
+# 每个快照保留的版本变化记录数，客户端版本落后更多时返回完整列表
+HISTORY_SIZE = 50
+
+DayKey = Tuple[str, date_type]
+# (开始时间, 结束时间, 时间块ID)
+WorkEntry = Tuple[datetime, datetime, str]
+
+
+class DayConflictState:
+    """一个用户一天的冲突快照"""
+
+    def __init__(self, conflicts: Iterable['TimeBlockConflict'], work_sequence: List[WorkEntry]):
+        self.state_id = uuid.uuid4().hex[:12]
+        self.version = 0
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.conflicts: Dict[str, Dict] = {}
+        self.block_keys: Dict[str, Set[str]] = {}
+        self.task_keys: Dict[str, Set[str]] = {}
+        self.work_sequence = work_sequence
+        # (变化后的版本号, 新增的冲突键, 移除的冲突键)
+        self.history = deque(maxlen=HISTORY_SIZE)
+
+        for conflict in conflicts:
+            self.add(conflict.to_dict())
+
+    @property
+    def token(self) -> str:
+        return f'{self.state_id}.{self.version}'
+
+    def parse_version(self, token: Optional[str]) -> Optional[int]:
+        """客户端版本号属于本快照且变化记录仍在时返回版本序号，否则返回None"""
+        if not token or '.' not in token:
+            return None
+        state_id, _, version = token.partition('.')
+        if state_id != self.state_id or not version.isdigit():
+            return None
+
+        version = int(version)
+        oldest = self.history[0][0] - 1 if self.history else self.version
+        return version if oldest <= version <= self.version else None
+
+    def add(self, conflict: Dict):
+        key = conflict['key']
+        self.conflicts[key] = conflict
+        for block in conflict['affected_blocks']:
+            self.block_keys.setdefault(block['id'], set()).add(key)
+        for task in conflict['affected_tasks']:
+            self.task_keys.setdefault(task['id'], set()).add(key)
+
+    def remove(self, key: str):
+        conflict = self.conflicts.pop(key, None)
+        if conflict is None:
+            return
+        for block in conflict['affected_blocks']:
+            self.block_keys.get(block['id'], set()).discard(key)
+        for task in conflict['affected_tasks']:
+            self.task_keys.get(task['id'], set()).discard(key)
+
+    def keys_for_blocks(self, block_ids: Iterable[str]) -> Set[str]:
+        keys = set()
+        for block_id in block_ids:
+            keys.update(self.block_keys.get(block_id, ()))
+        return keys
+
+    def blocks_for_tasks(self, task_ids: Iterable[str]) -> Set[str]:
+        """之前的冲突中涉及这些任务的时间块（任务被移出时间块后仍需复查原时间块）"""
+        return {
+            block['id']
+            for task_id in task_ids
+            for key in self.task_keys.get(task_id, ())
+            for block in self.conflicts[key]['affected_blocks']
+        }
+
+    def changes_since(self, version: int) -> Tuple[Set[str], Set[str]]:
+        """自指定版本以来 (仍存在的新增冲突键, 移除的冲突键)"""
+        added, removed = set(), set()
+        for entry_version, entry_added, entry_removed in self.history:
+            if entry_version > version:
+                added.update(entry_added)
+                removed.update(entry_removed)
+        return {key for key in added if key in self.conflicts}, removed
+
+    def sorted_conflicts(self, keys: Optional[Iterable[str]] = None) -> List[Dict]:
+        conflicts = self.conflicts.values() if keys is None else (self.conflicts[key] for key in keys)
+        return sorted(conflicts, key=lambda c: (-_SEVERITY_PRIORITY.get(c['severity'], 0), c['key']))
+
+
+# 键为 ConflictSeverity 的取值
+_SEVERITY_PRIORITY = {
+    'critical': 4,
+    'high': 3,
+    'medium': 2,
+    'low': 1
+}
+
+
+class ConflictDelta:
+    """一次复查的结果"""
+
+    def __init__(self, state: DayConflictState, day: date_type, full: bool,
+                 added: Iterable[str] = (), removed: Iterable[str] = ()):
+        self.state = state
+        self.day = day
+        self.full = full
+        self.added = state.sorted_conflicts(added)
+        self.removed = sorted(removed)
+
+    def to_dict(self, compact: bool = False) -> Dict:
+        """compact时added / conflicts只引用ID，涉及的时间块与任务放入blocks / tasks"""
+        conflicts = self.state.conflicts.values()
+        severity_summary = {severity: 0 for severity in ('critical', 'high', 'medium', 'low')}
+        for conflict in conflicts:
+            if conflict['severity'] in severity_summary:
+                severity_summary[conflict['severity']] += 1
+
+        result = {
+            'date': self.day.isoformat(),
+            'version': self.state.token,
+            'full': self.full,
+            'added': self.added,
+            'removed': self.removed,
+            'conflict_count': len(self.state.conflicts),
+            'auto_fixable_count': sum(1 for conflict in conflicts if conflict['auto_fixable']),
+            'severity_summary': severity_summary
+        }
+        if self.full:
+            result['conflicts'] = self.state.sorted_conflicts()
+
+        if compact:
+            from services.conflict_resolution import normalize_conflict_dicts
+            name = 'conflicts' if self.full else 'added'
+            normalized = normalize_conflict_dicts(result[name])
+            result.update({name: normalized['conflicts'], 'blocks': normalized['blocks'],
+                           'tasks': normalized['tasks']})
+        return result
+
+
+class IncrementalConflictChecker:
+    """按 (用户, 日期) 缓存冲突快照并增量复查"""
+
+    def __init__(self):
+        self._days: 'OrderedDict[DayKey, DayConflictState]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """绑定Flask应用（每个应用可能使用不同的数据库，清空已有快照）"""
+        app.extensions['incremental_conflict_checker'] = self
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+
+    def invalidate_user(self, user_id: str):
+        """丢弃用户的所有冲突快照，之后的复查退回整天检测"""
+        with self._lock:
+            for key in [key for key in self._days if key[0] == user_id]:
+                del self._days[key]
+
+    def full_check(self, user_id: str, day: date_type) -> Tuple[List['TimeBlockConflict'], str]:
+        """整天检测冲突并保存快照，返回 (冲突列表, 版本号)"""
+        conflicts, state = self._rebuild(user_id, day)
+        return conflicts, state.token
+
+    def _rebuild(self, user_id: str, day: date_type) -> Tuple[List['TimeBlockConflict'], DayConflictState]:
+        from services.conflict_resolution import conflict_resolution_service
+        conflicts = conflict_resolution_service.detect_conflicts(user_id, datetime.combine(day, time_of_day.min))
+        state = DayConflictState(conflicts, self._load_work_sequence(user_id, day))
+        self._store((user_id, day), state)
+        return conflicts, state
+
+    def recheck(self, user_id: str, day: date_type, since: Optional[str],
+                block_ids: Iterable[str] = (), task_ids: Iterable[str] = ()) -> ConflictDelta:
+        """
+        时间块或任务修改后增量复查，返回自客户端版本since以来的冲突变化
+
+        block_ids为被修改（移动、改时长/类型、删除）的时间块，task_ids为被修改（排程、改预估）的任务；
+        无法增量时（快照缺失、过期或版本不匹配）返回full=True的完整结果
+        """
+        state = self._get((user_id, day))
+        since_version = state.parse_version(since) if state else None
+        if since_version is None:
+            _, state = self._rebuild(user_id, day)
+            return ConflictDelta(state, day, full=True)
+
+        with state.lock:
+            affected_ids = set(block_ids)
+            task_ids = list(task_ids)
+            if task_ids:
+                affected_ids.update(state.blocks_for_tasks(task_ids))
+                rows = db.session.query(Task.scheduled_time_block_id).filter(
+                    Task.id.in_(task_ids),
+                    Task.user_id == user_id
+                ).all()
+                affected_ids.update(block_id for block_id, in rows if block_id)
+
+            added, removed = self._apply_changes(state, user_id, day, affected_ids)
+            state.version += 1
+            state.history.append((state.version, frozenset(added), frozenset(removed)))
+
+            added, removed = state.changes_since(since_version)
+            return ConflictDelta(state, day, full=False, added=added, removed=removed)
+
+    def _apply_changes(self, state: DayConflictState, user_id: str, day: date_type,
+                       affected_ids: Set[str]) -> Tuple[Set[str], Set[str]]:
+        """重新检测受影响的部分并更新快照，返回 (新增或内容变化的冲突键, 移除或内容变化的冲突键)"""
+        from services.conflict_resolution import conflict_resolution_service
+        window_start = datetime.combine(day, time_of_day.min)
+        window_end = window_start + timedelta(days=1)
+
+        blocks = {}
+        if affected_ids:
+            blocks = {
+                block.id: block
+                for block in TimeBlock.query.options(selectinload(TimeBlock.scheduled_tasks)).filter(
+                    TimeBlock.id.in_(affected_ids),
+                    TimeBlock.user_id == user_id,
+                    TimeBlock.start_time < window_end,
+                    TimeBlock.end_time > window_start
+                )
+            }
+
+        stale_keys = state.keys_for_blocks(affected_ids)
+        new_conflicts: List['TimeBlockConflict'] = []
+
+        # 1. 时间重叠：只与时间上相交的相邻时间块比较，冲突归属于较晚开始的时间块所在日期
+        seen_pairs = set()
+        for block in blocks.values():
+            neighbors = TimeBlock.query.filter(
+                TimeBlock.user_id == user_id,
+                TimeBlock.id != block.id,
+                TimeBlock.start_time < block.end_time,
+                TimeBlock.end_time > block.start_time
+            ).all()
+            for neighbor in neighbors:
+                first, second = sorted((block, neighbor), key=lambda b: (b.start_time, b.end_time, b.id))
+                if (first.id, second.id) in seen_pairs or not window_start <= second.start_time < window_end:
+                    continue
+                seen_pairs.add((first.id, second.id))
+                new_conflicts.append(conflict_resolution_service._build_overlap_conflict(first, second))
+
+        # 2~4. 任务时长、任务类型、资源过载：只检查本身排程的任务
+        in_window = [block for block in blocks.values() if block.start_time >= window_start]
+        new_conflicts.extend(conflict_resolution_service._detect_task_duration_conflicts(in_window))
+        new_conflicts.extend(conflict_resolution_service._detect_task_type_mismatches(in_window))
+        new_conflicts.extend(conflict_resolution_service._detect_resource_overloads(in_window))
+
+        # 5. 连续工作：更新工作时间块序列后重新合并连续段，只为变化的连续段访问数据库
+        stale_streak_keys, new_streaks = self._recheck_work_streaks(
+            state, affected_ids, blocks, window_start, conflict_resolution_service.get_work_streak_policy(user_id)
+        )
+        stale_keys |= stale_streak_keys
+        new_conflicts.extend(new_streaks)
+
+        fresh = {conflict.key: conflict for conflict in new_conflicts}
+        added, removed = set(), set()
+        for key in stale_keys:
+            old = state.conflicts[key]
+            conflict = fresh.get(key)
+            if conflict is None or (conflict.severity, conflict.message) != (old['severity'], old['message']):
+                removed.add(key)
+            state.remove(key)
+        for key, conflict in fresh.items():
+            if key in removed or key not in stale_keys:
+                added.add(key)
+            state.add(conflict.to_dict())
+        return added, removed
+
+    def _recheck_work_streaks(self, state: DayConflictState, affected_ids: Set[str],
+                              blocks: Dict[str, TimeBlock], window_start: datetime,
+                              policy: 'WorkStreakPolicy') -> Tuple[Set[str], List['TimeBlockConflict']]:
+        """返回 (需要清除的连续工作冲突键, 重新构建的连续工作冲突)"""
+        from services.conflict_resolution import (
+            ConflictType, WORK_BLOCK_TYPES, WorkStreak, WorkStreakTracker, conflict_key, conflict_resolution_service
+        )
+        moved_work = [block for block in blocks.values() if block.block_type in WORK_BLOCK_TYPES]
+        if not moved_work and not any(entry[2] in affected_ids for entry in state.work_sequence):
+            return set(), []
+
+        sequence = [entry for entry in state.work_sequence if entry[2] not in affected_ids]
+        sequence.extend((block.start_time, block.end_time, block.id) for block in moved_work)
+        sequence.sort()
+        state.work_sequence = sequence
+
+        # 在内存中按时间重新合并当天的连续段（不访问数据库），只为成员有变化的段重建冲突
+        work_streaks = WorkStreakTracker(policy)
+        streaks = [work_streaks.push(start_time, end_time, block_id) for start_time, end_time, block_id in sequence]
+        streaks.append(work_streaks.close())
+        current = {
+            conflict_key(ConflictType.SCHEDULE_VIOLATION, streak.items): streak
+            for streak in streaks if streak and streak.start_time >= window_start
+        }
+
+        stale_keys = {
+            key for key, conflict in state.conflicts.items()
+            if conflict['conflict_type'] == ConflictType.SCHEDULE_VIOLATION and key not in current
+        }
+        rebuild = [streak for key, streak in current.items()
+                   if key not in state.conflicts or affected_ids.intersection(streak.items)]
+
+        missing_ids = {block_id for streak in rebuild for block_id in streak.items} - set(blocks)
+        loaded = dict(blocks)
+        if missing_ids:
+            loaded.update((block.id, block) for block in TimeBlock.query.filter(TimeBlock.id.in_(missing_ids)))
+
+        conflicts = [
+            conflict_resolution_service._build_work_streak_conflict(
+                WorkStreak(streak.start_time, streak.end_time, [loaded[block_id] for block_id in streak.items]),
+                policy
+            )
+            for streak in rebuild
+        ]
+        return stale_keys, conflicts
+
+    def _load_work_sequence(self, user_id: str, day: date_type) -> List[WorkEntry]:
+        from services.conflict_resolution import WORK_BLOCK_TYPES
+        window_start = datetime.combine(day, time_of_day.min)
+        window_end = window_start + timedelta(days=1)
+        rows = db.session.query(TimeBlock.start_time, TimeBlock.end_time, TimeBlock.id).filter(
+            TimeBlock.user_id == user_id,
+            TimeBlock.start_time < window_end,
+            TimeBlock.end_time > window_start,
+            TimeBlock.block_type.in_(WORK_BLOCK_TYPES)
+        ).all()
+        return sorted(tuple(row) for row in rows)
+
+    def _get(self, key: DayKey) -> Optional[DayConflictState]:
+        ttl = current_app.config.get('CONFLICT_STATE_TTL', DEFAULT_TTL)
+        with self._lock:
+            state = self._days.get(key)
+            if state is None or time.monotonic() - state.built_at >= ttl:
+                self._days.pop(key, None)
+                return None
+            self._days.move_to_end(key)
+            return state
+
+    def _store(self, key: DayKey, state: DayConflictState):
+        with self._lock:
+            self._days[key] = state
+            self._days.move_to_end(key)
+            while len(self._days) > MAX_CACHED_DAYS:
+                self._days.popitem(last=False)
+
+
+# 全局冲突增量复查实例
+incremental_conflict_checker = IncrementalConflictChecker()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+后台任务队列服务
+进程内线程池执行，任务状态持久化在同一数据库的jobs表中，无需外部消息代理
+
+执行中（RUNNING）的任务超过 JOB_RUNNING_TIMEOUT 仍未结束视为执行进程已退出：
+可被重新认领，worker每轮及查询任务状态时将其重新排队，重试次数用尽的标记为失败；
+到期超过同一时限仍为PENDING的任务视为调度丢失（如重试定时器随进程退出），同时重新调度
+"""
+
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from app import db
+from models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[str, Dict[str, Any]], Any]
+
+DEFAULT_RUNNING_TIMEOUT = 600
+
+
+class JobQueueMode:
+    """任务执行模式"""
+    THREAD = "thread"      # 在Web进程的线程池中执行
+    EXTERNAL = "external"  # 仅入库，由 `flask jobs worker` 进程执行
+    EAGER = "eager"        # 入队时同步执行（测试用）
+
+
+class JobQueue:
+    """后台任务队列"""
+
+    def __init__(self):
+        self.handlers: Dict[str, JobHandler] = {}
+        self.app = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def init_app(self, app):
+        """绑定Flask应用"""
+        self.app = app
+        app.extensions['job_queue'] = self
+
+    def register(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """注册任务处理函数的装饰器，处理函数签名为 handler(user_id, payload) -> result"""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.handlers[job_type] = handler
+            return handler
+        return decorator
+
+    @property
+    def mode(self) -> str:
+        return self.app.config.get('JOB_QUEUE_MODE', JobQueueMode.THREAD)
+
+    def enqueue(self, job_type: str, user_id: str, payload: Dict[str, Any] = None,
+                max_attempts: int = None) -> Job:
+        """创建任务记录并按执行模式调度"""
+        if job_type not in self.handlers:
+            raise ValueError(f"未知的任务类型: {job_type}")
+
+        job = Job(
+            user_id=user_id,
+            job_type=job_type,
+            status=JobStatus.PENDING,
+            max_attempts=max_attempts or self.app.config.get('JOB_MAX_ATTEMPTS', 3)
+        )
+        job.set_payload(payload or {})
+        db.session.add(job)
+        db.session.commit()
+
+        self._dispatch(job.id)
+        return job
+
+    def _dispatch(self, job_id: str, delay: float = 0):
+        """按执行模式调度任务"""
+        if self.mode == JobQueueMode.EAGER:
+            self.run_job(job_id)
+            return
+        if self.mode == JobQueueMode.EXTERNAL:
+            return
+
+        if delay > 0:
+            timer = threading.Timer(delay, self._submit, args=(job_id,))
+            timer.daemon = True
+            timer.start()
+            return
+        self._submit(job_id)
+
+    def _submit(self, job_id: str):
+        """提交到线程池"""
+        self._get_executor().submit(self._run_in_app_context, job_id)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.app.config.get('JOB_WORKERS', 4),
+                    thread_name_prefix='job-worker'
+                )
+            return self._executor
+
+    def _run_in_app_context(self, job_id: str):
+        with self.app.app_context():
+            try:
+                self.run_job(job_id)
+            finally:
+                db.session.remove()
+
+    def _stale_before(self) -> datetime:
+        """开始时间早于此的RUNNING任务视为执行超时"""
+        timeout = self.app.config.get('JOB_RUNNING_TIMEOUT', DEFAULT_RUNNING_TIMEOUT)
+        return datetime.utcnow() - timedelta(seconds=timeout)
+
+    def _stale(self):
+        return db.and_(Job.status == JobStatus.RUNNING, Job.started_at < self._stale_before())
+
+    def is_stale(self, job: Job) -> bool:
+        """任务是否执行超时（执行进程可能已退出）"""
+        return job.status == JobStatus.RUNNING and job.started_at is not None \
+            and job.started_at < self._stale_before()
+
+    def _overdue(self):
+        return db.and_(
+            Job.status == JobStatus.PENDING,
+            db.func.coalesce(Job.run_after, Job.created_at) < self._stale_before()
+        )
+
+    def needs_recovery(self, job: Job) -> bool:
+        """任务是否执行超时，或到期后超时仍未开始执行（调度已丢失）"""
+        if job.status == JobStatus.PENDING:
+            due = job.run_after or job.created_at
+            return due is not None and due < self._stale_before()
+        return self.is_stale(job)
+
+    def claim(self, job_id: str) -> bool:
+        """
+        原子地将任务置为RUNNING，多个worker之间只有一个能成功
+
+        可认领PENDING的任务，以及执行超时且仍有重试次数的RUNNING任务
+        """
+        now = datetime.utcnow()
+        claimed = db.session.query(Job).filter(
+            Job.id == job_id,
+            db.or_(
+                Job.status == JobStatus.PENDING,
+                db.and_(self._stale(), Job.attempts < Job.max_attempts)
+            )
+        ).update({
+            Job.status: JobStatus.RUNNING,
+            Job.started_at: now,
+            Job.attempts: Job.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def run_job(self, job_id: str) -> Optional[Job]:
+        """执行单个任务，失败时按退避策略重试"""
+        if not self.claim(job_id):
+            return None
+
+        job = db.session.get(Job, job_id, populate_existing=True)
+        handler = self.handlers.get(job.job_type)
+
+        try:
+            if handler is None:
+                raise ValueError(f"未知的任务类型: {job.job_type}")
+            result = handler(job.user_id, job.get_payload())
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Job %s (%s) failed on attempt %s: %s", job.id, job.job_type, job.attempts, e)
+            self._record_failure(job, e)
+            return job
+
+        job.set_result(result)
+        job.status = JobStatus.SUCCEEDED
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return job
+
+    def _record_failure(self, job: Job, exc: Exception):
+        """记录失败并决定是否重试"""
+        job = db.session.get(Job, job.id, populate_existing=True)
+        job.error = ''.join(traceback.format_exception_only(type(exc), exc)).strip()
+
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.FAILED
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            return
+
+        delay = self.app.config.get('JOB_RETRY_DELAY', 2) * (2 ** (job.attempts - 1))
+        job.status = JobStatus.PENDING
+        job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+        db.session.commit()
+
+        if self.mode == JobQueueMode.EAGER:
+            self.run_job(job.id)
+        else:
+            self._dispatch(job.id, delay)
+
+    def recover_stale(self) -> int:
+        """
+        回收执行超时的RUNNING任务及调度丢失的PENDING任务，返回回收数量
+
+        重试次数用尽的标记为失败，其余重新置为PENDING并按执行模式调度；
+        重复调度是安全的，claim保证同一任务只执行一次
+        """
+        now = datetime.utcnow()
+        overdue_ids = [job_id for (job_id,) in db.session.query(Job.id).filter(
+            self._overdue()
+        ).order_by(Job.created_at).all()]
+
+        timeout = self.app.config.get('JOB_RUNNING_TIMEOUT', DEFAULT_RUNNING_TIMEOUT)
+        failed = db.session.query(Job).filter(
+            self._stale(),
+            Job.attempts >= Job.max_attempts
+        ).update({
+            Job.status: JobStatus.FAILED,
+            Job.error: f'Job did not finish within {timeout:g}s (worker lost)',
+            Job.finished_at: now
+        }, synchronize_session=False)
+
+        job_ids = [job_id for (job_id,) in db.session.query(Job.id).filter(self._stale()).all()]
+        requeued = 0
+        if job_ids:
+            requeued = db.session.query(Job).filter(
+                Job.id.in_(job_ids),
+                self._stale()
+            ).update({
+                Job.status: JobStatus.PENDING,
+                Job.run_after: None
+            }, synchronize_session=False)
+        db.session.commit()
+
+        if failed or requeued or overdue_ids:
+            logger.warning("Recovered stale jobs: %s requeued, %s failed, %s overdue",
+                           requeued, failed, len(overdue_ids))
+        # external模式由worker的下一轮执行
+        if self.mode != JobQueueMode.EXTERNAL:
+            for job_id in job_ids + overdue_ids:
+                self._dispatch(job_id)
+        return failed + requeued + len(overdue_ids)
+
+    def run_pending(self, limit: int = 10) -> int:
+        """回收执行超时的任务后执行到期的待处理任务，返回执行数量（供worker进程调用）"""
+        self.recover_stale()
+        now = datetime.utcnow()
+        job_ids = [job_id for (job_id,) in db.session.query(Job.id).filter(
+            Job.status == JobStatus.PENDING,
+            db.or_(Job.run_after.is_(None), Job.run_after <= now)
+        ).order_by(Job.created_at).limit(limit).all()]
+        db.session.commit()
+
+        executed = 0
+        for job_id in job_ids:
+            if self.run_job(job_id) is not None:
+                executed += 1
+        return executed
+
+    def work(self, poll_interval: float = 1.0, once: bool = False):
+        """worker主循环"""
+        while True:
+            executed = self.run_pending()
+            if once:
+                return
+            if not executed:
+                time.sleep(poll_interval)
+
+
+# 全局任务队列实例
+job_queue = JobQueue()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+匹配规则服务
+用户自定义的 任务类别 -> 时间块类型 匹配分数持久化在数据库中，
+每个进程按用户缓存编译后的 类别 × 时间块类型 分数矩阵（LRU），
+规则集版本号变化时重新编译，保证多个worker之间一致
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app, g
+
+from app import db
+from models.matching_rule import MatchingRuleSet, MatchingRule
+from models.time_block import BlockType
+
+# 预定义的匹配规则：任务类别 -> [(时间块类型, 匹配分数)]
+DEFAULT_MATCHING_RULES = {
+    '科研': [(BlockType.RESEARCH, 1.0), (BlockType.GROWTH, 0.8), (BlockType.REVIEW, 0.6)],
+    '学习': [(BlockType.GROWTH, 1.0), (BlockType.RESEARCH, 0.8), (BlockType.REVIEW, 0.6)],
+    '工作': [(BlockType.RESEARCH, 1.0), (BlockType.GROWTH, 0.8)],
+    '阅读': [(BlockType.GROWTH, 1.0), (BlockType.REST, 0.7)],
+    '运动': [(BlockType.REST, 1.0), (BlockType.ENTERTAINMENT, 0.8)],
+    '娱乐': [(BlockType.ENTERTAINMENT, 1.0), (BlockType.REST, 0.8)],
+    '休息': [(BlockType.REST, 1.0)],
+    '总结': [(BlockType.REVIEW, 1.0), (BlockType.GROWTH, 0.8)],
+    '规划': [(BlockType.REVIEW, 1.0), (BlockType.RESEARCH, 0.8)],
+    '其他': [(BlockType.GROWTH, 0.8), (BlockType.RESEARCH, 0.7), (BlockType.REST, 0.6)]
+}
+
+# 未配置规则的类别使用该类别的规则
+FALLBACK_CATEGORY = '其他'
+
+BLOCK_TYPES = list(BlockType)
+BLOCK_TYPE_INDEX = {block_type: index for index, block_type in enumerate(BLOCK_TYPES)}
+
+DEFAULT_CACHE_SIZE = 1024
+
+# 当前请求内已校验过版本的用户，避免同一请求重复查询版本号
+CHECKED_VERSIONS_KEY = '_matching_rule_versions'
+
+
+class CompiledMatchingRules:
+    """编译后的匹配规则：行为类别、列为时间块类型的稠密分数矩阵（按行展开存放）"""
+
+    def __init__(self, version: int, rules: Dict[str, List[Tuple[BlockType, float]]]):
+        self.version = version
+        self.categories = list(rules)
+        self.row_index = {name: row for row, name in enumerate(self.categories)}
+        self.fallback_row = self.row_index[FALLBACK_CATEGORY]
+        self.width = len(BLOCK_TYPES)
+
+        self.scores = [0.0] * (len(self.categories) * self.width)
+        for row, name in enumerate(self.categories):
+            for block_type, score in rules[name]:
+                self.scores[row * self.width + BLOCK_TYPE_INDEX[block_type]] = score
+
+    def row_for(self, category_name: str) -> int:
+        return self.row_index.get(category_name, self.fallback_row)
+
+    def score(self, category_name: str, block_type: BlockType) -> float:
+        """类别与时间块类型的匹配分数"""
+        return self.scores[self.row_for(category_name) * self.width + BLOCK_TYPE_INDEX[block_type]]
+
+    def row_scores(self, category_name: str) -> Dict[BlockType, float]:
+        """类别对每种时间块类型的匹配分数"""
+        start = self.row_for(category_name) * self.width
+        return dict(zip(BLOCK_TYPES, self.scores[start:start + self.width]))
+
+    def rules_for(self, category_name: str) -> List[Tuple[BlockType, float]]:
+        """按分数降序列出类别的非零匹配规则"""
+        scores = self.row_scores(category_name)
+        return sorted(((bt, s) for bt, s in scores.items() if s > 0), key=lambda item: item[1], reverse=True)
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.version,
+            'block_types': [block_type.value for block_type in BLOCK_TYPES],
+            'categories': self.categories,
+            'scores': [self.scores[row * self.width:(row + 1) * self.width] for row in range(len(self.categories))]
+        }
+
+
+class MatchingRuleService:
+    """匹配规则的持久化与编译缓存"""
+
+    def __init__(self):
+        self._cache: 'OrderedDict[str, CompiledMatchingRules]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._default_rules = CompiledMatchingRules(0, DEFAULT_MATCHING_RULES)
+
+    @property
+    def cache_size(self) -> int:
+        return current_app.config.get('MATCHING_RULES_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+
+    def get_compiled(self, user_id: Optional[str]) -> CompiledMatchingRules:
+        """获取用户编译后的匹配规则，版本号变化时重新编译"""
+        if not user_id:
+            return self._default_rules
+
+        checked = g.setdefault(CHECKED_VERSIONS_KEY, {})
+        with self._lock:
+            compiled = self._cache.get(user_id)
+            if compiled is not None and checked.get(user_id) == compiled.version:
+                self._cache.move_to_end(user_id)
+                return compiled
+
+        version = db.session.query(MatchingRuleSet.version).filter_by(user_id=user_id).scalar() or 0
+        checked[user_id] = version
+
+        if compiled is None or compiled.version != version:
+            compiled = self._compile(user_id, version)
+
+        with self._lock:
+            self._cache[user_id] = compiled
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compiled
+
+    def _compile(self, user_id: str, version: int) -> CompiledMatchingRules:
+        if version == 0:
+            return CompiledMatchingRules(0, DEFAULT_MATCHING_RULES)
+
+        rules = dict(DEFAULT_MATCHING_RULES)
+        rows = db.session.query(MatchingRule.category_name, MatchingRule.block_type, MatchingRule.score).join(
+            MatchingRuleSet
+        ).filter(MatchingRuleSet.user_id == user_id).all()
+
+        custom_rules: Dict[str, List[Tuple[BlockType, float]]] = {}
+        for category_name, block_type, score in rows:
+            custom_rules.setdefault(category_name, []).append((block_type, score))
+        # 自定义规则整体替换同名类别的默认规则
+        rules.update(custom_rules)
+        return CompiledMatchingRules(version, rules)
+
+    def get_custom_rules(self, user_id: str) -> Dict[str, List[Tuple[BlockType, float]]]:
+        """获取用户的自定义规则"""
+        rule_set = MatchingRuleSet.query.filter_by(user_id=user_id).first()
+        custom_rules: Dict[str, List[Tuple[BlockType, float]]] = {}
+        if rule_set:
+            for rule in rule_set.rules:
+                custom_rules.setdefault(rule.category_name, []).append((rule.block_type, rule.score))
+        return custom_rules
+
+    def set_category_rules(self, user_id: str, category_name: str,
+                           rules: List[Tuple[BlockType, float]]) -> MatchingRuleSet:
+        """替换某个类别的自定义规则"""
+        return self.replace_rules(user_id, {category_name: rules}, replace_all=False)
+
+    def replace_rules(self, user_id: str, rules: Dict[str, List[Tuple[BlockType, float]]],
+                      replace_all: bool = True) -> MatchingRuleSet:
+        """
+        写入自定义规则并递增版本号
+
+        Args:
+            user_id: 用户ID
+            rules: {类别名称: [(时间块类型, 匹配分数)]}
+            replace_all: True时先清空该用户的全部自定义规则，否则只替换rules中出现的类别
+        """
+        rule_set = self._get_or_create_rule_set(user_id)
+
+        for rule in list(rule_set.rules):
+            if replace_all or rule.category_name in rules:
+                rule_set.rules.remove(rule)
+        db.session.flush()
+
+        for category_name, category_rules in rules.items():
+            for block_type, score in category_rules:
+                rule_set.rules.append(MatchingRule(
+                    category_name=category_name,
+                    block_type=block_type,
+                    score=score
+                ))
+
+        self._bump_version(rule_set)
+        db.session.commit()
+        self.invalidate(user_id)
+        return rule_set
+
+    def delete_category_rules(self, user_id: str, category_name: Optional[str] = None) -> bool:
+        """删除某个类别（或全部）的自定义规则，恢复默认规则"""
+        rule_set = MatchingRuleSet.query.filter_by(user_id=user_id).first()
+        if not rule_set:
+            return False
+
+        removed = [rule for rule in rule_set.rules if category_name is None or rule.category_name == category_name]
+        if not removed:
+            return False
+
+        for rule in removed:
+            rule_set.rules.remove(rule)
+        self._bump_version(rule_set)
+        db.session.commit()
+        self.invalidate(user_id)
+        return True
+
+    def rename_category(self, user_id: str, old_name: str, new_name: str):
+        """
+        任务类别改名时同步自定义规则（由调用方提交事务）
+
+        规则按类别名称保存，可能残留已删除类别（或预先配置）的同名规则；
+        改名的类别有自定义规则时，以其规则整体替换新名称下已有的规则
+        """
+        rule_set = MatchingRuleSet.query.filter_by(user_id=user_id).first()
+        if not rule_set:
+            return
+
+        renamed = [rule for rule in rule_set.rules if rule.category_name == old_name]
+        if not renamed:
+            return
+
+        replaced = [rule for rule in rule_set.rules if rule.category_name == new_name]
+        if replaced:
+            for rule in replaced:
+                rule_set.rules.remove(rule)
+            # 先删除再改名，避免同一次flush中违反 (类别名称, 时间块类型) 唯一约束
+            db.session.flush()
+
+        for rule in renamed:
+            rule.category_name = new_name
+        self._bump_version(rule_set)
+        self.invalidate(user_id)
+
+    def invalidate(self, user_id: str):
+        """移除本进程缓存（其他进程通过版本号感知变化）"""
+        with self._lock:
+            self._cache.pop(user_id, None)
+        checked = g.get(CHECKED_VERSIONS_KEY)
+        if checked:
+            checked.pop(user_id, None)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _get_or_create_rule_set(self, user_id: str) -> MatchingRuleSet:
+        rule_set = MatchingRuleSet.query.filter_by(user_id=user_id).first()
+        if not rule_set:
+            rule_set = MatchingRuleSet(user_id=user_id, version=0)
+            db.session.add(rule_set)
+        return rule_set
+
+    def _bump_version(self, rule_set: MatchingRuleSet):
+        # 使用SQL表达式递增，并发修改时版本号不会丢失
+        rule_set.version = MatchingRuleSet.version + 1 if rule_set.version else 1
+
+
+# 全局匹配规则服务实例
+matching_rule_service = MatchingRuleService()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+番茄钟会话事件广播服务
+进程内发布/订阅，供SSE推送会话状态变化
+"""
+
+import queue
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Set
+
+
+class PomodoroEventType:
+    """会话事件类型常量"""
+    SYNC = "sync"
+    STARTED = "started"
+    COMPLETED = "completed"
+    INTERRUPTED = "interrupted"
+
+
+class PomodoroEventBroker:
+    """番茄钟会话事件广播器"""
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[str, Set[queue.Queue]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: str) -> queue.Queue:
+        """为用户注册一个订阅队列"""
+        subscriber = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id: str, subscriber: queue.Queue):
+        """注销订阅队列"""
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if not subscribers:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def publish(self, user_id: str, event_type: str, payload: Dict[str, Any]) -> int:
+        """向用户的所有订阅者推送事件，返回送达的订阅者数量"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+
+        delivered = 0
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event_type, payload))
+                delivered += 1
+            except queue.Full:
+                # 消费过慢的连接直接丢弃事件，客户端重连时会收到完整同步
+                continue
+        return delivered
+
+    def subscriber_count(self, user_id: str) -> int:
+        """获取用户当前的订阅者数量"""
+        with self._lock:
+            return len(self._subscribers.get(user_id, ()))
+
+
+# 全局事件广播器实例
+pomodoro_event_broker = PomodoroEventBroker()
@@ -34,6 +34,20 @@ class RecommendationService:
         # 获取用户的所有待处理任务
         pending_tasks = self._get_pending_tasks(user_id)
 
+        return self.rank_tasks(pending_tasks, current_time, limit)
+
+    def rank_tasks(self, pending_tasks: List[Task], current_time: datetime, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        对已加载的待处理任务评分排序（不访问数据库，供异步端点复用）
+
+        Args:
+            pending_tasks: 待处理任务列表
+            current_time: 当前时间
+            limit: 返回推荐数量限制
+
+        Returns:
+            推荐任务列表，按优先级排序
+        """
         if not pending_tasks:
             return []
 
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+全文搜索索引
+任务标题与描述、项目名称与描述、标签名称、番茄钟完成总结统一写入SQLite FTS5索引，
+索引由数据库触发器维护，ORM、批量SQL与外部工具的写入都会同步，无需应用层额外处理。
+
+- search_documents保存每条文档的类型、源ID、用户与文本，FTS5以它为外部内容表（external content），文本只存一份
+- 使用trigram分词器，中文没有空格分词也能按子串匹配；长度不少于3个字符的关键词走MATCH并按bm25排序
+- trigram无法索引更短的关键词（如两个汉字的"周报"），只含短关键词时沿user_id索引逐条匹配，取够一页即停止
+- 文档ID递减分配：FTS5按rowid升序遍历倒排列表最快，升序即由新到旧
+- 所有用户共用一个索引，先按关键词命中再按用户过滤，适合本应用单用户或少量用户的SQLite部署
+- 非SQLite数据库或SQLite未编译FTS5时，退化为对源表的LIKE查询，接口行为不变
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, or_, text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from models.pomodoro_session import PomodoroSession
+from models.project import Project
+from models.tag import Tag
+from models.task import Task
+
+logger = logging.getLogger(__name__)
+
+INDEX_TABLE = 'search_index'
+DOCUMENTS_TABLE = 'search_documents'
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_TERMS = 8
+# trigram分词器能索引的最短关键词长度
+MIN_MATCH_LENGTH = 3
+# bm25列权重：标题、正文
+RANK_WEIGHTS = (10.0, 1.0)
+# 参与相关度排序的候选上限：常见词命中大量文档时只在最新的这些文档中排序
+MAX_RANKED_CANDIDATES = 2000
+
+
+class SearchSource:
+    """一类被索引的文档：源模型与作为标题、正文的列"""
+
+    def __init__(self, doc_type: str, model, title: Optional[str] = None, body: Optional[str] = None):
+        self.doc_type = doc_type
+        self.model = model
+        self.table = model.__tablename__
+        self.title = title
+        self.body = body
+
+    @property
+    def fields(self) -> List:
+        return [getattr(self.model, name) for name in (self.title, self.body) if name]
+
+    @property
+    def columns(self) -> List[str]:
+        return [name for name in (self.title, self.body) if name] + ['user_id']
+
+    def text_expressions(self, row: str) -> Tuple[str, str]:
+        """标题与正文的SQL表达式，row为触发器中的new/old或源表别名"""
+        return tuple(f"coalesce({row}.{name}, '')" if name else "''" for name in (self.title, self.body))
+
+    def condition(self, row: str) -> str:
+        """标题与正文都为空的行不入索引"""
+        return ' OR '.join(f"{expression} <> ''" for expression in self.text_expressions(row) if expression != "''")
+
+
+SOURCES: Tuple[SearchSource, ...] = (
+    SearchSource('task', Task, title='title', body='description'),
+    SearchSource('project', Project, title='name', body='description'),
+    SearchSource('tag', Tag, title='name'),
+    SearchSource('session', PomodoroSession, body='completion_summary'),
+)
+
+SOURCES_BY_TYPE = {source.doc_type: source for source in SOURCES}
+DOC_TYPES = tuple(SOURCES_BY_TYPE)
+
+
+def _insert_statements(source: SearchSource, row: str) -> List[str]:
+    """为一行源数据写入文档与索引"""
+    title, body = source.text_expressions(row)
+    return [
+        f"INSERT INTO {DOCUMENTS_TABLE} (id, doc_type, doc_id, user_id, title, body) "
+        f"SELECT (SELECT coalesce(min(id), 0) - 1 FROM {DOCUMENTS_TABLE}), "
+        f"'{source.doc_type}', {row}.id, {row}.user_id, {title}, {body} WHERE {source.condition(row)};",
+        f"INSERT INTO {INDEX_TABLE} (rowid, title, body) SELECT id, title, body FROM {DOCUMENTS_TABLE} "
+        f"WHERE doc_type = '{source.doc_type}' AND doc_id = {row}.id;"
+    ]
+
+
+def _delete_statements(source: SearchSource, row: str) -> List[str]:
+    """删除一行源数据的索引与文档（外部内容表需要用旧文本写入delete命令）"""
+    return [
+        f"INSERT INTO {INDEX_TABLE} ({INDEX_TABLE}, rowid, title, body) "
+        f"SELECT 'delete', id, title, body FROM {DOCUMENTS_TABLE} "
+        f"WHERE doc_type = '{source.doc_type}' AND doc_id = {row}.id;",
+        f"DELETE FROM {DOCUMENTS_TABLE} WHERE doc_type = '{source.doc_type}' AND doc_id = {row}.id;"
+    ]
+
+
+def _trigger_statements(source: SearchSource) -> List[str]:
+    prefix = f'{INDEX_TABLE}_{source.table}'
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {prefix}_ai AFTER INSERT ON {source.table} BEGIN "
+        + ' '.join(_insert_statements(source, 'new')) + ' END',
+        f"CREATE TRIGGER IF NOT EXISTS {prefix}_au AFTER UPDATE OF {', '.join(source.columns)} "
+        f"ON {source.table} BEGIN "
+        + ' '.join(_delete_statements(source, 'old') + _insert_statements(source, 'new')) + ' END',
+        f"CREATE TRIGGER IF NOT EXISTS {prefix}_ad AFTER DELETE ON {source.table} BEGIN "
+        + ' '.join(_delete_statements(source, 'old')) + ' END',
+    ]
+
+
+def _populate_statement(sources: Iterable[SearchSource] = SOURCES, by_ids: bool = False) -> str:
+    """从源表批量写入文档，按创建时间由旧到新分配递减的ID；by_ids时只写入 :ids 中的源数据"""
+    selects = []
+    for source in sources:
+        title, body = source.text_expressions('src')
+        selects.append(
+            f"SELECT '{source.doc_type}' AS doc_type, src.id AS doc_id, src.user_id AS user_id, "
+            f"{title} AS title, {body} AS body, src.created_at AS created_at "
+            f"FROM {source.table} AS src WHERE ({source.condition('src')})"
+            + (" AND src.id IN :ids" if by_ids else '')
+        )
+    return (
+        f"INSERT INTO {DOCUMENTS_TABLE} (id, doc_type, doc_id, user_id, title, body) "
+        f"SELECT (SELECT coalesce(min(id), 0) FROM {DOCUMENTS_TABLE}) - row_number() OVER (ORDER BY created_at, doc_id), "
+        f"doc_type, doc_id, user_id, title, body FROM ({' UNION ALL '.join(selects)})"
+    )
+
+
+def parse_terms(query: str) -> List[str]:
+    """按空白拆分搜索词（不区分大小写），去掉引号，最多保留MAX_TERMS个"""
+    terms = []
+    for term in (query or '').split():
+        term = term.replace('"', '').strip().lower()
+        if term and term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def _phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+class SearchIndex:
+    """全文搜索索引"""
+
+    def __init__(self):
+        self._listening = False
+
+    def init_app(self, app):
+        """绑定Flask应用，并在 db.create_all() / db.drop_all() 时同步创建、删除索引表与触发器"""
+        app.extensions['search_index'] = self
+
+        if not self._listening:
+            event.listen(db.metadata, 'after_create', self._after_create)
+            event.listen(db.metadata, 'before_drop', self._before_drop)
+            self._listening = True
+
+    def _after_create(self, target, connection, **kwargs):
+        self.create(connection)
+
+    def _before_drop(self, target, connection, **kwargs):
+        self.drop(connection)
+
+    @staticmethod
+    def is_supported(connection) -> bool:
+        return connection.dialect.name == 'sqlite'
+
+    def exists(self, connection) -> bool:
+        if not self.is_supported(connection):
+            return False
+        return connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': INDEX_TABLE}
+        ).first() is not None
+
+    def create(self, connection) -> bool:
+        """创建索引表与触发器（已存在时跳过），新建时用现有数据填充；数据库不支持时返回False"""
+        if not self.is_supported(connection):
+            return False
+        if self.exists(connection):
+            return True
+
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {DOCUMENTS_TABLE} ("
+            f"id INTEGER PRIMARY KEY, doc_type VARCHAR(20) NOT NULL, doc_id VARCHAR(36) NOT NULL, "
+            f"user_id VARCHAR(36) NOT NULL, title TEXT NOT NULL, body TEXT NOT NULL, "
+            f"UNIQUE (doc_type, doc_id))"
+        ))
+        # 二级索引隐含rowid（即id），按用户过滤后天然由新到旧有序
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{DOCUMENTS_TABLE}_user_id ON {DOCUMENTS_TABLE} (user_id)"
+        ))
+        try:
+            with connection.begin_nested():
+                connection.execute(text(
+                    f"CREATE VIRTUAL TABLE {INDEX_TABLE} USING fts5(title, body, "
+                    f"content = '{DOCUMENTS_TABLE}', content_rowid = 'id', tokenize = 'trigram')"
+                ))
+        except OperationalError as exc:
+            logger.warning('SQLite FTS5 trigram tokenizer unavailable, search falls back to LIKE: %s', exc)
+            connection.execute(text(f'DROP TABLE IF EXISTS {DOCUMENTS_TABLE}'))
+            return False
+
+        for source in SOURCES:
+            for statement in _trigger_statements(source):
+                connection.execute(text(statement))
+        self._populate(connection)
+        return True
+
+    def drop(self, connection):
+        """删除索引表与触发器"""
+        if not self.is_supported(connection):
+            return
+        for source in SOURCES:
+            for suffix in ('ai', 'au', 'ad'):
+                connection.execute(text(f'DROP TRIGGER IF EXISTS {INDEX_TABLE}_{source.table}_{suffix}'))
+        connection.execute(text(f'DROP TABLE IF EXISTS {INDEX_TABLE}'))
+        connection.execute(text(f'DROP TABLE IF EXISTS {DOCUMENTS_TABLE}'))
+
+    def rebuild(self) -> bool:
+        """按源表重建整个索引（数据在触发器之外被修改后使用）"""
+        connection = db.session.connection()
+        if not self.create(connection):
+            return False
+        connection.execute(text(f'DELETE FROM {DOCUMENTS_TABLE}'))
+        self._populate(connection)
+        db.session.commit()
+        return True
+
+    def bulk_insert(self, connection, doc_type: str, rows: List[Dict]):
+        """
+        批量插入一类源数据：在同一事务中暂时删除其插入触发器，插入后一次写入这些行的文档，并按rowid升序写入索引
+
+        触发器逐行分配递减的文档ID，FTS5每遇到更小的rowid就要把内存中的数据落成一个新段，
+        大批量插入时比升序写入慢数倍。SQLite的DDL是事务性的，其他连接看不到触发器缺失的中间状态
+        """
+        source = SOURCES_BY_TYPE[doc_type]
+        table = source.model.__table__
+        if not rows:
+            return
+        if not self.exists(connection):
+            connection.execute(table.insert(), rows)
+            return
+
+        # pysqlite只在DML之前隐式开启事务，DDL作为事务中的第一条语句时会被自动提交
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN')
+        connection.execute(text(f'DROP TRIGGER IF EXISTS {INDEX_TABLE}_{source.table}_ai'))
+        connection.execute(table.insert(), rows)
+        lowest = connection.execute(text(f'SELECT coalesce(min(id), 0) FROM {DOCUMENTS_TABLE}')).scalar()
+        connection.execute(
+            text(_populate_statement([source], by_ids=True)).bindparams(bindparam('ids', expanding=True)),
+            {'ids': [row['id'] for row in rows]}
+        )
+        connection.execute(text(
+            f"INSERT INTO {INDEX_TABLE} (rowid, title, body) "
+            f"SELECT id, title, body FROM {DOCUMENTS_TABLE} WHERE id < :lowest ORDER BY id"
+        ), {'lowest': lowest})
+        connection.execute(text(_trigger_statements(source)[0]))
+
+    def _populate(self, connection):
+        connection.execute(text(_populate_statement()))
+        connection.execute(text(f"INSERT INTO {INDEX_TABLE} ({INDEX_TABLE}) VALUES ('rebuild')"))
+
+    def search(self, user_id: str, query: str, doc_types: Optional[Iterable[str]] = None,
+               limit: int = DEFAULT_LIMIT, offset: int = 0) -> Dict:
+        """
+        搜索用户的任务、项目、标签与番茄钟总结
+
+        返回按相关度排序的结果，每条包含类型、ID、得分与完整对象；多取一条判断是否还有下一页
+        """
+        terms = parse_terms(query)
+        doc_types = [doc_type for doc_type in (doc_types or DOC_TYPES) if doc_type in SOURCES_BY_TYPE]
+        if not terms or not doc_types:
+            return {'results': [], 'count': 0, 'has_more': False, 'terms': terms}
+
+        connection = db.session.connection()
+        if self.exists(connection):
+            engine = 'fts5'
+            matches = self._search_fts(connection, user_id, terms, doc_types, limit + 1, offset)
+        else:
+            engine = 'like'
+            matches = self._search_like(user_id, terms, doc_types, limit + 1, offset)
+
+        has_more = len(matches) > limit
+        matches = matches[:limit]
+        objects = self._load(matches)
+        results = [
+            {'type': doc_type, 'id': doc_id, 'score': score, 'item': objects[(doc_type, doc_id)].to_dict()}
+            for doc_type, doc_id, score in matches
+            if (doc_type, doc_id) in objects
+        ]
+        return {'results': results, 'count': len(results), 'has_more': has_more, 'terms': terms, 'engine': engine}
+
+    def matching_time_block_ids(self, user_id: str, query: str) -> List[str]:
+        """标题或描述匹配搜索词的任务所排入的时间块ID"""
+        terms = parse_terms(query)
+        if not terms:
+            return []
+
+        connection = db.session.connection()
+        if not self.exists(connection):
+            rows = Task.query.with_entities(Task.scheduled_time_block_id).filter(
+                Task.user_id == user_id,
+                Task.scheduled_time_block_id.isnot(None),
+                *[or_(Task.title.ilike(f'%{term}%'), Task.description.ilike(f'%{term}%')) for term in terms]
+            ).distinct()
+            return [block_id for block_id, in rows]
+
+        source, where, params, _ = self._fts_query(user_id, terms, ['task'])
+        rows = connection.execute(text(
+            f"SELECT DISTINCT t.scheduled_time_block_id FROM {source} "
+            f"JOIN tasks AS t ON t.id = d.doc_id "
+            f"WHERE {where} AND t.scheduled_time_block_id IS NOT NULL"
+        ).bindparams(bindparam('doc_types', expanding=True)), params)
+        return [block_id for block_id, in rows]
+
+    def _fts_query(self, user_id: str, terms: List[str],
+                   doc_types: List[str]) -> Tuple[str, str, Dict, bool]:
+        """构造FTS查询，返回 (FROM子句, WHERE子句, 参数, 是否可按bm25排序)"""
+        long_terms = [term for term in terms if len(term) >= MIN_MATCH_LENGTH]
+        short_terms = [term for term in terms if len(term) < MIN_MATCH_LENGTH]
+
+        clauses = ['d.user_id = :user_id', 'd.doc_type IN :doc_types']
+        params = {'user_id': user_id, 'doc_types': doc_types}
+        if long_terms:
+            # CROSS JOIN固定连接顺序：先由倒排索引取命中的行，再按主键取文档过滤用户
+            source = f'{INDEX_TABLE} CROSS JOIN {DOCUMENTS_TABLE} AS d ON d.id = {INDEX_TABLE}.rowid'
+            clauses.append(f'{INDEX_TABLE} MATCH :match')
+            params['match'] = ' AND '.join(_phrase(term) for term in long_terms)
+        else:
+            source = f'{DOCUMENTS_TABLE} AS d'
+        for index, term in enumerate(short_terms):
+            # 只有含大小写字母的关键词需要lower()，中文关键词直接比较更快
+            title, body = ('lower(d.title)', 'lower(d.body)') if term.upper() != term else ('d.title', 'd.body')
+            clauses.append(f'(instr({title}, :term{index}) > 0 OR instr({body}, :term{index}) > 0)')
+            params[f'term{index}'] = term
+        return source, ' AND '.join(clauses), params, bool(long_terms)
+
+    def _search_fts(self, connection, user_id: str, terms: List[str], doc_types: List[str],
+                    limit: int, offset: int) -> List[Tuple[str, str, float]]:
+        source, where, params, ranked = self._fts_query(user_id, terms, doc_types)
+        statement = (
+            f"SELECT d.doc_type, d.doc_id, d.id AS document_id, {{score}} AS score FROM {source} "
+            f"WHERE {where} ORDER BY {{order}} LIMIT {{limit}}"
+        )
+        if ranked:
+            # 先按倒排列表顺序取最新的候选再按bm25排序，常见词的耗时与命中总数无关；
+            # 必须按FTS的rowid排序，按d.id排序时SQLite不知道两者等价，会先对全部命中排序
+            weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+            candidates = statement.format(score=f'-bm25({INDEX_TABLE}, {weights})',
+                                          order=f'{INDEX_TABLE}.rowid', limit=':candidates')
+            statement = (
+                f"SELECT doc_type, doc_id, score FROM ({candidates}) "
+                f"ORDER BY score DESC, document_id LIMIT :limit OFFSET :offset"
+            )
+            params['candidates'] = MAX_RANKED_CANDIDATES
+        else:
+            # 只有短关键词时没有相关度，由新到旧
+            statement = statement.format(score='0.0', order='d.id', limit=':limit OFFSET :offset')
+
+        rows = connection.execute(
+            text(statement).bindparams(bindparam('doc_types', expanding=True)),
+            {**params, 'limit': limit, 'offset': offset}
+        )
+        return [(row.doc_type, row.doc_id, round(row.score, 4)) for row in rows]
+
+    def _search_like(self, user_id: str, terms: List[str], doc_types: List[str],
+                     limit: int, offset: int) -> List[Tuple[str, str, float]]:
+        """数据库不支持FTS5时的退化实现：逐类LIKE查询，按创建时间由新到旧"""
+        matches = []
+        for doc_type in doc_types:
+            source = SOURCES_BY_TYPE[doc_type]
+            model = source.model
+            rows = db.session.query(model.id, model.created_at).filter(
+                model.user_id == user_id,
+                *[or_(*[field.ilike(f'%{term}%') for field in source.fields]) for term in terms]
+            ).order_by(model.created_at.desc()).limit(limit + offset).all()
+            matches.extend((doc_type, doc_id, created_at) for doc_id, created_at in rows)
+
+        matches.sort(key=lambda match: (match[2] is not None, match[2]), reverse=True)
+        return [(doc_type, doc_id, 0.0) for doc_type, doc_id, _ in matches[offset:offset + limit]]
+
+    def _load(self, matches: List[Tuple[str, str, float]]) -> Dict[Tuple[str, str], object]:
+        """按类型批量加载命中的对象"""
+        ids_by_type: Dict[str, List[str]] = {}
+        for doc_type, doc_id, _ in matches:
+            ids_by_type.setdefault(doc_type, []).append(doc_id)
+
+        objects = {}
+        for doc_type, ids in ids_by_type.items():
+            model = SOURCES_BY_TYPE[doc_type].model
+            for obj in model.query.filter(model.id.in_(ids)).all():
+                objects[(doc_type, obj.id)] = obj
+        return objects
+
+
+# 全局搜索索引实例
+search_index = SearchIndex()
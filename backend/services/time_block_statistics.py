@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+时间块统计服务
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from app import db
+from models.time_block import TimeBlock, BlockType
+
+
+def build_time_block_statistics(user_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+    """统计指定时间范围内的时间块分布"""
+    # 获取指定时间范围内的时间块，只取统计用到的列，时长直接读存储的duration_minutes
+    time_blocks = db.session.query(
+        TimeBlock.date, TimeBlock.start_time, TimeBlock.end_time, TimeBlock.block_type, TimeBlock.duration_minutes
+    ).filter(
+        TimeBlock.user_id == user_id,
+        TimeBlock.date >= start_date,
+        TimeBlock.date <= end_date
+    ).all()
+
+    if not time_blocks:
+        return {
+            'period': {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+                'days': (end_date - start_date).days
+            },
+            'total_blocks': 0,
+            'total_minutes': 0,
+            'statistics': {}
+        }
+
+    # 基础统计
+    total_blocks = len(time_blocks)
+    total_minutes = sum(block.duration_minutes for block in time_blocks)
+    total_hours = total_minutes / 60
+
+    # 按类型统计
+    type_stats = {}
+    for block_type in BlockType:
+        blocks_of_type = [block for block in time_blocks if block.block_type == block_type]
+        type_minutes = sum(block.duration_minutes for block in blocks_of_type)
+        type_stats[block_type.value] = {
+            'count': len(blocks_of_type),
+            'minutes': type_minutes,
+            'hours': round(type_minutes / 60, 2),
+            'percentage': round((type_minutes / total_minutes) * 100, 2) if total_minutes > 0 else 0
+        }
+
+    # 按日期统计
+    daily_stats = {}
+    for block in time_blocks:
+        date_key = block.date.date().isoformat()
+        if date_key not in daily_stats:
+            daily_stats[date_key] = {
+                'count': 0,
+                'minutes': 0,
+                'types': {}
+            }
+
+        daily_stats[date_key]['count'] += 1
+        daily_stats[date_key]['minutes'] += block.duration_minutes
+
+        block_type = block.block_type.value
+        if block_type not in daily_stats[date_key]['types']:
+            daily_stats[date_key]['types'][block_type] = 0
+        daily_stats[date_key]['types'][block_type] += block.duration_minutes
+
+    # 转换分钟为小时
+    for date_data in daily_stats.values():
+        date_data['hours'] = round(date_data['minutes'] / 60, 2)
+
+    # 按星期统计
+    weekday_stats = {}
+    weekday_names = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+
+    for block in time_blocks:
+        weekday = block.date.weekday()  # 0=Monday, 6=Sunday
+        weekday_name = weekday_names[weekday]
+
+        if weekday_name not in weekday_stats:
+            weekday_stats[weekday_name] = {
+                'count': 0,
+                'minutes': 0,
+                'hours': 0
+            }
+
+        weekday_stats[weekday_name]['count'] += 1
+        weekday_stats[weekday_name]['minutes'] += block.duration_minutes
+
+    for weekday_data in weekday_stats.values():
+        weekday_data['hours'] = round(weekday_data['minutes'] / 60, 2)
+
+    # 按时间段统计（小时）
+    hourly_stats = {}
+    for i in range(24):
+        hourly_stats[f"{i:02d}:00"] = {
+            'count': 0,
+            'minutes': 0
+        }
+
+    for block in time_blocks:
+        start_hour = block.start_time.hour
+        end_hour = block.end_time.hour
+
+        # 计算每个小时的时间块时长
+        current_hour = start_hour
+        current_time = block.start_time
+
+        while current_time < block.end_time and current_hour < 24:
+            hour_end = current_time.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            hour_end = min(hour_end, block.end_time)
+
+            hour_minutes = (hour_end - current_time).total_seconds() / 60
+            hourly_stats[f"{current_hour:02d}:00"]['count'] += 1
+            hourly_stats[f"{current_hour:02d}:00"]['minutes'] += hour_minutes
+
+            current_time = hour_end
+            current_hour = current_time.hour
+
+    # 计算平均值
+    days_in_period = max(1, (end_date - start_date).days)
+    avg_blocks_per_day = round(total_blocks / days_in_period, 2)
+    avg_hours_per_day = round(total_hours / days_in_period, 2)
+
+    # 找出最常用的时间块类型
+    most_used_type = max(type_stats.items(), key=lambda x: x[1]['count'])[0] if type_stats else None
+
+    # 找出最忙碌的一天
+    busiest_day = max(daily_stats.items(), key=lambda x: x[1]['minutes'])[0] if daily_stats else None
+
+    # 找出最常用的时间段
+    most_active_hour = max(hourly_stats.items(), key=lambda x: x[1]['minutes'])[0] if hourly_stats else None
+
+    return {
+        'period': {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'days': days_in_period
+        },
+        'summary': {
+            'total_blocks': total_blocks,
+            'total_minutes': total_minutes,
+            'total_hours': round(total_hours, 2),
+            'avg_blocks_per_day': avg_blocks_per_day,
+            'avg_hours_per_day': avg_hours_per_day,
+            'most_used_type': most_used_type,
+            'busiest_day': busiest_day,
+            'most_active_hour': most_active_hour
+        },
+        'by_type': type_stats,
+        'by_date': daily_stats,
+        'by_weekday': weekday_stats,
+        'by_hour': hourly_stats
+    }
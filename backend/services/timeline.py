@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+日程时间轴
+一次返回日期范围内的时间块（嵌套已排程任务）与番茄钟会话，日历视图不必再分别请求时间块、任务和会话。
+无论时间块与任务多少，固定三次查询：时间块、selectinload批量加载的已排程任务、番茄钟会话。
+"""
+
+from datetime import date as date_type, datetime, time, timedelta
+from typing import Dict
+
+from sqlalchemy.orm import selectinload
+
+from models.pomodoro_session import PomodoroSession
+from models.task import Task
+from models.time_block import TimeBlock
+
+
+def build_timeline(user_id: str, start_date: date_type, end_date: date_type) -> Dict:
+    """日期范围（含首尾）内的时间轴，时间块包含跨越范围边界的部分"""
+    window_start = datetime.combine(start_date, time.min)
+    window_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    time_blocks = TimeBlock.query.options(
+        selectinload(TimeBlock.scheduled_tasks)
+    ).filter(
+        TimeBlock.user_id == user_id,
+        TimeBlock.start_time < window_end,
+        TimeBlock.end_time > window_start
+    ).order_by(TimeBlock.start_time, TimeBlock.end_time).all()
+
+    sessions = PomodoroSession.query.filter(
+        PomodoroSession.user_id == user_id,
+        PomodoroSession.start_time >= window_start,
+        PomodoroSession.start_time < window_end
+    ).order_by(PomodoroSession.start_time).all()
+
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'time_blocks': [_serialize_block(block) for block in time_blocks],
+        'pomodoro_sessions': [session.to_dict() for session in sessions]
+    }
+
+
+def _serialize_block(block: TimeBlock) -> Dict:
+    block_dict = block.to_dict()
+    scheduled_tasks = sorted(block.scheduled_tasks, key=_task_order)
+    block_dict['scheduled_tasks'] = [task.to_dict() for task in scheduled_tasks]
+    return block_dict
+
+
+def _task_order(task: Task):
+    return (task.planned_start_time or datetime.max, task.created_at or datetime.max, task.id)
@@ -1,3 +1,4 @@
+import json
 from typing import Dict, Any, Optional
 from flask import jsonify
 
@@ -31,4 +32,29 @@ def validation_error_response(errors: Dict[str, Any]):
         message="Validation failed",
         status_code=422,
         details={'validation_errors': errors}
-    )
\ No newline at end of file
+    )
+
+def job_accepted_response(job, message: str = "Job accepted"):
+    """后台任务已受理响应（202），客户端轮询Location或订阅stream获取结果"""
+    status_url = f'/api/jobs/{job.id}'
+    response = jsonify({
+        'message': message,
+        'job': job.to_dict(),
+        'status_url': status_url,
+        'stream_url': f'{status_url}/stream'
+    })
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+def format_sse_event(event_type: str, payload: Dict[str, Any]) -> str:
+    """格式化SSE事件帧"""
+    return f"event: {event_type}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def format_ndjson_line(payload: Dict[str, Any]) -> str:
+    """格式化NDJSON行（每行一个JSON对象）"""
+    return json.dumps(payload, ensure_ascii=False) + '\n'
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+启动耗时分析
+按子系统依次导入（框架 -> 应用包 -> 模型 -> 各路由模块 -> 服务），再调用create_app，
+每一步只计入该步新导入的模块，类似 `python -X importtime` 但按子系统汇总
+"""
+
+import sys
+import time
+from importlib import import_module
+from typing import Callable, List, Tuple
+
+# 导入顺序即依赖顺序，靠后的子系统不会重复计入前面已导入的模块
+FRAMEWORK_MODULES = (
+    ('flask', 'flask'),
+    ('sqlalchemy', 'flask_sqlalchemy'),
+    ('jwt', 'flask_jwt_extended'),
+    ('cors', 'flask_cors'),
+    ('config', 'config'),
+)
+
+SERVICE_MODULES = (
+    'services.job_queue',
+    'services.background_jobs',
+    'services.capacity_index',
+    'app.cli',
+)
+
+
+class StartupProfiler:
+    """记录各子系统的导入耗时与新增模块数"""
+
+    def __init__(self):
+        self.records: List[Tuple[str, float, int]] = []
+
+    def measure(self, name: str, func: Callable):
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        self.records.append((name, elapsed, len(sys.modules) - modules_before))
+        return result
+
+    def import_module(self, name: str, module_name: str):
+        return self.measure(name, lambda: import_module(module_name))
+
+    def report(self) -> str:
+        total = sum(elapsed for _, elapsed, _ in self.records)
+        lines = [f"{'subsystem':<40}{'ms':>10}{'modules':>10}{'share':>8}"]
+        for name, elapsed, module_count in self.records:
+            share = elapsed / total * 100 if total else 0
+            lines.append(f'{name:<40}{elapsed * 1000:>10.1f}{module_count:>10}{share:>7.1f}%')
+        lines.append(f"{'total':<40}{total * 1000:>10.1f}{sum(r[2] for r in self.records):>10}")
+        return '\n'.join(lines)
+
+
+def profile_startup(config_class=None) -> StartupProfiler:
+    """按子系统测量应用冷启动耗时，需在导入app包之前调用"""
+    profiler = StartupProfiler()
+
+    for name, module_name in FRAMEWORK_MODULES:
+        profiler.import_module(name, module_name)
+
+    app_package = profiler.import_module('app', 'app')
+    profiler.import_module('models', 'models')
+
+    for module_name, _, _ in app_package.BLUEPRINTS:
+        profiler.import_module(module_name, module_name)
+
+    for module_name in SERVICE_MODULES:
+        profiler.import_module(module_name, module_name)
+
+    profiler.measure('create_app', lambda: app_package.create_app(config_class))
+    return profiler
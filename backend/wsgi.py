@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+时间管理系统 - WSGI入口
+gunicorn wsgi:app
+"""
+
+from dotenv import load_dotenv
+from app import create_app
+
+# 加载环境变量
+load_dotenv()
+
+# 创建应用实例
+app = application = create_app()
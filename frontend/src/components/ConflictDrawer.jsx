@@ -138,7 +138,7 @@ const ConflictDrawer = ({
                     <div style={{ marginBottom: '16px' }}>
                         <Title level={5}>
                             <CheckCircleOutlined style={{ color: '#52c41a', marginRight: '8px' }} />
-                            自动修复结果
+                            自动修复方案（预览）
                         </Title>
                         <List
                             dataSource={autoFixes}
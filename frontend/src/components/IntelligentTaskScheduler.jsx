@@ -120,8 +120,19 @@ const IntelligentTaskScheduler = () => {
   const generateRecommendations = async () => {
     setLoading(true)
     try {
+      // 服务端一次性为所有未排程任务计算时间块匹配分数，失败时使用本地匹配
+      let blockSuggestions = {}
+      try {
+        const response = await api.post('/time-blocks/suggest-time-slots/batch', {
+          date: selectedDate.format('YYYY-MM-DD')
+        })
+        blockSuggestions = response?.suggestions || {}
+      } catch (error) {
+        console.warn('批量获取时间块建议失败:', error)
+      }
+
       // 这里是核心的智能推荐算法
-      const smartRecommendations = calculateSmartRecommendations()
+      const smartRecommendations = calculateSmartRecommendations(blockSuggestions)
       setRecommendations(smartRecommendations)
 
       // 更新统计数据
@@ -137,7 +148,7 @@ const IntelligentTaskScheduler = () => {
   }
 
   // 核心智能推荐算法
-  const calculateSmartRecommendations = () => {
+  const calculateSmartRecommendations = (blockSuggestions = {}) => {
     const pendingTasks = tasks.filter(task => task.status === 'PENDING')
     const todayTimeBlocks = timeBlocks.filter(block =>
       dayjs(block.date).isSame(selectedDate, 'day')
@@ -201,7 +212,10 @@ const IntelligentTaskScheduler = () => {
       // 只推荐优先级分数足够高的任务
       if (priorityScore >= algorithmConfig.minPriorityScore) {
         // 寻找合适的时间块
-        const suitableTimeBlock = findSuitableTimeBlock(task, todayTimeBlocks)
+        const bestSuggestion = blockSuggestions[task.id]?.[0]
+        const suitableTimeBlock = (bestSuggestion?.match_score > 0 &&
+          todayTimeBlocks.find(block => block.id === bestSuggestion.time_block_id)) ||
+          findSuitableTimeBlock(task, todayTimeBlocks)
 
         recommendations.push({
           id: `task_${task.id}`,
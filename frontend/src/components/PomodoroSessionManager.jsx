@@ -34,7 +34,7 @@ import {
 } from '@ant-design/icons'
 import dayjs from 'dayjs'
 import duration from 'dayjs/plugin/duration'
-import api from '../services/api'
+import api, { pomodoroService } from '../services/api'
 
 dayjs.extend(duration)
 
@@ -84,6 +84,7 @@ const PomodoroSessionManager = ({ selectedTask = null, onSessionUpdate = null })
 
   const timerRef = useRef(null)
   const intervalRef = useRef(null)
+  const serverOffsetRef = useRef(0)
 
   // 获取任务列表
   const fetchTasks = async () => {
@@ -166,16 +167,53 @@ const PomodoroSessionManager = ({ selectedTask = null, onSessionUpdate = null })
     fetchSessions()
     fetchActiveSession()
 
-    // 每10秒检查一次活跃会话状态
-    intervalRef.current = setInterval(fetchActiveSession, 10000)
+    // 订阅会话状态推送，由服务器时间偏移在本地倒计时；推送不可用时退回轮询
+    const source = pomodoroService.openSessionStream()
+
+    source.addEventListener('sync', (event) => {
+      const { server_time: serverTime, active_session: session } = JSON.parse(event.data)
+      serverOffsetRef.current = dayjs(serverTime).valueOf() - Date.now()
+      applySessionState(session)
+    })
+    ;['started', 'completed', 'interrupted'].forEach((eventType) => {
+      source.addEventListener(eventType, (event) => {
+        applySessionState(JSON.parse(event.data))
+        fetchSessions()
+      })
+    })
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED && !intervalRef.current) {
+        intervalRef.current = setInterval(fetchActiveSession, 10000)
+      }
+    }
 
     return () => {
+      source.close()
       if (intervalRef.current) {
         clearInterval(intervalRef.current)
       }
     }
   }, [])
 
+  // 根据推送的会话状态更新计时器
+  const applySessionState = (session) => {
+    if (!session || session.status !== 'IN_PROGRESS') {
+      setActiveSession(null)
+      setIsRunning(false)
+      stopTimer()
+      return
+    }
+
+    // 服务器时间为UTC且不带时区标记
+    const serverNow = Date.now() + serverOffsetRef.current
+    const elapsedSeconds = (serverNow - dayjs(`${session.start_time}Z`).valueOf()) / 1000
+    const remainingTime = Math.max(0, Math.floor(session.planned_duration * 60 - elapsedSeconds))
+
+    setActiveSession({ ...session, remaining_time: remainingTime })
+    setIsRunning(true)
+    startTimer(remainingTime)
+  }
+
   useEffect(() => {
     if (selectedTask) {
       setCurrentTask(selectedTask)
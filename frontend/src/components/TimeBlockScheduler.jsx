@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import {
     Card,
     Button,
@@ -25,7 +25,7 @@ import {
     AppstoreOutlined,
     DeleteOutlined
 } from '@ant-design/icons';
-import { timeBlockService, taskService } from '../services/api';
+import { timeBlockService, taskService, timelineService } from '../services/api';
 import { useAuthStore } from '../stores/authStore';
 import dayjs from 'dayjs';
 import { DragDropContext } from 'react-beautiful-dnd';
@@ -53,7 +53,10 @@ const TimeBlockScheduler = () => {
     const [conflictDrawerVisible, setConflictDrawerVisible] = useState(false);
     const [conflicts, setConflicts] = useState([]);
     const [autoFixes, setAutoFixes] = useState([]);
+    const [autoFixFingerprint, setAutoFixFingerprint] = useState(null);
     const [severitySummary, setSeveritySummary] = useState({});
+    // 冲突快照版本，拖拽后据此增量复查
+    const conflictVersionRef = useRef(null);
     const [form] = Form.useForm();
 
     // 新增状态
@@ -71,16 +74,23 @@ const TimeBlockScheduler = () => {
     };
 
     // 获取时间块数据
-    const fetchTimeBlocks = useCallback(async (date) => {
+    // changes为拖拽修改的 { blockIds, taskIds }，传入时只增量复查受影响的冲突
+    const fetchTimeBlocks = useCallback(async (date, changes) => {
         if (!isAuthenticated) return;
 
         setLoading(true);
         try {
             const dateStr = date.format('YYYY-MM-DD');
-            const response = await timeBlockService.getTimeBlocks({ date: dateStr });
-            setTimeBlocks(response || []);
+            // 时间轴接口一次返回时间块及其已排程任务
+            const response = await timelineService.getTimeline({ date: dateStr });
+            const blocks = response.time_blocks || [];
+            setTimeBlocks(blocks);
             // 检查时间冲突
-            checkConflicts(response || []);
+            if (changes) {
+                recheckConflicts(blocks, changes);
+            } else {
+                checkConflicts(blocks);
+            }
         } catch (error) {
             console.error('获取时间块失败:', error);
             message.error('获取时间块失败');
@@ -112,12 +122,13 @@ const TimeBlockScheduler = () => {
         try {
             const response = await timeBlockService.checkConflicts(selectedDate.format('YYYY-MM-DD'));
             const conflicts = response.conflicts || [];
-            const autoFixes = response.auto_fixes || [];
             const severitySummary = response.severity_summary || {};
 
             setConflicts(conflicts);
-            setAutoFixes(autoFixes);
             setSeveritySummary(severitySummary);
+            conflictVersionRef.current = response.version || null;
+
+            await previewAutoFix(response.auto_fixable_count);
 
             // 如果有冲突，显示通知
             if (conflicts.length > 0) {
@@ -136,6 +147,51 @@ const TimeBlockScheduler = () => {
         }
     };
 
+    // 检测接口只读，有可自动修复的冲突时预览修复方案
+    const previewAutoFix = async (autoFixableCount) => {
+        if (autoFixableCount > 0) {
+            const plan = await timeBlockService.autoFixConflicts(selectedDate.format('YYYY-MM-DD'), { dry_run: true });
+            setAutoFixes(plan.changes || []);
+            setAutoFixFingerprint(plan.fingerprint || null);
+        } else {
+            setAutoFixes([]);
+            setAutoFixFingerprint(null);
+        }
+    };
+
+    // 增量复查：只合并自上次版本以来新增和移除的冲突，没有版本时退回整天检测
+    const recheckConflicts = async (blocks, { blockIds = [], taskIds = [] }) => {
+        if (!conflictVersionRef.current) {
+            checkConflicts(blocks);
+            return;
+        }
+
+        try {
+            const response = await timeBlockService.recheckConflicts(selectedDate.format('YYYY-MM-DD'), {
+                since: conflictVersionRef.current,
+                block_ids: blockIds,
+                task_ids: taskIds
+            });
+            conflictVersionRef.current = response.version || null;
+
+            if (response.full) {
+                setConflicts(response.conflicts || []);
+            } else {
+                const removed = new Set(response.removed || []);
+                setConflicts(previous => [
+                    ...previous.filter(conflict => !removed.has(conflict.key)),
+                    ...(response.added || [])
+                ]);
+            }
+            setSeveritySummary(response.severity_summary || {});
+
+            await previewAutoFix(response.auto_fixable_count);
+        } catch (error) {
+            console.error('增量复查时间冲突失败:', error);
+            checkConflicts(blocks);
+        }
+    };
+
     // 本地冲突检查（降级方案）
     const checkConflictsLocally = (blocks) => {
         const conflicts = [];
@@ -203,7 +259,7 @@ const TimeBlockScheduler = () => {
             setModalVisible(false);
             setEditingBlock(null);
             form.resetFields();
-            fetchTimeBlocks(selectedDate);
+            fetchTimeBlocks(selectedDate, editingBlock ? { blockIds: [editingBlock.id] } : undefined);
         } catch (error) {
             console.error(`${editingBlock ? '更新' : '创建'}时间块失败:`, error);
             const errorMessage = error.error || `${editingBlock ? '更新' : '创建'}时间块失败`;
@@ -252,7 +308,7 @@ const TimeBlockScheduler = () => {
                 try {
                     await timeBlockService.scheduleTask(timeBlockId, task.id);
                     message.success(`任务"${task.title}"已调度到${blockTypeConfig[timeBlock.block_type]?.label}时间块`);
-                    fetchTimeBlocks(selectedDate);
+                    fetchTimeBlocks(selectedDate, { taskIds: [task.id] });
                 } catch (error) {
                     console.error('任务调度失败:', error);
                     const errorMessage = error.error || '任务调度失败';
@@ -278,7 +334,7 @@ const TimeBlockScheduler = () => {
                         // 再调度到新时间块
                         await timeBlockService.scheduleTask(destBlockId, taskId);
                         message.success(`任务"${task.title}"已移动到新的时间块`);
-                        fetchTimeBlocks(selectedDate);
+                        fetchTimeBlocks(selectedDate, { taskIds: [task.id] });
                     } catch (error) {
                         console.error('任务移动失败:', error);
                         const errorMessage = error.error || '任务移动失败';
@@ -292,11 +348,22 @@ const TimeBlockScheduler = () => {
     // 自动修复所有冲突
     const handleAutoFixAll = async () => {
         try {
-            // 这里可以调用自动修复API
-            message.info('自动修复功能开发中...');
+            const result = await timeBlockService.autoFixConflicts(selectedDate.format('YYYY-MM-DD'), {
+                dry_run: false,
+                fingerprint: autoFixFingerprint
+            });
+            message.success(`已调整 ${result.change_count} 个时间块，解决 ${result.resolved_overlap_count} 处重叠`);
+            fetchTimeBlocks(selectedDate);
         } catch (error) {
             console.error('自动修复失败:', error);
-            message.error('自动修复失败');
+            // 预览之后时间块被修改，重新检测以获取最新方案
+            if (error.plan) {
+                message.warning('时间块已变化，请确认新的修复方案');
+                setAutoFixes(error.plan.changes || []);
+                setAutoFixFingerprint(error.plan.fingerprint || null);
+            } else {
+                message.error('自动修复失败');
+            }
         }
     };
 
@@ -27,7 +27,7 @@ import {
   CheckCircleOutlined
 } from '@ant-design/icons'
 import dayjs from 'dayjs'
-import api from '../services/api'
+import api, { timelineService } from '../services/api'
 
 const { Option } = Select
 const { TextArea } = Input
@@ -43,19 +43,20 @@ const BLOCK_TYPES = [
 
 function Calendar() {
   const [timeBlocks, setTimeBlocks] = useState([])
+  const [pomodoroSessions, setPomodoroSessions] = useState([])
   const [loading, setLoading] = useState(false)
   const [selectedDate, setSelectedDate] = useState(dayjs())
   const [modalVisible, setModalVisible] = useState(false)
   const [editingTimeBlock, setEditingTimeBlock] = useState(null)
   const [form] = Form.useForm()
 
-  // 获取时间块列表
-  const fetchTimeBlocks = async (date = null) => {
+  // 获取时间轴：时间块（含已排程任务）与当天的番茄钟会话一次返回
+  const fetchTimeBlocks = async (date = dayjs()) => {
     setLoading(true)
     try {
-      const params = date ? `?date=${date.format('YYYY-MM-DD')}` : ''
-      const response = await api.get(`/time-blocks${params}`)
-      setTimeBlocks(response.data)
+      const response = await timelineService.getTimeline({ date: date.format('YYYY-MM-DD') })
+      setTimeBlocks(response.time_blocks || [])
+      setPomodoroSessions(response.pomodoro_sessions || [])
     } catch (error) {
       message.error('获取时间块列表失败')
     } finally {
@@ -155,6 +156,12 @@ function Calendar() {
     return hours
   }
 
+  // 时间块内已排程任务当天完成的番茄钟数
+  const countCompletedPomodoros = (timeBlock) => {
+    const taskIds = new Set((timeBlock.scheduled_tasks || []).map(task => task.id))
+    return pomodoroSessions.filter(session => session.status === 'COMPLETED' && taskIds.has(session.task_id)).length
+  }
+
   // 获取指定小时的时间块
   const getTimeBlocksForHour = (hour) => {
     return timeBlocks
@@ -190,6 +197,16 @@ function Calendar() {
                   {timeBlock.description}
                 </div>
               )}
+              {timeBlock.scheduled_tasks?.length > 0 && (
+                <div style={{ fontSize: '10px', opacity: 0.9 }}>
+                  {timeBlock.scheduled_tasks.map(task => task.title).join('、')}
+                </div>
+              )}
+              {countCompletedPomodoros(timeBlock) > 0 && (
+                <div style={{ fontSize: '10px', opacity: 0.9 }}>
+                  🍅 × {countCompletedPomodoros(timeBlock)}
+                </div>
+              )}
             </div>
           </Card>
         )
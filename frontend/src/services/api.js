@@ -9,19 +9,24 @@ const api = axios.create({
   }
 })
 
+// 从本地存储读取认证token
+const getAuthToken = () => {
+  const token = localStorage.getItem('auth-storage')
+  if (!token) return null
+  try {
+    return JSON.parse(token).state?.token || null
+  } catch (error) {
+    console.warn('Failed to parse auth token from localStorage')
+    return null
+  }
+}
+
 // 请求拦截器 - 添加认证token
 api.interceptors.request.use(
   (config) => {
-    const token = localStorage.getItem('auth-storage')
+    const token = getAuthToken()
     if (token) {
-      try {
-        const authData = JSON.parse(token)
-        if (authData.state?.token) {
-          config.headers.Authorization = `Bearer ${authData.state.token}`
-        }
-      } catch (error) {
-        console.warn('Failed to parse auth token from localStorage')
-      }
+      config.headers.Authorization = `Bearer ${token}`
     }
     return config
   },
@@ -76,6 +81,15 @@ export const taskCategoryService = {
   deleteCategory: (id) => api.delete(`/task-categories/${id}`)
 }
 
+// 类别匹配规则相关API
+export const matchingRuleService = {
+  getRules: () => api.get('/matching-rules'),
+  getMatrix: () => api.get('/matching-rules/matrix'),
+  setCategoryRules: (categoryName, rules) => api.put(`/matching-rules/${encodeURIComponent(categoryName)}`, { rules }),
+  deleteCategoryRules: (categoryName) => api.delete(`/matching-rules/${encodeURIComponent(categoryName)}`),
+  resetRules: () => api.delete('/matching-rules')
+}
+
 // 项目相关API
 export const projectService = {
   getProjects: () => api.get('/projects'),
@@ -104,7 +118,35 @@ export const timeBlockService = {
   scheduleTask: (timeBlockId, taskId) => api.post(`/time-blocks/${timeBlockId}/schedule-task`, { task_id: taskId }),
   unscheduleTask: (timeBlockId, taskId) => api.post(`/time-blocks/${timeBlockId}/unschedule-task`, { task_id: taskId }),
   checkConflicts: (date) => api.post('/time-blocks/check-conflicts', { date }),
+  autoFixConflicts: (date, options) => api.post('/time-blocks/conflicts/auto-fix', { date, ...options }),
+  recheckConflicts: (date, options) => api.post('/time-blocks/conflicts/recheck', { date, ...options }),
   suggestTimeSlots: (taskId, date) => api.post('/time-blocks/suggest-time-slots', { task_id: taskId, date }),
+  suggestTimeSlotsBatch: (date, taskIds, topK) => api.post('/time-blocks/suggest-time-slots/batch', { date, task_ids: taskIds, top_k: topK }),
+  autoSchedule: (data) => api.post('/time-blocks/auto-schedule', data),
+  getFreeSlots: (date, minutes) => api.get('/time-blocks/free-slots', { params: { date, minutes } }),
+  // 冲突范围扫描以NDJSON流式返回，axios无法逐行读取响应，使用fetch读取；每行解析后回调onLine
+  scanConflicts: async (startDate, endDate, onLine) => {
+    const token = getAuthToken()
+    const params = new URLSearchParams({ start_date: startDate, end_date: endDate })
+    const response = await fetch(`/api/time-blocks/conflicts?${params}`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {}
+    })
+    if (!response.ok) {
+      throw await response.json()
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    for (;;) {
+      const { done, value } = await reader.read()
+      buffer += decoder.decode(value || new Uint8Array(), { stream: !done })
+      const lines = buffer.split('\n')
+      buffer = lines.pop()
+      lines.filter(Boolean).forEach(line => onLine(JSON.parse(line)))
+      if (done) break
+    }
+  },
   // 新增API
   getStatistics: (params) => api.get('/time-blocks/statistics', { params }),
   searchTimeBlocks: (params) => api.get('/time-blocks/search', { params }),
@@ -113,6 +155,28 @@ export const timeBlockService = {
 }
 
 // 时间块模板相关API
+// 时间轴：一次获取时间块（含已排程任务）与番茄钟会话，params为 { date } 或 { start, end }
+export const searchService = {
+  search: (params) => api.get('/search', { params })
+}
+
+export const exportService = {
+  exportData: (params) => api.get('/export', { params, responseType: 'blob' }),
+  exportAnalytics: (params) => api.get('/export/analytics', { params, responseType: 'blob' })
+}
+
+export const importService = {
+  importData: (file, params) => api.post('/import', file, {
+    params,
+    headers: { 'Content-Type': params?.format === 'csv' ? 'text/csv' : 'application/x-ndjson' },
+    responseType: 'text'
+  })
+}
+
+export const timelineService = {
+  getTimeline: (params) => api.get('/timeline', { params })
+}
+
 export const timeBlockTemplateService = {
   getTemplates: () => api.get('/time-block-templates'),
   getTemplate: (id) => api.get(`/time-block-templates/${id}`),
@@ -132,7 +196,13 @@ export const pomodoroService = {
   completeSession: (id, summary) => api.post(`/pomodoro-sessions/${id}/complete`, { completion_summary: summary }),
   interruptSession: (id, reason) => api.post(`/pomodoro-sessions/${id}/interrupt`, { interruption_reason: reason }),
   getActiveSession: () => api.get('/pomodoro-sessions/active'),
-  deleteSession: (id) => api.delete(`/pomodoro-sessions/${id}`)
+  deleteSession: (id) => api.delete(`/pomodoro-sessions/${id}`),
+  // EventSource无法设置请求头，令牌通过查询参数传递
+  openSessionStream: () => {
+    const token = getAuthToken()
+    const query = token ? `?jwt=${encodeURIComponent(token)}` : ''
+    return new EventSource(`/api/pomodoro-sessions/stream${query}`)
+  }
 }
 
 // 推荐引擎相关API
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+分析用列式导出测试（需要pyarrow）
+"""
+
+import pytest
+import io
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestAnalyticsExport:
+    """测试Arrow / Parquet导出"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {'Authorization': f'Bearer {access_token}'}
+
+    @pytest.fixture
+    def time_blocks(self, app):
+        """当前用户5个时间块（插入顺序与时间顺序相反），另有其他用户的时间块"""
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+
+        blocks = [TimeBlock(user_id=USER_ID, date=DAY, start_time=DAY + timedelta(hours=hour),
+                            end_time=DAY + timedelta(hours=hour, minutes=45), block_type=block_type,
+                            color='#000000')
+                  for hour, block_type in zip((16, 14, 12, 10, 8), (BlockType.REST, BlockType.RESEARCH,
+                                                                   BlockType.REVIEW, BlockType.RESEARCH,
+                                                                   BlockType.GROWTH))]
+        blocks.append(TimeBlock(user_id='other-user-id', date=DAY, start_time=DAY, end_time=DAY + timedelta(hours=1),
+                                block_type=BlockType.REST, color='#000000'))
+        db.session.add_all(blocks)
+        db.session.commit()
+        return blocks
+
+    def test_parquet_types_and_order(self, client, auth_headers, time_blocks):
+        """测试Parquet列类型（枚举为dictionary、时间为timestamp）与按时间排序"""
+        pa = pytest.importorskip('pyarrow')
+        pq = pytest.importorskip('pyarrow.parquet')
+
+        response = client.get('/api/export/analytics?entity=time_blocks&format=parquet', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/vnd.apache.parquet'
+
+        table = pq.read_table(io.BytesIO(response.get_data()))
+        assert table.num_rows == 5
+        assert table.schema.field('block_type').type == pa.dictionary(pa.int8(), pa.string())
+        assert table.schema.field('start_time').type == pa.timestamp('us')
+        assert table.schema.field('duration_minutes').type == pa.int32()
+        assert table.schema.field('is_recurring').type == pa.bool_()
+        assert table.column('start_time').to_pylist() == [DAY + timedelta(hours=hour) for hour in (8, 10, 12, 14, 16)]
+        assert table.column('block_type').to_pylist() == ['GROWTH', 'RESEARCH', 'REVIEW', 'RESEARCH', 'REST']
+        assert set(table.column('user_id').to_pylist()) == {USER_ID}
+
+    def test_arrow_stream_in_batches(self, client, auth_headers, time_blocks, monkeypatch):
+        """测试按批写出：每批一个RecordBatch / row group，各批枚举字典一致"""
+        pa = pytest.importorskip('pyarrow')
+        pq = pytest.importorskip('pyarrow.parquet')
+        from services import analytics_export
+
+        monkeypatch.setattr(analytics_export, 'ANALYTICS_BATCH_SIZE', 2)
+        response = client.get('/api/export/analytics?entity=time_blocks&format=arrow', headers=auth_headers)
+        assert response.mimetype == 'application/vnd.apache.arrow.stream'
+        batches = list(pa.ipc.open_stream(response.get_data()))
+        assert [batch.num_rows for batch in batches] == [2, 2, 1]
+        dictionaries = {tuple(batch.column('block_type').dictionary.to_pylist()) for batch in batches}
+        assert dictionaries == {('RESEARCH', 'GROWTH', 'REST', 'ENTERTAINMENT', 'REVIEW')}
+
+        response = client.get('/api/export/analytics?entity=time_blocks&format=parquet', headers=auth_headers)
+        assert pq.ParquetFile(io.BytesIO(response.get_data())).metadata.num_row_groups == 3
+
+    def test_sessions_and_empty_export(self, app, client, auth_headers):
+        """测试番茄钟会话导出，及没有数据时输出带schema的空文件"""
+        pq = pytest.importorskip('pyarrow.parquet')
+        from app import db
+        from models.pomodoro_session import PomodoroSession
+        from models.task import Task, TaskType
+
+        response = client.get('/api/export/analytics?entity=pomodoro_sessions', headers=auth_headers)
+        table = pq.read_table(io.BytesIO(response.get_data()))
+        assert table.num_rows == 0 and 'session_type' in table.column_names
+
+        task = Task(title='阅读论文', user_id=USER_ID, category_id='missing-category', planned_start_time=DAY,
+                    task_type=TaskType.FLEXIBLE)
+        db.session.add(task)
+        db.session.commit()
+        session = PomodoroSession(task_id=task.id, user_id=USER_ID)
+        session.start()
+        db.session.add(session)
+        db.session.commit()
+
+        response = client.get('/api/export/analytics?entity=pomodoro_sessions', headers=auth_headers)
+        row = pq.read_table(io.BytesIO(response.get_data())).to_pylist()[0]
+        assert row['task_id'] == task.id
+        assert row['status'] == 'IN_PROGRESS' and row['planned_duration'] == 25 and row['end_time'] is None
+
+    def test_validation(self, client, auth_headers, monkeypatch):
+        """测试参数校验与未安装pyarrow时的响应"""
+        from services import analytics_export
+
+        assert client.get('/api/export/analytics?entity=projects', headers=auth_headers).status_code == 400
+        assert client.get('/api/export/analytics?entity=tasks&format=csv', headers=auth_headers).status_code == 400
+
+        monkeypatch.setattr(analytics_export, 'is_available', lambda: False)
+        assert client.get('/api/export/analytics?entity=tasks', headers=auth_headers).status_code == 501
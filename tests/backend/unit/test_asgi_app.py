@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+ASGI模式异步轮询端点测试
+"""
+
+import pytest
+import asyncio
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('asgiref')
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+
+def _call_asgi(asgi_app, path, headers=None, query_string=b''):
+    """以最小ASGI请求调用应用，返回(状态码, 响应头, JSON)"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('utf-8'),
+        'root_path': '',
+        'query_string': query_string,
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in (headers or {}).items()],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 12345)
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+
+    start = next(m for m in messages if m['type'] == 'http.response.start')
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    response_headers = {k.decode('latin-1'): v.decode('latin-1') for k, v in start['headers']}
+    return start['status'], response_headers, json.loads(body)
+
+
+class TestAsyncPollingEndpoints:
+    """测试异步轮询端点"""
+
+    @pytest.fixture
+    def flask_app(self, tmp_path):
+        """创建使用临时文件数据库的测试应用（异步引擎需与同步引擎共享数据）"""
+        from config import TestingConfig
+
+        class FileDatabaseConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'asgi_test.db'}"
+            JWT_SECRET_KEY = 'test-secret-key'
+
+        app = create_app(FileDatabaseConfig)
+        with app.app_context():
+            from app import db
+            db.create_all()
+        return app
+
+    @pytest.fixture
+    def asgi_app(self, flask_app):
+        from app.asgi import create_asgi_app
+        return create_asgi_app(flask_app)
+
+    @pytest.fixture
+    def auth_headers(self, flask_app):
+        """创建认证头"""
+        with flask_app.app_context():
+            access_token = create_access_token(identity='test-user-id')
+        return {'Authorization': f'Bearer {access_token}'}
+
+    def _add_task(self, flask_app, **overrides):
+        from app import db
+        from models.task import Task, TaskType, TaskStatus, PriorityLevel
+
+        with flask_app.app_context():
+            values = dict(
+                title='写论文',
+                user_id='test-user-id',
+                planned_start_time=datetime.utcnow() - timedelta(hours=1),
+                task_type=TaskType.RIGID,
+                category_id='category-1',
+                status=TaskStatus.PENDING,
+                priority=PriorityLevel.HIGH
+            )
+            values.update(overrides)
+            task = Task(**values)
+            db.session.add(task)
+            db.session.commit()
+            return task.id
+
+    def test_health_is_served_async(self, asgi_app):
+        """测试健康检查"""
+        status, _, body = _call_asgi(asgi_app, '/api/health')
+        assert status == 200
+        assert body['status'] == 'healthy'
+
+    def test_requires_token(self, asgi_app):
+        """测试缺少令牌时与Flask-JWT-Extended一致返回401"""
+        status, _, body = _call_asgi(asgi_app, '/api/pomodoro-sessions/active')
+        assert status == 401
+        assert body['msg'] == 'Missing Authorization Header'
+
+    def test_rejects_invalid_token(self, asgi_app):
+        """测试无效令牌"""
+        status, _, _ = _call_asgi(asgi_app, '/api/recommendations/current',
+                                  headers={'Authorization': 'Bearer not-a-token'})
+        assert status == 422
+
+    def test_active_session_matches_sync_endpoint(self, flask_app, asgi_app, auth_headers):
+        """测试活跃会话的异步实现与同步实现返回一致"""
+        from app import db
+        from models.pomodoro_session import PomodoroSession
+
+        task_id = self._add_task(flask_app)
+        with flask_app.app_context():
+            session = PomodoroSession(task_id=task_id, user_id='test-user-id')
+            session.start()
+            db.session.add(session)
+            db.session.commit()
+            session_id = session.id
+
+        status, _, body = _call_asgi(asgi_app, '/api/pomodoro-sessions/active', headers=auth_headers)
+        assert status == 200
+        assert body['active_session']['id'] == session_id
+        assert body['active_session']['status'] == 'IN_PROGRESS'
+
+        sync_response = flask_app.test_client().get('/api/pomodoro-sessions/active', headers=auth_headers)
+        sync_body = json.loads(sync_response.data)
+        assert sync_body['active_session']['id'] == body['active_session']['id']
+
+    def test_no_active_session(self, asgi_app, auth_headers):
+        """测试没有活跃会话"""
+        status, _, body = _call_asgi(asgi_app, '/api/pomodoro-sessions/active', headers=auth_headers)
+        assert status == 200
+        assert 'active_session' not in body
+
+    def test_current_recommendation(self, flask_app, asgi_app, auth_headers):
+        """测试当前推荐的异步实现"""
+        from models.task import PriorityLevel
+
+        self._add_task(flask_app, title='低优先级', priority=PriorityLevel.LOW)
+        task_id = self._add_task(flask_app, title='高优先级')
+
+        status, _, body = _call_asgi(asgi_app, '/api/recommendations/current', headers=auth_headers)
+        assert status == 200
+        assert body['recommendation']['task']['id'] == task_id
+
+        status, _, body = _call_asgi(asgi_app, '/api/recommendations/current', headers=auth_headers,
+                                     query_string=b'current_time=not-a-time')
+        assert status == 400
+
+    def test_other_routes_fall_back_to_flask(self, asgi_app, auth_headers):
+        """测试其余路由交给Flask处理"""
+        status, _, body = _call_asgi(asgi_app, '/api/jobs/', headers=auth_headers)
+        assert status == 200
+        assert body['count'] == 0
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+任务自动排程测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestAutoScheduler:
+    """测试自动排程"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        app.config['JOB_QUEUE_MODE'] = 'eager'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    @pytest.fixture
+    def categories(self, app):
+        from app import db
+        from models.task_category import TaskCategory
+
+        research = TaskCategory(name='科研', color='#000000', user_id=USER_ID)
+        sport = TaskCategory(name='运动', color='#000000', user_id=USER_ID)
+        db.session.add_all([research, sport])
+        db.session.commit()
+        return {'科研': research.id, '运动': sport.id}
+
+    def _block(self, block_type, start_hour, minutes=60, day=DAY):
+        from app import db
+        from models.time_block import TimeBlock
+
+        start_time = day + timedelta(hours=start_hour)
+        block = TimeBlock(
+            user_id=USER_ID,
+            date=day,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=minutes),
+            block_type=block_type,
+            color='#000000'
+        )
+        db.session.add(block)
+        db.session.commit()
+        return block.id
+
+    def _task(self, category_id, start_hour=9, pomodoros=1, rigid=False, priority=None, **overrides):
+        from app import db
+        from models.task import Task, TaskType, PriorityLevel
+
+        task = Task(
+            title=overrides.pop('title', '任务'),
+            user_id=USER_ID,
+            planned_start_time=DAY + timedelta(hours=start_hour),
+            estimated_pomodoros=pomodoros,
+            task_type=TaskType.RIGID if rigid else TaskType.FLEXIBLE,
+            category_id=category_id,
+            priority=priority or PriorityLevel.MEDIUM,
+            **overrides
+        )
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+    def _schedule(self, **kwargs):
+        from services.auto_scheduler import auto_scheduler
+        return auto_scheduler.schedule(USER_ID, DAY, DAY, **kwargs)
+
+    def _assigned(self, result):
+        return {a['task_id']: a['time_block_id'] for a in result['assignments']}
+
+    def test_prefers_best_matching_block_type(self, app, categories):
+        """测试柔性任务分配到类别匹配分数最高的时间块"""
+        from models.time_block import BlockType
+
+        self._block(BlockType.GROWTH, 9)
+        research_block = self._block(BlockType.RESEARCH, 14)
+        task_id = self._task(categories['科研'], start_hour=9)
+
+        result = self._schedule()
+
+        assert self._assigned(result) == {task_id: research_block}
+        assert result['assignments'][0]['match_score'] == 1.0
+
+    def test_respects_capacity_and_task_limit(self, app, categories):
+        """测试时间块容量：60分钟只能放下两个番茄钟"""
+        from models.time_block import BlockType
+
+        self._block(BlockType.RESEARCH, 9, minutes=60)
+        task_ids = [self._task(categories['科研'], title=f'任务{i}') for i in range(3)]
+
+        result = self._schedule()
+
+        assert result['summary']['scheduled'] == 2
+        assert result['unscheduled'][0]['task_id'] in task_ids
+        assert result['unscheduled'][0]['reason'] == '匹配的时间块容量已满'
+
+    def test_existing_schedule_consumes_capacity(self, app, categories):
+        """测试已排程任务占用的容量"""
+        from models.time_block import BlockType
+
+        block_id = self._block(BlockType.RESEARCH, 9, minutes=60)
+        self._task(categories['科研'], pomodoros=2, scheduled_time_block_id=block_id)
+        self._task(categories['科研'])
+
+        result = self._schedule()
+
+        assert result['summary']['total_tasks'] == 1
+        assert result['summary']['scheduled'] == 0
+
+    def test_mismatched_block_is_not_used(self, app, categories):
+        """测试匹配分数低于阈值的时间块不会被使用"""
+        from models.time_block import BlockType
+
+        self._block(BlockType.ENTERTAINMENT, 9)
+        self._task(categories['科研'])
+
+        result = self._schedule()
+
+        assert result['summary']['scheduled'] == 0
+        assert result['unscheduled'][0]['reason'] == '没有类型匹配且时长足够的时间块'
+
+    def test_rigid_task_uses_covering_block(self, app, categories):
+        """测试刚性任务固定在覆盖其计划开始时间的时间块，不受类型匹配影响"""
+        from models.time_block import BlockType
+
+        self._block(BlockType.RESEARCH, 9)
+        covering_block = self._block(BlockType.REST, 14)
+        rigid_id = self._task(categories['科研'], start_hour=14.5, rigid=True)
+        orphan_id = self._task(categories['科研'], start_hour=20, rigid=True)
+
+        result = self._schedule()
+
+        assert self._assigned(result) == {rigid_id: covering_block}
+        assert result['unscheduled'] == [{
+            'task_id': orphan_id,
+            'task_title': '任务',
+            'task_type': 'RIGID',
+            'reason': '没有覆盖计划开始时间的时间块'
+        }]
+
+    def test_rigid_tasks_take_capacity_first(self, app, categories):
+        """测试刚性任务优先占用容量，柔性任务改用其他时间块"""
+        from models.time_block import BlockType
+
+        first_block = self._block(BlockType.RESEARCH, 9, minutes=50)
+        second_block = self._block(BlockType.RESEARCH, 11, minutes=50)
+        flexible_id = self._task(categories['科研'], start_hour=9, pomodoros=2)
+        rigid_id = self._task(categories['科研'], start_hour=9, pomodoros=2, rigid=True)
+
+        assigned = self._assigned(self._schedule())
+
+        assert assigned == {rigid_id: first_block, flexible_id: second_block}
+
+    def test_high_priority_wins_contention(self, app, categories):
+        """测试高优先级任务优先获得最佳时间块"""
+        from models.task import PriorityLevel
+        from models.time_block import BlockType
+
+        research_block = self._block(BlockType.RESEARCH, 9, minutes=25)
+        growth_block = self._block(BlockType.GROWTH, 10, minutes=25)
+        low_id = self._task(categories['科研'], priority=PriorityLevel.LOW, title='低')
+        high_id = self._task(categories['科研'], priority=PriorityLevel.HIGH, title='高')
+
+        assigned = self._assigned(self._schedule())
+
+        assert assigned == {high_id: research_block, low_id: growth_block}
+
+    def test_dry_run_does_not_persist(self, app, categories):
+        """测试dry_run只返回方案"""
+        from app import db
+        from models.task import Task
+        from models.time_block import BlockType
+
+        block_id = self._block(BlockType.RESEARCH, 9)
+        task_id = self._task(categories['科研'])
+
+        assert self._schedule(dry_run=True)['summary']['scheduled'] == 1
+        assert db.session.get(Task, task_id).scheduled_time_block_id is None
+
+        self._schedule()
+        db.session.expire_all()
+        assert db.session.get(Task, task_id).scheduled_time_block_id == block_id
+
+    def test_auto_schedule_endpoint(self, client, auth_headers, categories):
+        """测试自动排程API"""
+        from models.time_block import BlockType
+
+        block_id = self._block(BlockType.RESEARCH, 9)
+        task_id = self._task(categories['科研'])
+
+        response = client.post('/api/time-blocks/auto-schedule', headers=auth_headers,
+                               data=json.dumps({'date': DAY.date().isoformat()}))
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        assert data['assignments'][0]['task_id'] == task_id
+        assert data['assignments'][0]['time_block_id'] == block_id
+        assert data['period'] == {'start_date': '2025-03-10', 'end_date': '2025-03-10'}
+        assert data['dry_run'] is False
+
+    def test_auto_schedule_endpoint_validation(self, client, auth_headers):
+        """测试自动排程API参数校验"""
+        response = client.post('/api/time-blocks/auto-schedule', headers=auth_headers, data=json.dumps({}))
+        assert response.status_code == 400
+
+        # dry_run只接受布尔值，字符串"false"不能被当作预览
+        for dry_run in ('false', '0', 1):
+            response = client.post('/api/time-blocks/auto-schedule', headers=auth_headers,
+                                   data=json.dumps({'date': '2025-03-10', 'dry_run': dry_run}))
+            assert response.status_code == 400
+
+        response = client.post('/api/time-blocks/auto-schedule', headers=auth_headers,
+                               data=json.dumps({'start_date': '2025-03-10', 'end_date': '2025-03-20'}))
+        assert response.status_code == 400
+
+        response = client.post('/api/time-blocks/auto-schedule', headers=auth_headers,
+                               data=json.dumps({'start_date': '2025-03-10', 'end_date': '2025-03-09'}))
+        assert response.status_code == 400
+
+    def test_auto_schedule_endpoint_async(self, client, auth_headers, categories):
+        """测试以后台任务方式排程"""
+        from models.time_block import BlockType
+
+        self._block(BlockType.RESEARCH, 9)
+        self._task(categories['科研'])
+
+        response = client.post('/api/time-blocks/auto-schedule?async=true', headers=auth_headers,
+                               data=json.dumps({'start_date': '2025-03-10', 'end_date': '2025-03-16'}))
+        assert response.status_code == 202
+
+        job = client.get(response.headers['Location'], headers=auth_headers).get_json()['job']
+        assert job['status'] == 'SUCCEEDED'
+        assert job['result']['summary']['scheduled'] == 1
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+批量时间块建议测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestBatchSuggestions:
+    """测试批量时间块建议"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            from services.matching_rules import matching_rule_service
+            db.create_all()
+            matching_rule_service.clear_cache()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    @pytest.fixture
+    def data(self, app):
+        """三个不同类型的时间块与四个任务（最后一个已排程）"""
+        from app import db
+        from models.task import Task, TaskType
+        from models.task_category import TaskCategory
+        from models.time_block import TimeBlock, BlockType
+
+        research = TaskCategory(name='科研', color='#000000', user_id=USER_ID)
+        sport = TaskCategory(name='运动', color='#000000', user_id=USER_ID)
+        db.session.add_all([research, sport])
+        db.session.flush()
+
+        blocks = []
+        for hour, block_type, minutes in ((9, BlockType.RESEARCH, 120), (13, BlockType.GROWTH, 30),
+                                          (18, BlockType.REST, 60)):
+            start_time = DAY + timedelta(hours=hour)
+            blocks.append(TimeBlock(user_id=USER_ID, date=DAY, start_time=start_time,
+                                    end_time=start_time + timedelta(minutes=minutes),
+                                    block_type=block_type, color='#000000'))
+        db.session.add_all(blocks)
+        db.session.flush()
+
+        tasks = [
+            Task(title='论文', user_id=USER_ID, category_id=research.id, estimated_pomodoros=2,
+                 planned_start_time=DAY + timedelta(hours=10), task_type=TaskType.FLEXIBLE),
+            Task(title='跑步', user_id=USER_ID, category_id=sport.id,
+                 planned_start_time=DAY + timedelta(hours=17), task_type=TaskType.FLEXIBLE),
+            Task(title='杂事', user_id=USER_ID, category_id='missing-category',
+                 planned_start_time=DAY + timedelta(hours=12), task_type=TaskType.FLEXIBLE),
+            Task(title='已排程', user_id=USER_ID, category_id=research.id, scheduled_time_block_id=blocks[0].id,
+                 planned_start_time=DAY + timedelta(hours=9), task_type=TaskType.FLEXIBLE),
+        ]
+        db.session.add_all(tasks)
+        db.session.commit()
+        return tasks, blocks
+
+    def test_score_matrix_matches_single_task_scoring(self, app, data):
+        """测试矩阵打分与逐任务打分一致"""
+        from services.category_timeblock_matching import category_timeblock_matcher
+
+        tasks, blocks = data
+        matrix = category_timeblock_matcher.score_matrix(USER_ID, tasks, blocks)
+        assert matrix.shape == (len(tasks), len(blocks))
+
+        for row, task in enumerate(tasks):
+            expected = dict(
+                (block.id, score)
+                for block, score in category_timeblock_matcher.find_best_time_blocks(task, blocks, top_k=len(blocks))
+            )
+            for column, block in enumerate(blocks):
+                assert matrix[row, column] == pytest.approx(expected[block.id])
+
+    def test_batch_endpoint_defaults_to_unscheduled_tasks(self, client, auth_headers, data):
+        """测试未指定task_ids时只为未排程的待处理任务建议，并按分数返回top_k"""
+        tasks, blocks = data
+
+        response = client.post('/api/time-blocks/suggest-time-slots/batch', headers=auth_headers,
+                               data=json.dumps({'date': '2025-03-10', 'top_k': 2}))
+        assert response.status_code == 200
+
+        result = json.loads(response.data)
+        assert result['task_count'] == 3
+        assert set(result['suggestions']) == {task.id for task in tasks[:3]}
+        assert [block['id'] for block in result['time_blocks']] == [block.id for block in blocks]
+
+        paper = result['suggestions'][tasks[0].id]
+        assert len(paper) == 2
+        assert paper[0]['time_block_id'] == blocks[0].id
+        assert paper[0]['match_score'] >= paper[1]['match_score']
+        assert result['suggestions'][tasks[1].id][0]['time_block_id'] == blocks[2].id
+
+    def test_batch_endpoint_validation(self, client, auth_headers, data):
+        """测试参数校验"""
+        tasks, _ = data
+        url = '/api/time-blocks/suggest-time-slots/batch'
+
+        assert client.post(url, headers=auth_headers, data=json.dumps({})).status_code == 400
+        assert client.post(url, headers=auth_headers,
+                           data=json.dumps({'date': '2025-03-10', 'top_k': 0})).status_code == 400
+        assert client.post(url, headers=auth_headers,
+                           data=json.dumps({'date': '2025-03-10', 'task_ids': 'abc'})).status_code == 400
+
+        response = client.post(url, headers=auth_headers,
+                               data=json.dumps({'date': '2025-03-11', 'task_ids': [tasks[3].id]}))
+        assert json.loads(response.data)['suggestions'] == {tasks[3].id: []}
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+任务批量操作测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, func, select
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestBulkTaskOperations:
+    """测试 POST /api/tasks/bulk"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {'Authorization': f'Bearer {access_token}'}
+
+    @pytest.fixture
+    def data(self, app):
+        """一个分类、两个项目、两个标签、一个2小时的时间块与10个任务（另有其他用户的任务）"""
+        from app import db
+        from models.project import Project
+        from models.tag import Tag
+        from models.task import Task, TaskType
+        from models.task_category import TaskCategory
+        from models.time_block import TimeBlock, BlockType
+
+        category = TaskCategory(name='科研', user_id=USER_ID, color='#000000')
+        projects = [Project(name=name, user_id=USER_ID, color='#000000') for name in ('毕业设计', '投稿')]
+        tags = [Tag(name=name, user_id=USER_ID) for name in ('论文', '紧急')]
+        block = TimeBlock(user_id=USER_ID, date=DAY, start_time=DAY.replace(hour=9), end_time=DAY.replace(hour=11),
+                          block_type=BlockType.RESEARCH, color='#000000')
+        db.session.add_all([category, *projects, *tags, block])
+        db.session.flush()
+
+        tasks = [
+            Task(title=f'任务{index}', user_id=USER_ID, category_id=category.id, project_id=projects[0].id,
+                 planned_start_time=DAY + timedelta(hours=index), task_type=TaskType.FLEXIBLE,
+                 estimated_pomodoros=6 if index == 9 else 1, tags=tags[:1] if index < 5 else [])
+            for index in range(10)
+        ]
+        other = Task(title='别人的任务', user_id='other-user-id', category_id=category.id,
+                     planned_start_time=DAY, task_type=TaskType.FLEXIBLE)
+        db.session.add_all([*tasks, other])
+        db.session.commit()
+        return {'category': category, 'projects': projects, 'tags': tags, 'block': block,
+                'task_ids': [task.id for task in tasks], 'other_id': other.id}
+
+    def _bulk(self, client, auth_headers, operations, expected_status=200):
+        response = client.post('/api/tasks/bulk', headers=auth_headers, json={'operations': operations})
+        assert response.status_code == expected_status, response.get_data(as_text=True)
+        return json.loads(response.data)
+
+    def test_operations_and_per_item_results(self, app, client, auth_headers, data):
+        """测试各类操作依次执行、逐项返回结果，且语句数与任务数无关"""
+        from app import db
+        from models.task import Task, TaskStatus
+        from models.task_tags import task_tags
+
+        ids, block, tags = data['task_ids'], data['block'], data['tags']
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            result = self._bulk(client, auth_headers, [
+                {'op': 'update', 'task_ids': ids[:8], 'fields': {'status': 'COMPLETED', 'priority': 'HIGH'}},
+                {'op': 'reschedule', 'task_ids': ids[:8], 'shift_minutes': 7 * 24 * 60},
+                {'op': 'move', 'task_ids': [ids[0], ids[9], 'missing-task', data['other_id']],
+                 'time_block_id': block.id},
+                {'op': 'add_tags', 'task_ids': ids[3:7], 'tag_ids': [tag.id for tag in tags]},
+                {'op': 'remove_tags', 'task_ids': ids[:2], 'tag_ids': [tags[0].id]},
+                {'op': 'delete', 'task_ids': ids[7:]},
+                {'op': 'update', 'task_ids': [ids[8]], 'fields': {'priority': 'LOW'}},
+            ])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        results = result['results']
+        assert [item['op'] for item in results] == [
+            'update', 'reschedule', 'move', 'add_tags', 'remove_tags', 'delete', 'update'
+        ]
+        assert results[0]['succeeded'] == ids[:8] and results[0]['failed'] == []
+        assert results[2]['succeeded'] == [ids[0]]
+        assert {item['task_id']: item['error'].split(' (')[0] for item in results[2]['failed']} == {
+            ids[9]: 'Task duration', 'missing-task': 'Task not found', data['other_id']: 'Task not found'
+        }
+        # 已被前面的操作删除
+        assert results[6]['failed'] == [{'task_id': ids[8], 'error': 'Task deleted by an earlier operation'}]
+        assert result['summary'] == {'operations': 7, 'succeeded': 26, 'failed': 4}
+        assert sum(1 for statement in statements if statement.lstrip().startswith('UPDATE tasks')) <= 6
+
+        db.session.expire_all()
+        remaining = {task.id: task for task in Task.query.filter_by(user_id=USER_ID)}
+        assert sorted(remaining) == sorted(ids[:7])
+        assert all(remaining[task_id].status == TaskStatus.COMPLETED for task_id in ids[:7])
+        assert remaining[ids[1]].planned_start_time == DAY + timedelta(days=7, hours=1)
+        assert remaining[ids[0]].scheduled_time_block_id == block.id
+        assert db.session.get(Task, data['other_id']).status == TaskStatus.PENDING
+
+        tag_counts = dict(db.session.execute(
+            select(task_tags.c.tag_id, func.count()).group_by(task_tags.c.tag_id)
+        ).all())
+        assert tag_counts == {tags[0].id: 5, tags[1].id: 4}
+
+    def test_counters_and_caches(self, app, client, auth_headers, data):
+        """测试集合语句之后计数与源数据一致，容量索引随之失效"""
+        from app import db
+        from models.counters import reconcile_counters
+        from models.time_log import TimeLog
+        from services.capacity_index import capacity_index
+
+        ids, projects, block = data['task_ids'], data['projects'], data['block']
+        db.session.add(TimeLog(user_id=USER_ID, task_id=ids[5], start_time=DAY, end_time=DAY + timedelta(minutes=25),
+                               duration=25, is_completed=True, category_id=data['category'].id,
+                               project_id=projects[0].id))
+        db.session.commit()
+        assert capacity_index.get_day(USER_ID, DAY).remaining_minutes(block.id) == 120
+
+        self._bulk(client, auth_headers, [
+            {'op': 'update', 'task_ids': ids[:4], 'fields': {'project_id': projects[1].id, 'status': 'COMPLETED',
+                                                             'estimated_pomodoros': 2}},
+            {'op': 'move', 'task_ids': ids[:2], 'time_block_id': block.id},
+            {'op': 'delete', 'task_ids': ids[5:7]},
+        ])
+
+        assert reconcile_counters(db.session.connection(), repair=False) == {
+            'tasks': 0, 'projects': 0, 'task_categories': 0
+        }
+        db.session.refresh(projects[1])
+        assert (projects[1].task_count, projects[1].completed_count, projects[1].estimated_pomodoros) == (4, 4, 8)
+        db.session.refresh(projects[0])
+        assert (projects[0].task_count, projects[0].actual_minutes) == (4, 0)
+        assert capacity_index.get_day(USER_ID, DAY).remaining_minutes(block.id) == 20
+
+    def test_validation_rejects_whole_request(self, client, auth_headers, data):
+        """测试请求不合法时返回400且不执行任何操作"""
+        from app import db
+        from models.task import Task, PriorityLevel
+
+        ids = data['task_ids']
+        invalid = [
+            {'op': 'archive', 'task_ids': ids},
+            {'op': 'update', 'task_ids': []},
+            {'op': 'update', 'task_ids': ids, 'fields': {'title': '新标题'}},
+            {'op': 'update', 'task_ids': ids, 'fields': {'status': 'DONE'}},
+            {'op': 'update', 'task_ids': ids, 'fields': {'project_id': 'missing-project'}},
+            {'op': 'reschedule', 'task_ids': ids, 'shift_minutes': '1h'},
+            {'op': 'move', 'task_ids': ids, 'time_block_id': 'missing-block'},
+            {'op': 'add_tags', 'task_ids': ids, 'tag_ids': ['missing-tag']},
+        ]
+        for operation in invalid:
+            result = self._bulk(client, auth_headers, [
+                {'op': 'update', 'task_ids': ids, 'fields': {'priority': 'LOW'}}, operation
+            ], expected_status=400)
+            assert result['error'].startswith('operations[1]: ')
+        self._bulk(client, auth_headers, [], expected_status=400)
+
+        db.session.expire_all()
+        assert Task.query.filter_by(priority=PriorityLevel.LOW).count() == 0
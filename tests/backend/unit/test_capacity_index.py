@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+时间块容量索引测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestCapacityIndex:
+    """测试容量索引"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    @pytest.fixture
+    def index(self, app):
+        from services.capacity_index import capacity_index
+        return capacity_index
+
+    def _block(self, start_hour, minutes=60):
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+
+        start_time = DAY + timedelta(hours=start_hour)
+        block = TimeBlock(
+            user_id=USER_ID,
+            date=DAY,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=minutes),
+            block_type=BlockType.RESEARCH,
+            color='#000000'
+        )
+        db.session.add(block)
+        db.session.commit()
+        return block.id
+
+    def _task(self, pomodoros=1, **overrides):
+        from app import db
+        from models.task import Task, TaskType
+
+        task = Task(
+            title='任务',
+            user_id=USER_ID,
+            planned_start_time=DAY + timedelta(hours=9),
+            estimated_pomodoros=pomodoros,
+            task_type=TaskType.FLEXIBLE,
+            category_id='category-1',
+            **overrides
+        )
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+    def test_blocks_and_gaps_that_fit(self, app, index):
+        """测试按剩余容量与间隙长度查询"""
+        short_block = self._block(8, minutes=60)
+        long_block = self._block(10, minutes=120)
+        self._block(14, minutes=30)
+        self._task(pomodoros=2, scheduled_time_block_id=long_block)
+
+        capacity = index.get_day(USER_ID, DAY)
+
+        assert capacity.remaining_minutes(long_block) == 70
+        assert [block.block_id for block in capacity.blocks_that_fit(60)] == [short_block, long_block]
+        assert [block.block_id for block in capacity.blocks_that_fit(75)] == []
+        assert capacity.gaps_that_fit(75) == [{
+            'start_time': (DAY + timedelta(hours=12)).isoformat(),
+            'end_time': (DAY + timedelta(hours=14)).isoformat(),
+            'minutes': 120
+        }]
+        assert len(capacity.gaps_that_fit(60)) == 2
+
+    def test_schedule_and_unschedule_adjust_in_place(self, app, client, auth_headers, index):
+        """测试排程/取消排程提交后增量调整，不重建索引"""
+        block_id = self._block(9, minutes=60)
+        task_id = self._task()
+        capacity = index.get_day(USER_ID, DAY)
+
+        response = client.post(f'/api/time-blocks/{block_id}/schedule-task', headers=auth_headers,
+                               data=json.dumps({'task_id': task_id}))
+        assert response.status_code == 200
+        assert index.get_day(USER_ID, DAY) is capacity
+        assert capacity.remaining_minutes(block_id) == 35
+        assert capacity.task_count(block_id) == 1
+
+        response = client.post(f'/api/time-blocks/{block_id}/unschedule-task', headers=auth_headers,
+                               data=json.dumps({'task_id': task_id}))
+        assert response.status_code == 200
+        assert capacity.remaining_minutes(block_id) == 60
+        assert capacity.task_count(block_id) == 0
+
+    def test_task_changes_adjust_capacity(self, app, index):
+        """测试番茄钟数修改与任务取消释放容量"""
+        from app import db
+        from models.task import Task, TaskStatus
+
+        block_id = self._block(9, minutes=120)
+        task_id = self._task(pomodoros=2, scheduled_time_block_id=block_id)
+        capacity = index.get_day(USER_ID, DAY)
+        assert capacity.remaining_minutes(block_id) == 70
+
+        task = db.session.get(Task, task_id)
+        task.estimated_pomodoros = 3
+        db.session.commit()
+        assert capacity.remaining_minutes(block_id) == 45
+
+        task = db.session.get(Task, task_id)
+        task.status = TaskStatus.CANCELLED
+        db.session.commit()
+        assert capacity.remaining_minutes(block_id) == 120
+
+    def test_rollback_discards_changes(self, app, index):
+        """测试回滚的改动不影响索引"""
+        from app import db
+        from models.task import Task
+
+        block_id = self._block(9)
+        task_id = self._task()
+        capacity = index.get_day(USER_ID, DAY)
+
+        task = db.session.get(Task, task_id)
+        task.scheduled_time_block_id = block_id
+        db.session.flush()
+        db.session.rollback()
+
+        assert capacity.remaining_minutes(block_id) == 60
+
+    def test_block_edit_invalidates_day(self, app, index):
+        """测试时间块修改使当天索引失效并重建"""
+        from app import db
+        from models.time_block import TimeBlock
+
+        block_id = self._block(9, minutes=60)
+        capacity = index.get_day(USER_ID, DAY)
+
+        block = db.session.get(TimeBlock, block_id)
+        block.end_time = block.start_time + timedelta(minutes=90)
+        db.session.commit()
+
+        rebuilt = index.get_day(USER_ID, DAY)
+        assert rebuilt is not capacity
+        assert rebuilt.remaining_minutes(block_id) == 90
+
+        self._block(13)
+        assert len(index.get_day(USER_ID, DAY).blocks) == 2
+
+    def test_expired_entries_are_rebuilt(self, app, index):
+        """测试超过TTL的索引重新构建"""
+        self._block(9)
+        capacity = index.get_day(USER_ID, DAY)
+
+        app.config['CAPACITY_INDEX_TTL'] = 0
+        assert index.get_day(USER_ID, DAY) is not capacity
+
+    def test_free_slots_endpoint(self, client, auth_headers):
+        """测试空闲时段API"""
+        block_id = self._block(9, minutes=120)
+        self._block(8, minutes=30)
+
+        response = client.get('/api/time-blocks/free-slots?date=2025-03-10&minutes=75', headers=auth_headers)
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        assert [block['time_block_id'] for block in data['time_blocks']] == [block_id]
+        assert data['time_blocks'][0]['remaining_minutes'] == 120
+        assert data['gaps'] == []
+
+        response = client.get('/api/time-blocks/free-slots?date=2025-03-10&minutes=abc', headers=auth_headers)
+        assert response.status_code == 400
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+冲突自动修复方案测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+AUTO_FIX_URL = '/api/time-blocks/conflicts/auto-fix'
+
+
+class TestConflictAutoFix:
+    """测试冲突检测只读与自动修复方案"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    def _block(self, hour, minute, minutes):
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+
+        start_time = DAY + timedelta(hours=hour, minutes=minute)
+        block = TimeBlock(
+            user_id=USER_ID,
+            date=DAY,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=minutes),
+            block_type=BlockType.REST,
+            color='#000000'
+        )
+        db.session.add(block)
+        db.session.commit()
+        return block.id
+
+    def _times(self, block_id):
+        from app import db
+        from models.time_block import TimeBlock
+
+        db.session.expire_all()
+        block = db.session.get(TimeBlock, block_id)
+        return block.start_time.strftime('%H:%M'), block.end_time.strftime('%H:%M')
+
+    def _auto_fix(self, client, auth_headers, **options):
+        response = client.post(AUTO_FIX_URL, headers=auth_headers, data=json.dumps({'date': '2025-03-10', **options}))
+        return response.status_code, json.loads(response.data)
+
+    def test_check_conflicts_is_read_only(self, client, auth_headers):
+        """测试冲突检测不再修改时间块"""
+        first = self._block(9, 0, 60)
+        second = self._block(9, 50, 60)
+
+        response = client.post('/api/time-blocks/check-conflicts', headers=auth_headers,
+                               data=json.dumps({'date': '2025-03-10'}))
+        data = json.loads(response.data)
+        assert data['conflict_count'] == 1
+        assert data['auto_fixable_count'] == 1
+        assert 'auto_fixes' not in data
+        assert self._times(first) == ('09:00', '10:00')
+        assert self._times(second) == ('09:50', '10:50')
+
+    def test_cascading_plan_dry_run_and_apply(self, client, auth_headers):
+        """测试顺延级联到后续时间块，预览不修改，应用后没有重叠"""
+        first = self._block(9, 0, 60)
+        second = self._block(9, 50, 60)
+        third = self._block(10, 55, 60)
+
+        status, plan = self._auto_fix(client, auth_headers, dry_run=True)
+        assert status == 200
+        assert plan['applied'] is False
+        assert [(c['time_block_id'], c['new_start_time'][11:16], c['shift_minutes']) for c in plan['changes']] == [
+            (second, '10:05', 15),
+            (third, '11:10', 15)
+        ]
+        assert plan['resolved_overlap_count'] == 1
+        assert plan['unresolved_overlaps'] == []
+        assert self._times(second) == ('09:50', '10:50')
+
+        status, result = self._auto_fix(client, auth_headers, fingerprint=plan['fingerprint'])
+        assert status == 200
+        assert result['applied'] is True
+        assert result['changes'][0]['old_start_time'][11:16] == '09:50'
+        assert self._times(first) == ('09:00', '10:00')
+        assert self._times(second) == ('10:05', '11:05')
+        assert self._times(third) == ('11:10', '12:10')
+
+        response = client.post('/api/time-blocks/check-conflicts', headers=auth_headers,
+                               data=json.dumps({'date': '2025-03-10'}))
+        assert json.loads(response.data)['conflict_count'] == 0
+
+    def test_large_overlaps_are_left_for_manual_fix(self, client, auth_headers):
+        """测试重叠不少于30分钟的时间块保持不动"""
+        first = self._block(9, 0, 60)
+        second = self._block(9, 20, 60)
+
+        _, plan = self._auto_fix(client, auth_headers, dry_run=True)
+        assert plan['changes'] == []
+        assert plan['unresolved_overlaps'] == [{'time_block_ids': [first, second], 'overlap_minutes': 40}]
+
+    def test_shift_never_creates_new_overlap(self, client, auth_headers):
+        """测试顺延会与固定时间块产生新重叠时放弃该顺延"""
+        self._block(9, 0, 60)
+        self._block(9, 50, 30)
+        # 两个互相重叠30分钟的时间块需要手动处理，顺延后的时间块不能压到它们上面
+        self._block(10, 30, 30)
+        self._block(10, 30, 60)
+
+        _, plan = self._auto_fix(client, auth_headers, dry_run=True)
+        assert plan['changes'] == []
+        assert sorted(o['overlap_minutes'] for o in plan['unresolved_overlaps']) == [10, 30]
+
+    def test_shift_does_not_cross_midnight(self, client, auth_headers):
+        """测试顺延后会越过午夜的时间块保持不动"""
+        self._block(23, 0, 50)
+        self._block(23, 40, 15)
+
+        _, plan = self._auto_fix(client, auth_headers, dry_run=True)
+        assert plan['changes'] == []
+        assert len(plan['unresolved_overlaps']) == 1
+
+    def test_stale_fingerprint_is_rejected(self, client, auth_headers):
+        """测试预览后时间块被修改时拒绝应用"""
+        self._block(9, 0, 60)
+        second = self._block(9, 50, 60)
+
+        _, plan = self._auto_fix(client, auth_headers, dry_run=True)
+        self._block(12, 0, 30)
+
+        status, data = self._auto_fix(client, auth_headers, fingerprint=plan['fingerprint'])
+        assert status == 409
+        assert data['plan']['fingerprint'] != plan['fingerprint']
+        assert self._times(second) == ('09:50', '10:50')
+
+    def test_dry_run_must_be_boolean(self, client, auth_headers):
+        """测试dry_run为字符串或数字时返回400，不按错误的模式执行"""
+        self._block(9, 0, 60)
+        second = self._block(9, 50, 60)
+
+        for dry_run in ('true', 'false', 0):
+            status, data = self._auto_fix(client, auth_headers, dry_run=dry_run)
+            assert status == 400
+            assert data['error'] == 'dry_run must be a boolean'
+        assert self._times(second) == ('09:50', '10:50')
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+冲突响应规范化结构（compact=1）测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestConflictPayload:
+    """测试冲突响应的规范化结构"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    @pytest.fixture
+    def blocks(self, app):
+        """一个长时间块与两个短时间块重叠，长时间块上排了一个超时的任务"""
+        from app import db
+        from models.task import Task, TaskType
+        from models.time_block import TimeBlock, BlockType
+
+        blocks = []
+        for hour, minute, minutes in ((9, 0, 120), (9, 30, 30), (10, 30, 60)):
+            start_time = DAY + timedelta(hours=hour, minutes=minute)
+            blocks.append(TimeBlock(user_id=USER_ID, date=DAY, start_time=start_time,
+                                    end_time=start_time + timedelta(minutes=minutes),
+                                    block_type=BlockType.REST, color='#000000'))
+        db.session.add_all(blocks)
+        db.session.flush()
+        db.session.add(Task(title='写报告', user_id=USER_ID, category_id='missing-category', estimated_pomodoros=6,
+                            planned_start_time=DAY + timedelta(hours=9), task_type=TaskType.FLEXIBLE,
+                            scheduled_time_block_id=blocks[0].id))
+        db.session.commit()
+        return blocks
+
+    def _denormalize(self, payload, name='conflicts'):
+        """按ID还原为完整结构，用于与默认结构比较"""
+        conflicts = []
+        for conflict in payload[name]:
+            conflict = dict(conflict)
+            conflict['affected_blocks'] = [payload['blocks'][block_id] for block_id in conflict.pop('block_ids')]
+            conflict['affected_tasks'] = [payload['tasks'][task_id] for task_id in conflict.pop('task_ids')]
+            conflicts.append(conflict)
+        return conflicts
+
+    def _strip_created_at(self, conflicts):
+        return [{name: value for name, value in conflict.items() if name != 'created_at'} for conflict in conflicts]
+
+    def test_check_conflicts_compact(self, client, auth_headers, blocks):
+        """测试compact=1时每个时间块只序列化一次，还原后与默认结构一致"""
+        url = '/api/time-blocks/check-conflicts'
+        body = json.dumps({'date': '2025-03-10'})
+        full = json.loads(client.post(url, headers=auth_headers, data=body).data)
+        compact = json.loads(client.post(f'{url}?compact=1', headers=auth_headers, data=body).data)
+
+        assert 'blocks' not in full
+        assert compact['conflict_count'] == full['conflict_count'] == 3
+        assert set(compact['blocks']) == {block.id for block in blocks}
+        assert len(compact['tasks']) == 1
+        assert all('affected_blocks' not in conflict for conflict in compact['conflicts'])
+        # 长时间块涉及全部三个冲突，规范化后只出现一次
+        assert sum(blocks[0].id in conflict['block_ids'] for conflict in compact['conflicts']) == 3
+        assert self._strip_created_at(self._denormalize(compact)) == self._strip_created_at(full['conflicts'])
+
+    def test_stream_and_recheck_compact(self, app, client, auth_headers, blocks):
+        """测试范围扫描与增量复查也支持compact=1"""
+        from app import db
+
+        response = client.get('/api/time-blocks/conflicts?start_date=2025-03-10&compact=1', headers=auth_headers)
+        day_line = json.loads(response.get_data(as_text=True).splitlines()[0])
+        assert set(day_line['blocks']) == {block.id for block in blocks}
+        assert all('block_ids' in conflict for conflict in day_line['conflicts'])
+
+        version = json.loads(client.post('/api/time-blocks/check-conflicts', headers=auth_headers,
+                                         data=json.dumps({'date': '2025-03-10'})).data)['version']
+        blocks[2].start_time += timedelta(minutes=10)
+        blocks[2].end_time += timedelta(minutes=10)
+        db.session.commit()
+
+        response = client.post('/api/time-blocks/conflicts/recheck?compact=1', headers=auth_headers,
+                               data=json.dumps({'date': '2025-03-10', 'since': version, 'block_ids': [blocks[2].id]}))
+        delta = json.loads(response.data)
+        [added] = delta['added']
+        assert added['block_ids'] == [blocks[0].id, blocks[2].id]
+        assert set(delta['blocks']) == {blocks[0].id, blocks[2].id}
+        assert delta['removed'] == [added['key']]
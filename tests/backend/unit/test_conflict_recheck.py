@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+冲突增量复查测试
+"""
+
+import pytest
+import json
+import random
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+RECHECK_URL = '/api/time-blocks/conflicts/recheck'
+
+
+class TestConflictRecheck:
+    """测试冲突增量复查"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    def _block(self, hour, minute, minutes, block_type=None):
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+
+        start_time = DAY + timedelta(hours=hour, minutes=minute)
+        block = TimeBlock(
+            user_id=USER_ID,
+            date=DAY,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=minutes),
+            block_type=block_type or BlockType.REST,
+            color='#000000'
+        )
+        db.session.add(block)
+        db.session.commit()
+        return block
+
+    def _move(self, block, hour, minute):
+        from app import db
+
+        duration = block.end_time - block.start_time
+        block.start_time = DAY + timedelta(hours=hour, minutes=minute)
+        block.end_time = block.start_time + duration
+        db.session.commit()
+
+    def _check(self, client, auth_headers):
+        response = client.post('/api/time-blocks/check-conflicts', headers=auth_headers,
+                               data=json.dumps({'date': '2025-03-10'}))
+        return json.loads(response.data)
+
+    def _recheck(self, client, auth_headers, since, block_ids=(), task_ids=()):
+        response = client.post(RECHECK_URL, headers=auth_headers, data=json.dumps({
+            'date': '2025-03-10', 'since': since, 'block_ids': list(block_ids), 'task_ids': list(task_ids)
+        }))
+        assert response.status_code == 200
+        return json.loads(response.data)
+
+    def test_drag_reports_added_and_removed(self, client, auth_headers):
+        """测试拖入重叠时返回新增冲突，拖开后返回移除的冲突键"""
+        first = self._block(9, 0, 60)
+        second = self._block(11, 0, 60)
+
+        data = self._check(client, auth_headers)
+        assert data['conflict_count'] == 0
+
+        self._move(second, 9, 40)
+        delta = self._recheck(client, auth_headers, data['version'], block_ids=[second.id])
+        assert delta['full'] is False
+        assert delta['removed'] == []
+        [conflict] = delta['added']
+        assert conflict['conflict_type'] == 'time_overlap'
+        assert [block['id'] for block in conflict['affected_blocks']] == [first.id, second.id]
+        assert delta['conflict_count'] == 1
+
+        # 继续拖动，重叠分钟数变化：同一个键先移除再添加
+        self._move(second, 9, 50)
+        delta = self._recheck(client, auth_headers, delta['version'], block_ids=[second.id])
+        assert delta['removed'] == [conflict['key']]
+        assert [c['key'] for c in delta['added']] == [conflict['key']]
+        assert '10 分钟' in delta['added'][0]['message']
+
+        self._move(second, 12, 0)
+        delta = self._recheck(client, auth_headers, delta['version'], block_ids=[second.id])
+        assert delta['removed'] == [conflict['key']]
+        assert delta['added'] == []
+        assert delta['conflict_count'] == 0
+
+    def test_older_version_gets_accumulated_changes(self, client, auth_headers):
+        """测试客户端版本落后多次修改时返回累计变化，未知版本返回完整列表"""
+        self._block(9, 0, 60)
+        second = self._block(11, 0, 60)
+        third = self._block(14, 0, 60)
+        version = self._check(client, auth_headers)['version']
+
+        self._move(second, 9, 30)
+        self._recheck(client, auth_headers, version, block_ids=[second.id])
+        self._move(third, 9, 45)
+        delta = self._recheck(client, auth_headers, version, block_ids=[third.id])
+        assert delta['full'] is False
+        assert len(delta['added']) == 3
+        assert delta['conflict_count'] == 3
+
+        delta = self._recheck(client, auth_headers, 'unknown.0', block_ids=[third.id])
+        assert delta['full'] is True
+        assert len(delta['conflicts']) == 3
+
+    def test_task_changes_recheck_old_and_new_block(self, client, auth_headers):
+        """测试任务从过小的时间块移到足够大的时间块后，两处的冲突都被复查"""
+        from app import db
+        from models.task import Task, TaskType
+
+        small = self._block(9, 0, 30)
+        large = self._block(13, 0, 120)
+        task = Task(title='写论文', user_id=USER_ID, category_id='missing-category', estimated_pomodoros=3,
+                    planned_start_time=DAY + timedelta(hours=9), task_type=TaskType.FLEXIBLE,
+                    scheduled_time_block_id=small.id)
+        db.session.add(task)
+        db.session.commit()
+
+        data = self._check(client, auth_headers)
+        assert [c['conflict_type'] for c in data['conflicts']] == ['task_duration']
+
+        task.scheduled_time_block_id = large.id
+        db.session.commit()
+        delta = self._recheck(client, auth_headers, data['version'], task_ids=[task.id])
+        assert delta['removed'] == [data['conflicts'][0]['key']]
+        assert delta['added'] == []
+
+    def test_random_mutations_match_full_detection(self, app, client, auth_headers):
+        """测试随机拖动、改类型、删除、排程后，按增量结果维护的冲突列表与整天检测一致"""
+        from app import db
+        from models.task import Task, TaskType
+        from models.task_category import TaskCategory
+        from models.time_block import BlockType
+        from models.user import User
+        from services.conflict_resolution import conflict_resolution_service
+
+        rng = random.Random(7)
+        category = TaskCategory(name='科研', color='#000000', user_id=USER_ID)
+        # 放宽连续工作阈值，让随机日程更容易出现连续工作冲突
+        user = User(id=USER_ID, username='tester', email='tester@example.com', password_hash='x')
+        user.set_preferences({'min_rest_minutes': 30, 'max_continuous_work_minutes': 120})
+        db.session.add_all([category, user])
+        db.session.flush()
+
+        block_types = [BlockType.RESEARCH, BlockType.GROWTH, BlockType.REST]
+        blocks = [self._block(rng.randrange(6, 20), rng.choice((0, 20, 40)), rng.choice((30, 60, 90)),
+                              rng.choice(block_types)) for _ in range(12)]
+        tasks = [Task(title=f'任务{i}', user_id=USER_ID, category_id=category.id,
+                      estimated_pomodoros=rng.randint(1, 4), planned_start_time=DAY,
+                      task_type=TaskType.FLEXIBLE) for i in range(6)]
+        db.session.add_all(tasks)
+        db.session.commit()
+
+        data = self._check(client, auth_headers)
+        known = {conflict['key']: conflict['message'] for conflict in data['conflicts']}
+        version = data['version']
+        seen_types = set()
+
+        for _ in range(60):
+            live = list(blocks)
+            action = rng.random()
+            block_ids, task_ids = [], []
+            if action < 0.5:
+                block = rng.choice(live)
+                self._move(block, rng.randrange(6, 20), rng.choice((0, 10, 20, 40)))
+                block_ids.append(block.id)
+            elif action < 0.65:
+                block = rng.choice(live)
+                block.block_type = rng.choice(block_types)
+                db.session.commit()
+                block_ids.append(block.id)
+            elif action < 0.72 and len(live) > 4:
+                block = rng.choice(live)
+                block_ids.append(block.id)
+                for task in block.scheduled_tasks:
+                    task.scheduled_time_block_id = None
+                db.session.delete(block)
+                db.session.commit()
+                blocks.remove(block)
+            else:
+                task = rng.choice(tasks)
+                task.scheduled_time_block_id = rng.choice(live).id if rng.random() < 0.8 else None
+                db.session.commit()
+                task_ids.append(task.id)
+
+            delta = self._recheck(client, auth_headers, version, block_ids, task_ids)
+            assert delta['full'] is False
+            for key in delta['removed']:
+                known.pop(key, None)
+            for conflict in delta['added']:
+                known[conflict['key']] = conflict['message']
+                seen_types.add(conflict['conflict_type'])
+            version = delta['version']
+
+            expected = conflict_resolution_service.detect_conflicts(USER_ID, DAY)
+            assert known == {conflict.key: conflict.message for conflict in expected}
+            assert delta['conflict_count'] == len(expected)
+
+        assert {'time_overlap', 'schedule_violation', 'task_duration', 'task_type_mismatch'} <= seen_types
+
+    def test_recheck_validation(self, client, auth_headers):
+        """测试参数校验"""
+        assert client.post(RECHECK_URL, headers=auth_headers, data=json.dumps({})).status_code == 400
+        assert client.post(RECHECK_URL, headers=auth_headers,
+                           data=json.dumps({'date': '2025-03-10'})).status_code == 400
+        assert client.post(RECHECK_URL, headers=auth_headers,
+                           data=json.dumps({'date': '2025-03-10', 'block_ids': 'abc'})).status_code == 400
+        assert client.post(RECHECK_URL, headers=auth_headers, data=json.dumps({
+            'date': '2025-03-10', 'block_ids': [str(i) for i in range(51)]
+        })).status_code == 400
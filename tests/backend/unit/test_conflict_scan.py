@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+冲突范围扫描测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestConflictScan:
+    """测试冲突范围扫描"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    @pytest.fixture
+    def service(self, app):
+        from services.conflict_resolution import conflict_resolution_service
+        return conflict_resolution_service
+
+    def _block(self, start_time, minutes, block_type=None):
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+
+        block = TimeBlock(
+            user_id=USER_ID,
+            date=start_time.replace(hour=0, minute=0),
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=minutes),
+            block_type=block_type or BlockType.REST,
+            color='#000000'
+        )
+        db.session.add(block)
+        db.session.commit()
+        return block
+
+    def test_overlap_across_midnight(self, app, service):
+        """测试前一天跨午夜的时间块与次日时间块的重叠归属于次日"""
+        late = self._block(DAY + timedelta(hours=23), 120)
+        early = self._block(DAY + timedelta(days=1, minutes=30), 60)
+
+        days = list(service.scan_conflicts(USER_ID, DAY.date(), (DAY + timedelta(days=1)).date()))
+        assert [day for day, _ in days] == [(DAY + timedelta(days=1)).date()]
+        [conflict] = days[0][1]
+        assert conflict.conflict_type == 'time_overlap'
+        assert [block.id for block in conflict.affected_blocks] == [late.id, early.id]
+
+        # 只检查次日时，前一天的时间块也参与检测
+        conflicts = service.detect_conflicts(USER_ID, DAY + timedelta(days=1))
+        assert [conflict.conflict_type for conflict in conflicts] == ['time_overlap']
+        assert service.detect_conflicts(USER_ID, DAY) == []
+
+    def test_scan_matches_per_day_detection(self, app, service):
+        """测试范围扫描与逐天检测结果一致，且按日期顺序产出"""
+        from models.time_block import BlockType
+
+        for offset in (0, 2):
+            day = DAY + timedelta(days=offset)
+            self._block(day + timedelta(hours=9), 60)
+            self._block(day + timedelta(hours=9, minutes=50), 60)
+            for hour in (13, 14, 15):
+                self._block(day + timedelta(hours=hour), 65, BlockType.RESEARCH)
+
+        days = list(service.scan_conflicts(USER_ID, DAY.date(), (DAY + timedelta(days=6)).date()))
+        assert [day for day, _ in days] == [DAY.date(), (DAY + timedelta(days=2)).date()]
+
+        for day, conflicts in days:
+            per_day = service.detect_conflicts(USER_ID, datetime.combine(day, datetime.min.time()))
+            assert sorted(c.conflict_type for c in conflicts) == sorted(c.conflict_type for c in per_day)
+            # 3个重叠（9点两块；13/14/15点相邻两块首尾重叠5分钟）+ 1个连续工作
+            assert sorted(c.conflict_type for c in conflicts) == [
+                'schedule_violation', 'time_overlap', 'time_overlap', 'time_overlap'
+            ]
+
+    def test_stream_endpoint(self, client, auth_headers):
+        """测试NDJSON流式接口"""
+        self._block(DAY + timedelta(hours=9), 60)
+        self._block(DAY + timedelta(hours=9, minutes=30), 60)
+        self._block(DAY + timedelta(days=3, hours=23), 120)
+        self._block(DAY + timedelta(days=4, minutes=15), 30)
+
+        response = client.get('/api/time-blocks/conflicts?start_date=2025-03-10&end_date=2025-03-16',
+                              headers=auth_headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [line['type'] for line in lines] == ['day', 'day', 'summary']
+        assert [line['date'] for line in lines[:2]] == ['2025-03-10', '2025-03-14']
+        assert lines[0]['severity_summary']['high'] == 1
+        assert lines[2]['conflict_count'] == 2
+        assert lines[2]['days_with_conflicts'] == 2
+
+    def test_stream_endpoint_validation(self, client, auth_headers):
+        """测试参数校验"""
+        url = '/api/time-blocks/conflicts'
+        assert client.get(url, headers=auth_headers).status_code == 400
+        assert client.get(f'{url}?start_date=abc', headers=auth_headers).status_code == 400
+        assert client.get(f'{url}?start_date=2025-03-10&end_date=2025-03-09', headers=auth_headers).status_code == 400
+        assert client.get(f'{url}?start_date=2025-03-01&end_date=2025-04-15', headers=auth_headers).status_code == 400
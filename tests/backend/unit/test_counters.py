@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+任务、项目与分类冗余计数测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, text
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestCounters:
+    """测试计数列的维护与修正"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        app.config['JOB_QUEUE_MODE'] = 'eager'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {'Authorization': f'Bearer {access_token}'}
+
+    @pytest.fixture
+    def owners(self, app):
+        """两个项目与两个分类"""
+        from app import db
+        from models.project import Project
+        from models.task_category import TaskCategory
+
+        owners = {
+            'research': TaskCategory(name='科研', user_id=USER_ID, color='#000000'),
+            'growth': TaskCategory(name='成长', user_id=USER_ID, color='#000000'),
+            'thesis': Project(name='毕业设计', user_id=USER_ID, color='#000000'),
+            'paper': Project(name='投稿', user_id=USER_ID, color='#000000'),
+        }
+        db.session.add_all(owners.values())
+        db.session.commit()
+        return owners
+
+    def _task(self, owners, title='阅读论文', category='research', project='thesis', **kwargs):
+        from app import db
+        from models.task import Task, TaskType
+
+        task = Task(title=title, user_id=USER_ID, category_id=owners[category].id,
+                    project_id=owners[project].id if project else None, planned_start_time=DAY,
+                    task_type=TaskType.FLEXIBLE, **kwargs)
+        db.session.add(task)
+        db.session.commit()
+        return task
+
+    def _counts(self, item, *names):
+        from app import db
+
+        db.session.refresh(item)
+        return tuple(getattr(item, name) for name in names)
+
+    def test_task_changes_update_counts(self, app, client, auth_headers, owners):
+        """测试任务创建、状态变化、移动与删除时项目和分类的计数随之更新"""
+        from app import db
+        from models.task import TaskStatus
+
+        thesis, paper, research = owners['thesis'], owners['paper'], owners['research']
+        updated_at = thesis.updated_at
+        first = self._task(owners, estimated_pomodoros=3)
+        self._task(owners, title='写实验', estimated_pomodoros=2, status=TaskStatus.COMPLETED)
+
+        # 会话中已加载的对象同步更新，无需刷新
+        assert (thesis.task_count, thesis.completed_count, thesis.estimated_pomodoros) == (2, 1, 5)
+        assert thesis.to_dict()['completion_progress'] == 0.5
+        assert thesis.to_dict()['total_estimated_time'] == 125
+        assert self._counts(thesis, 'updated_at') == (updated_at,)
+
+        response = client.put(f'/api/tasks/{first.id}', headers=auth_headers,
+                              json={'status': 'COMPLETED', 'project_id': paper.id, 'category_id': owners['growth'].id})
+        assert response.status_code == 200
+        assert self._counts(thesis, 'task_count', 'completed_count', 'estimated_pomodoros') == (1, 1, 2)
+        assert self._counts(paper, 'task_count', 'completed_count', 'estimated_pomodoros') == (1, 1, 3)
+        assert self._counts(research, 'task_count', 'completed_count') == (1, 1)
+        assert self._counts(owners['growth'], 'task_count', 'completed_count') == (1, 1)
+
+        assert client.delete(f'/api/tasks/{first.id}', headers=auth_headers).status_code == 200
+        assert self._counts(paper, 'task_count', 'completed_count', 'estimated_pomodoros') == (0, 0, 0)
+        assert self._counts(owners['growth'], 'task_count') == (0,)
+
+        from models.counters import reconcile_counters
+        assert set(reconcile_counters(db.session.connection(), repair=False).values()) == {0}
+
+    def test_sessions_update_time_counters(self, app, owners, monkeypatch):
+        """测试番茄钟完成与中断累计实际时间，只有完成的计入番茄钟数，to_dict不再查询"""
+        from app import db
+        from models import pomodoro_session
+        from models.pomodoro_session import PomodoroSession
+
+        class Clock(datetime):
+            now_value = DAY
+
+            @classmethod
+            def utcnow(cls):
+                return cls.now_value
+
+        monkeypatch.setattr(pomodoro_session, 'datetime', Clock)
+        task = self._task(owners)
+        for hour, minutes, interrupt in ((9, 25, False), (10, 25, False), (11, 10, True)):
+            Clock.now_value = DAY.replace(hour=hour)
+            session = PomodoroSession(task_id=task.id, user_id=USER_ID)
+            db.session.add(session)
+            session.start()
+            Clock.now_value += timedelta(minutes=minutes)
+            if interrupt:
+                session.interrupt('电话')
+            else:
+                session.complete()
+            db.session.commit()
+
+        db.session.expire_all()
+        thesis, research = owners['thesis'], owners['research']
+        assert self._counts(task, 'actual_minutes', 'completed_pomodoros') == (60, 2)
+        assert self._counts(thesis, 'actual_minutes', 'completed_pomodoros') == (60, 2)
+        assert self._counts(research, 'actual_minutes', 'completed_pomodoros') == (60, 2)
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            project_dict, category_dict, task_dict = thesis.to_dict(), research.to_dict(), task.to_dict()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert statements == []
+        assert project_dict['total_actual_time'] == 60 and project_dict['completed_pomodoros'] == 2
+        assert category_dict['total_time_spent'] == 60 and category_dict['task_count'] == 1
+        assert task_dict['actual_minutes'] == 60 and task_dict['completed_pomodoros'] == 2
+
+        # 删除任务时其时间日志一并删除，项目与分类扣减
+        db.session.delete(task)
+        db.session.commit()
+        assert self._counts(thesis, 'task_count', 'actual_minutes', 'completed_pomodoros') == (0, 0, 0)
+        assert self._counts(research, 'task_count', 'actual_minutes', 'completed_pomodoros') == (0, 0, 0)
+
+    def test_reconcile_detects_and_repairs_drift(self, app, owners):
+        """测试绕过ORM造成的偏差可被检测并修正"""
+        from app import db
+        from models.counters import reconcile_counters
+        from models.job import JobStatus
+        from models.task_category import TaskCategory
+        from services.job_queue import job_queue
+
+        task = self._task(owners, estimated_pomodoros=4)
+        other = TaskCategory(name='科研', user_id='other-user-id', color='#000000')
+        db.session.add(other)
+        db.session.commit()
+        db.session.execute(text("UPDATE tasks SET status = 'COMPLETED', actual_minutes = 99 WHERE id = :id"),
+                           {'id': task.id})
+        db.session.execute(text('UPDATE task_categories SET task_count = 7'))
+        db.session.commit()
+
+        drift = reconcile_counters(db.session.connection(), USER_ID, repair=False)
+        assert drift == {'tasks': 1, 'projects': 1, 'task_categories': 2}
+
+        job = job_queue.enqueue('counters.reconcile', USER_ID)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.get_result() == {'drift': drift, 'repaired': True}
+        assert self._counts(task, 'actual_minutes') == (0,)
+        assert self._counts(owners['thesis'], 'task_count', 'completed_count', 'estimated_pomodoros') == (1, 1, 4)
+        assert self._counts(owners['research'], 'task_count', 'completed_count') == (1, 1)
+        assert self._counts(owners['growth'], 'task_count') == (0,)
+        # 其他用户的分类不在本次检查范围内
+        assert self._counts(other, 'task_count') == (7,)
+        assert reconcile_counters(db.session.connection(), repair=False) == {
+            'tasks': 0, 'projects': 0, 'task_categories': 1
+        }
+
+    def test_bulk_import_updates_counts(self, app, client, auth_headers, owners):
+        """测试批量导入（Core插入）的任务同样计入项目与分类"""
+        from app import db
+        from models.counters import reconcile_counters
+
+        body = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in (
+            {'entity': 'tasks', 'title': '任务一', 'planned_start_time': '2025-03-10T09:00:00',
+             'category': '科研', 'project': '毕业设计', 'estimated_pomodoros': 2},
+            {'entity': 'tasks', 'title': '任务二', 'planned_start_time': '2025-03-10T10:00:00',
+             'category': '新分类', 'project': '毕业设计', 'status': 'COMPLETED'},
+        ))
+        response = client.post('/api/import', headers=auth_headers, data=body.encode('utf-8'))
+        assert response.status_code == 200
+
+        assert self._counts(owners['thesis'], 'task_count', 'completed_count', 'estimated_pomodoros') == (2, 1, 3)
+        assert self._counts(owners['research'], 'task_count') == (1,)
+        assert set(reconcile_counters(db.session.connection(), repair=False).values()) == {0}
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+数据导出测试
+"""
+
+import pytest
+import csv
+import gzip
+import io
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestExport:
+    """测试流式导出接口"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {'Authorization': f'Bearer {access_token}'}
+
+    @pytest.fixture
+    def history(self, app):
+        """当前用户的任务、标签与时间块，另有其他用户的任务"""
+        from app import db
+        from models.tag import Tag
+        from models.task import Task, TaskType
+        from models.time_block import TimeBlock, BlockType
+
+        tasks = [Task(title=f'任务{index}', user_id=USER_ID, category_id='missing-category',
+                      planned_start_time=DAY + timedelta(hours=index), task_type=TaskType.FLEXIBLE)
+                 for index in range(5)]
+        other = Task(title='别人的任务', user_id='other-user-id', category_id='missing-category',
+                     planned_start_time=DAY, task_type=TaskType.FLEXIBLE)
+        tag = Tag(name='论文', user_id=USER_ID)
+        other_tag = Tag(name='论文', user_id='other-user-id')
+        tasks[0].tags.append(tag)
+        other.tags.append(other_tag)
+        block = TimeBlock(user_id=USER_ID, date=DAY, start_time=DAY + timedelta(hours=9),
+                          end_time=DAY + timedelta(hours=10), block_type=BlockType.RESEARCH, color='#000000')
+        db.session.add_all(tasks + [other, tag, other_tag, block])
+        db.session.commit()
+        return {'tasks': tasks, 'tag': tag, 'block': block}
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_ndjson_exports_only_own_records(self, client, auth_headers, history):
+        """测试NDJSON包含header、记录、checkpoint与summary，且只导出当前用户的数据"""
+        response = client.get('/api/export?format=ndjson', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert 'Content-Encoding' not in response.headers
+
+        lines = self._lines(response)
+        assert lines[0]['type'] == 'header'
+        assert lines[-1] == {'type': 'summary', 'complete': True, 'counts': {
+            'projects': 0, 'task_categories': 0, 'tags': 1, 'time_block_templates': 0,
+            'time_block_template_configs': 0, 'time_blocks': 1, 'tasks': 5, 'task_tags': 1,
+            'pomodoro_sessions': 0
+        }}
+        records = [line for line in lines if line['type'] == 'record']
+        task_ids = sorted(record['data']['id'] for record in records if record['entity'] == 'tasks')
+        assert task_ids == sorted(task.id for task in history['tasks'])
+        block = next(record['data'] for record in records if record['entity'] == 'time_blocks')
+        assert block['block_type'] == 'RESEARCH' and block['start_time'] == '2025-03-10T09:00:00'
+        assert [record['data'] for record in records if record['entity'] == 'task_tags'] == [
+            {'task_id': history['tasks'][0].id, 'tag_id': history['tag'].id}
+        ]
+
+    def test_resume_from_checkpoint(self, app, client, auth_headers, history, monkeypatch):
+        """测试按checkpoint游标续传，不重复也不遗漏"""
+        from services import data_export
+
+        monkeypatch.setattr(data_export, 'EXPORT_BATCH_SIZE', 2)
+        response = client.get('/api/export?entities=tasks,task_tags', headers=auth_headers)
+        lines = self._lines(response)
+        checkpoints = [index for index, line in enumerate(lines) if line['type'] == 'checkpoint']
+        # 5个任务按每批2条分3批，task_tags一批
+        assert len(checkpoints) == 4
+
+        # 模拟在第一个checkpoint之后中断
+        first = checkpoints[0]
+        response = client.get(f"/api/export?entities=tasks,task_tags&cursor={lines[first]['cursor']}",
+                              headers=auth_headers)
+        resumed = self._lines(response)
+        assert resumed[0]['resumed_from'] == lines[first]['cursor']
+
+        def records(items):
+            return [(line['entity'], line['data']) for line in items if line['type'] == 'record']
+        assert records(lines[:first]) + records(resumed) == records(lines)
+
+        # 从复合主键的游标续传
+        response = client.get(f"/api/export?entities=task_tags&cursor={lines[checkpoints[-1]]['cursor']}",
+                              headers=auth_headers)
+        assert records(self._lines(response)) == []
+
+    def test_gzip_and_csv(self, client, auth_headers, history):
+        """测试gzip压缩与CSV格式"""
+        response = client.get('/api/export?format=csv&entities=tasks',
+                              headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.mimetype == 'text/csv'
+
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.get_data()).decode('utf-8'))))
+        assert sorted(row['id'] for row in rows) == sorted(task.id for task in history['tasks'])
+        assert rows[0]['task_type'] == 'FLEXIBLE'
+
+        # 没有数据时只有列名
+        response = client.get('/api/export?format=csv&entities=projects', headers=auth_headers)
+        assert response.get_data(as_text=True).splitlines()[0].startswith('id,')
+        assert len(response.get_data(as_text=True).splitlines()) == 1
+
+    def test_validation(self, client, auth_headers):
+        """测试参数校验"""
+        def status(query):
+            return client.get(f'/api/export?{query}', headers=auth_headers).status_code
+
+        assert status('format=xml') == 400
+        assert status('entities=tasks,users') == 400
+        assert status('format=csv') == 400
+        assert status('format=csv&entities=tasks,tags') == 400
+        assert status('entities=tasks&cursor=tags:abc') == 400
+        assert status('cursor=task_tags:only-one') == 400
+        assert status('cursor=tasks') == 400
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+批量导入测试
+"""
+
+import pytest
+import gzip
+import json
+import sys
+import os
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+
+USER_ID = 'test-user-id'
+
+
+class TestImport:
+    """测试批量导入接口"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {'Authorization': f'Bearer {access_token}'}
+
+    def _import(self, client, auth_headers, body, query='', headers=None):
+        if isinstance(body, list):
+            body = ''.join(line if isinstance(line, str) else json.dumps(line, ensure_ascii=False) + '\n'
+                           for line in body)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        response = client.post(f'/api/import?{query}', headers={**auth_headers, **(headers or {})}, data=body)
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        return response, events
+
+    def test_import_resolves_names_and_refs(self, app, client, auth_headers):
+        """测试按名称解析分类、项目与标签，会话通过task_ref引用本次导入的任务，导入的任务可被搜索"""
+        from app import db
+        from models.pomodoro_session import PomodoroSession, SessionStatus
+        from models.task import Task, TaskStatus
+        from models.task_category import TaskCategory
+        from models.time_block import TimeBlock
+
+        category = TaskCategory(name='科研', user_id=USER_ID, color='#000000')
+        db.session.add(category)
+        db.session.commit()
+
+        response, events = self._import(client, auth_headers, [
+            {'entity': 'tasks', 'ref': 'a', 'title': '阅读论文', 'planned_start_time': '2025-03-10T09:00:00',
+             'category': '科研', 'project': '毕业设计', 'tags': ['论文', '英文'], 'status': 'completed'},
+            {'entity': 'tasks', 'ref': 'b', 'title': '跑步', 'planned_start_time': '2025-03-10T18:00:00+08:00',
+             'category': '运动', 'tags': ['论文']},
+            {'entity': 'pomodoro_sessions', 'task_ref': 'a', 'start_time': '2025-03-10T09:00:00',
+             'end_time': '2025-03-10T09:25:00', 'status': 'COMPLETED', 'completion_summary': '读完引言部分'},
+            {'entity': 'time_blocks', 'start_time': '2025-03-10T09:00:00', 'end_time': '2025-03-10T11:00:00',
+             'block_type': 'research'},
+        ])
+        assert response.status_code == 200
+        summary = events[-1]
+        assert summary['type'] == 'summary' and summary['complete'] is True
+        assert summary['imported'] == {'tasks': 2, 'time_blocks': 1, 'pomodoro_sessions': 1}
+        assert summary['created'] == {'task_categories': 1, 'projects': 1, 'tags': 2}
+        assert summary['errors'] == 0
+        assert [event['type'] for event in events] == ['progress', 'summary']
+
+        paper = Task.query.filter_by(title='阅读论文').one()
+        run = Task.query.filter_by(title='跑步').one()
+        assert paper.category_id == category.id
+        assert paper.status == TaskStatus.COMPLETED and paper.project.name == '毕业设计'
+        assert sorted(tag.name for tag in paper.tags) == ['英文', '论文']
+        assert [tag.id for tag in run.tags] == [tag.id for tag in paper.tags if tag.name == '论文']
+        assert run.planned_start_time == datetime(2025, 3, 10, 10, 0)
+        session = PomodoroSession.query.one()
+        assert session.task_id == paper.id and session.actual_duration == 25
+        assert session.status == SessionStatus.COMPLETED
+        block = TimeBlock.query.one()
+        assert block.date == datetime(2025, 3, 10) and block.duration_minutes == 120
+
+        # 导入时暂停的插入触发器已恢复，索引与文档一致
+        db.session.add(Task(title='整理论文笔记', user_id=USER_ID, category_id=category.id,
+                            planned_start_time=datetime(2025, 3, 11), task_type='FLEXIBLE'))
+        db.session.commit()
+        db.session.execute(text("INSERT INTO search_index (search_index, rank) VALUES ('integrity-check', 1)"))
+        response = client.get('/api/search?q=论文', headers=auth_headers)
+        found = {(result['type'], result['item'].get('title')) for result in json.loads(response.data)['results']}
+        assert {('task', '阅读论文'), ('task', '整理论文笔记')} <= found
+        response = client.get('/api/search?q=读完引言', headers=auth_headers)
+        assert json.loads(response.data)['count'] == 1
+
+    def test_row_errors_do_not_stop_import(self, app, client, auth_headers):
+        """测试出错的行逐行报告行号，其余行照常导入"""
+        from app import db
+        from models.task import Task
+        from models.time_block import TimeBlock, BlockType
+
+        day = datetime(2025, 3, 10)
+        other = Task(title='别人的任务', user_id='other-user-id', category_id='missing-category',
+                     planned_start_time=day, task_type='FLEXIBLE')
+        db.session.add_all([other, TimeBlock(user_id=USER_ID, date=day, start_time=day.replace(hour=8),
+                                             end_time=day.replace(hour=9), block_type=BlockType.REST,
+                                             color='#000000')])
+        db.session.commit()
+
+        response, events = self._import(client, auth_headers, [
+            '{not json\n',
+            {'entity': 'tasks', 'planned_start_time': '2025-03-10T09:00:00', 'category': '科研'},
+            {'entity': 'tasks', 'title': '好任务', 'planned_start_time': '2025-03-10T09:00:00', 'category': '科研'},
+            {'entity': 'tasks', 'title': '坏类型', 'planned_start_time': '2025-03-10T09:00:00',
+             'category': '科研', 'task_type': 'SOMETIMES'},
+            {'entity': 'time_blocks', 'start_time': '2025-03-10T08:30:00', 'end_time': '2025-03-10T10:00:00',
+             'block_type': 'GROWTH'},
+            {'entity': 'time_blocks', 'start_time': '2025-03-10T10:00:00', 'end_time': '2025-03-10T11:00:00',
+             'block_type': 'GROWTH'},
+            {'entity': 'time_blocks', 'start_time': '2025-03-10T10:30:00', 'end_time': '2025-03-10T11:30:00',
+             'block_type': 'GROWTH'},
+            {'entity': 'pomodoro_sessions', 'task_ref': 'missing', 'start_time': '2025-03-10T09:00:00'},
+            {'entity': 'pomodoro_sessions', 'task_id': other.id, 'start_time': '2025-03-10T09:00:00'},
+            {'entity': 'projects', 'name': '不支持'},
+        ], query='entity=tasks')
+
+        errors = {event['line']: event['error'] for event in events if event['type'] == 'error'}
+        assert errors == {
+            1: 'Invalid JSON',
+            2: 'Missing required field: title',
+            4: 'Invalid task_type: SOMETIMES',
+            5: 'Time block overlaps with existing blocks',
+            7: 'Time block overlaps with existing blocks',
+            8: 'Unknown task_ref: missing',
+            9: f'Task not found: {other.id}',
+            10: 'Invalid entity: projects',
+        }
+        assert events[-1]['imported'] == {'tasks': 1, 'time_blocks': 1, 'pomodoro_sessions': 0}
+        assert events[-1]['errors'] == 8
+        # 出错的行没有创建分类
+        assert events[-1]['created']['task_categories'] == 1
+
+    def test_csv_gzip_in_chunks(self, app, client, auth_headers, monkeypatch):
+        """测试gzip压缩的CSV按块导入并逐块报告进度"""
+        from services import data_import
+        from models.task import Task
+
+        monkeypatch.setattr(data_import, 'IMPORT_CHUNK_SIZE', 2)
+        body = 'title,planned_start_time,category,tags,estimated_pomodoros\n' + ''.join(
+            f'任务{index},2025-03-1{index}T09:00:00,科研,"论文,英文",{index + 1}\n' for index in range(5)
+        ) + '缺少时间,,科研,,\n'
+        response, events = self._import(client, auth_headers, gzip.compress(body.encode('utf-8')),
+                                        query='format=csv&entity=tasks', headers={'Content-Encoding': 'gzip'})
+
+        progress = [event for event in events if event['type'] == 'progress']
+        assert [event['rows'] for event in progress] == [2, 4, 6]
+        assert [event['imported']['tasks'] for event in progress] == [2, 4, 5]
+        assert [event for event in events if event['type'] == 'error'] == [
+            {'type': 'error', 'line': 7, 'error': 'Missing required field: planned_start_time'}
+        ]
+        assert events[-1]['created'] == {'task_categories': 1, 'projects': 0, 'tags': 2}
+        assert sorted(task.estimated_pomodoros for task in Task.query.all()) == [1, 2, 3, 4, 5]
+        assert all(len(task.tags) == 2 for task in Task.query.all())
+
+    def test_validation(self, client, auth_headers):
+        """测试参数校验"""
+        def status(query, body=b'{}\n'):
+            return client.post(f'/api/import?{query}', headers=auth_headers, data=body).status_code
+
+        assert status('format=xml') == 400
+        assert status('format=csv') == 400
+        assert status('entity=projects') == 400
+        assert status('', body=b'') == 400
+
+        response, events = self._import(client, auth_headers, b'not gzip', headers={'Content-Encoding': 'gzip'})
+        assert events[-1]['type'] == 'failed'
+
+    def test_imported_blocks_refresh_capacity_index(self, client, auth_headers):
+        """测试导入的时间块在已预热的空闲时段查询中出现"""
+        response = client.get('/api/time-blocks/free-slots?date=2025-03-10', headers=auth_headers)
+        assert json.loads(response.data)['time_blocks'] == []
+
+        response, events = self._import(client, auth_headers, [
+            {'entity': 'time_blocks', 'start_time': '2025-03-10T09:00:00', 'end_time': '2025-03-10T11:00:00',
+             'block_type': 'research'},
+        ])
+        assert events[-1]['imported']['time_blocks'] == 1
+
+        response = client.get('/api/time-blocks/free-slots?date=2025-03-10', headers=auth_headers)
+        blocks = json.loads(response.data)['time_blocks']
+        assert [block['remaining_minutes'] for block in blocks] == [120]
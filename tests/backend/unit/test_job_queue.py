@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+后台任务队列测试
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+
+class TestJobQueue:
+    """测试后台任务队列"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        app.config['JOB_QUEUE_MODE'] = 'eager'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity='test-user-id')
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    def test_enqueue_runs_handler_and_stores_result(self, app):
+        """测试任务执行并持久化结果"""
+        from services.job_queue import job_queue
+        from models.job import JobStatus
+
+        job_queue.register('test.echo')(lambda user_id, payload: {'user_id': user_id, **payload})
+
+        job = job_queue.enqueue('test.echo', 'test-user-id', {'value': 42})
+
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.get_result() == {'user_id': 'test-user-id', 'value': 42}
+        assert job.attempts == 1
+
+    def test_failed_job_is_retried_until_max_attempts(self, app):
+        """测试失败任务按次数重试后标记为失败"""
+        from services.job_queue import job_queue
+        from models.job import Job, JobStatus
+        from app import db
+
+        calls = []
+
+        def always_fail(user_id, payload):
+            calls.append(user_id)
+            raise RuntimeError('boom')
+
+        job_queue.register('test.fail')(always_fail)
+
+        job = job_queue.enqueue('test.fail', 'test-user-id', max_attempts=3)
+        job = db.session.get(Job, job.id, populate_existing=True)
+
+        assert len(calls) == 3
+        assert job.status == JobStatus.FAILED
+        assert 'boom' in job.error
+
+    def test_flaky_job_succeeds_on_retry(self, app):
+        """测试偶发失败的任务在重试后成功"""
+        from services.job_queue import job_queue
+        from models.job import Job, JobStatus
+        from app import db
+
+        calls = []
+
+        def flaky(user_id, payload):
+            calls.append(user_id)
+            if len(calls) < 2:
+                raise RuntimeError('temporary')
+            return {'ok': True}
+
+        job_queue.register('test.flaky')(flaky)
+
+        job = job_queue.enqueue('test.flaky', 'test-user-id')
+        job = db.session.get(Job, job.id, populate_existing=True)
+
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.attempts == 2
+        assert job.get_result() == {'ok': True}
+
+    def test_external_mode_defers_to_worker(self, app):
+        """测试external模式只入库，由worker执行"""
+        from services.job_queue import job_queue
+        from models.job import Job, JobStatus
+        from app import db
+
+        app.config['JOB_QUEUE_MODE'] = 'external'
+        job_queue.register('test.echo')(lambda user_id, payload: payload)
+
+        job = job_queue.enqueue('test.echo', 'test-user-id', {'value': 1})
+        assert job.status == JobStatus.PENDING
+
+        assert job_queue.run_pending() == 1
+        job = db.session.get(Job, job.id, populate_existing=True)
+        assert job.status == JobStatus.SUCCEEDED
+
+        # 已执行的任务不会被重复认领
+        assert job_queue.claim(job.id) is False
+
+    def test_unknown_job_type_rejected(self, app):
+        """测试未注册的任务类型"""
+        from services.job_queue import job_queue
+
+        with pytest.raises(ValueError):
+            job_queue.enqueue('test.unknown', 'test-user-id')
+
+    def test_async_statistics_returns_202_and_pollable_job(self, client, auth_headers):
+        """测试统计接口的后台任务模式"""
+        response = client.get('/api/time-blocks/statistics?async=true', headers=auth_headers)
+
+        assert response.status_code == 202
+        result = json.loads(response.data)
+        job_id = result['job']['id']
+        assert response.headers['Location'] == f'/api/jobs/{job_id}'
+
+        response = client.get(f'/api/jobs/{job_id}', headers=auth_headers)
+        assert response.status_code == 200
+        job = json.loads(response.data)['job']
+        assert job['status'] == 'SUCCEEDED'
+        assert job['result']['total_blocks'] == 0
+
+    def test_job_not_visible_to_other_users(self, client, app, auth_headers):
+        """测试任务只能被创建者查询"""
+        from services.job_queue import job_queue
+
+        job_queue.register('test.echo')(lambda user_id, payload: payload)
+        job = job_queue.enqueue('test.echo', 'other-user-id')
+
+        response = client.get(f'/api/jobs/{job.id}', headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_job_stream_ends_after_terminal_status(self, client, app, auth_headers):
+        """测试任务SSE推送在任务结束后关闭"""
+        from services.job_queue import job_queue
+
+        job_queue.register('test.echo')(lambda user_id, payload: payload)
+        job = job_queue.enqueue('test.echo', 'test-user-id', {'value': 1})
+
+        response = client.get(f'/api/jobs/{job.id}/stream', headers=auth_headers)
+        body = response.data.decode('utf-8')
+
+        assert response.mimetype == 'text/event-stream'
+        assert body.count('event: status') == 1
+        assert '"SUCCEEDED"' in body
+
+    def _running_job(self, job_type, started_minutes_ago, attempts=1, max_attempts=3):
+        """模拟执行进程中途退出、停留在RUNNING的任务"""
+        from app import db
+        from models.job import Job, JobStatus
+        from datetime import datetime, timedelta
+
+        job = Job(user_id='test-user-id', job_type=job_type, status=JobStatus.RUNNING, attempts=attempts,
+                  max_attempts=max_attempts, started_at=datetime.utcnow() - timedelta(minutes=started_minutes_ago))
+        job.set_payload({'value': 1})
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+    def test_stale_running_jobs_are_recovered(self, app):
+        """测试执行超时的RUNNING任务可被重新认领，worker将其重新执行或在次数用尽时标记失败"""
+        from services.job_queue import job_queue
+        from models.job import Job, JobStatus
+        from app import db
+
+        app.config['JOB_QUEUE_MODE'] = 'external'
+        app.config['JOB_RUNNING_TIMEOUT'] = 60
+        job_queue.register('test.echo')(lambda user_id, payload: payload)
+
+        fresh_id = self._running_job('test.echo', started_minutes_ago=0)
+        stale_id = self._running_job('test.echo', started_minutes_ago=5)
+        exhausted_id = self._running_job('test.echo', started_minutes_ago=5, attempts=3)
+
+        # 仍在执行期限内的任务不能被其他worker认领
+        assert job_queue.claim(fresh_id) is False
+
+        assert job_queue.run_pending() == 1
+        jobs = {job_id: db.session.get(Job, job_id, populate_existing=True)
+                for job_id in (fresh_id, stale_id, exhausted_id)}
+        assert jobs[fresh_id].status == JobStatus.RUNNING
+        assert jobs[stale_id].status == JobStatus.SUCCEEDED and jobs[stale_id].attempts == 2
+        assert jobs[exhausted_id].status == JobStatus.FAILED and 'worker lost' in jobs[exhausted_id].error
+
+        # 超时的任务也可以直接被认领
+        stale_id = self._running_job('test.echo', started_minutes_ago=5)
+        assert job_queue.claim(stale_id) is True
+
+    def test_polling_recovers_stale_job(self, client, app, auth_headers):
+        """测试轮询任务状态时回收执行超时的任务，客户端不会无限等待"""
+        app.config['JOB_RUNNING_TIMEOUT'] = 60
+        job_id = self._running_job('test.unknown-type', started_minutes_ago=5, attempts=3)
+
+        response = client.get(f'/api/jobs/{job_id}', headers=auth_headers)
+        assert json.loads(response.data)['job']['status'] == 'FAILED'
+
+        response = client.get(f'/api/jobs/{job_id}/stream', headers=auth_headers)
+        assert '"FAILED"' in response.data.decode('utf-8')
+
+    def test_lost_retry_timer_is_recovered(self, client, app, auth_headers):
+        """测试线程模式下重试定时器丢失（进程退出）后，轮询任务状态时重新调度"""
+        from app import db
+        from services.job_queue import job_queue
+        from models.job import Job, JobStatus
+        from datetime import datetime, timedelta
+
+        calls = []
+
+        def flaky(user_id, payload):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError('temporary')
+            return 'ok'
+
+        job_queue.register('test.lost-timer')(flaky)
+        app.config['JOB_QUEUE_MODE'] = 'thread'
+        app.config['JOB_RUNNING_TIMEOUT'] = 60
+        original_dispatch = job_queue._dispatch
+        job_queue._dispatch = lambda job_id, delay=0: None
+        try:
+            job = job_queue.enqueue('test.lost-timer', 'test-user-id')
+            job_queue.run_job(job.id)
+        finally:
+            job_queue._dispatch = original_dispatch
+
+        job = db.session.get(Job, job.id, populate_existing=True)
+        assert job.status == JobStatus.PENDING and job.run_after is not None
+        # 进程重启后，到期已久的重试不会再有定时器触发
+        app.config['JOB_QUEUE_MODE'] = 'eager'
+        job.run_after = datetime.utcnow() - timedelta(minutes=5)
+        db.session.commit()
+
+        response = client.get(f'/api/jobs/{job.id}', headers=auth_headers)
+        data = json.loads(response.data)['job']
+        assert data['status'] == 'SUCCEEDED' and data['attempts'] == 2
+        assert len(calls) == 2
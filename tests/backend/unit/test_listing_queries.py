@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+标签与任务类别列表的查询次数测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+USER_ID = 'test-user-id'
+
+
+class TestListingQueries:
+    """测试列表接口的查询次数与任务数量无关"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {'Authorization': f'Bearer {access_token}'}
+
+    @pytest.fixture
+    def data(self, app):
+        """3个分类、4个标签（其中1个未使用）与60个任务，另有其他用户的标签"""
+        from app import db
+        from models.tag import Tag
+        from models.task import Task, TaskType, TaskStatus
+        from models.task_category import TaskCategory
+
+        categories = [TaskCategory(name=f'分类{index}', user_id=USER_ID, color='#000000') for index in range(3)]
+        tags = [Tag(name=f'标签{index}', user_id=USER_ID) for index in range(4)]
+        other_tag = Tag(name='标签0', user_id='other-user-id')
+        db.session.add_all(categories + tags + [other_tag])
+        db.session.flush()
+        for index in range(60):
+            task = Task(title=f'任务{index}', user_id=USER_ID, category_id=categories[index % 3].id,
+                        planned_start_time=datetime(2025, 3, 10), task_type=TaskType.FLEXIBLE,
+                        status=TaskStatus.COMPLETED if index % 4 == 0 else TaskStatus.PENDING)
+            task.tags = tags[:index % 3 + 1]
+            db.session.add(task)
+        db.session.commit()
+        db.session.expire_all()
+        return categories, tags
+
+    def _get(self, client, auth_headers, url):
+        """请求并记录执行的SQL"""
+        from app import db
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = client.get(url, headers=auth_headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert response.status_code == 200
+        return json.loads(response.data), statements
+
+    def test_tag_listing_single_grouped_count(self, client, auth_headers, data):
+        """测试标签列表用一条分组COUNT查询得到全部使用次数"""
+        result, statements = self._get(client, auth_headers, '/api/tags/')
+
+        assert {tag['name']: tag['usage_count'] for tag in result} == {
+            '标签0': 60, '标签1': 40, '标签2': 20, '标签3': 0
+        }
+        assert len(statements) == 1
+        assert 'count(task_tags.task_id)' in statements[0] and 'GROUP BY' in statements[0]
+
+    def test_category_listing_reads_counters(self, client, auth_headers, data):
+        """测试任务类别列表只查询分类表，不加载任务"""
+        result, statements = self._get(client, auth_headers, '/api/task-categories/')
+
+        assert sorted((category['task_count'], category['completed_count']) for category in result) == [
+            (20, 5), (20, 5), (20, 5)
+        ]
+        assert len(statements) == 1
+        assert 'FROM task_categories' in statements[0] and 'FROM tasks' not in statements[0]
+
+    def test_single_tag_and_delete_checks(self, client, auth_headers, data):
+        """测试单个标签的使用次数与删除检查不加载任务"""
+        categories, tags = data
+
+        result, statements = self._get(client, auth_headers, f'/api/tags/{tags[1].id}')
+        assert result['usage_count'] == 40
+        assert not any('FROM tasks' in statement for statement in statements)
+
+        assert client.delete(f'/api/tags/{tags[1].id}', headers=auth_headers).status_code == 400
+        assert client.delete(f'/api/tags/{tags[3].id}', headers=auth_headers).status_code == 200
+        response = client.delete(f'/api/task-categories/{categories[0].id}', headers=auth_headers)
+        assert response.status_code == 400
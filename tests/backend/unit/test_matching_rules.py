@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+匹配规则持久化与编译缓存测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+USER_ID = 'test-user-id'
+
+
+class TestMatchingRules:
+    """测试匹配规则"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            from services.matching_rules import matching_rule_service
+            db.create_all()
+            matching_rule_service.clear_cache()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    @pytest.fixture
+    def service(self, app):
+        from services.matching_rules import matching_rule_service
+        return matching_rule_service
+
+    def _task_and_block(self, category_name, block_type):
+        from app import db
+        from models.task import Task
+        from models.task_category import TaskCategory
+        from models.time_block import TimeBlock
+
+        category = TaskCategory(name=category_name, color='#000000', user_id=USER_ID)
+        db.session.add(category)
+        db.session.flush()
+        task = Task(title='任务', user_id=USER_ID, category_id=category.id)
+        day = datetime(2025, 3, 10)
+        block = TimeBlock(user_id=USER_ID, date=day, start_time=day.replace(hour=9), end_time=day.replace(hour=10),
+                          block_type=block_type, color='#000000')
+        return task, block
+
+    def test_compiled_matrix_matches_default_rules(self, app, service):
+        """测试编译后的矩阵与默认规则一致，未知类别回退到'其他'"""
+        from models.time_block import BlockType
+        from services.matching_rules import DEFAULT_MATCHING_RULES
+
+        compiled = service.get_compiled(USER_ID)
+        assert compiled.version == 0
+        for category_name, rules in DEFAULT_MATCHING_RULES.items():
+            for block_type in BlockType:
+                assert compiled.score(category_name, block_type) == dict(rules).get(block_type, 0.0)
+
+        assert compiled.score('未知类别', BlockType.GROWTH) == 0.8
+        assert compiled.rules_for('运动') == [(BlockType.REST, 1.0), (BlockType.ENTERTAINMENT, 0.8)]
+
+    def test_custom_rules_override_defaults(self, app, service):
+        """测试自定义规则整体替换同名类别的默认规则"""
+        from services.category_timeblock_matching import category_timeblock_matcher
+        from models.time_block import BlockType
+
+        task, block = self._task_and_block('运动', BlockType.REST)
+        assert category_timeblock_matcher.calculate_match_score(task, block) == 1.0
+
+        category_timeblock_matcher.set_user_custom_rules(USER_ID, {'运动': [(BlockType.GROWTH, 0.9)]})
+        assert category_timeblock_matcher.calculate_match_score(task, block) == 0.0
+        block.block_type = BlockType.GROWTH
+        assert category_timeblock_matcher.calculate_match_score(task, block) == 0.9
+        assert category_timeblock_matcher.get_matching_rules('other-user', '运动')[0] == (BlockType.REST, 1.0)
+
+    def test_version_change_recompiles_cached_rules(self, app, service):
+        """测试其他进程修改规则（版本号递增）后重新编译"""
+        from flask import g
+        from app import db
+        from models.matching_rule import MatchingRule, MatchingRuleSet
+        from models.time_block import BlockType
+        from services.matching_rules import CHECKED_VERSIONS_KEY
+
+        service.set_category_rules(USER_ID, '阅读', [(BlockType.REVIEW, 0.7)])
+        compiled = service.get_compiled(USER_ID)
+        assert compiled.score('阅读', BlockType.REVIEW) == 0.7
+        assert service.get_compiled(USER_ID) is compiled
+
+        # 模拟其他进程直接改库，不经过本进程缓存
+        rule = MatchingRule.query.one()
+        rule.score = 0.3
+        rule_set = MatchingRuleSet.query.one()
+        rule_set.version = MatchingRuleSet.version + 1
+        db.session.commit()
+
+        # 同一请求内不重复检查版本，新请求才会感知
+        assert service.get_compiled(USER_ID) is compiled
+        g.pop(CHECKED_VERSIONS_KEY)
+        recompiled = service.get_compiled(USER_ID)
+        assert recompiled.version == compiled.version + 1
+        assert recompiled.score('阅读', BlockType.REVIEW) == 0.3
+
+    def test_lru_eviction(self, app, service):
+        """测试缓存超过上限时淘汰最久未使用的用户"""
+        app.config['MATCHING_RULES_CACHE_SIZE'] = 2
+        for user_id in ('user-1', 'user-2', 'user-3'):
+            service.get_compiled(user_id)
+
+        assert list(service._cache) == ['user-2', 'user-3']
+
+    def test_rules_api(self, client, auth_headers):
+        """测试匹配规则管理API"""
+        response = client.put('/api/matching-rules/阅读', headers=auth_headers, data=json.dumps({
+            'rules': [{'block_type': 'REVIEW', 'score': 0.9}, {'block_type': 'REST', 'score': 0.4}]
+        }))
+        assert response.status_code == 200
+        assert json.loads(response.data)['version'] == 1
+
+        response = client.get('/api/matching-rules/', headers=auth_headers)
+        data = json.loads(response.data)
+        assert data['version'] == 1
+        assert data['rules'] == {'阅读': [{'block_type': 'REVIEW', 'score': 0.9}, {'block_type': 'REST', 'score': 0.4}]}
+        assert '阅读' in data['defaults']
+
+        response = client.get('/api/matching-rules/matrix', headers=auth_headers)
+        matrix = json.loads(response.data)
+        row = matrix['scores'][matrix['categories'].index('阅读')]
+        assert row[matrix['block_types'].index('REVIEW')] == 0.9
+        assert row[matrix['block_types'].index('GROWTH')] == 0.0
+
+        response = client.put('/api/matching-rules/阅读', headers=auth_headers,
+                              data=json.dumps({'rules': [{'block_type': 'REVIEW', 'score': 1.5}]}))
+        assert response.status_code == 400
+        response = client.put('/api/matching-rules/阅读', headers=auth_headers,
+                              data=json.dumps({'rules': [{'block_type': 'NAP', 'score': 0.5}]}))
+        assert response.status_code == 400
+
+        response = client.delete('/api/matching-rules/阅读', headers=auth_headers)
+        assert response.status_code == 200
+        response = client.delete('/api/matching-rules/阅读', headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_category_rename_moves_rules(self, client, auth_headers, service):
+        """测试任务类别改名时自定义规则随之改名"""
+        from models.time_block import BlockType
+
+        response = client.post('/api/task-categories/', headers=auth_headers,
+                               data=json.dumps({'name': '阅读', 'color': '#000000'}))
+        category_id = json.loads(response.data)['category']['id']
+        service.set_category_rules(USER_ID, '阅读', [(BlockType.REVIEW, 0.9)])
+
+        response = client.put(f'/api/task-categories/{category_id}', headers=auth_headers,
+                              data=json.dumps({'name': '精读'}))
+        assert response.status_code == 200
+
+        assert service.get_custom_rules(USER_ID) == {'精读': [(BlockType.REVIEW, 0.9)]}
+        assert service.get_compiled(USER_ID).score('精读', BlockType.REVIEW) == 0.9
+
+    def test_category_rename_replaces_leftover_rules(self, client, auth_headers, service):
+        """测试改名为残留规则的名称（如已删除的类别）时，以改名类别的规则替换，不违反唯一约束"""
+        from models.time_block import BlockType
+
+        response = client.post('/api/task-categories/', headers=auth_headers,
+                               data=json.dumps({'name': '阅读', 'color': '#000000'}))
+        category_id = json.loads(response.data)['category']['id']
+        service.set_category_rules(USER_ID, '阅读', [(BlockType.REVIEW, 0.9), (BlockType.REST, 0.3)])
+        # 已删除类别留下的同名规则，其中REVIEW与改名类别的规则冲突
+        service.set_category_rules(USER_ID, '精读', [(BlockType.REVIEW, 0.2), (BlockType.GROWTH, 0.8)])
+
+        response = client.put(f'/api/task-categories/{category_id}', headers=auth_headers,
+                              data=json.dumps({'name': '精读'}))
+        assert response.status_code == 200
+
+        assert service.get_custom_rules(USER_ID) == {'精读': [(BlockType.REVIEW, 0.9), (BlockType.REST, 0.3)]}
+        assert service.get_compiled(USER_ID).score('精读', BlockType.GROWTH) == 0.0
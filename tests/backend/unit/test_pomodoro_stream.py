@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+番茄钟会话SSE推送测试
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+
+def _parse_sse_frame(chunk: bytes):
+    """解析单个SSE事件帧"""
+    event_type, data = None, None
+    for line in chunk.decode('utf-8').strip().split('\n'):
+        if line.startswith('event: '):
+            event_type = line[len('event: '):]
+        elif line.startswith('data: '):
+            data = json.loads(line[len('data: '):])
+    return event_type, data
+
+
+class TestPomodoroEventBroker:
+    """测试事件广播器"""
+
+    def test_publish_reaches_only_user_subscribers(self):
+        """测试事件只推送给对应用户"""
+        from services.pomodoro_events import PomodoroEventBroker
+
+        broker = PomodoroEventBroker()
+        subscriber = broker.subscribe('user-a')
+        other_subscriber = broker.subscribe('user-b')
+
+        delivered = broker.publish('user-a', 'started', {'id': 'session-1'})
+
+        assert delivered == 1
+        assert subscriber.get_nowait() == ('started', {'id': 'session-1'})
+        assert other_subscriber.empty()
+
+    def test_unsubscribe_removes_subscriber(self):
+        """测试注销订阅"""
+        from services.pomodoro_events import PomodoroEventBroker
+
+        broker = PomodoroEventBroker()
+        subscriber = broker.subscribe('user-a')
+        broker.unsubscribe('user-a', subscriber)
+
+        assert broker.subscriber_count('user-a') == 0
+        assert broker.publish('user-a', 'started', {}) == 0
+
+    def test_full_queue_drops_event(self):
+        """测试慢消费者的事件被丢弃而不阻塞发布"""
+        from services.pomodoro_events import PomodoroEventBroker
+
+        broker = PomodoroEventBroker(max_queue_size=1)
+        broker.subscribe('user-a')
+
+        assert broker.publish('user-a', 'started', {}) == 1
+        assert broker.publish('user-a', 'completed', {}) == 0
+
+
+class TestPomodoroStreamRoute:
+    """测试SSE推送路由"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        app.config['POMODORO_STREAM_HEARTBEAT'] = 0.05
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def token(self, app):
+        """创建访问令牌"""
+        return create_access_token(identity='test-user-id')
+
+    def test_stream_requires_token(self, app):
+        """测试未认证请求被拒绝"""
+        client = app.test_client()
+        response = client.get('/api/pomodoro-sessions/stream')
+        assert response.status_code == 401
+
+    def test_stream_sends_sync_then_transitions(self, app, token):
+        """测试首帧同步服务器时间，之后推送状态变化"""
+        from services.pomodoro_events import pomodoro_event_broker
+
+        client = app.test_client()
+        response = client.get(f'/api/pomodoro-sessions/stream?jwt={token}', buffered=False)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+        frames = iter(response.response)
+        event_type, data = _parse_sse_frame(next(frames))
+        assert event_type == 'sync'
+        assert 'server_time' in data
+        assert data['active_session'] is None
+
+        # 心跳帧
+        assert next(frames).startswith(b':')
+
+        pomodoro_event_broker.publish('test-user-id', 'started', {'id': 'session-1', 'status': 'IN_PROGRESS'})
+        event_type, data = _parse_sse_frame(next(frames))
+        while event_type is None:
+            event_type, data = _parse_sse_frame(next(frames))
+        assert event_type == 'started'
+        assert data['id'] == 'session-1'
+
+        response.close()
+        assert pomodoro_event_broker.subscriber_count('test-user-id') == 0
+
+    def test_disconnect_before_first_frame_leaves_no_subscriber(self, app, token):
+        """测试客户端在收到首帧前断开时不残留订阅"""
+        from services.pomodoro_events import pomodoro_event_broker
+
+        client = app.test_client()
+        response = client.get(f'/api/pomodoro-sessions/stream?jwt={token}', buffered=False)
+        assert response.status_code == 200
+
+        response.close()
+        assert pomodoro_event_broker.subscriber_count('test-user-id') == 0
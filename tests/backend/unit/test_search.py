@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+全文搜索测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestSearch:
+    """测试全文搜索接口与索引维护"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    def _task(self, title, description=None, user_id=USER_ID, **kwargs):
+        from app import db
+        from models.task import Task, TaskType
+
+        task = Task(title=title, description=description, user_id=user_id, category_id='missing-category',
+                    planned_start_time=DAY, task_type=TaskType.FLEXIBLE, **kwargs)
+        db.session.add(task)
+        db.session.commit()
+        return task
+
+    def _search(self, client, auth_headers, query):
+        response = client.get(f'/api/search?{query}', headers=auth_headers)
+        return response.status_code, json.loads(response.data)
+
+    def test_search_across_types(self, app, client, auth_headers):
+        """测试在任务、项目、标签与番茄钟总结中搜索，标题命中排在描述命中之前"""
+        from app import db
+        from models.pomodoro_session import PomodoroSession
+        from models.project import Project
+        from models.tag import Tag
+
+        in_description = self._task('整理资料', description='为季度报告准备图表')
+        in_title = self._task('撰写季度报告')
+        self._task('季度报告', user_id='other-user-id')
+        project = Project(name='季度报告项目', user_id=USER_ID, color='#000000')
+        tag = Tag(name='report', user_id=USER_ID)
+        session = PomodoroSession(task_id=in_title.id, user_id=USER_ID)
+        session.completion_summary = '完成了季度报告初稿'
+        db.session.add_all([project, tag, session])
+        db.session.commit()
+
+        status, data = self._search(client, auth_headers, 'q=季度报告')
+        assert status == 200
+        assert data['engine'] == 'fts5'
+        found = [(result['type'], result['id']) for result in data['results']]
+        assert set(found) == {('task', in_description.id), ('task', in_title.id),
+                              ('project', project.id), ('session', session.id)}
+        assert found.index(('task', in_title.id)) < found.index(('task', in_description.id))
+        assert data['results'][0]['item']['id'] == data['results'][0]['id']
+
+        status, data = self._search(client, auth_headers, 'q=REPORT&types=tag')
+        assert [result['id'] for result in data['results']] == [tag.id]
+
+        status, data = self._search(client, auth_headers, 'q=季度报告 图表&types=task')
+        assert [result['id'] for result in data['results']] == [in_description.id]
+
+    def test_short_terms_and_paging(self, client, auth_headers):
+        """测试少于3个字符的关键词（无法走trigram索引）与分页"""
+        tasks = [self._task(f'第{index}份周报') for index in range(5)]
+        self._task('月度总结')
+
+        status, data = self._search(client, auth_headers, 'q=周报&limit=3')
+        assert status == 200
+        assert data['count'] == 3 and data['has_more'] is True
+        status, rest = self._search(client, auth_headers, 'q=周报&limit=3&offset=3')
+        assert rest['has_more'] is False
+        # 没有相关度时由新到旧
+        assert [result['id'] for result in data['results'] + rest['results']] == [task.id for task in reversed(tasks)]
+
+    def test_index_follows_updates_and_deletes(self, app, client, auth_headers):
+        """测试触发器随更新与删除维护索引"""
+        from app import db
+        from services.search_index import search_index
+
+        task = self._task('准备组会')
+        task.title = '准备答辩'
+        db.session.commit()
+        assert self._search(client, auth_headers, 'q=组会')[1]['count'] == 0
+        assert self._search(client, auth_headers, 'q=答辩')[1]['count'] == 1
+
+        db.session.delete(task)
+        db.session.commit()
+        assert self._search(client, auth_headers, 'q=答辩')[1]['count'] == 0
+        db.session.execute(text("INSERT INTO search_index (search_index, rank) VALUES ('integrity-check', 1)"))
+
+        self._task('阅读论文')
+        assert search_index.rebuild()
+        assert self._search(client, auth_headers, 'q=阅读论文')[1]['count'] == 1
+
+    def test_like_fallback(self, app, client, auth_headers):
+        """测试没有FTS索引时退化为LIKE查询"""
+        from app import db
+        from services.search_index import search_index
+
+        task = self._task('整理实验记录', description='周报素材')
+        search_index.drop(db.session.connection())
+        db.session.commit()
+
+        status, data = self._search(client, auth_headers, 'q=实验 周报')
+        assert status == 200
+        assert data['engine'] == 'like'
+        assert [result['id'] for result in data['results']] == [task.id]
+
+    def test_time_block_keyword_searches_tasks(self, app, client, auth_headers):
+        """测试时间块搜索的关键词匹配排入的任务"""
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+
+        blocks = [TimeBlock(user_id=USER_ID, date=DAY, start_time=DAY + timedelta(hours=hour),
+                            end_time=DAY + timedelta(hours=hour + 1), block_type=BlockType.RESEARCH, color='#000000')
+                  for hour in (9, 10)]
+        db.session.add_all(blocks)
+        db.session.commit()
+        self._task('实验数据分析', scheduled_time_block_id=blocks[1].id)
+
+        response = client.get('/api/time-blocks/search?keyword=数据分析', headers=auth_headers)
+        assert [block['id'] for block in json.loads(response.data)['results']] == [blocks[1].id]
+        response = client.get('/api/time-blocks/search?keyword=research', headers=auth_headers)
+        assert json.loads(response.data)['count'] == 2
+
+    def test_validation(self, client, auth_headers):
+        """测试参数校验"""
+        assert self._search(client, auth_headers, 'q=')[0] == 400
+        assert self._search(client, auth_headers, 'q=abc&types=task,block')[0] == 400
+        assert self._search(client, auth_headers, 'q=abc&limit=0')[0] == 400
+        assert self._search(client, auth_headers, 'q=abc&offset=-1')[0] == 400
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+生产环境启动配置测试
+"""
+
+import pytest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serve
+
+
+class TestServeOptions:
+    """测试serve.py的gunicorn配置"""
+
+    def test_defaults_preload_gthread(self):
+        """测试默认使用gthread worker并预加载应用"""
+        options = serve.build_options(serve.parse_args([]))
+
+        assert options['worker_class'] == 'gthread'
+        assert options['preload_app'] is True
+        assert options['keepalive'] == 5
+        assert options['max_requests'] == 0
+        assert options['post_fork'] is serve._post_fork
+        assert 'pidfile' not in options
+
+    def test_command_line_overrides(self):
+        """测试命令行参数"""
+        options = serve.build_options(serve.parse_args([
+            '--workers', '3', '--threads', '8', '--keepalive', '10',
+            '--max-requests', '1000', '--no-preload', '--pidfile', '/tmp/app.pid'
+        ]))
+
+        assert options['workers'] == 3
+        assert options['threads'] == 8
+        assert options['keepalive'] == 10
+        assert options['max_requests_jitter'] == 100
+        assert options['preload_app'] is False
+        assert options['pidfile'] == '/tmp/app.pid'
+
+    def test_environment_defaults(self, monkeypatch):
+        """测试环境变量提供默认值"""
+        monkeypatch.setenv('WEB_WORKERS', '6')
+        monkeypatch.setenv('WEB_WORKER_CLASS', 'gevent')
+        options = serve.build_options(serve.parse_args([]))
+
+        assert options['workers'] == 6
+        assert options['worker_class'] == 'gevent'
+
+    def test_asgi_uses_uvicorn_worker(self):
+        """测试ASGI模式"""
+        options = serve.build_options(serve.parse_args(['--asgi', '--worker-class', 'sync']))
+        assert options['worker_class'] == 'uvicorn.workers.UvicornWorker'
+
+    def test_options_are_valid_gunicorn_settings(self):
+        """测试配置项均为gunicorn可识别的设置"""
+        config = pytest.importorskip('gunicorn.config')
+        settings = config.Config().settings
+
+        options = serve.build_options(serve.parse_args(['--pidfile', '/tmp/app.pid', '--access-log', '-']))
+        assert set(options) <= set(settings)
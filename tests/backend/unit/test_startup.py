@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+应用启动测试：蓝图注册表、按需加载迁移、启动耗时分析
+"""
+
+import pytest
+import subprocess
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, BLUEPRINTS
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), 'backend')
+
+
+def _run_python(code: str) -> str:
+    """在独立进程中执行代码，保证sys.modules干净"""
+    env = dict(os.environ, FLASK_ENV='testing')
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+class TestStartup:
+    """测试应用启动"""
+
+    def test_all_blueprints_registered(self):
+        """测试注册表中的蓝图全部注册且前缀正确"""
+        app = create_app()
+        assert len(app.blueprints) == len(BLUEPRINTS)
+
+        rules = {rule.rule for rule in app.url_map.iter_rules()}
+        assert '/api/auth/login' in rules
+        assert '/api/pomodoro-sessions/stream' in rules
+        assert '/api/recommendations/current' in rules
+        assert '/api/jobs/' in rules
+
+    def test_web_process_skips_migrations(self):
+        """测试Web进程不导入alembic"""
+        output = _run_python(
+            "import sys\n"
+            "from app import create_app\n"
+            "app = create_app()\n"
+            "print('alembic' in sys.modules, 'migrate' in app.extensions)"
+        )
+        assert output.strip() == 'False False'
+
+    def test_web_process_skips_conflict_detection(self):
+        """测试启动时不导入冲突检测服务（及其依赖的numpy）"""
+        output = _run_python(
+            "import sys\n"
+            "from app import create_app\n"
+            "create_app()\n"
+            "print('services.conflict_resolution' in sys.modules)"
+        )
+        assert output.strip() == 'False'
+
+    def test_matching_service_defers_numpy(self):
+        """测试导入匹配与冲突检测服务不加载numpy"""
+        output = _run_python(
+            "import sys\n"
+            "from app import create_app\n"
+            "create_app()\n"
+            "import services.conflict_resolution\n"
+            "print('numpy' in sys.modules)"
+        )
+        assert output.strip() == 'False'
+
+    def test_migrations_enabled_by_config(self):
+        """测试配置强制启用迁移"""
+        pytest.importorskip('flask_migrate')
+        from config import TestingConfig
+
+        class MigrationsConfig(TestingConfig):
+            MIGRATIONS_ENABLED = True
+
+        app = create_app(MigrationsConfig)
+        assert 'migrate' in app.extensions
+        assert 'db' in app.cli.commands
+
+    def test_startup_profile_report(self):
+        """测试--startup-profile按子系统输出耗时"""
+        result = subprocess.run([sys.executable, 'app.py', '--startup-profile'], cwd=BACKEND_DIR,
+                                env=dict(os.environ, FLASK_ENV='testing'),
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+
+        subsystems = [line.split()[0] for line in result.stdout.splitlines()[1:]]
+        assert subsystems[:2] == ['flask', 'sqlalchemy']
+        assert 'models' in subsystems
+        assert 'routes.task_routes' in subsystems
+        assert subsystems[-2:] == ['create_app', 'total']
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+任务列表过滤测试
+"""
+
+import pytest
+import random
+import json
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, select, text
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestTaskFilters:
+    """测试按标签、项目、优先级与计划时间过滤任务"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {'Authorization': f'Bearer {access_token}'}
+
+    @pytest.fixture
+    def tasks(self, app):
+        """5个任务：标签组合、项目、优先级与计划时间各不相同"""
+        from app import db
+        from models.project import Project
+        from models.tag import Tag
+        from models.task import Task, TaskType, PriorityLevel
+
+        tags = {name: Tag(name=name, user_id=USER_ID) for name in ('论文', '英文', '紧急')}
+        project = Project(name='毕业设计', user_id=USER_ID, color='#000000')
+        db.session.add_all([*tags.values(), project])
+        db.session.flush()
+
+        specs = [
+            ('读论文', ('论文', '英文'), project.id, PriorityLevel.HIGH, 0),
+            ('写论文', ('论文',), project.id, PriorityLevel.MEDIUM, 1),
+            ('背单词', ('英文',), None, PriorityLevel.LOW, 2),
+            ('交材料', ('论文', '英文', '紧急'), None, PriorityLevel.HIGH, 3),
+            ('跑步', (), None, PriorityLevel.MEDIUM, 4),
+        ]
+        for title, tag_names, project_id, priority, days in specs:
+            task = Task(title=title, user_id=USER_ID, category_id='missing-category', project_id=project_id,
+                        priority=priority, planned_start_time=DAY + timedelta(days=days),
+                        task_type=TaskType.FLEXIBLE)
+            task.tags = [tags[name] for name in tag_names]
+            db.session.add(task)
+        db.session.add(Task(title='别人的论文', user_id='other-user-id', category_id='missing-category',
+                            planned_start_time=DAY, task_type=TaskType.FLEXIBLE, tags=[tags['论文']]))
+        db.session.commit()
+        return {name: tag.id for name, tag in tags.items()}, project.id
+
+    def _titles(self, client, auth_headers, query):
+        response = client.get(f'/api/tasks/?{query}', headers=auth_headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return sorted(task['title'] for task in json.loads(response.data)['tasks'])
+
+    def test_tag_filters(self, client, auth_headers, tasks):
+        """测试多个标签的any / all语义"""
+        tag_ids, _ = tasks
+        paper, english, urgent = tag_ids['论文'], tag_ids['英文'], tag_ids['紧急']
+
+        assert self._titles(client, auth_headers, f'tag_ids={paper}') == ['交材料', '写论文', '读论文']
+        assert self._titles(client, auth_headers, f'tag_ids={paper},{english}') == [
+            '交材料', '写论文', '背单词', '读论文'
+        ]
+        assert self._titles(client, auth_headers, f'tag_ids={paper}&tag_ids={english}&tag_match=all') == [
+            '交材料', '读论文'
+        ]
+        # 重复的标签ID不影响all语义
+        assert self._titles(client, auth_headers, f'tag_ids={urgent},{paper},{paper}&tag_match=all') == ['交材料']
+        assert self._titles(client, auth_headers, 'tag_ids=missing-tag') == []
+
+    def test_combined_filters_in_one_query(self, app, client, auth_headers, tasks):
+        """测试项目、优先级、时间范围与标签组合过滤，只执行一条查询"""
+        from app import db
+
+        tag_ids, project_id = tasks
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            titles = self._titles(
+                client, auth_headers,
+                f'tag_ids={tag_ids["论文"]}&priority=HIGH&planned_start_from={DAY:%Y-%m-%dT%H:%M:%S}'
+                f'&planned_start_to={DAY + timedelta(days=3):%Y-%m-%dT%H:%M:%S}'
+            )
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert titles == ['交材料', '读论文']
+        assert len(statements) == 1 and 'task_tags' in statements[0]
+
+        assert self._titles(client, auth_headers, f'project_id={project_id}') == ['写论文', '读论文']
+        assert self._titles(client, auth_headers, f'project_id={project_id}&tag_ids={tag_ids["英文"]}') == ['读论文']
+        assert self._titles(
+            client, auth_headers, f'planned_start_from={(DAY + timedelta(days=2)).isoformat()}'
+        ) == ['交材料', '背单词', '跑步']
+
+    def test_validation(self, client, auth_headers):
+        """测试参数校验"""
+        for query in ('priority=URGENT', 'status=DONE', 'planned_start_from=tomorrow',
+                      'planned_start_to=2025-13-01', 'tag_ids=a&tag_match=some'):
+            assert client.get(f'/api/tasks/?{query}', headers=auth_headers).status_code == 400
+
+    def test_tag_filter_query_plan(self, app, client, auth_headers):
+        """测试标签过滤的结果与逐个任务计算一致，且走 (tag_id, task_id) 索引（耗时见 benchmarks/bench_task_filters.py）"""
+        from app import db
+        from models.tag import Tag
+        from models.task import Task, TaskType
+        from models.task_tags import task_tags
+
+        rng = random.Random(42)
+        tag_ids = [str(uuid.uuid4()) for _ in range(20)]
+        db.session.execute(Tag.__table__.insert(), [
+            {'id': tag_id, 'name': f'tag{index}', 'user_id': USER_ID} for index, tag_id in enumerate(tag_ids)
+        ])
+        weights = [1 / rank for rank in range(1, len(tag_ids) + 1)]
+        tasks, links, tags_by_task = [], [], {}
+        for index in range(500):
+            task_id = str(uuid.uuid4())
+            tasks.append({'id': task_id, 'title': f'task {index}', 'user_id': USER_ID,
+                          'category_id': 'missing-category', 'planned_start_time': DAY + timedelta(minutes=index),
+                          'task_type': TaskType.FLEXIBLE})
+            tags_by_task[task_id] = set(rng.choices(tag_ids, weights, k=rng.randint(0, 4)))
+            links.extend({'task_id': task_id, 'tag_id': tag_id} for tag_id in tags_by_task[task_id])
+        db.session.execute(Task.__table__.insert(), tasks)
+        db.session.execute(task_tags.insert(), links)
+        db.session.commit()
+
+        def expected(ids, match_all):
+            wanted = set(ids)
+            return {task_id for task_id, tags in tags_by_task.items()
+                    if (wanted <= tags if match_all else wanted & tags)}
+
+        cases = [(tag_ids[-1:], False), (tag_ids[8:11], False), (tag_ids[:2], True), (tag_ids[3:6], True)]
+        for ids, match_all in cases:
+            statement = select(Task.id).where(Task.user_id == USER_ID, Task.tagged_with(ids, match_all))
+            plan = ' '.join(row[-1] for row in db.session.execute(
+                text('EXPLAIN QUERY PLAN ' + str(statement.compile(db.engine,
+                                                                   compile_kwargs={'literal_binds': True})))
+            ))
+            # 不扫描任务表，标签条件走 (tag_id, task_id) 覆盖索引
+            assert 'SCAN tasks' not in plan, plan
+            assert 'COVERING INDEX ix_task_tags_tag_id_task_id' in plan, plan
+            assert set(db.session.scalars(statement)) == expected(ids, match_all)
+
+        # 接口：少见标签的过滤结果
+        response = client.get(f'/api/tasks/?tag_ids={tag_ids[-1]}', headers=auth_headers)
+        assert json.loads(response.data)['count'] == len(expected(tag_ids[-1:], False))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+时间块存储时长（duration_minutes）测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestTimeBlockDuration:
+    """测试时长列的维护与按时长搜索"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    def _stored_duration(self, block_id):
+        from app import db
+        return db.session.execute(text('SELECT duration_minutes FROM time_blocks WHERE id = :id'),
+                                  {'id': block_id}).scalar()
+
+    def test_duration_follows_create_and_update(self, app, client, auth_headers):
+        """测试创建、修改时间与Core批量插入时存储的时长同步"""
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+
+        response = client.post('/api/time-blocks/', headers=auth_headers, data=json.dumps({
+            'date': '2025-03-10', 'start_time': '2025-03-10T09:00:00', 'end_time': '2025-03-10T10:30:00',
+            'block_type': 'RESEARCH', 'color': '#000000'
+        }))
+        block_id = json.loads(response.data)['time_block']['id']
+        assert self._stored_duration(block_id) == 90
+
+        client.put(f'/api/time-blocks/{block_id}', headers=auth_headers,
+                   data=json.dumps({'end_time': '2025-03-10T09:45:00'}))
+        assert self._stored_duration(block_id) == 45
+
+        db.session.execute(TimeBlock.__table__.insert(), [{
+            'id': 'bulk-block', 'user_id': USER_ID, 'date': DAY, 'start_time': DAY,
+            'end_time': DAY + timedelta(minutes=20), 'block_type': BlockType.REST, 'color': '#000000'
+        }])
+        db.session.commit()
+        assert self._stored_duration('bulk-block') == 20
+
+    def test_search_filters_and_sorts_by_duration(self, app, client, auth_headers):
+        """测试时间块搜索的min_duration、max_duration与sort_by=duration"""
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+
+        blocks = {}
+        for hour, minutes in ((8, 30), (10, 120), (14, 60), (18, 45)):
+            start_time = DAY + timedelta(hours=hour)
+            blocks[minutes] = TimeBlock(user_id=USER_ID, date=DAY, start_time=start_time,
+                                        end_time=start_time + timedelta(minutes=minutes),
+                                        block_type=BlockType.GROWTH, color='#000000')
+        db.session.add_all(blocks.values())
+        db.session.commit()
+
+        def search(query):
+            response = client.get(f'/api/time-blocks/search?{query}', headers=auth_headers)
+            return [block['duration'] for block in json.loads(response.data)['results']]
+
+        assert search('sort_by=duration&sort_order=asc') == [30, 45, 60, 120]
+        assert search('sort_by=duration&sort_order=desc') == [120, 60, 45, 30]
+        assert search('min_duration=45&max_duration=60&sort_by=duration&sort_order=asc') == [45, 60]
+        assert search('min_duration=100') == [120]
+
+    def test_create_all_upgrades_old_schema(self, app):
+        """测试旧数据库缺少时长列时，db.create_all() 补列并回填"""
+        from app import db
+        from models.time_block import sync_durations
+
+        db.session.execute(text('DROP INDEX ix_time_blocks_user_id_duration_minutes'))
+        db.session.execute(text('ALTER TABLE time_blocks DROP COLUMN duration_minutes'))
+        db.session.execute(text(
+            "INSERT INTO time_blocks (id, user_id, date, start_time, end_time, block_type, color) "
+            "VALUES ('old-block', :user_id, '2025-03-10 00:00:00.000000', '2025-03-10 09:00:00.000000', "
+            "'2025-03-10 09:50:00.000000', 'RESEARCH', '#000000')"
+        ), {'user_id': USER_ID})
+        db.session.commit()
+
+        db.create_all()
+        assert self._stored_duration('old-block') == 50
+        index_names = {row[1] for row in db.session.execute(text("PRAGMA index_list('time_blocks')"))}
+        assert 'ix_time_blocks_user_id_duration_minutes' in index_names
+
+        # 绕过ORM修改时间后，sync_durations修正存储的时长
+        db.session.execute(text("UPDATE time_blocks SET end_time = '2025-03-10 10:00:00.000000'"))
+        assert sync_durations(db.session.connection()) == 1
+        assert self._stored_duration('old-block') == 60
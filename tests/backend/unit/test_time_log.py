@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+时间账本测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from sqlalchemy import event
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestTimeLog:
+    """测试番茄钟会话生成的时间日志"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def task(self, app):
+        """项目与分类下的任务"""
+        from app import db
+        from models.project import Project
+        from models.task import Task, TaskType
+        from models.task_category import TaskCategory
+
+        category = TaskCategory(name='科研', user_id=USER_ID, color='#000000')
+        project = Project(name='毕业设计', user_id=USER_ID, color='#000000')
+        db.session.add_all([category, project])
+        db.session.flush()
+        task = Task(title='阅读论文', user_id=USER_ID, category_id=category.id, project_id=project.id,
+                    planned_start_time=DAY, task_type=TaskType.FLEXIBLE)
+        db.session.add(task)
+        db.session.commit()
+        return task
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """可设置的当前时间，会话开始、结束时间取自它"""
+        from models import pomodoro_session
+
+        class Clock(datetime):
+            now_value = DAY
+
+            @classmethod
+            def utcnow(cls):
+                return cls.now_value
+
+        monkeypatch.setattr(pomodoro_session, 'datetime', Clock)
+        return Clock
+
+    def _run_session(self, clock, task, start, minutes, interrupt=False, session_type=None):
+        """从start开始运行minutes分钟后完成（或中断）会话"""
+        from app import db
+        from models.pomodoro_session import PomodoroSession, SessionType
+
+        clock.now_value = start
+        session = PomodoroSession(task_id=task.id, user_id=USER_ID,
+                                  session_type=session_type or SessionType.FOCUS)
+        db.session.add(session)
+        session.start()
+        clock.now_value = start + timedelta(minutes=minutes)
+        if interrupt:
+            session.interrupt('电话')
+        else:
+            session.complete('读完引言部分')
+        db.session.commit()
+        return session
+
+    def test_complete_and_interrupt_generate_logs(self, app, task, clock):
+        """测试完成与中断都生成日志并记录任务快照，休息会话不生成"""
+        from app import db
+        from models.pomodoro_session import SessionType
+        from models.time_log import TimeLog
+
+        project_id = task.project_id
+        session = self._run_session(clock, task, DAY.replace(hour=9), 25)
+        time_log = session.time_log
+        assert time_log is not None and time_log.duration == 25
+        assert time_log.task_id == task.id and time_log.completion_summary == '读完引言部分'
+        assert time_log.start_time == session.start_time and time_log.end_time == session.end_time
+        assert time_log.is_valid()
+
+        # 任务修改不影响已有日志的快照与归属
+        task.title = '重读论文'
+        task.project_id = None
+        db.session.commit()
+        data = time_log.to_dict()
+        assert data['task_snapshot']['title'] == '阅读论文'
+        assert data['task_snapshot']['status'] == 'PENDING'
+        assert data['project_id'] == project_id and data['category_id'] == task.category_id
+
+        self._run_session(clock, task, DAY.replace(hour=10), 10, interrupt=True)
+        self._run_session(clock, task, DAY.replace(hour=11), 5, session_type=SessionType.BREAK)
+        assert sorted(log.duration for log in TimeLog.query.all()) == [10, 25]
+
+    def test_logs_never_overlap(self, app, task, clock):
+        """测试与已有日志重叠的部分不计入，完全被覆盖时不生成日志"""
+        from models.time_log import TimeLog
+
+        self._run_session(clock, task, DAY.replace(hour=9), 30)
+        clipped = self._run_session(clock, task, DAY.replace(hour=9, minute=20), 25)
+        covered = self._run_session(clock, task, DAY.replace(hour=9, minute=5), 10)
+
+        assert clipped.time_log.start_time == DAY.replace(hour=9, minute=30)
+        assert clipped.time_log.duration == 15
+        assert clipped.actual_duration == 25
+        assert covered.time_log is None
+
+        logs = TimeLog.query.order_by(TimeLog.start_time).all()
+        assert [log.duration for log in logs] == [30, 15]
+        assert all(log.is_valid() for log in logs)
+        overlapping = TimeLog(user_id=USER_ID, task_id=task.id, start_time=DAY.replace(hour=9, minute=40),
+                              end_time=DAY.replace(hour=10), duration=20)
+        assert not overlapping.is_valid()
+
+    def test_free_time_before_later_log_is_kept(self, app, task, clock):
+        """测试只扣除重叠的区间：已有日志开始晚于会话时保留之前的空闲时间，多段空闲取最长的一段"""
+        from app import db
+        from models.pomodoro_session import PomodoroSession, SessionStatus
+        from models.time_log import TimeLog, backfill_time_logs
+
+        self._run_session(clock, task, DAY.replace(hour=10, minute=20), 20)
+        self._run_session(clock, task, DAY.replace(hour=15, minute=10), 10)
+
+        # 补生成早于已有实时日志开始的会话
+        for start, minutes in ((DAY.replace(hour=10), 25), (DAY.replace(hour=15), 45)):
+            session = PomodoroSession(task_id=task.id, user_id=USER_ID)
+            session.status = SessionStatus.COMPLETED
+            session.start_time = start
+            session.end_time = start + timedelta(minutes=minutes)
+            db.session.add(session)
+        db.session.commit()
+        assert backfill_time_logs() == 2
+
+        logs = TimeLog.query.order_by(TimeLog.start_time).all()
+        assert [(log.start_time.strftime('%H:%M'), log.end_time.strftime('%H:%M'), log.duration) for log in logs] == [
+            ('10:00', '10:20', 20), ('10:20', '10:40', 20), ('15:10', '15:20', 10), ('15:20', '15:45', 25)
+        ]
+        assert all(log.is_valid() for log in logs)
+
+    def test_aggregates_without_loading_tasks(self, app, task, clock):
+        """测试项目与分类的实际时间不加载任务，与按时间日志汇总的结果一致"""
+        from app import db
+        from models.project import Project
+        from models.task_category import TaskCategory
+
+        self._run_session(clock, task, DAY.replace(hour=9), 25)
+        self._run_session(clock, task, DAY.replace(hour=10), 20, interrupt=True)
+        db.session.expire_all()
+
+        project = Project.query.one()
+        category = TaskCategory.query.one()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            assert project.get_total_actual_time() == 45
+            assert category.get_total_time_spent() == 45
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert statements == []
+
+        total = db.session.scalar(db.text('SELECT sum(duration) FROM time_logs WHERE project_id = :id'),
+                                  {'id': project.id})
+        assert total == 45
+        plan = db.session.execute(db.text(
+            'EXPLAIN QUERY PLAN SELECT sum(duration) FROM time_logs WHERE project_id = :id'
+        ), {'id': project.id}).all()
+        assert 'COVERING INDEX ix_time_logs_project_id_duration' in ' '.join(row[-1] for row in plan)
+
+    def test_backfill_and_cascade(self, app, task):
+        """测试为已有会话补生成日志，删除任务时日志一并删除"""
+        from app import db
+        from models.pomodoro_session import PomodoroSession, SessionStatus
+        from models.time_log import TimeLog, backfill_time_logs
+
+        for hour in (9, 10):
+            session = PomodoroSession(task_id=task.id, user_id=USER_ID)
+            session.status = SessionStatus.COMPLETED
+            session.start_time = DAY.replace(hour=hour)
+            session.end_time = DAY.replace(hour=hour, minute=25)
+            db.session.add(session)
+        db.session.commit()
+
+        assert backfill_time_logs() == 2
+        assert backfill_time_logs() == 0
+        assert json.loads(TimeLog.query.first().task_snapshot)['title'] == '阅读论文'
+
+        db.session.delete(task)
+        db.session.commit()
+        assert TimeLog.query.count() == 0
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+时间轴接口测试
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+
+
+class TestTimeline:
+    """测试时间轴接口"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    def _seed(self, day, block_count, tasks_per_block):
+        from app import db
+        from models.pomodoro_session import PomodoroSession
+        from models.task import Task, TaskType
+        from models.time_block import TimeBlock, BlockType
+
+        blocks = []
+        for index in range(block_count):
+            start_time = day + timedelta(hours=8 + index)
+            blocks.append(TimeBlock(user_id=USER_ID, date=day, start_time=start_time,
+                                    end_time=start_time + timedelta(minutes=50),
+                                    block_type=BlockType.RESEARCH, color='#000000'))
+        db.session.add_all(blocks)
+        db.session.flush()
+
+        tasks = [
+            Task(title=f'任务{index}-{offset}', user_id=USER_ID, category_id='missing-category',
+                 planned_start_time=block.start_time + timedelta(minutes=offset), task_type=TaskType.FLEXIBLE,
+                 scheduled_time_block_id=block.id)
+            for index, block in enumerate(blocks)
+            for offset in range(tasks_per_block)
+        ]
+        db.session.add_all(tasks)
+        db.session.flush()
+
+        for task in tasks[:3]:
+            session = PomodoroSession(task_id=task.id, user_id=USER_ID)
+            session.start_time = task.planned_start_time
+            db.session.add(session)
+        db.session.commit()
+        return blocks, tasks
+
+    def _get(self, client, auth_headers, query):
+        response = client.get(f'/api/timeline?{query}', headers=auth_headers)
+        return response.status_code, json.loads(response.data)
+
+    def test_day_timeline(self, client, auth_headers):
+        """测试单日时间轴包含嵌套的已排程任务与当天的番茄钟会话"""
+        blocks, tasks = self._seed(DAY, 3, 2)
+        self._seed(DAY + timedelta(days=1), 1, 1)
+
+        status, data = self._get(client, auth_headers, 'date=2025-03-10')
+        assert status == 200
+        assert [block['id'] for block in data['time_blocks']] == [block.id for block in blocks]
+        assert [task['id'] for task in data['time_blocks'][0]['scheduled_tasks']] == [t.id for t in tasks[:2]]
+        assert len(data['pomodoro_sessions']) == 3
+        assert {session['task_id'] for session in data['pomodoro_sessions']} == {task.id for task in tasks[:3]}
+
+        status, data = self._get(client, auth_headers, 'start=2025-03-10&end=2025-03-11')
+        assert len(data['time_blocks']) == 4
+        assert len(data['pomodoro_sessions']) == 4
+
+    def test_query_count_is_fixed(self, app, client, auth_headers):
+        """测试查询次数固定，不随时间块与任务数量增长"""
+        from app import db
+
+        self._seed(DAY, 10, 3)
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            status, data = self._get(client, auth_headers, 'date=2025-03-10')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        assert status == 200
+        assert sum(len(block['scheduled_tasks']) for block in data['time_blocks']) == 30
+        assert len([statement for statement in statements if statement.lstrip().upper().startswith('SELECT')]) == 3
+
+    def test_validation(self, client, auth_headers):
+        """测试参数校验"""
+        assert self._get(client, auth_headers, '')[0] == 400
+        assert self._get(client, auth_headers, 'date=abc')[0] == 400
+        assert self._get(client, auth_headers, 'start=2025-03-10&end=2025-03-09')[0] == 400
+        assert self._get(client, auth_headers, 'start=2025-03-01&end=2025-04-15')[0] == 400
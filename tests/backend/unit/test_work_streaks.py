@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+连续工作检测测试（随机生成日程的性质测试）
+"""
+
+import pytest
+import json
+import random
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from flask_jwt_extended import create_access_token
+
+DAY = datetime(2025, 3, 10)
+USER_ID = 'test-user-id'
+PROPERTY_RUNS = 200
+
+
+class TestWorkStreaks:
+    """测试连续工作检测"""
+
+    @pytest.fixture
+    def app(self):
+        """创建测试应用"""
+        app = create_app()
+        app.config['TESTING'] = True
+        app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        with app.app_context():
+            from app import db
+            db.create_all()
+            yield app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def auth_headers(self, app):
+        """创建认证头"""
+        access_token = create_access_token(identity=USER_ID)
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+
+    @pytest.fixture
+    def service(self, app):
+        from services.conflict_resolution import conflict_resolution_service
+        return conflict_resolution_service
+
+    def _random_blocks(self, rng, count):
+        """生成未保存的时间块：两天内随机开始，时长5~120分钟，可能重叠或相邻"""
+        from models.time_block import TimeBlock, BlockType
+
+        blocks = []
+        for index in range(count):
+            start_time = DAY + timedelta(minutes=rng.randrange(0, 2 * 24 * 60, 5))
+            blocks.append(TimeBlock(
+                id=f'block-{index:03d}',
+                user_id=USER_ID,
+                date=start_time.replace(hour=0, minute=0),
+                start_time=start_time,
+                end_time=start_time + timedelta(minutes=rng.randrange(5, 125, 5)),
+                block_type=rng.choice(list(BlockType)),
+                color='#000000'
+            ))
+        return blocks
+
+    def _reference_streaks(self, blocks, policy):
+        """参照实现：同一天内 [开始, 结束+最短休息) 相交的工作时间块连通为一段，逐对比较 O(n²)"""
+        from services.conflict_resolution import WORK_BLOCK_TYPES
+
+        work_blocks = [block for block in blocks if block.block_type in WORK_BLOCK_TYPES]
+        parent = {block.id: block.id for block in work_blocks}
+
+        def find(block_id):
+            while parent[block_id] != block_id:
+                block_id = parent[block_id]
+            return block_id
+
+        for first in work_blocks:
+            for second in work_blocks:
+                if first.start_time.date() == second.start_time.date() and \
+                        first.start_time < second.end_time + policy.min_rest and \
+                        second.start_time < first.end_time + policy.min_rest:
+                    parent[find(first.id)] = find(second.id)
+
+        groups = {}
+        for block in work_blocks:
+            groups.setdefault(find(block.id), []).append(block)
+
+        streaks = set()
+        for group in groups.values():
+            span = max(block.end_time for block in group) - min(block.start_time for block in group)
+            if len(group) >= 2 and span > policy.max_work:
+                streaks.add(frozenset(block.id for block in group))
+        return streaks
+
+    def test_matches_reference_on_random_schedules(self, app, service):
+        """性质：每段超长的最长连续工作恰好报告一次，与逐对比较的参照实现一致，且与输入顺序无关"""
+        from services.conflict_resolution import WorkStreakPolicy
+
+        rng = random.Random(20250310)
+        for _ in range(PROPERTY_RUNS):
+            blocks = self._random_blocks(rng, rng.randint(0, 40))
+            policy = WorkStreakPolicy(rng.choice((5, 15, 30)), rng.choice((60, 120, 180)))
+
+            conflicts = service._detect_schedule_violations(blocks, policy)
+            reported = [frozenset(block.id for block in conflict.affected_blocks) for conflict in conflicts]
+
+            assert len(reported) == len(set(reported))
+            assert set(reported) == self._reference_streaks(blocks, policy)
+            # 同一时间块不会出现在两段连续工作中
+            assert sum(len(streak) for streak in reported) == len(set().union(*reported))
+
+            rng.shuffle(blocks)
+            shuffled = service._detect_schedule_violations(blocks, policy)
+            assert sorted(c.key for c in shuffled) == sorted(c.key for c in conflicts)
+
+    def test_streak_internal_gaps_are_shorter_than_min_rest(self, app, service):
+        """性质：报告的连续段内部没有不少于最短休息的间隔，总时长超过上限"""
+        from services.conflict_resolution import WorkStreakPolicy
+
+        rng = random.Random(7)
+        for _ in range(PROPERTY_RUNS):
+            policy = WorkStreakPolicy(rng.choice((10, 15, 20)), rng.choice((90, 180)))
+            for conflict in service._detect_schedule_violations(self._random_blocks(rng, 30), policy):
+                blocks = conflict.affected_blocks
+                assert len(blocks) >= 2
+                assert len({block.start_time.date() for block in blocks}) == 1
+                assert max(b.end_time for b in blocks) - blocks[0].start_time > policy.max_work
+
+                latest_end = blocks[0].end_time
+                for block in blocks[1:]:
+                    assert block.start_time - latest_end < policy.min_rest
+                    latest_end = max(latest_end, block.end_time)
+
+    def test_long_day_reported_once(self, app, service):
+        """测试一整段紧挨着的工作时间块只报告一次，而不是每三个一组重复报告"""
+        from models.time_block import TimeBlock, BlockType
+        from services.conflict_resolution import WorkStreakPolicy
+
+        blocks = [
+            TimeBlock(id=f'block-{hour}', user_id=USER_ID, date=DAY, block_type=BlockType.RESEARCH,
+                      start_time=DAY + timedelta(hours=hour), end_time=DAY + timedelta(hours=hour, minutes=55),
+                      color='#000000')
+            for hour in range(8, 16)
+        ]
+        [conflict] = service._detect_schedule_violations(blocks, WorkStreakPolicy())
+        assert len(conflict.affected_blocks) == 8
+        assert conflict.message.startswith('连续工作 475 分钟')
+
+    def test_thresholds_from_preferences(self, app, client, auth_headers, service):
+        """测试阈值来自用户偏好，偏好接口拒绝不合法的阈值"""
+        from app import db
+        from models.time_block import TimeBlock, BlockType
+        from models.user import User
+
+        db.session.add(User(id=USER_ID, username='tester', email='tester@example.com', password_hash='x'))
+        for start_minute, minutes in ((9 * 60, 50), (10 * 60, 50), (11 * 60, 50)):
+            start_time = DAY + timedelta(minutes=start_minute)
+            db.session.add(TimeBlock(user_id=USER_ID, date=DAY, start_time=start_time,
+                                     end_time=start_time + timedelta(minutes=minutes),
+                                     block_type=BlockType.GROWTH, color='#000000'))
+        db.session.commit()
+
+        # 默认阈值：间隔10分钟不算休息，但总共170分钟未超过180分钟
+        assert service.detect_conflicts(USER_ID, DAY) == []
+
+        response = client.put('/api/users/preferences', headers=auth_headers, data=json.dumps({
+            'preferences': {'max_continuous_work_minutes': 120}
+        }))
+        assert response.status_code == 200
+        [conflict] = service.detect_conflicts(USER_ID, DAY)
+        assert conflict.conflict_type == 'schedule_violation'
+
+        # 10分钟的间隔已足够休息
+        client.put('/api/users/preferences', headers=auth_headers, data=json.dumps({
+            'preferences': {'max_continuous_work_minutes': 120, 'min_rest_minutes': 10}
+        }))
+        assert service.detect_conflicts(USER_ID, DAY) == []
+
+        for value in (0, -5, 'abc', True, 2000):
+            response = client.put('/api/users/preferences', headers=auth_headers, data=json.dumps({
+                'preferences': {'min_rest_minutes': value}
+            }))
+            assert response.status_code == 400